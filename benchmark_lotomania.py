@@ -0,0 +1,266 @@
+"""
+Benchmarks dos caminhos críticos da LotomaniaIA (execução sem interface gráfica).
+
+Uso:
+    python benchmark_lotomania.py                         # histórico real + simulados 10x e 100x
+    python benchmark_lotomania.py --escalas 1,10 --saida bench.json
+    python benchmark_lotomania.py --comparar bench_anterior.json --tolerancia 0.25
+
+Os resultados são gravados em JSON para que execuções diferentes possam ser
+comparadas e regressões de desempenho sejam detectadas.
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+import lotomania_core as lot
+
+BENCHMARK_FILE = "benchmark_lotomania.json"
+
+# Critérios folgados: praticamente toda combinação é aceita na primeira tentativa
+CRITERIOS_FOLGADOS = {
+    'soma_min': 0, 'soma_max': 4950,
+    'pares_min': 0, 'pares_max': 50,
+    'impares_min': 0, 'impares_max': 50,
+    'moldura_min': 0, 'moldura_max': 36,
+    'miolo_min': 0, 'miolo_max': 64,
+    'max_consecutivos': None,
+    'primos_min': 0, 'primos_max': 25,
+}
+
+# Critérios estreitos: os valores padrão da janela de geração balanceada (~1% de aceitação)
+CRITERIOS_ESTREITOS = {
+    'soma_min': 2000, 'soma_max': 3000,
+    'pares_min': 20, 'pares_max': 30,
+    'impares_min': 20, 'impares_max': 30,
+    'moldura_min': 12, 'moldura_max': 22,
+    'miolo_min': 28, 'miolo_max': 38,
+    'max_consecutivos': 3,
+    'primos_min': 10, 'primos_max': 18,
+}
+
+
+def medir(func, repeticoes=5):
+    """Executa func() 'repeticoes' vezes e retorna estatísticas de tempo em segundos."""
+    tempos = []
+    for _ in range(repeticoes):
+        with contextlib.redirect_stdout(io.StringIO()): # Silencia os prints das funções medidas
+            inicio = time.perf_counter()
+            func()
+            tempos.append(time.perf_counter() - inicio)
+    return {
+        'min': min(tempos),
+        'mediana': statistics.median(tempos),
+        'media': statistics.mean(tempos),
+        'repeticoes': repeticoes,
+    }
+
+
+def _casos_de_benchmark(historico_map, caminho_json, num_jogos, compartilhado):
+    """Monta a lista de (nome, função) a medir para um histórico."""
+    historico = [historico_map[c] for c in sorted(historico_map.keys())]
+    frequencias, _ = lot.analisar_frequencia_lotomania(historico)
+    modelo_transicao = lot.ModeloTransicao.do_historico(historico)
+    indice_concursos = lot.IndiceConcursos.do_historico_map(historico_map)
+    combinacoes_teste = lot.gerar_aleatorio_lotomania(1000)
+    jogos_comparacao = lot.gerar_aleatorio_lotomania(num_jogos)
+    carteira = lot.gerar_aleatorio_lotomania(100)
+    inclusao = list(range(0, 20, 2))
+    exclusao = list(range(80, 100, 3))
+
+    ultimos = {c: historico_map[c] for c in sorted(historico_map)[-10:]}
+    grafico = lot.GraficoFrequencias()
+    dados_grafico = lot.dados_grafico_lotomania("total", historico)
+    grafico.atualizar(*dados_grafico) # O primeiro desenho é completo; os seguintes, na mesma escala, usam blitting
+    caminho_grafico = os.path.join(os.path.dirname(caminho_json), "grafico.png")
+    caminho_csv = os.path.join(os.path.dirname(caminho_json), "historico.csv")
+    with open(caminho_csv, 'w', encoding='utf-8') as f: # Mesmo layout da planilha da Caixa: concurso, data, 20 bolas
+        f.write("Concurso;Data Sorteio;" + ";".join(f"Bola{i}" for i in range(1, 21)) + "\n")
+        for concurso in sorted(historico_map):
+            f.write(f"{concurso};01/01/2000;" + ";".join(map(str, historico_map[concurso])) + "\n")
+
+    def conferir_apostas():
+        registro = lot.RegistroApostas(caminho=None)
+        registro.registrar(combinacoes_teste, min(ultimos), len(ultimos))
+        registro.conferir(ultimos)
+
+    incidencia_teste = np.zeros((len(combinacoes_teste), lot.NUM_DEZENAS_TOTAL), dtype=bool)
+    for linha, combinacao in enumerate(combinacoes_teste):
+        incidencia_teste[linha, combinacao] = True
+
+    def checar_criterios():
+        # Os validadores do pipeline sobre um bloco de 1000 jogos, como no PipelineGeracao
+        caracteristicas = lot.caracteristicas_em_bloco(incidencia_teste)
+        for etapa in lot.etapas_criterios(CRITERIOS_ESTREITOS):
+            etapa.funcao(incidencia_teste, caracteristicas)
+
+    def desdobramento(grupo, k, t):
+        # Também guarda a garantia: um desdobramento que a própria conferência reprova interrompe o benchmark
+        resultado = lot.gerar_desdobramento_lotomania(grupo, k, t, tempo_busca_local=1.0, semente=0)
+        if resultado['verificacao']['falhas']:
+            raise AssertionError(f"Desdobramento [{len(grupo)},{k},{t}] com {resultado['verificacao']['falhas']} alvo(s) sem cobertura.")
+
+    return [
+        ('carregar_historico_map', lambda: lot.carregar_historico_map(caminho_json)),
+        ('analisar_frequencia_lotomania', lambda: lot.analisar_frequencia_lotomania(historico)),
+        ('calcular_estatisticas_historicas_lotomania', lambda: lot.calcular_estatisticas_historicas_lotomania(historico)),
+        ('AnaliseAtrasos.do_historico', lambda: lot.AnaliseAtrasos.do_historico(historico)),
+        ('analisar_volante_lotomania', lambda: lot.analisar_volante_lotomania(historico)),
+        ('testar_aleatoriedade_historico[20 simulações]', lambda: lot.testar_aleatoriedade_historico(historico, simulacoes_pares=20)),
+        ('importar_historico[csv]', lambda: lot.importar_historico([caminho_csv], {})),
+        ('IndiceConcursos.do_historico_map', lambda: lot.IndiceConcursos.do_historico_map(historico_map)),
+        ('IndiceConcursos.consultar[3 dezenas]', lambda: indice_concursos.resultado(indice_concursos.consultar([7, 44, 90]))),
+        ('IndiceConcursos.consultar[jogo >= 15 acertos]', lambda: indice_concursos.resultado(
+            indice_concursos.consultar(jogo=carteira[0], minimo_acertos=15), jogo=carteira[0])),
+        ('gerar_aleatorio_lotomania', lambda: lot.gerar_aleatorio_lotomania(num_jogos)),
+        ('gerar_baseado_em_frequencia_lotomania', lambda: lot.gerar_baseado_em_frequencia_lotomania(frequencias, num_jogos)),
+        ('ModeloTransicao.do_historico', lambda: lot.ModeloTransicao.do_historico(historico)),
+        ('gerar_por_transicao_lotomania', lambda: lot.gerar_por_transicao_lotomania(modelo_transicao, num_jogos)),
+        ('ModeloLogisticoLotomania.atualizar', lambda: lot.ModeloLogisticoLotomania().atualizar(historico)),
+        ('avaliar_modelo_walk_forward', lambda: lot.avaliar_modelo_walk_forward(historico, passo=50)),
+        ('gerar_com_filtros_lotomania', lambda: lot.gerar_com_filtros_lotomania(inclusao, exclusao, num_jogos)),
+        ('gerar_balanceado_lotomania[folgado]', lambda: lot.gerar_balanceado_lotomania(CRITERIOS_FOLGADOS, num_jogos)),
+        ('gerar_balanceado_lotomania[estreito]', lambda: lot.gerar_balanceado_lotomania(CRITERIOS_ESTREITOS, num_jogos)),
+        ('etapas_criterios[estreito, bloco x1000]', checar_criterios),
+        ('PipelineGeracao[frequência + estreito + pontuação p80]', lambda: lot.PipelineGeracao(
+            lot.pesos_de_amostragem("frequencia", frequencias), incluir=inclusao[:3], validadores=lot.etapas_criterios(CRITERIOS_ESTREITOS),
+            pontuadores=[lot.pontuador_dezenas("frequência", [frequencias[n] for n in range(lot.NUM_DEZENAS_TOTAL)], 80)],
+            indice=lot.IndiceJogos()).gerar(num_jogos)),
+        ('avaliar_criterios[estreito, 200k candidatos]', lambda: lot.avaliar_criterios(CRITERIOS_ESTREITOS)),
+        ('GraficoFrequencias.atualizar[blit]', lambda: grafico.atualizar(*dados_grafico)),
+        ('exportar_grafico_lotomania[png]', lambda: lot.exportar_grafico_lotomania(caminho_grafico, historico)),
+        ('gerar_desdobramento_lotomania[60,6,5]', lambda: desdobramento(range(60), 6, 5)),
+        ('gerar_desdobramento_lotomania[54,6,6, alvos amostrados]', lambda: desdobramento(range(54), 6, 6)),
+        ('deduplicar_jogos[limiar 45]', lambda: lot.deduplicar_jogos(jogos_comparacao)),
+        ('avaliar_carteira_lotomania[100 jogos x 200k sorteios]', lambda: lot.avaliar_carteira_lotomania(carteira, num_sorteios=200_000, semente=0)),
+        ('avaliar_carteira_lotomania[exato, 3 jogos]', lambda: lot.avaliar_carteira_lotomania(carteira[:3], metodo="exato")),
+        ('simular_estrategia_paralela[10 jogos x 500k]', lambda: lot.simular_estrategia_paralela(carteira[:10], 500_000, semente=0)),
+        ('comparar_jogos_com_historico', lambda: lot.comparar_jogos_com_historico(jogos_comparacao, historico_map)),
+        ('RegistroApostas.conferir[1000 apostas x 10 concursos]', conferir_apostas),
+        ('simular_sorteios_array', lambda: lot.simular_sorteios_array(len(historico_map))),
+        ('coocorrencia_paralela', lambda: lot.coocorrencia_paralela(compartilhado)),
+        ('backtest_paralelo', lambda: lot.backtest_paralelo(compartilhado, jogos_comparacao)),
+    ]
+
+
+def _historico_simulado(base_map, escala, semente=None):
+    """Gera um histórico sintético 'escala' vezes maior que o histórico base."""
+    num_sorteios = max(1, len(base_map)) * escala
+    sorteios = lot.simular_historico_lotomania(num_sorteios, semente=semente)
+    return {i + 1: sorteio for i, sorteio in enumerate(sorteios)}
+
+
+def executar_benchmarks(escalas=(1, 10, 100), repeticoes=5, num_jogos=15, semente=42, caminho_historico=None):
+    """
+    Executa todos os benchmarks e retorna o dicionário de resultados.
+    escala 1 usa o histórico real; escalas maiores usam históricos simulados.
+    """
+    random.seed(semente)
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            base_map = lot.carregar_historico_map(caminho_historico)
+    except lot.ErroHistorico as e:
+        print(e.mensagem)
+        base_map = {}
+    if not base_map:
+        print("Histórico real não encontrado. A escala 1 usará um histórico simulado.")
+        base_map = _historico_simulado({}, 10000, semente)
+
+    resultados = {}
+    for escala in escalas:
+        historico_map = base_map if escala == 1 else _historico_simulado(base_map, escala, semente + escala)
+        rotulo = "real" if escala == 1 else f"x{escala}"
+        print(f"--- Escala {rotulo}: {len(historico_map)} sorteios ---")
+
+        historico = [historico_map[c] for c in sorted(historico_map.keys())]
+        with tempfile.TemporaryDirectory() as tmp_dir, lot.HistoricoCompartilhado(historico) as compartilhado:
+            caminho_json = os.path.join(tmp_dir, "historico.json")
+            with contextlib.redirect_stdout(io.StringIO()):
+                lot.salvar_historico(historico_map, caminho_json)
+
+            for nome, func in _casos_de_benchmark(historico_map, caminho_json, num_jogos, compartilhado):
+                chave = f"{nome}@{rotulo}"
+                stats = medir(func, repeticoes)
+                stats['n_sorteios'] = len(historico_map)
+                resultados[chave] = stats
+                print(f"{chave:<60} mediana {stats['mediana'] * 1000:10.2f} ms   min {stats['min'] * 1000:10.2f} ms")
+
+    return {
+        'meta': {
+            'data': time.strftime("%Y-%m-%dT%H:%M:%S"),
+            'python': platform.python_version(),
+            'numpy': np.__version__,
+            'plataforma': platform.platform(),
+            'escalas': list(escalas),
+            'repeticoes': repeticoes,
+            'num_jogos': num_jogos,
+            'semente': semente,
+        },
+        'resultados': resultados,
+    }
+
+
+def salvar_resultados(resultados, caminho=BENCHMARK_FILE):
+    with open(caminho, 'w', encoding='utf-8') as f:
+        json.dump(resultados, f, indent=4)
+    print(f"Resultados salvos em {caminho}")
+
+
+def comparar_resultados(atual, anterior, tolerancia=0.20):
+    """
+    Compara a mediana de cada benchmark com uma execução anterior.
+    Retorna a lista de regressões (nome, mediana_anterior, mediana_atual, variação)
+    cuja piora excede a tolerância (0.20 = 20% mais lento).
+    """
+    regressoes = []
+    for nome, stats in atual['resultados'].items():
+        base = anterior.get('resultados', {}).get(nome)
+        if not base or base['mediana'] <= 0:
+            continue
+        variacao = stats['mediana'] / base['mediana'] - 1
+        marca = "REGRESSÃO" if variacao > tolerancia else ""
+        print(f"{nome:<60} {base['mediana'] * 1000:10.2f} ms -> {stats['mediana'] * 1000:10.2f} ms ({variacao:+.1%}) {marca}")
+        if variacao > tolerancia:
+            regressoes.append((nome, base['mediana'], stats['mediana'], variacao))
+    return regressoes
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmarks dos caminhos críticos da LotomaniaIA.")
+    parser.add_argument("--escalas", default="1,10,100", help="Escalas do histórico separadas por vírgula (1 = histórico real).")
+    parser.add_argument("--repeticoes", type=int, default=5, help="Repetições por benchmark.")
+    parser.add_argument("--jogos", type=int, default=15, help="Quantidade de jogos por geração.")
+    parser.add_argument("--semente", type=int, default=42, help="Semente do gerador aleatório.")
+    parser.add_argument("--historico", default=None, help="Arquivo de histórico (padrão: historico_lotomania.json).")
+    parser.add_argument("--saida", default=BENCHMARK_FILE, help="Arquivo JSON de saída.")
+    parser.add_argument("--comparar", default=None, help="JSON de uma execução anterior para detectar regressões.")
+    parser.add_argument("--tolerancia", type=float, default=0.20, help="Piora relativa tolerada antes de acusar regressão.")
+    args = parser.parse_args(argv)
+
+    escalas = [int(e) for e in args.escalas.split(',') if e.strip()]
+    resultados = executar_benchmarks(escalas, args.repeticoes, args.jogos, args.semente, args.historico)
+    salvar_resultados(resultados, args.saida)
+
+    if args.comparar:
+        with open(args.comparar, 'r', encoding='utf-8') as f:
+            anterior = json.load(f)
+        regressoes = comparar_resultados(resultados, anterior, args.tolerancia)
+        if regressoes:
+            print(f"{len(regressoes)} regressão(ões) acima de {args.tolerancia:.0%} detectada(s).")
+            return 1
+        print("Nenhuma regressão detectada.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
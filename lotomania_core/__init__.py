@@ -0,0 +1,43 @@
+"""
+Núcleo da LotomaniaIA, sem interface gráfica: dados, análises, modelos, geração e avaliação de jogos.
+
+Módulos, na ordem de dependência: constantes, eventos, telemetria, dezenas, historico, analise, modelos,
+rede, importacao, geracao, comparacao, indices, predefinicoes, carteira, desdobramentos, paralelo,
+graficos (Matplotlib com backend Agg) e assincrono (variantes asyncio das operações de rede e longas).
+Nenhum deles importa tkinter: os erros chegam como ErroLotomania (com um 'codigo' estável) e o progresso
+como EventoProgresso, e cada cliente (a interface em lotomania_ia.py, o serviço HTTP, o benchmark)
+decide como mostrá-los. Mensagens de andamento e avisos vão para os loggers 'lotomania_core.*', que não
+escrevem nada enquanto o cliente não configurar o logging. Os nomes públicos (o __all__ de cada módulo)
+ficam disponíveis direto no pacote.
+"""
+import logging
+
+from .constantes import *
+from .eventos import *
+from .telemetria import *
+from .dezenas import *
+from .historico import *
+from .analise import *
+from .modelos import *
+from .rede import *
+from .importacao import *
+from .geracao import *
+from .comparacao import *
+from .indices import *
+from .predefinicoes import *
+from .carteira import *
+from .desdobramentos import *
+from .paralelo import *
+from .graficos import *
+from .assincrono import *
+from . import (
+    analise, assincrono, carteira, comparacao, constantes, desdobramentos, dezenas, eventos, geracao, graficos,
+    historico, importacao, indices, modelos, paralelo, predefinicoes, rede, telemetria
+)
+
+__all__ = [nome for modulo in (constantes, eventos, telemetria, dezenas, historico, analise, modelos, rede, importacao,
+                               geracao, comparacao, indices, predefinicoes, carteira, desdobramentos, paralelo, graficos,
+                               assincrono)
+           for nome in modulo.__all__]
+
+logging.getLogger(__name__).addHandler(logging.NullHandler())
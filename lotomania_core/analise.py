@@ -0,0 +1,363 @@
+"""Análise do volante, testes estatísticos de aleatoriedade e cache de análises caras."""
+import functools
+import hashlib
+import json
+import logging
+import math
+import os
+import threading
+
+import numpy as np
+
+from .constantes import (
+    ANALISES_CACHE_FILE, NUM_DEZENAS_POR_APOSTA, NUM_DEZENAS_SORTEADAS, NUM_DEZENAS_TOTAL, TESTES_SIMULACOES_PARES
+)
+from .telemetria import TELEMETRIA, perfilado
+from .dezenas import MASCARAS_COLUNA, MASCARAS_DIAGONAL, MASCARAS_LINHA, MASCARAS_QUADRANTE, TABELA_DEZENAS
+from .historico import dezenas_para_incidencia, historico_para_array, simular_sorteios_array
+
+__all__ = [
+    'CRITERIOS_VOLANTE', 'contagens_volante', 'analisar_volante_lotomania', 'sugerir_criterios_volante',
+    'impressao_digital_historico', 'distribuicao_soma_sorteio', 'distribuicao_pares_sorteio',
+    'testar_aleatoriedade_historico', 'CacheAnalises', 'testes_aleatoriedade_em_cache', 'analise_volante_em_cache',
+]
+
+logger = logging.getLogger(__name__)
+
+# --- Análise do Volante (Linhas, Colunas, Quadrantes e Diagonais) ---
+# Todas as contagens saem da matriz de incidência vista como volante (N, 10, 10): o histórico é
+# convertido uma vez e cada recorte é uma redução (reshape/sum) sobre a mesma grade. Um recorte novo
+# é só mais uma entrada em contagens_volante e em CRITERIOS_VOLANTE.
+# (prefixo do critério, recorte, máscaras dos grupos, dezenas por grupo)
+CRITERIOS_VOLANTE = (
+    ('linha', 'linhas', MASCARAS_LINHA, 10),
+    ('coluna', 'colunas', MASCARAS_COLUNA, 10),
+    ('quadrante', 'quadrantes', MASCARAS_QUADRANTE, 25),
+    ('diagonal', 'diagonais', MASCARAS_DIAGONAL, 10),
+)
+_LIMITES_VOLANTE = tuple((f"{prefixo}_min", f"{prefixo}_max", mascaras, tamanho) for prefixo, _, mascaras, tamanho in CRITERIOS_VOLANTE)
+# Razão entre os desvios padrão da contagem num grupo para uma aposta de 50 e um sorteio de 20
+# dezenas (hipergeométrica: a variância é proporcional a k * (100 - k), qualquer que seja o grupo)
+_ESCALA_STD_APOSTA = math.sqrt(NUM_DEZENAS_POR_APOSTA * (NUM_DEZENAS_TOTAL - NUM_DEZENAS_POR_APOSTA) /
+                               (NUM_DEZENAS_SORTEADAS * (NUM_DEZENAS_TOTAL - NUM_DEZENAS_SORTEADAS)))
+
+def contagens_volante(incidencia):
+    """Dezenas marcadas por linha, coluna, quadrante e diagonal em cada linha de 'incidencia' (N, 100): {recorte: (N, G)}."""
+    grade = np.asarray(incidencia, dtype=bool).reshape(-1, 10, 10)
+    return {
+        'linhas': grade.sum(axis=2),
+        'colunas': grade.sum(axis=1),
+        'quadrantes': grade.reshape(-1, 2, 5, 2, 5).sum(axis=(2, 4)).reshape(-1, 4),
+        'diagonais': np.stack([grade.diagonal(axis1=1, axis2=2).sum(axis=1),
+                               grade[:, :, ::-1].diagonal(axis1=1, axis2=2).sum(axis=1)], axis=1),
+    }
+
+@perfilado
+def analisar_volante_lotomania(historico_dezenas_list):
+    """
+    Distribuição das dezenas sorteadas por linha, coluna, quadrante e diagonal do volante.
+    Para cada recorte retorna (em listas, para caber no CacheAnalises):
+      'media', 'std':     média e desvio padrão históricos por grupo (ex.: por linha);
+      'distribuicao':     [grupo][c] = sorteios com exatamente c dezenas no grupo;
+      'media_geral', 'std_geral': os mesmos valores agregando todos os grupos do recorte.
+    """
+    if not historico_dezenas_list:
+        return {}
+
+    incidencia = dezenas_para_incidencia(historico_para_array(historico_dezenas_list))
+    por_recorte = contagens_volante(incidencia)
+    resultado = {'num_sorteios': int(incidencia.shape[0])}
+    for _, recorte, _, tamanho in CRITERIOS_VOLANTE:
+        contagens = por_recorte[recorte]
+        grupos = contagens.shape[1]
+        # Histogramas de todos os grupos do recorte em um só bincount: cada grupo ocupa tamanho + 1 posições
+        deslocadas = contagens + np.arange(grupos) * (tamanho + 1)
+        distribuicao = np.bincount(deslocadas.ravel(), minlength=grupos * (tamanho + 1)).reshape(grupos, tamanho + 1)
+        resultado[recorte] = {
+            'media': contagens.mean(axis=0).tolist(),
+            'std': contagens.std(axis=0).tolist(),
+            'distribuicao': distribuicao.tolist(),
+            'media_geral': float(contagens.mean()),
+            'std_geral': float(contagens.std()),
+        }
+    return resultado
+
+def sugerir_criterios_volante(analise_volante, desvios=2.0):
+    """
+    Limites por grupo para uma aposta de 50 dezenas a partir da análise do volante dos sorteios (20 dezenas):
+    a média é escalada por 50/20 e o desvio padrão pela razão hipergeométrica, e o intervalo é média ± desvios * std.
+    """
+    criterios = {}
+    for prefixo, recorte, _, tamanho in CRITERIOS_VOLANTE:
+        estatisticas = analise_volante.get(recorte)
+        if not estatisticas:
+            continue
+        media = estatisticas['media_geral'] * NUM_DEZENAS_POR_APOSTA / NUM_DEZENAS_SORTEADAS
+        margem = desvios * estatisticas['std_geral'] * _ESCALA_STD_APOSTA
+        criterios[f'{prefixo}_min'] = max(0, round(media - margem))
+        criterios[f'{prefixo}_max'] = min(tamanho, round(media + margem))
+    return criterios
+
+# --- Testes Estatísticos de Aleatoriedade ---
+# Verificam se os desvios exibidos como "quentes/frios" são compatíveis com um sorteio justo
+# (20 dezenas distintas e equiprováveis em 100). Todas as distribuições de referência são exatas
+# para amostragem sem reposição; nenhuma dependência além do NumPy é necessária.
+_P_DEZENA = NUM_DEZENAS_SORTEADAS / NUM_DEZENAS_TOTAL
+# Escala da covariância das contagens sob a hipótese nula: cov = N * k(n-k)/(n-1) * (diag(q) - q q^T)
+_ESCALA_HIPERGEOMETRICA = NUM_DEZENAS_SORTEADAS * (NUM_DEZENAS_TOTAL - NUM_DEZENAS_SORTEADAS) / (NUM_DEZENAS_TOTAL - 1)
+_P_PAR_DEZENAS = NUM_DEZENAS_SORTEADAS * (NUM_DEZENAS_SORTEADAS - 1) / (NUM_DEZENAS_TOTAL * (NUM_DEZENAS_TOTAL - 1))
+
+def impressao_digital_historico(historico_dezenas_list):
+    """SHA-256 do histórico no formato "dezenas"; muda se qualquer sorteio (ou a ordem) mudar."""
+    dezenas = historico_para_array(historico_dezenas_list)
+    return hashlib.sha256(np.ascontiguousarray(dezenas).tobytes()).hexdigest()
+
+def _gama_incompleta_superior(a, x):
+    """Função gama incompleta regularizada Q(a, x): série para x < a + 1, fração contínua (Lentz) caso contrário."""
+    if x <= 0:
+        return 1.0
+    log_prefixo = a * math.log(x) - x - math.lgamma(a)
+    if x < a + 1:
+        termo = soma = 1.0 / a
+        denominador = a
+        for _ in range(100_000):
+            denominador += 1
+            termo *= x / denominador
+            soma += termo
+            if abs(termo) < abs(soma) * 1e-15:
+                break
+        return min(1.0, max(0.0, 1.0 - soma * math.exp(log_prefixo)))
+    minimo = 1e-300
+    b = x + 1 - a
+    c = 1.0 / minimo
+    d = 1.0 / b
+    resultado = d
+    for i in range(1, 100_000):
+        an = -i * (i - a)
+        b += 2
+        d = an * d + b
+        d = 1.0 / (d if abs(d) > minimo else minimo)
+        c = b + an / c
+        c = c if abs(c) > minimo else minimo
+        resultado *= d * c
+        if abs(d * c - 1) < 1e-15:
+            break
+    return min(1.0, max(0.0, math.exp(log_prefixo) * resultado))
+
+def _p_valor_qui_quadrado(estatistica, graus_liberdade):
+    return _gama_incompleta_superior(graus_liberdade / 2, estatistica / 2)
+
+def _p_valor_normal_bilateral(z):
+    """P(|Z| >= |z|) para um escalar ou vetor de escores z."""
+    z = np.abs(np.asarray(z, dtype=np.float64))
+    return np.vectorize(math.erfc, otypes=[np.float64])(z / math.sqrt(2))
+
+def _p_valor_ks(d, n):
+    """P-valor assintótico de Kolmogorov com a correção de Stephens (conservador para distribuições discretas)."""
+    if n == 0:
+        return 1.0
+    raiz = math.sqrt(n)
+    lam = (raiz + 0.12 + 0.11 / raiz) * d
+    if lam < 0.2:
+        return 1.0
+    soma = sum((-1) ** (k - 1) * math.exp(-2 * (k * lam) ** 2) for k in range(1, 101))
+    return min(1.0, max(0.0, 2 * soma))
+
+@functools.lru_cache(maxsize=None)
+def distribuicao_soma_sorteio():
+    """
+    Vetor P(soma = s), s = 0..soma máxima, da soma de 20 dezenas distintas de 00 a 99.
+    Programação dinâmica sobre subconjuntos: contagem[k, s] = nº de subconjuntos com k dezenas e soma s.
+    """
+    soma_maxima = sum(range(NUM_DEZENAS_TOTAL - NUM_DEZENAS_SORTEADAS, NUM_DEZENAS_TOTAL))
+    contagem = np.zeros((NUM_DEZENAS_SORTEADAS + 1, soma_maxima + 1), dtype=np.float64)
+    contagem[0, 0] = 1.0
+    for valor in range(NUM_DEZENAS_TOTAL):
+        # O lado direito é lido antes da escrita (NumPy copia operandos sobrepostos): cada dezena entra no máximo uma vez
+        contagem[1:, valor:] += contagem[:-1, :soma_maxima + 1 - valor]
+    distribuicao = contagem[NUM_DEZENAS_SORTEADAS] / math.comb(NUM_DEZENAS_TOTAL, NUM_DEZENAS_SORTEADAS)
+    distribuicao.flags.writeable = False
+    return distribuicao
+
+@functools.lru_cache(maxsize=None)
+def distribuicao_pares_sorteio():
+    """Vetor P(pares = j), j = 0..20: hipergeométrica com 50 dezenas pares entre as 100."""
+    pares = NUM_DEZENAS_TOTAL // 2
+    total = math.comb(NUM_DEZENAS_TOTAL, NUM_DEZENAS_SORTEADAS)
+    distribuicao = np.array([math.comb(pares, j) * math.comb(NUM_DEZENAS_TOTAL - pares, NUM_DEZENAS_SORTEADAS - j) / total
+                             for j in range(NUM_DEZENAS_SORTEADAS + 1)])
+    distribuicao.flags.writeable = False
+    return distribuicao
+
+def _teste_ks_discreto(valores, distribuicao):
+    """Estatística D e p-valor do KS entre os valores inteiros observados e uma distribuição exata indexada por valor."""
+    n = len(valores)
+    if n == 0:
+        return {'D': 0.0, 'p': 1.0}
+    empirica = np.cumsum(np.bincount(valores, minlength=len(distribuicao))[:len(distribuicao)]) / n
+    d = float(np.abs(empirica - np.cumsum(distribuicao)).max())
+    return {'D': d, 'p': _p_valor_ks(d, n)}
+
+def _teste_grupos(contagens_grupo, tamanhos_grupo, num_sorteios):
+    """
+    Qui-quadrado de uniformidade para grupos disjuntos de dezenas (uma dezena ou uma faixa de dez).
+    Usa a covariância exata da multinomial hipergeométrica, então o global tem (G - 1) graus de liberdade;
+    o teste de cada grupo isolado é o escore z da sua contagem (qui-quadrado com 1 grau de liberdade).
+    """
+    q = np.asarray(tamanhos_grupo, dtype=np.float64) / NUM_DEZENAS_TOTAL
+    esperado = num_sorteios * NUM_DEZENAS_SORTEADAS * q
+    escala = num_sorteios * _ESCALA_HIPERGEOMETRICA
+    desvio = np.asarray(contagens_grupo, dtype=np.float64) - esperado
+    estatistica = float((desvio ** 2 / (escala * q)).sum()) if num_sorteios else 0.0
+    variancia = escala * q * (1 - q)
+    z = np.divide(desvio, np.sqrt(variancia), out=np.zeros_like(desvio), where=variancia > 0)
+    graus = len(q) - 1
+    return {
+        'global': {'estatistica': estatistica, 'gl': graus, 'p': _p_valor_qui_quadrado(estatistica, graus)},
+        'z': z.round(4).tolist(),
+        'p': _p_valor_normal_bilateral(z).tolist(),
+    }
+
+def _estatistica_pares(incidencia):
+    """Matriz de coocorrência e qui-quadrado dos 4950 pares contra a contagem esperada N * k(k-1)/(n(n-1))."""
+    matriz = incidencia.astype(np.float32)
+    coocorrencia = np.rint(matriz.T @ matriz).astype(np.int64) # float32 é exato até 2**24 sorteios
+    i, j = np.triu_indices(NUM_DEZENAS_TOTAL, k=1)
+    esperado = incidencia.shape[0] * _P_PAR_DEZENAS
+    pares = coocorrencia[i, j]
+    estatistica = float(((pares - esperado) ** 2).sum() / esperado) if esperado else 0.0
+    return estatistica, pares, i, j, esperado
+
+def _teste_sequencias(incidencia):
+    """Teste de sequências de Wald-Wolfowitz na série de aparições de cada dezena (vetorizado nas 100 colunas)."""
+    n = incidencia.shape[0]
+    uns = incidencia.sum(axis=0).astype(np.float64)
+    zeros = n - uns
+    sequencias = 1 + np.count_nonzero(incidencia[1:] != incidencia[:-1], axis=0) if n else np.zeros(NUM_DEZENAS_TOTAL)
+    produto = 2 * uns * zeros
+    media = np.divide(produto, n, out=np.zeros_like(uns), where=n > 0) + 1
+    variancia = np.divide(produto * (produto - n), n * n * (n - 1), out=np.zeros_like(uns), where=(n > 1) & (produto > 0))
+    z = np.divide(sequencias - media, np.sqrt(variancia), out=np.zeros_like(uns), where=variancia > 0)
+    return {'sequencias': np.asarray(sequencias).astype(int).tolist(), 'z': z.round(4).tolist(), 'p': _p_valor_normal_bilateral(z).tolist()}
+
+@perfilado
+def testar_aleatoriedade_historico(historico_dezenas_list, simulacoes_pares=TESTES_SIMULACOES_PARES, semente=0):
+    """
+    Bateria de testes de aleatoriedade sobre o histórico. Retorna um dicionário serializável em JSON:
+      'uniformidade_dezenas': qui-quadrado global (99 g.l.) e p-valor de cada dezena;
+      'uniformidade_faixas':  idem para as faixas 00-09, 10-19, ..., 90-99 (9 g.l.);
+      'independencia_pares':  qui-quadrado dos pares da matriz de coocorrência, com p-valor de Monte Carlo
+                              (simulacoes_pares históricos simulados do mesmo tamanho) e os pares mais atípicos;
+      'sequencias':           teste de sequências (runs) da série de aparições de cada dezena;
+      'ks_soma', 'ks_pares':  KS da soma e da quantidade de pares contra as distribuições exatas.
+    A mesma semente produz sempre o mesmo p-valor de Monte Carlo.
+    """
+    dezenas = historico_para_array(historico_dezenas_list)
+    num_sorteios = dezenas.shape[0]
+    incidencia = dezenas_para_incidencia(dezenas)
+    contagens = np.bincount(dezenas.ravel(), minlength=NUM_DEZENAS_TOTAL)
+
+    faixas = np.bincount(TABELA_DEZENAS['faixa'], weights=contagens, minlength=10).astype(np.int64)
+    resultado = {
+        'impressao': impressao_digital_historico(dezenas),
+        'num_sorteios': int(num_sorteios),
+        'uniformidade_dezenas': _teste_grupos(contagens, np.ones(NUM_DEZENAS_TOTAL), num_sorteios),
+        'uniformidade_faixas': _teste_grupos(faixas, np.full(NUM_DEZENAS_TOTAL // 10, 10), num_sorteios),
+        'sequencias': _teste_sequencias(incidencia),
+        'ks_soma': _teste_ks_discreto(dezenas.sum(axis=1, dtype=np.int64), distribuicao_soma_sorteio()),
+        'ks_pares': _teste_ks_discreto(TABELA_DEZENAS['par'][dezenas].sum(axis=1), distribuicao_pares_sorteio()),
+    }
+
+    # Pares: as contagens dos 4950 pares são dependentes entre si, então a distribuição nula da
+    # estatística é obtida simulando históricos justos do mesmo tamanho
+    estatistica, pares, i, j, esperado = _estatistica_pares(incidencia)
+    extremos = []
+    p_pares = 1.0
+    if num_sorteios:
+        maiores = 0
+        for filho in np.random.SeedSequence(semente).spawn(simulacoes_pares):
+            simulado = dezenas_para_incidencia(simular_sorteios_array(num_sorteios, semente=filho))
+            maiores += _estatistica_pares(simulado)[0] >= estatistica
+        p_pares = (1 + maiores) / (1 + simulacoes_pares)
+        z_pares = (pares - esperado) / math.sqrt(esperado * (1 - _P_PAR_DEZENAS))
+        for idx in np.argsort(-np.abs(z_pares), kind='stable')[:10]:
+            extremos.append({'par': [int(i[idx]), int(j[idx])], 'observado': int(pares[idx]), 'z': round(float(z_pares[idx]), 4)})
+    resultado['independencia_pares'] = {
+        'estatistica': estatistica,
+        'esperado_por_par': esperado,
+        'simulacoes': simulacoes_pares,
+        'p': p_pares,
+        'extremos': extremos,
+    }
+    return resultado
+
+class CacheAnalises:
+    """
+    Resultados de análises caras guardados por impressão digital do histórico, em memória e em um
+    arquivo JSON. Um histórico igual reaproveita o resultado; qualquer sorteio novo ou corrigido muda a
+    impressão e força o recálculo. Só as max_historicos impressões usadas mais recentemente são mantidas.
+    """
+    def __init__(self, caminho=ANALISES_CACHE_FILE, max_historicos=4):
+        self.caminho = caminho
+        self.max_historicos = max_historicos
+        self._lock = threading.Lock()
+        self._dados = None # {impressao: {nome: resultado}}, em ordem de uso
+
+    def _carregar(self):
+        if self._dados is None:
+            self._dados = {}
+            if self.caminho and os.path.exists(self.caminho):
+                try:
+                    with open(self.caminho, 'r', encoding='utf-8') as f:
+                        self._dados = json.load(f)
+                except (ValueError, OSError) as e:
+                    logger.warning(f"Erro ao ler o cache de análises {self.caminho}: {e}. Ele será recriado.")
+        return self._dados
+
+    def _salvar(self):
+        if not self.caminho:
+            return
+        temporario = f"{self.caminho}.tmp"
+        try:
+            with open(temporario, 'w', encoding='utf-8') as f:
+                json.dump(self._dados, f)
+            os.replace(temporario, self.caminho)
+        except OSError as e:
+            logger.warning(f"Erro ao salvar o cache de análises {self.caminho}: {e}")
+
+    def obter(self, impressao, nome):
+        with self._lock:
+            return self._carregar().get(impressao, {}).get(nome)
+
+    def guardar(self, impressao, nome, resultado):
+        with self._lock:
+            dados = self._carregar()
+            entradas = dados.pop(impressao, {}) # Reinsere no fim: a ordem do dicionário é a ordem de uso
+            entradas[nome] = resultado
+            dados[impressao] = entradas
+            while len(dados) > self.max_historicos:
+                dados.pop(next(iter(dados)))
+            self._salvar()
+
+    def obter_ou_calcular(self, impressao, nome, calcular):
+        resultado = self.obter(impressao, nome)
+        if resultado is None:
+            TELEMETRIA.incrementar('cache_analises_falhas')
+            resultado = calcular()
+            self.guardar(impressao, nome, resultado)
+        else:
+            TELEMETRIA.incrementar('cache_analises_acertos')
+        return resultado
+
+def testes_aleatoriedade_em_cache(historico_dezenas_list, cache, simulacoes_pares=TESTES_SIMULACOES_PARES, semente=0):
+    """testar_aleatoriedade_historico com o resultado guardado em 'cache' (CacheAnalises) pela impressão do histórico."""
+    impressao = impressao_digital_historico(historico_dezenas_list)
+    def calcular():
+        with TELEMETRIA.cronometro('testes_aleatoriedade', sorteios=len(historico_dezenas_list)):
+            return testar_aleatoriedade_historico(historico_dezenas_list, simulacoes_pares, semente)
+    return cache.obter_ou_calcular(impressao, f"aleatoriedade:{simulacoes_pares}:{semente}", calcular)
+
+def analise_volante_em_cache(historico_dezenas_list, cache):
+    """analisar_volante_lotomania com o resultado guardado em 'cache' (CacheAnalises) pela impressão do histórico."""
+    return cache.obter_ou_calcular(impressao_digital_historico(historico_dezenas_list), "volante",
+                                   lambda: analisar_volante_lotomania(historico_dezenas_list))
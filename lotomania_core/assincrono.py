@@ -0,0 +1,102 @@
+"""
+Variantes asyncio das operações de rede e das mais longas. Cada uma roda a versão síncrona numa thread
+(ou no executor dado), sem bloquear o laço de eventos, e entrega os EventoProgresso a 'progresso' já
+dentro do laço; 'progresso' pode ser uma função ou uma corrotina. Cancelar a tarefa aciona o stop_event
+da operação, que para na próxima verificação. Os erros são os mesmos da versão síncrona (ErroRede,
+ErroHistorico, ValueError).
+"""
+import asyncio
+import inspect
+import threading
+
+from .eventos import EventoProgresso
+from .rede import atualizar_historico, reparar_lacunas_historico
+from .importacao import importar_historico
+from .geracao import gerar_balanceado_lotomania
+from .carteira import avaliar_carteira_lotomania
+from .desdobramentos import gerar_desdobramento_lotomania
+from .paralelo import simular_estrategia_paralela
+
+__all__ = [
+    'atualizar_historico_async', 'reparar_lacunas_async', 'buscar_concurso_async', 'importar_historico_async',
+    'gerar_pipeline_async', 'gerar_balanceado_async', 'avaliar_carteira_async', 'gerar_desdobramento_async',
+    'simular_estrategia_async',
+]
+
+async def _em_thread(chamada, progresso=None, executor=None):
+    """
+    Executa chamada(emitir, stop_event) no executor. emitir(evento), chamado da thread, agenda progresso(evento)
+    no laço; os eventos emitidos antes do fim da chamada são entregues antes de o resultado ser devolvido.
+    """
+    laco = asyncio.get_running_loop()
+    stop_event = threading.Event()
+    pendentes = set()
+
+    def entregar(evento):
+        resultado = progresso(evento)
+        if inspect.isawaitable(resultado):
+            tarefa = asyncio.ensure_future(resultado)
+            pendentes.add(tarefa)
+            tarefa.add_done_callback(pendentes.discard)
+
+    def emitir(evento):
+        if progresso is not None:
+            laco.call_soon_threadsafe(entregar, evento)
+
+    try:
+        resultado = await laco.run_in_executor(executor, chamada, emitir, stop_event)
+    except asyncio.CancelledError:
+        stop_event.set()
+        raise
+    if pendentes:
+        await asyncio.gather(*pendentes)
+    return resultado
+
+def _progresso_geracao(emitir):
+    """Adapta o progress_callback(aceitos, num_jogos, candidatos, max_candidatos) do pipeline a EventoProgresso."""
+    return lambda aceitos, total, candidatos, maximo: emitir(
+        EventoProgresso('geracao', aceitos, total, candidatos=candidatos, max_candidatos=maximo))
+
+# --- Rede ---
+
+async def atualizar_historico_async(historico_map, cache_api, registro_falhas, completo=False, progresso=None, executor=None):
+    """atualizar_historico: eventos 'download' (um por concurso) e 'reparo' (um por lacuna)."""
+    return await _em_thread(
+        lambda emitir, parar: atualizar_historico(historico_map, cache_api, registro_falhas, completo, progresso=emitir, stop_event=parar),
+        progresso, executor)
+
+async def reparar_lacunas_async(lacunas, cache_api, registro_falhas=None, progresso=None, executor=None):
+    """reparar_lacunas_historico: ({concurso: dezenas} recuperados, {concurso: erro}), com eventos 'reparo'."""
+    return await _em_thread(
+        lambda emitir, parar: reparar_lacunas_historico(lacunas, cache_api, registro_falhas, progresso=emitir), progresso, executor)
+
+async def buscar_concurso_async(cache_api, concurso, executor=None):
+    """Resposta da API para o concurso (do cache em disco, se já estiver lá)."""
+    return await _em_thread(lambda emitir, parar: cache_api.buscar_concurso(concurso), executor=executor)
+
+# --- Operações longas ---
+
+async def importar_historico_async(caminhos, historico_map, substituir_conflitos=False, executor=None):
+    return await _em_thread(lambda emitir, parar: importar_historico(caminhos, historico_map, substituir_conflitos), executor=executor)
+
+async def gerar_pipeline_async(pipeline, num_jogos, progresso=None, executor=None, **opcoes):
+    """PipelineGeracao.gerar -> (jogos, relatorio); eventos 'geracao' com atual = jogos aceitos."""
+    return await _em_thread(
+        lambda emitir, parar: pipeline.gerar(num_jogos, progress_callback=_progresso_geracao(emitir), stop_event=parar, **opcoes),
+        progresso, executor)
+
+async def gerar_balanceado_async(criterios, num_jogos, progresso=None, executor=None, aviso_callback=None):
+    return await _em_thread(
+        lambda emitir, parar: gerar_balanceado_lotomania(criterios, num_jogos, progress_callback=_progresso_geracao(emitir),
+                                                         stop_event=parar, aviso_callback=aviso_callback),
+        progresso, executor)
+
+async def avaliar_carteira_async(jogos, executor=None, **opcoes):
+    return await _em_thread(lambda emitir, parar: avaliar_carteira_lotomania(jogos, **opcoes), executor=executor)
+
+async def gerar_desdobramento_async(grupo, k, t, executor=None, **opcoes):
+    return await _em_thread(lambda emitir, parar: gerar_desdobramento_lotomania(grupo, k, t, **opcoes), executor=executor)
+
+async def simular_estrategia_async(jogos, num_sorteios, semente=None, workers=None, executor=None):
+    """simular_estrategia_paralela; os processos são os dela, a thread só espera pelo resultado."""
+    return await _em_thread(lambda emitir, parar: simular_estrategia_paralela(jogos, num_sorteios, semente, workers), executor=executor)
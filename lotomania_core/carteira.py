@@ -0,0 +1,265 @@
+"""Probabilidades das faixas e avaliação de carteiras de jogos."""
+import functools
+import math
+import time
+
+import numpy as np
+
+from .constantes import FAIXAS_PREMIADAS, NUM_DEZENAS_POR_APOSTA, NUM_DEZENAS_SORTEADAS, NUM_DEZENAS_TOTAL
+from .telemetria import TELEMETRIA, perfilado
+from .historico import SIMULACAO_BLOCO, dezenas_para_mascara, historico_para_array, iterar_sorteios_simulados
+from .comparacao import acertos_por_mascara, jogos_para_mascara
+
+__all__ = [
+    'combinacoes', 'calcular_probabilidade_lotomania', 'CARTEIRA_MAX_EXATO', 'CARTEIRA_SORTEIOS_PADRAO',
+    'CARTEIRA_METODOS', 'ORDEM_FAIXAS', 'momentos_exatos_carteira', 'avaliar_carteira_lotomania',
+]
+
+# --- Funções de Probabilidade ---
+
+def combinacoes(n, k):
+    if k < 0 or k > n:
+        return 0
+    if k == 0 or k == n:
+        return 1
+    if k > n // 2:
+        k = n - k
+    
+    res = 1
+    for i in range(k):
+        res = res * (n - i) // (i + 1)
+    return res
+
+def calcular_probabilidade_lotomania(acertos_desejados):
+    """
+    Calcula a probabilidade de acertar um número específico de dezenas na Lotomania.
+    - NUM_DEZENAS_TOTAL = 100 (de 00 a 99)
+    - NUM_DEZENAS_POR_APOSTA = 50 (você aposta 50 dezenas)
+    - NUM_DEZENAS_SORTEADAS = 20 (sorteadas)
+    
+    A fórmula é: C(50, acertos) * C(50, 20 - acertos) / C(100, 20)
+    Onde:
+    - C(N, K) é o número de combinações de N elementos tomados K a K.
+    - C(50, acertos): combinações de 50 dezenas que você escolheu que acertaram
+    - C(50, 20 - acertos): combinações das 50 dezenas que você NÃO escolheu que foram sorteadas (20 - acertos)
+    - C(100, 20): Total de combinações possíveis de 20 dezenas em 100.
+    """
+    
+    # 50 dezenas apostadas (acertadas)
+    # 50 dezenas não apostadas
+    
+    prob = {}
+    acertos_possiveis = FAIXAS_PREMIADAS
+    
+    # Total de combinações possíveis de 20 dezenas em 100
+    total_combinacoes = combinacoes(NUM_DEZENAS_TOTAL, NUM_DEZENAS_SORTEADAS)
+    
+    for acerto in acertos_possiveis:
+        # Número de formas de escolher 'acerto' dezenas entre as 50 que você apostou
+        combinacoes_acertadas_da_aposta = combinacoes(NUM_DEZENAS_POR_APOSTA, acerto)
+        
+        # Número de formas de escolher (20 - acerto) dezenas entre as 50 que você NÃO apostou
+        combinacoes_nao_acertadas_da_aposta = combinacoes(NUM_DEZENAS_TOTAL - NUM_DEZENAS_POR_APOSTA, NUM_DEZENAS_SORTEADAS - acerto)
+        
+        # O resultado é a multiplicação desses dois dividido pelo total de combinações
+        probabilidade_num = (combinacoes_acertadas_da_aposta * combinacoes_nao_acertadas_da_aposta) / total_combinacoes
+        
+        prob[acerto] = probabilidade_num
+        
+    return prob
+
+# --- Avaliação de Carteiras de Jogos ---
+# Os jogos de uma carteira não são independentes: jogos com muitas dezenas em comum tendem a acertar
+# juntos. A média de bilhetes premiados (ou do valor dos prêmios) só depende de cada jogo, a variância
+# depende dos pares e a distribuição da melhor faixa e do número de premiados depende da carteira toda.
+# - "exato" (até CARTEIRA_MAX_EXATO jogos): distribuição conjunta dos acertos por programação dinâmica
+#   sobre as 2^N regiões do diagrama de Venn dos jogos, onde o sorteio é hipergeométrico multivariado;
+# - "monte_carlo": sorteios simulados em blocos, acertos pelo popcount das máscaras;
+# - "historico": os mesmos contadores sobre os sorteios reais.
+# Média e variância exatas saem, para qualquer carteira, da distribuição conjunta de acertos de dois
+# jogos, que só depende de quantas dezenas eles têm em comum.
+CARTEIRA_MAX_EXATO = 3
+CARTEIRA_SORTEIOS_PADRAO = 1_000_000
+CARTEIRA_METODOS = ("exato", "monte_carlo", "historico")
+ORDEM_FAIXAS = (20, 0, 19, 18, 17, 16, 15) # Da faixa mais rara para a mais comum (0 e 20 acertos têm a mesma chance)
+_POSICAO_FAIXA = np.zeros(NUM_DEZENAS_SORTEADAS + 1, dtype=np.uint8) # 0 = sem prêmio; maior = faixa mais rara
+for _posicao, _faixa in enumerate(ORDEM_FAIXAS):
+    _POSICAO_FAIXA[_faixa] = len(ORDEM_FAIXAS) - _posicao
+
+def _valores_por_acerto(premios=None):
+    """Vetor (21,) com o valor de um bilhete por número de acertos: 1 nas faixas premiadas ou o prêmio {faixa: valor}."""
+    valores = np.zeros(NUM_DEZENAS_SORTEADAS + 1)
+    for faixa in FAIXAS_PREMIADAS:
+        valores[faixa] = 1.0 if premios is None else float(premios.get(faixa, 0.0))
+    return valores
+
+@functools.lru_cache(maxsize=None)
+def _acertos_de_dois_jogos():
+    """
+    Array (51, 21, 21): P(um jogo acerta a e o outro acerta b) para dois jogos de 50 dezenas com o em comum.
+    As 100 dezenas se dividem em o (dos dois), 50 - o (só de um), 50 - o (só do outro) e o (de nenhum).
+    """
+    binomiais = np.array([[math.comb(n, k) for k in range(NUM_DEZENAS_SORTEADAS + 1)] for n in range(NUM_DEZENAS_TOTAL + 1)], dtype=np.float64)
+    def binomial(n, k):
+        return np.where((k >= 0) & (k <= NUM_DEZENAS_SORTEADAS), binomiais[n, np.clip(k, 0, NUM_DEZENAS_SORTEADAS)], 0.0)
+    x = np.arange(NUM_DEZENAS_SORTEADAS + 1)[:, None, None] # Acertos entre as dezenas em comum
+    a = np.arange(NUM_DEZENAS_SORTEADAS + 1)[None, :, None]
+    b = np.arange(NUM_DEZENAS_SORTEADAS + 1)[None, None, :]
+    tabela = np.empty((NUM_DEZENAS_POR_APOSTA + 1, NUM_DEZENAS_SORTEADAS + 1, NUM_DEZENAS_SORTEADAS + 1))
+    for comum in range(NUM_DEZENAS_POR_APOSTA + 1):
+        exclusivas = NUM_DEZENAS_POR_APOSTA - comum
+        formas = binomial(comum, x) * binomial(exclusivas, a - x) * binomial(exclusivas, b - x) * binomial(comum, NUM_DEZENAS_SORTEADAS - a - b + x)
+        tabela[comum] = formas.sum(axis=0)
+    tabela /= math.comb(NUM_DEZENAS_TOTAL, NUM_DEZENAS_SORTEADAS)
+    tabela.flags.writeable = False
+    return tabela
+
+def _momentos_carteira(sobreposicoes, valores):
+    """Média e variância de sum_j valores[acertos_j] dada a matriz (G, G) de dezenas em comum entre os jogos."""
+    num_jogos = len(sobreposicoes)
+    pares = _acertos_de_dois_jogos()
+    um_jogo = pares[0].sum(axis=1) # Distribuição hipergeométrica dos acertos de um jogo
+    contagem = np.bincount(np.asarray(sobreposicoes).ravel(), minlength=NUM_DEZENAS_POR_APOSTA + 1)
+    contagem[NUM_DEZENAS_POR_APOSTA] -= num_jogos # Tira a diagonal (cada jogo com ele mesmo)
+    cruzados = np.einsum('a,oab,b->o', valores, pares, valores)
+    media = num_jogos * (valores @ um_jogo)
+    segundo_momento = num_jogos * (valores ** 2 @ um_jogo) + contagem @ cruzados
+    return float(media), float(max(segundo_momento - media ** 2, 0.0))
+
+def momentos_exatos_carteira(jogos, premios=None):
+    """
+    Média e variância exatas, por sorteio, do número de bilhetes premiados da carteira (ou do valor dos
+    prêmios, com premios={faixa: valor}). Usa a tabela de pares por dezenas em comum: O(N²) popcounts.
+    """
+    mascaras = jogos_para_mascara(jogos)
+    return _momentos_carteira(acertos_por_mascara(mascaras, mascaras), _valores_por_acerto(premios))
+
+def _distribuicao_conjunta_exata(jogos):
+    """Distribuição conjunta (21,) * N dos acertos de N jogos, por programação dinâmica sobre as regiões do diagrama de Venn."""
+    n = len(jogos)
+    regiao_da_dezena = np.zeros(NUM_DEZENAS_TOTAL, dtype=np.int64)
+    for i, jogo in enumerate(jogos):
+        regiao_da_dezena[list(jogo)] |= 1 << i
+    tamanhos = np.bincount(regiao_da_dezena, minlength=1 << n)
+    # estado[k, a_1, ..., a_n]: formas de escolher k dezenas das regiões já vistas com a_i acertos no jogo i
+    estado = np.zeros((NUM_DEZENAS_SORTEADAS + 1,) * (n + 1))
+    estado[(0,) * (n + 1)] = 1.0
+    for regiao, tamanho in enumerate(tamanhos.tolist()):
+        if not tamanho:
+            continue
+        eixos = [0] + [i + 1 for i in range(n) if regiao >> i & 1]
+        novo = np.zeros_like(estado)
+        for x in range(min(tamanho, NUM_DEZENAS_SORTEADAS) + 1):
+            origem = tuple(slice(0, NUM_DEZENAS_SORTEADAS + 1 - x) if eixo in eixos else slice(None) for eixo in range(n + 1))
+            destino = tuple(slice(x, None) if eixo in eixos else slice(None) for eixo in range(n + 1))
+            novo[destino] += math.comb(tamanho, x) * estado[origem]
+        estado = novo
+    return estado[NUM_DEZENAS_SORTEADAS] / math.comb(NUM_DEZENAS_TOTAL, NUM_DEZENAS_SORTEADAS)
+
+class _AcumuladorCarteira:
+    """Contadores da melhor faixa, do número de premiados e do valor por sorteio, somados bloco a bloco."""
+    def __init__(self, num_jogos, valores):
+        self.valores = valores
+        self.melhor = np.zeros(len(ORDEM_FAIXAS) + 1)
+        self.premiados = np.zeros(num_jogos + 1)
+        self.soma_valor = 0.0
+        self.soma_valor_quadrado = 0.0
+        self.peso_total = 0.0
+
+    def somar(self, acertos, pesos=None):
+        """acertos: (G, B) uint8, um sorteio por coluna; pesos: (B,) probabilidades (None = sorteios equiprováveis)."""
+        pesos = np.ones(acertos.shape[1]) if pesos is None else pesos
+        self.melhor += np.bincount(_POSICAO_FAIXA[acertos].max(axis=0), weights=pesos, minlength=len(self.melhor))
+        premiado = _valores_por_acerto()[acertos].sum(axis=0).astype(np.int64)
+        self.premiados += np.bincount(premiado, weights=pesos, minlength=len(self.premiados))
+        valor = self.valores[acertos].sum(axis=0)
+        self.soma_valor += float(valor @ pesos)
+        self.soma_valor_quadrado += float(valor ** 2 @ pesos)
+        self.peso_total += float(pesos.sum())
+
+    def resultado(self):
+        melhor = self.melhor / self.peso_total
+        premiados = self.premiados / self.peso_total
+        media_premiados = float(np.arange(len(premiados)) @ premiados)
+        media_valor = self.soma_valor / self.peso_total
+        return {
+            'melhor_faixa': {faixa: float(melhor[len(ORDEM_FAIXAS) - posicao]) for posicao, faixa in enumerate(ORDEM_FAIXAS)},
+            'prob_algum_premio': float(1.0 - melhor[0]),
+            'premiados': premiados.tolist(),
+            'media_premiados': media_premiados,
+            'variancia_premiados': float(max(np.arange(len(premiados)) ** 2 @ premiados - media_premiados ** 2, 0.0)),
+            'media_valor': media_valor,
+            'variancia_valor': max(self.soma_valor_quadrado / self.peso_total - media_valor ** 2, 0.0),
+        }
+
+def _validar_carteira(jogos):
+    jogos = [sorted(int(n) for n in jogo) for jogo in jogos]
+    if not jogos:
+        raise ValueError("A carteira precisa de pelo menos um jogo.")
+    for jogo in jogos:
+        if len(set(jogo)) != NUM_DEZENAS_POR_APOSTA or jogo[0] < 0 or jogo[-1] >= NUM_DEZENAS_TOTAL:
+            raise ValueError(f"Cada jogo da carteira deve ter {NUM_DEZENAS_POR_APOSTA} dezenas distintas entre 00 e 99.")
+    return jogos
+
+@perfilado
+def avaliar_carteira_lotomania(jogos, metodo=None, num_sorteios=CARTEIRA_SORTEIOS_PADRAO, historico_dezenas_list=None,
+                               premios=None, semente=None, bloco=SIMULACAO_BLOCO):
+    """
+    Distribuição da melhor faixa e do número de bilhetes premiados por sorteio para uma carteira de jogos de
+    50 dezenas, com média e variância (do número de premiados, ou do valor com premios={faixa: valor}).
+    metodo: "exato" (até CARTEIRA_MAX_EXATO jogos), "monte_carlo" (num_sorteios simulados) ou "historico"
+    (os sorteios de historico_dezenas_list); None escolhe "exato" quando possível, senão "monte_carlo".
+    O resultado traz também a média e a variância exatas e o número esperado de bilhetes por faixa.
+    """
+    jogos = _validar_carteira(jogos)
+    if metodo is None:
+        metodo = "exato" if len(jogos) <= CARTEIRA_MAX_EXATO else "monte_carlo"
+    if metodo not in CARTEIRA_METODOS:
+        raise ValueError(f"Método desconhecido: {metodo}. Use um de {CARTEIRA_METODOS}.")
+    if metodo == "exato" and len(jogos) > CARTEIRA_MAX_EXATO:
+        raise ValueError(f"O cálculo exato aceita no máximo {CARTEIRA_MAX_EXATO} jogos; use Monte Carlo.")
+    if metodo == "historico" and not historico_dezenas_list:
+        raise ValueError("A avaliação pelo histórico precisa de sorteios.")
+
+    inicio = time.perf_counter()
+    valores = _valores_por_acerto(premios)
+    acumulador = _AcumuladorCarteira(len(jogos), valores)
+    if metodo == "exato":
+        conjunta = _distribuicao_conjunta_exata(jogos)
+        acertos = np.indices(conjunta.shape).reshape(len(jogos), -1).astype(np.uint8) # Todas as combinações de acertos
+        acumulador.somar(acertos, conjunta.ravel())
+        avaliados = None
+    else:
+        mascaras = jogos_para_mascara(jogos)
+        if metodo == "monte_carlo":
+            blocos = iterar_sorteios_simulados(num_sorteios, semente, bloco=bloco)
+        else:
+            dezenas = historico_para_array(historico_dezenas_list)
+            blocos = (dezenas[i:i + bloco] for i in range(0, len(dezenas), bloco))
+        avaliados = 0
+        for sorteios in blocos:
+            acumulador.somar(acertos_por_mascara(mascaras, dezenas_para_mascara(sorteios)))
+            avaliados += len(sorteios)
+        TELEMETRIA.incrementar('carteira_sorteios_avaliados', avaliados)
+
+    duracao = time.perf_counter() - inicio
+    resultado = acumulador.resultado()
+    if premios is None: # Sem prêmios, o valor é o próprio número de premiados
+        del resultado['media_valor'], resultado['variancia_valor']
+    media_exata, variancia_exata = momentos_exatos_carteira(jogos)
+    um_jogo = calcular_probabilidade_lotomania(0)
+    resultado.update({
+        'metodo': metodo,
+        'num_jogos': len(jogos),
+        'num_sorteios': avaliados,
+        'media_premiados_exata': media_exata,
+        'variancia_premiados_exata': variancia_exata,
+        'premiados_por_faixa': {faixa: len(jogos) * um_jogo[faixa] for faixa in ORDEM_FAIXAS},
+        'tempo': duracao,
+        'sorteios_por_segundo': avaliados / duracao if avaliados and duracao > 0 else None,
+    })
+    if avaliados:
+        resultado['erro_padrao_premiados'] = math.sqrt(resultado['variancia_premiados'] / avaliados)
+    if premios is not None:
+        resultado['media_valor_exata'], resultado['variancia_valor_exata'] = momentos_exatos_carteira(jogos, premios)
+    return resultado
@@ -0,0 +1,268 @@
+"""Comparação de jogos com sorteios por máscaras de bits e registro de apostas."""
+import json
+import logging
+import os
+import threading
+import time
+
+import numpy as np
+
+from .constantes import (
+    APOSTAS_FILE, APOSTA_MAX_CONCURSOS, FAIXAS_PREMIADAS, NUM_DEZENAS_POR_APOSTA, NUM_DEZENAS_SORTEADAS,
+    NUM_DEZENAS_TOTAL
+)
+from .telemetria import TELEMETRIA
+
+__all__ = [
+    'extrair_jogos_de_texto', 'contar_acertos_lotomania', 'comparar_jogos_com_historico', 'jogos_para_mascara',
+    'acertos_por_mascara', 'mascara_para_jogo', 'RegistroApostas',
+]
+
+logger = logging.getLogger(__name__)
+
+# --- Funções de Comparação ---
+
+def extrair_jogos_de_texto(conteudo):
+    """Extrai os jogos de 50 dezenas de linhas no formato "Jogo 01: 00, 05, ..." (área de resultados ou arquivo salvo)."""
+    jogos = []
+    for line in conteudo.split('\n'):
+        if "Jogo" in line and ":" in line:
+            try:
+                # Extrai os números após o ': ' e remove espaços
+                nums_str = line.split(': ')[1].strip()
+                nums = sorted([int(n) for n in nums_str.split(',') if n.strip().isdigit()])
+                if len(nums) == NUM_DEZENAS_POR_APOSTA:
+                    jogos.append(nums)
+            except (ValueError, IndexError):
+                # Se a linha não for um formato de jogo reconhecível, ignora
+                pass
+    return jogos
+
+def contar_acertos_lotomania(jogo, sorteio):
+    """Retorna quantas dezenas do jogo aparecem no sorteio."""
+    return len(set(jogo).intersection(sorteio))
+
+def comparar_jogos_com_historico(jogos, historico_map):
+    """
+    Compara vários jogos com todos os concursos do histórico de uma só vez.
+    Retorna uma lista (um item por jogo) de dicionários {concurso_num: acertos}.
+    """
+    sorteios = [(concurso, set(dezenas)) for concurso, dezenas in sorted(historico_map.items())]
+    resultados = []
+    for jogo in jogos:
+        jogo_set = set(jogo)
+        resultados.append({concurso: len(jogo_set & dezenas) for concurso, dezenas in sorteios})
+    return resultados
+
+def jogos_para_mascara(jogos):
+    """Converte jogos (listas de dezenas, de qualquer tamanho) em máscaras de bits (G, 2) uint64, como o formato "mascara"."""
+    bits = np.zeros((len(jogos), 128), dtype=bool)
+    for i, jogo in enumerate(jogos):
+        bits[i, list(jogo)] = True
+    return np.packbits(bits, axis=1, bitorder='little').view('<u8')
+
+if hasattr(np, 'bitwise_count'):
+    _popcount = np.bitwise_count
+else: # NumPy < 2.0: contagem por tabela de bytes
+    _BITS_POR_BYTE = np.array([bin(b).count('1') for b in range(256)], dtype=np.uint8)
+    def _popcount(valores):
+        valores = np.ascontiguousarray(valores, dtype=np.uint64)
+        return _BITS_POR_BYTE[valores.view(np.uint8)].reshape(valores.shape + (8,)).sum(axis=-1, dtype=np.uint8)
+
+def acertos_por_mascara(mascaras_jogos, mascaras_sorteios):
+    """Matriz (G, N) uint8 de acertos de cada jogo em cada sorteio: popcount do AND das máscaras."""
+    jogos = np.asarray(mascaras_jogos, dtype=np.uint64)
+    sorteios = np.asarray(mascaras_sorteios, dtype=np.uint64)
+    return (_popcount(jogos[:, None, 0] & sorteios[None, :, 0]) + _popcount(jogos[:, None, 1] & sorteios[None, :, 1])).astype(np.uint8)
+
+def _mascara_para_hex(mascara):
+    return np.asarray(mascara, dtype='<u8').tobytes().hex()
+
+def _hex_para_mascara(texto):
+    return np.frombuffer(bytes.fromhex(texto), dtype='<u8')
+
+def mascara_para_jogo(mascara):
+    """Máscara (2,) uint64 -> lista ordenada de dezenas."""
+    bits = np.unpackbits(np.asarray(mascara, dtype='<u8').view(np.uint8), bitorder='little')
+    return np.flatnonzero(bits[:NUM_DEZENAS_TOTAL]).tolist()
+
+def _valor_premio(metadados, acertos):
+    """Valor do prêmio da faixa 'acertos' nas premiações guardadas no cache da API (None se desconhecido)."""
+    for faixa in (metadados or {}).get('premiacoes') or []:
+        descricao = str(faixa.get('descricao', ''))
+        if descricao.split(' ')[0].isdigit() and int(descricao.split(' ')[0]) == acertos:
+            return faixa.get('valorPremio')
+    return None
+
+class RegistroApostas:
+    """
+    Apostas registradas para conferência automática. Cada aposta é guardada como máscara de 128 bits
+    (32 caracteres hexadecimais) com o concurso alvo e quantos concursos seguidos ela vale (teimosinha).
+
+    Em memória as máscaras ficam em um array (A, 2) uint64 e os acertos em uma matriz (A, APOSTA_MAX_CONCURSOS)
+    int8, com -1 nos concursos ainda não conferidos. 'conferir' recebe só os concursos novos, seleciona as
+    apostas que ainda esperam por eles e calcula os acertos por popcount do AND das máscaras; apostas já
+    conferidas nunca são revisitadas.
+    """
+    VERSAO = 1
+
+    def __init__(self, caminho=APOSTAS_FILE):
+        self.caminho = caminho
+        self._lock = threading.Lock()
+        self._zerar()
+        if caminho and os.path.exists(caminho):
+            self._carregar()
+
+    def _zerar(self):
+        self.ids = np.zeros(0, dtype=np.int64)
+        self.mascaras = np.zeros((0, 2), dtype=np.uint64)
+        self.concurso_alvo = np.zeros(0, dtype=np.int64)
+        self.concursos_validos = np.zeros(0, dtype=np.int64)
+        self.acertos = np.zeros((0, APOSTA_MAX_CONCURSOS), dtype=np.int8)
+        self.info = [] # [{'criado_em', 'descricao'}] na mesma ordem
+        self._proximo_id = 1
+
+    @property
+    def num_apostas(self):
+        return len(self.ids)
+
+    def _carregar(self):
+        try:
+            with open(self.caminho, 'r', encoding='utf-8') as f:
+                dados = json.load(f)
+            apostas = dados.get('apostas', [])
+            self.ids = np.array([a['id'] for a in apostas], dtype=np.int64)
+            self.mascaras = np.array([_hex_para_mascara(a['mascara']) for a in apostas], dtype=np.uint64).reshape(-1, 2)
+            self.concurso_alvo = np.array([a['concurso_alvo'] for a in apostas], dtype=np.int64)
+            self.concursos_validos = np.array([a['concursos_validos'] for a in apostas], dtype=np.int64)
+            self.acertos = np.full((len(apostas), APOSTA_MAX_CONCURSOS), -1, dtype=np.int8)
+            for i, aposta in enumerate(apostas):
+                self.acertos[i, :len(aposta['acertos'])] = aposta['acertos']
+            self.info = [{'criado_em': a.get('criado_em'), 'descricao': a.get('descricao', '')} for a in apostas]
+            self._proximo_id = int(dados.get('proximo_id', self.ids.max() + 1 if len(self.ids) else 1))
+        except (ValueError, KeyError, TypeError, OSError) as e:
+            logger.warning(f"Erro ao ler o registro de apostas {self.caminho}: {e}. Começando um registro vazio.")
+            self._zerar()
+
+    def salvar(self):
+        if not self.caminho:
+            return
+        with self._lock:
+            dados = {
+                'versao': self.VERSAO,
+                'proximo_id': self._proximo_id,
+                'apostas': [{
+                    'id': int(self.ids[i]),
+                    'mascara': _mascara_para_hex(self.mascaras[i]),
+                    'concurso_alvo': int(self.concurso_alvo[i]),
+                    'concursos_validos': int(self.concursos_validos[i]),
+                    'acertos': self.acertos[i, :self.concursos_validos[i]].tolist(),
+                    **self.info[i],
+                } for i in range(self.num_apostas)],
+            }
+        temporario = f"{self.caminho}.tmp"
+        try:
+            with open(temporario, 'w', encoding='utf-8') as f:
+                json.dump(dados, f, indent=1, ensure_ascii=False)
+            os.replace(temporario, self.caminho)
+        except OSError as e:
+            logger.warning(f"Erro ao salvar o registro de apostas {self.caminho}: {e}")
+
+    def registrar(self, jogos, concurso_alvo, concursos_validos=1, descricao=""):
+        """Registra os jogos para o concurso alvo (e os concursos_validos - 1 seguintes). Retorna os ids."""
+        if not 1 <= concursos_validos <= APOSTA_MAX_CONCURSOS:
+            raise ValueError(f"Uma aposta vale de 1 a {APOSTA_MAX_CONCURSOS} concursos.")
+        for jogo in jogos:
+            if len(set(jogo)) != len(jogo) or any(n < 0 or n >= NUM_DEZENAS_TOTAL for n in jogo):
+                raise ValueError("Os jogos devem ter dezenas distintas entre 00 e 99.")
+        with self._lock:
+            novos_ids = np.arange(self._proximo_id, self._proximo_id + len(jogos), dtype=np.int64)
+            self._proximo_id += len(jogos)
+            self.ids = np.concatenate([self.ids, novos_ids])
+            self.mascaras = np.concatenate([self.mascaras, jogos_para_mascara(jogos)])
+            self.concurso_alvo = np.concatenate([self.concurso_alvo, np.full(len(jogos), concurso_alvo, dtype=np.int64)])
+            self.concursos_validos = np.concatenate([self.concursos_validos, np.full(len(jogos), concursos_validos, dtype=np.int64)])
+            self.acertos = np.concatenate([self.acertos, np.full((len(jogos), APOSTA_MAX_CONCURSOS), -1, dtype=np.int8)])
+            agora = time.strftime("%Y-%m-%dT%H:%M:%S")
+            self.info.extend({'criado_em': agora, 'descricao': descricao} for _ in jogos)
+        return novos_ids.tolist()
+
+    def remover(self, ids):
+        with self._lock:
+            manter = ~np.isin(self.ids, list(ids))
+            self.ids, self.mascaras = self.ids[manter], self.mascaras[manter]
+            self.concurso_alvo, self.concursos_validos = self.concurso_alvo[manter], self.concursos_validos[manter]
+            self.acertos = self.acertos[manter]
+            self.info = [info for info, m in zip(self.info, manter) if m]
+
+    def jogo(self, indice):
+        return mascara_para_jogo(self.mascaras[indice])
+
+    def _pendentes(self):
+        """Índices das apostas com algum concurso alvo ainda não conferido."""
+        dentro = np.arange(APOSTA_MAX_CONCURSOS)[None, :] < self.concursos_validos[:, None]
+        return np.flatnonzero(((self.acertos < 0) & dentro).any(axis=1))
+
+    def concursos_aguardados(self):
+        """Conjunto dos concursos que alguma aposta pendente ainda espera."""
+        aguardados = set()
+        for i in self._pendentes():
+            offsets = np.flatnonzero(self.acertos[i, :self.concursos_validos[i]] < 0)
+            aguardados.update((self.concurso_alvo[i] + offsets).tolist())
+        return aguardados
+
+    def conferir(self, sorteios):
+        """
+        Confere as apostas pendentes contra os concursos novos {concurso: dezenas}.
+        Retorna [(id, concurso, acertos)] apenas do que foi conferido agora.
+        """
+        if not sorteios:
+            return []
+        with self._lock:
+            pendentes = self._pendentes()
+            if pendentes.size == 0:
+                return []
+            concursos = np.array(sorted(sorteios), dtype=np.int64)
+            mascaras_sorteios = jogos_para_mascara([sorteios[c] for c in concursos])
+            deslocamento = concursos[None, :] - self.concurso_alvo[pendentes, None] # (P, C)
+            no_periodo = (deslocamento >= 0) & (deslocamento < self.concursos_validos[pendentes, None])
+            ainda_nao = self.acertos[pendentes[:, None], np.clip(deslocamento, 0, APOSTA_MAX_CONCURSOS - 1)] < 0
+            linha, coluna = np.nonzero(no_periodo & ainda_nao)
+            if linha.size == 0:
+                return []
+            apostas = pendentes[linha]
+            jogos = self.mascaras[apostas]
+            alvos = mascaras_sorteios[coluna]
+            acertos = (_popcount(jogos[:, 0] & alvos[:, 0]) + _popcount(jogos[:, 1] & alvos[:, 1])).astype(np.int8)
+            self.acertos[apostas, deslocamento[linha, coluna]] = acertos
+            TELEMETRIA.incrementar('apostas_conferidas', int(linha.size))
+            return [(int(self.ids[a]), int(concursos[c]), int(n)) for a, c, n in zip(apostas, coluna, acertos)]
+
+    def sincronizar(self, historico_map):
+        """Confere as apostas pendentes com os concursos aguardados que já estão no histórico."""
+        disponiveis = {c: historico_map[c] for c in self.concursos_aguardados() if c in historico_map}
+        return self.conferir(disponiveis)
+
+    def relatorio(self, cache_api=None):
+        """
+        Resumo por faixa de premiação de todas as conferências feitas, sem recalcular acertos:
+        {'faixas': {acertos: quantidade}, 'premiadas': [(id, concurso, acertos, valor)], 'conferencias', 'pendentes'}.
+        Com cache_api, o valor vem das premiações do concurso guardadas no cache (None se desconhecido).
+        """
+        with self._lock:
+            apostas, deslocamentos = np.nonzero(self.acertos >= 0)
+            acertos = self.acertos[apostas, deslocamentos].astype(np.int64)
+            contagem = np.bincount(acertos, minlength=NUM_DEZENAS_SORTEADAS + 1)
+            premiada = np.isin(acertos, FAIXAS_PREMIADAS)
+            premiadas = []
+            for a, d, n in zip(apostas[premiada], deslocamentos[premiada], acertos[premiada]):
+                concurso = int(self.concurso_alvo[a] + d)
+                valor = _valor_premio(cache_api.metadados(concurso), int(n)) if cache_api else None
+                premiadas.append((int(self.ids[a]), concurso, int(n), valor))
+            return {
+                'faixas': {f: int(contagem[f]) for f in FAIXAS_PREMIADAS},
+                'distribuicao': contagem.tolist(),
+                'premiadas': sorted(premiadas, key=lambda p: (p[1], p[0])),
+                'conferencias': int(len(acertos)),
+                'pendentes': int(len(self._pendentes())),
+            }
@@ -0,0 +1,45 @@
+"""Arquivos, limites e parâmetros do jogo compartilhados por todos os módulos."""
+
+__all__ = [
+    'HISTORICO_FILE', 'NUM_DEZENAS_TOTAL', 'NUM_DEZENAS_POR_APOSTA', 'NUM_DEZENAS_SORTEADAS', 'FAIXAS_PREMIADAS',
+    'API_BASE_URL', 'HTTP_TENTATIVAS', 'HTTP_TIMEOUT', 'API_CACHE_DIR', 'API_CACHE_MAX_BYTES', 'API_LATEST_TTL',
+    'FALHAS_DOWNLOAD_FILE', 'REPARO_WORKERS', 'ANALISES_CACHE_FILE', 'TESTES_SIMULACOES_PARES',
+    'NIVEL_SIGNIFICANCIA', 'APOSTAS_FILE', 'APOSTA_MAX_CONCURSOS', 'INDICE_SEMELHANCA_PADRAO', 'INDICE_MAX_BLOCOS',
+    'INDICE_MAX_RODADAS', 'CONSULTA_LIMITE_PADRAO', 'DESDOBRAMENTO_MAX_ALVOS', 'DESDOBRAMENTO_MAX_VERIFICACAO',
+    'DESDOBRAMENTO_AMOSTRA_VERIFICACAO', 'MODELO_IA_FILE', 'CONFIG_FILE', 'TELEMETRIA_LOG_FILE',
+    'TELEMETRIA_PROMETHEUS_FILE',
+]
+
+# --- Configurações de Arquivo e Jogo (LOTOMANIA) ---
+HISTORICO_FILE = "historico_lotomania.json"
+NUM_DEZENAS_TOTAL = 100 # De 00 a 99
+NUM_DEZENAS_POR_APOSTA = 50 # Você escolhe 50 números
+NUM_DEZENAS_SORTEADAS = 20 # 20 números são sorteados no concurso
+FAIXAS_PREMIADAS = (0, 15, 16, 17, 18, 19, 20) # Lotomania premia 0, 15, 16, 17, 18, 19 e 20 acertos
+
+API_BASE_URL = "https://loteriascaixa-api.herokuapp.com/api/lotomania"
+HTTP_TENTATIVAS = 3 # Tentativas por requisição antes de desistir do concurso
+HTTP_TIMEOUT = 30 # Segundos
+API_CACHE_DIR = "cache_api_lotomania" # Respostas brutas da API, uma por concurso
+API_CACHE_MAX_BYTES = 50 * 1024 * 1024 # Limite do cache em disco (entradas menos usadas são removidas)
+API_LATEST_TTL = 300 # Segundos em que a resposta de /latest é reaproveitada sem consultar a API
+FALHAS_DOWNLOAD_FILE = "falhas_download_lotomania.json" # Registro persistente de concursos que falharam
+REPARO_WORKERS = 4 # Downloads simultâneos ao reparar lacunas
+
+ANALISES_CACHE_FILE = "cache_analises_lotomania.json" # Resultados de análises caras, por impressão digital do histórico
+TESTES_SIMULACOES_PARES = 200 # Históricos simulados para o p-valor de Monte Carlo do teste de pares
+NIVEL_SIGNIFICANCIA = 0.05
+APOSTAS_FILE = "apostas_lotomania.json" # Apostas registradas para conferência automática
+APOSTA_MAX_CONCURSOS = 12 # Concursos seguidos que uma aposta registrada pode valer
+INDICE_SEMELHANCA_PADRAO = 45 # Jogos de 50 dezenas com pelo menos 45 em comum são quase repetidos
+INDICE_MAX_BLOCOS = 13 # Acima disso os blocos ficam curtos demais e a consulta varre todas as máscaras
+INDICE_MAX_RODADAS = 50 # Lotes que gerar_sem_repeticoes pede ao gerador antes de desistir
+CONSULTA_LIMITE_PADRAO = 200 # Concursos listados por consulta ao histórico (os mais recentes); o total é sempre informado
+DESDOBRAMENTO_MAX_ALVOS = 100_000 # Acima disso o desdobramento é construído sobre uma amostra dos alvos
+DESDOBRAMENTO_MAX_VERIFICACAO = 5_000_000 # Alvos conferidos um a um para provar a garantia; acima disso, por amostragem
+DESDOBRAMENTO_AMOSTRA_VERIFICACAO = 200_000
+MODELO_IA_FILE = "modelo_lotomania.json" # Pesos do modelo logístico e impressão digital do histórico treinado
+CONFIG_FILE = "config_lotomania.json" # Últimas escolhas, predefinições de critérios e sugestões do histórico
+
+TELEMETRIA_LOG_FILE = "telemetria_lotomania.log"
+TELEMETRIA_PROMETHEUS_FILE = "telemetria_lotomania.prom"
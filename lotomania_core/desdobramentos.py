@@ -0,0 +1,332 @@
+"""Desdobramentos (fechamentos com garantia)."""
+import itertools
+import math
+import time
+
+import numpy as np
+
+from .constantes import (
+    DESDOBRAMENTO_AMOSTRA_VERIFICACAO, DESDOBRAMENTO_MAX_ALVOS, DESDOBRAMENTO_MAX_VERIFICACAO,
+    NUM_DEZENAS_POR_APOSTA, NUM_DEZENAS_SORTEADAS, NUM_DEZENAS_TOTAL
+)
+from .telemetria import TELEMETRIA, perfilado
+from .historico import dezenas_para_mascara
+from .comparacao import acertos_por_mascara, jogos_para_mascara
+
+__all__ = [
+    'DESDOBRAMENTO_CANDIDATOS', 'DESDOBRAMENTO_TEMPO_LIMITE', 'verificar_desdobramento',
+    'gerar_desdobramento_lotomania', 'resumo_desdobramento',
+]
+
+# --- Desdobramentos (Fechamentos com Garantia) ---
+# Um desdobramento sobre um grupo de v dezenas escolhidas (50 <= v <= 100) é um conjunto de jogos de
+# 50 dezenas do grupo tal que, se pelo menos k dezenas do grupo forem sorteadas, algum jogo acerta pelo
+# menos t delas. Os "alvos" são os subconjuntos de k dezenas do grupo; alvos e jogos viram máscaras
+# (N, 2) uint64 e "o jogo cobre o alvo" é popcount(jogo & alvo) >= t. Se saírem mais de k dezenas do
+# grupo, qualquer k delas já é um alvo coberto, então a garantia vale para "pelo menos k".
+DESDOBRAMENTO_CANDIDATOS = 64 # Jogos candidatos avaliados a cada passo do guloso
+DESDOBRAMENTO_TEMPO_LIMITE = 60.0 # Segundos para reforçar, com os alvos que a conferência achar descobertos, um desdobramento sobre alvos amostrados
+_BLOCO_ALVOS = 16_384 # Alvos por bloco na contagem de acertos (limita a matriz jogos x alvos em memória)
+
+def _subconjuntos_aleatorios(rng, tamanho_grupo, tamanho, quantidade):
+    """(quantidade, tamanho) posições de subconjuntos uniformes de range(tamanho_grupo), um por linha."""
+    chaves = rng.random((quantidade, tamanho_grupo))
+    return np.argpartition(chaves, tamanho - 1, axis=1)[:, :tamanho]
+
+def _iterar_subconjuntos(tamanho_grupo, tamanho, bloco=_BLOCO_ALVOS):
+    """Todos os subconjuntos de 'tamanho' posições de range(tamanho_grupo), em blocos (B, tamanho)."""
+    combinacoes = itertools.combinations(range(tamanho_grupo), tamanho)
+    while True:
+        dados = np.fromiter(itertools.chain.from_iterable(itertools.islice(combinacoes, bloco)), dtype=np.uint8)
+        if not dados.size:
+            return
+        yield dados.reshape(-1, tamanho)
+
+def _acertos_em_blocos(mascaras_jogos, mascaras_alvos):
+    """acertos_por_mascara em blocos de alvos, para não montar de uma vez a matriz intermediária uint64."""
+    if mascaras_alvos.shape[0] <= _BLOCO_ALVOS:
+        return acertos_por_mascara(mascaras_jogos, mascaras_alvos)
+    return np.concatenate([acertos_por_mascara(mascaras_jogos, mascaras_alvos[i:i + _BLOCO_ALVOS])
+                           for i in range(0, mascaras_alvos.shape[0], _BLOCO_ALVOS)], axis=1)
+
+def _validar_desdobramento(grupo, k, t):
+    grupo = np.unique(np.asarray(grupo, dtype=np.int64))
+    if grupo.size and (grupo[0] < 0 or grupo[-1] >= NUM_DEZENAS_TOTAL):
+        raise ValueError("As dezenas do grupo devem estar entre 00 e 99.")
+    if not NUM_DEZENAS_POR_APOSTA <= grupo.size <= NUM_DEZENAS_TOTAL:
+        raise ValueError(f"O grupo precisa de {NUM_DEZENAS_POR_APOSTA} a {NUM_DEZENAS_TOTAL} dezenas distintas (recebidas {grupo.size}).")
+    if not 1 <= t <= k <= NUM_DEZENAS_SORTEADAS:
+        raise ValueError(f"A garantia exige 1 <= acertos garantidos (t={t}) <= dezenas sorteadas do grupo (k={k}) <= {NUM_DEZENAS_SORTEADAS}.")
+    return grupo.astype(np.uint8)
+
+class _BuscaLocalDesdobramento:
+    """
+    Tenta eliminar jogos do desdobramento: retira um jogo e conserta os alvos que ficaram descobertos
+    trocando uma dezena de cada vez nos outros jogos (subida de encosta), sem descobrir nenhum alvo.
+    Se o conserto falha, as trocas são desfeitas e o jogo volta.
+
+    O ganho de todas as trocas (sai o, entra i) de um jogo sai de dois produtos de matrizes: uma troca só
+    muda a cobertura de alvos com exatamente t - 1 acertos (cobertos se 'i' está no alvo e 'o' não) ou
+    exatamente t (descobertos se 'o' está no alvo e 'i' não).
+    """
+    def __init__(self, jogos, alvos, t):
+        self.jogos = jogos.copy() # (J, v) bool sobre as posições do grupo
+        self.t = t
+        self.incidencia = np.zeros((alvos.shape[0], jogos.shape[1]), dtype=bool) # (A, v)
+        self.incidencia[np.arange(alvos.shape[0])[:, None], alvos] = True
+        # Contagens até 20 são exatas em float32, e o produto assim usa a BLAS
+        self.acertos = (self.incidencia.astype(np.float32) @ jogos.T.astype(np.float32)).astype(np.uint8) # (A, J)
+        self.ativos = np.ones(jogos.shape[0], dtype=bool)
+        self.cobertura = (self.acertos >= t).sum(axis=1)
+
+    def _aplicar(self, j, sai, entra):
+        self.jogos[j, sai] = False
+        self.jogos[j, entra] = True
+        novos = self.acertos[:, j] + self.incidencia[:, entra] - self.incidencia[:, sai]
+        self.cobertura += (novos >= self.t).astype(np.int64) - (self.acertos[:, j] >= self.t)
+        self.acertos[:, j] = novos
+
+    def _alternar(self, j, ativo):
+        self.ativos[j] = ativo
+        self.cobertura += np.where(self.acertos[:, j] >= self.t, 1 if ativo else -1, 0)
+
+    def _melhor_troca(self, j, descobertos):
+        """(ganho, sai, entra) da melhor troca no jogo j: alvos descobertos que ele passa a cobrir menos os que só ele cobria e perde."""
+        # Só os alvos descobertos podem ganhar cobertura, e só os cobertos apenas por j podem perdê-la
+        criticos = (self.cobertura == 1) & (self.acertos[:, j] >= self.t)
+        relevantes = np.flatnonzero(descobertos | criticos)
+        acertos = self.acertos[relevantes, j]
+        x = self.incidencia[relevantes].astype(np.int64)
+        dentro = self.jogos[j]
+        faltando_um = x[acertos == self.t - 1]
+        no_limite = x[acertos == self.t]
+        # ganho[o, i] para a dezena o dentro do jogo e i fora dele
+        ganho = (1 - faltando_um[:, dentro]).T @ faltando_um[:, ~dentro] - no_limite[:, dentro].T @ (1 - no_limite[:, ~dentro])
+        o, i = np.unravel_index(np.argmax(ganho), ganho.shape)
+        return ganho[o, i], np.flatnonzero(dentro)[o], np.flatnonzero(~dentro)[i]
+
+    def _exclusivos(self):
+        """Alvos cobertos só por cada jogo ativo (os inativos ficam com um valor acima de qualquer contagem)."""
+        exclusivos = ((self.cobertura == 1)[:, None] & (self.acertos >= self.t)).sum(axis=0)
+        return np.where(self.ativos, exclusivos, np.iinfo(np.int64).max)
+
+    def executar(self, limite_segundos, max_trocas=200):
+        fim = time.perf_counter() + limite_segundos
+        # Jogos redundantes (todos os seus alvos têm outra cobertura) saem sem conserto
+        for j in np.flatnonzero(self._exclusivos() == 0):
+            if not np.any((self.cobertura == 1) & (self.acertos[:, j] >= self.t)):
+                self._alternar(j, False)
+
+        tentados = set()
+        while self.ativos.sum() > 1 and time.perf_counter() < fim:
+            # Tenta primeiro o jogo que cobre sozinho menos alvos
+            exclusivos = self._exclusivos()
+            ordem = [j for j in np.argsort(exclusivos, kind='stable') if self.ativos[j] and j not in tentados]
+            if not ordem:
+                break
+            r = ordem[0]
+            tentados.add(r)
+            self._alternar(r, False)
+            trocas = []
+            for _ in range(max_trocas):
+                descobertos = self.cobertura == 0
+                if not descobertos.any():
+                    break
+                melhor = (0, None, None, None)
+                for j in np.flatnonzero(self.ativos):
+                    if time.perf_counter() >= fim:
+                        break
+                    troca = self._melhor_troca(j, descobertos)
+                    if troca[0] > melhor[0]:
+                        melhor = troca + (j,)
+                if melhor[0] <= 0:
+                    break # Nenhuma troca reduz os alvos descobertos (ou o tempo acabou)
+                _, sai, entra, j = melhor
+                self._aplicar(j, sai, entra)
+                trocas.append((j, sai, entra))
+            if (self.cobertura == 0).any():
+                for j, sai, entra in reversed(trocas): # Conserto falhou: desfaz as trocas e devolve o jogo
+                    self._aplicar(j, entra, sai)
+                self._alternar(r, True)
+            elif trocas:
+                tentados.clear() # Jogos mudaram: os já tentados voltam a ser candidatos à remoção
+        return self.jogos[self.ativos]
+
+def _candidatos_desdobramento(rng, alvos_descobertos, v, quantidade):
+    """
+    Jogos candidatos (quantidade, v) bool: as dezenas mais presentes nos alvos ainda descobertos, com ruído
+    de Gumbel em temperaturas crescentes (de quase guloso a quase aleatório). O último contém um alvo
+    descoberto inteiro, o que garante que todo passo do guloso cobre pelo menos um alvo.
+    """
+    frequencia = np.bincount(alvos_descobertos.ravel(), minlength=v).astype(np.float64)
+    frequencia /= max(frequencia.max(), 1.0)
+    temperaturas = np.geomspace(0.01, 10.0, quantidade)[:, None]
+    chaves = frequencia + temperaturas * -np.log(-np.log(rng.random((quantidade, v))))
+    chaves[-1, alvos_descobertos[rng.integers(alvos_descobertos.shape[0])]] = np.inf
+    escolhidas = np.argpartition(-chaves, NUM_DEZENAS_POR_APOSTA - 1, axis=1)[:, :NUM_DEZENAS_POR_APOSTA]
+    candidatos = np.zeros((quantidade, v), dtype=bool)
+    candidatos[np.arange(quantidade)[:, None], escolhidas] = True
+    return candidatos
+
+def _alvos_sem_cobertura(mascaras_jogos, grupo, k, t, max_exaustivo, amostras, rng):
+    """
+    Confere os jogos contra todos os subconjuntos de k posições do grupo, se forem até max_exaustivo, ou
+    contra 'amostras' subconjuntos aleatórios. Retorna (exaustivo, alvos conferidos, posições (F, k) dos alvos sem cobertura).
+    """
+    exaustivo = math.comb(len(grupo), k) <= max_exaustivo
+    if exaustivo:
+        blocos = _iterar_subconjuntos(len(grupo), k)
+    else:
+        blocos = (_subconjuntos_aleatorios(rng, len(grupo), k, min(_BLOCO_ALVOS, amostras - i)) for i in range(0, amostras, _BLOCO_ALVOS))
+    verificados = 0
+    falhos = []
+    with TELEMETRIA.cronometro('desdobramento_verificacao', exaustivo=exaustivo):
+        for posicoes in blocos:
+            sem_cobertura = acertos_por_mascara(mascaras_jogos, dezenas_para_mascara(grupo[posicoes])).max(axis=0, initial=0) < t
+            verificados += posicoes.shape[0]
+            if sem_cobertura.any():
+                falhos.append(posicoes[sem_cobertura].astype(np.int64))
+    return exaustivo, verificados, np.concatenate(falhos) if falhos else np.empty((0, k), dtype=np.int64)
+
+def _relatorio_verificacao(grupo, k, exaustivo, verificados, falhos):
+    falhas = falhos.shape[0]
+    return {
+        'garantido': exaustivo and falhas == 0,
+        'exaustivo': exaustivo,
+        'alvos_verificados': verificados,
+        'total_alvos': math.comb(len(grupo), k),
+        'falhas': falhas,
+        'exemplos_falha': [sorted(int(n) for n in grupo[posicoes]) for posicoes in falhos[:5]],
+        'fracao_falhas_max': 0.0 if exaustivo else (3.0 / verificados if falhas == 0 else None),
+    }
+
+def verificar_desdobramento(jogos, grupo, k, t, max_exaustivo=DESDOBRAMENTO_MAX_VERIFICACAO, amostras=DESDOBRAMENTO_AMOSTRA_VERIFICACAO, semente=None):
+    """
+    Confere a garantia "se pelo menos k dezenas do grupo saírem, algum jogo acerta pelo menos t" contra
+    todos os subconjuntos de k dezenas do grupo (prova) ou, se forem mais de max_exaustivo, contra
+    'amostras' subconjuntos aleatórios. Retorna:
+      'garantido':  True só se a conferência foi exaustiva e nenhum alvo falhou;
+      'exaustivo', 'alvos_verificados', 'total_alvos', 'falhas' e 'exemplos_falha' (até 5 alvos sem cobertura);
+      'fracao_falhas_max': na amostragem sem falhas, limite superior de 95% da fração de alvos descobertos (3 / n).
+    """
+    grupo = _validar_desdobramento(grupo, k, t)
+    exaustivo, verificados, falhos = _alvos_sem_cobertura(jogos_para_mascara(jogos), grupo, k, t, max_exaustivo, amostras,
+                                                          np.random.default_rng(semente))
+    return _relatorio_verificacao(grupo, k, exaustivo, verificados, falhos)
+
+@perfilado
+def gerar_desdobramento_lotomania(grupo, k, t, busca_local=True, tempo_busca_local=5.0, verificar=True,
+                                  max_alvos=DESDOBRAMENTO_MAX_ALVOS, candidatos=DESDOBRAMENTO_CANDIDATOS, semente=None,
+                                  tempo_limite=DESDOBRAMENTO_TEMPO_LIMITE):
+    """
+    Desdobramento reduzido sobre 'grupo': jogos de 50 dezenas do grupo tais que, se pelo menos k dezenas
+    do grupo forem sorteadas, algum jogo acerta pelo menos t delas.
+
+    Cobertura de conjuntos gulosa: a cada passo entra o candidato que cobre mais alvos ainda descobertos
+    (contagem por popcount das máscaras). Com busca_local, o resultado é refinado por até
+    tempo_busca_local segundos (somados entre as rodadas) tentando eliminar jogos (_BuscaLocalDesdobramento).
+    Os alvos são todos os subconjuntos de k dezenas do grupo se forem até max_alvos, e a garantia vale por
+    construção. Senão, parte-se de uma amostra deles, e cada rodada confere o desdobramento como
+    verificar_desdobramento (com uma amostra nova, ou contra todos os alvos se couberem): os alvos sem
+    cobertura entram na construção e o guloso volta a cobri-los, até uma conferência sem falhas ou até
+    tempo_limite segundos. A última conferência é a 'verificacao' do resultado, e só é limpa se nenhum alvo
+    conferido ficou de fora. Retorna os jogos, o tamanho, os tempos de cada etapa e a verificação.
+    """
+    grupo = _validar_desdobramento(grupo, k, t)
+    v = len(grupo)
+    rng = np.random.default_rng(semente)
+    inicio = time.perf_counter()
+    prazo = inicio + tempo_limite
+
+    total_alvos = math.comb(v, k)
+    alvos_exaustivos = total_alvos <= max_alvos
+    if alvos_exaustivos:
+        alvos = np.concatenate(list(_iterar_subconjuntos(v, k)))
+    else:
+        alvos = _subconjuntos_aleatorios(rng, v, k, max_alvos)
+    mascaras_alvos = dezenas_para_mascara(grupo[alvos])
+
+    def mascaras_jogos(jogos_bool):
+        # Cada linha tem exatamente 50 posições marcadas, em ordem: o nonzero se reparte por linha
+        return dezenas_para_mascara(grupo[np.nonzero(jogos_bool)[1].reshape(len(jogos_bool), NUM_DEZENAS_POR_APOSTA)])
+
+    jogos = []
+    descobertos = np.ones(alvos.shape[0], dtype=bool)
+    rodadas_reforco = 0
+    tempo_guloso = tempo_busca = tempo_verificacao = 0.0
+    verificacao = None
+    while True:
+        inicio_etapa = time.perf_counter()
+        with TELEMETRIA.cronometro('desdobramento_guloso', grupo=v, k=k, t=t):
+            while descobertos.any():
+                indices = np.flatnonzero(descobertos)
+                opcoes = _candidatos_desdobramento(rng, alvos[indices], v, candidatos)
+                cobre = _acertos_em_blocos(mascaras_jogos(opcoes), mascaras_alvos[indices]) >= t
+                melhor = int(np.argmax(cobre.sum(axis=1)))
+                jogos.append(opcoes[melhor])
+                descobertos[indices[cobre[melhor]]] = False
+        tempo_guloso += time.perf_counter() - inicio_etapa
+        tamanho_guloso = len(jogos)
+
+        restante_busca = min(tempo_busca_local - tempo_busca, prazo - time.perf_counter())
+        if busca_local and len(jogos) > 1 and restante_busca > 0:
+            inicio_etapa = time.perf_counter()
+            with TELEMETRIA.cronometro('desdobramento_busca_local', jogos=len(jogos)):
+                jogos = list(_BuscaLocalDesdobramento(np.array(jogos), alvos, t).executar(restante_busca))
+            tempo_busca += time.perf_counter() - inicio_etapa
+
+        if alvos_exaustivos and not verificar:
+            break
+        inicio_etapa = time.perf_counter()
+        exaustivo, verificados, falhos = _alvos_sem_cobertura(mascaras_jogos(np.array(jogos)), grupo, k, t, DESDOBRAMENTO_MAX_VERIFICACAO,
+                                                              DESDOBRAMENTO_AMOSTRA_VERIFICACAO, rng)
+        verificacao = _relatorio_verificacao(grupo, k, exaustivo, verificados, falhos)
+        tempo_verificacao += time.perf_counter() - inicio_etapa
+        if alvos_exaustivos or not falhos.shape[0] or time.perf_counter() >= prazo:
+            break
+        # Reforço: os alvos que a conferência achou descobertos entram na construção
+        rodadas_reforco += 1
+        falhos = falhos[:max_alvos]
+        alvos = np.concatenate([alvos, falhos])
+        mascaras_alvos = np.concatenate([mascaras_alvos, dezenas_para_mascara(grupo[falhos])])
+        descobertos = np.concatenate([np.zeros(descobertos.shape[0], dtype=bool), np.ones(falhos.shape[0], dtype=bool)])
+
+    jogos_dezenas = [sorted(int(n) for n in grupo[jogo]) for jogo in jogos]
+    resultado = {
+        'jogos': jogos_dezenas,
+        'tamanho': len(jogos_dezenas),
+        'tamanho_guloso': tamanho_guloso,
+        'grupo': [int(n) for n in grupo],
+        'k': k,
+        't': t,
+        'alvos': int(alvos.shape[0]),
+        'alvos_exaustivos': alvos_exaustivos,
+        'rodadas_reforco': rodadas_reforco,
+        'tempo_guloso': tempo_guloso,
+        'tempo_busca_local': tempo_busca,
+    }
+    if verificar:
+        resultado['verificacao'] = verificacao
+        resultado['tempo_verificacao'] = tempo_verificacao
+    resultado['tempo_total'] = time.perf_counter() - inicio
+    return resultado
+
+def resumo_desdobramento(resultado):
+    """Texto curto com o tamanho, os tempos e a verificação de um resultado de gerar_desdobramento_lotomania."""
+    linhas = [
+        f"Grupo de {len(resultado['grupo'])} dezenas: se saírem pelo menos {resultado['k']} delas, algum jogo acerta pelo menos {resultado['t']}.",
+        f"Desdobramento com {resultado['tamanho']} jogo(s) (guloso: {resultado['tamanho_guloso']}), construído sobre "
+        + (f"todos os {resultado['alvos']} alvos." if resultado['alvos_exaustivos'] else f"{resultado['alvos']} alvos amostrados."),
+        f"Tempo: guloso {resultado['tempo_guloso']:.2f} s, busca local {resultado['tempo_busca_local']:.2f} s, total {resultado['tempo_total']:.2f} s.",
+    ]
+    verificacao = resultado.get('verificacao')
+    if verificacao:
+        if verificacao['garantido']:
+            linhas.append(f"Garantia comprovada: todos os {verificacao['total_alvos']} subconjuntos foram conferidos.")
+        elif verificacao['falhas'] == 0:
+            linhas.append(f"Sem falhas em {verificacao['alvos_verificados']} subconjuntos amostrados de {verificacao['total_alvos']} "
+                          f"(fração descoberta abaixo de {verificacao['fracao_falhas_max']:.1e} com 95% de confiança).")
+        else:
+            exemplo = ", ".join(f"{n:02d}" for n in verificacao['exemplos_falha'][0])
+            linhas.append(f"ATENÇÃO: {verificacao['falhas']} de {verificacao['alvos_verificados']} subconjuntos conferidos ficaram sem cobertura (ex.: {exemplo}).")
+    return "\n".join(linhas)
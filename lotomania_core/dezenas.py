@@ -0,0 +1,73 @@
+"""Tabela de características das 100 dezenas e máscaras de bits dos grupos do volante."""
+import math
+
+import numpy as np
+
+from .constantes import NUM_DEZENAS_TOTAL
+
+__all__ = [
+    'TABELA_DEZENAS', 'BIT_DEZENA', 'MASCARA_PARES', 'MASCARA_IMPARES', 'MASCARA_PRIMOS', 'MASCARA_MOLDURA',
+    'MASCARA_MIOLO', 'MASCARAS_LINHA', 'MASCARAS_COLUNA', 'MASCARAS_FAIXA', 'MASCARAS_QUADRANTE',
+    'MASCARAS_DIAGONAL', 'NUM_MOLDURA', 'NUM_MIOLO', 'NUM_PRIMOS', 'mascara_da_combinacao',
+    'maior_sequencia_consecutiva',
+]
+
+# --- Tabela de Características das Dezenas ---
+# Construída uma vez na importação. No volante 10x10 a dezena n fica na linha n // 10 (que é também
+# a sua faixa de dez: 00-09, 10-19, ...) e na coluna n % 10; a moldura são as linhas e colunas 0 e 9.
+# Os quadrantes são os blocos 5x5 (0 superior esquerdo, 1 superior direito, 2 e 3 abaixo) e as
+# diagonais são 00, 11, ..., 99 (principal, 0) e 09, 18, ..., 90 (secundária, 1); -1 fora delas.
+def _crivo_primos(limite):
+    primo = np.ones(limite, dtype=bool)
+    primo[:2] = False # 0 e 1 não são primos
+    for i in range(2, int(math.isqrt(limite - 1)) + 1):
+        if primo[i]:
+            primo[i * i::i] = False
+    return primo
+
+TABELA_DEZENAS = np.zeros(NUM_DEZENAS_TOTAL, dtype=[
+    ('dezena', np.uint8), ('par', bool), ('primo', bool), ('moldura', bool),
+    ('linha', np.uint8), ('coluna', np.uint8), ('faixa', np.uint8), ('quadrante', np.uint8), ('diagonal', np.int8),
+])
+TABELA_DEZENAS['dezena'] = np.arange(NUM_DEZENAS_TOTAL)
+TABELA_DEZENAS['par'] = TABELA_DEZENAS['dezena'] % 2 == 0
+TABELA_DEZENAS['primo'] = _crivo_primos(NUM_DEZENAS_TOTAL) # 25 primos entre 00 e 99
+TABELA_DEZENAS['linha'] = TABELA_DEZENAS['dezena'] // 10
+TABELA_DEZENAS['coluna'] = TABELA_DEZENAS['dezena'] % 10
+TABELA_DEZENAS['faixa'] = TABELA_DEZENAS['linha']
+TABELA_DEZENAS['quadrante'] = TABELA_DEZENAS['linha'] // 5 * 2 + TABELA_DEZENAS['coluna'] // 5
+TABELA_DEZENAS['diagonal'] = np.where(TABELA_DEZENAS['linha'] == TABELA_DEZENAS['coluna'], 0,
+                                      np.where(TABELA_DEZENAS['linha'] + TABELA_DEZENAS['coluna'] == 9, 1, -1))
+TABELA_DEZENAS['moldura'] = np.isin(TABELA_DEZENAS['linha'], (0, 9)) | np.isin(TABELA_DEZENAS['coluna'], (0, 9))
+TABELA_DEZENAS.flags.writeable = False
+
+def _mascara_de(selecao):
+    """Máscara (int de 100 bits) das dezenas marcadas no vetor booleano 'selecao'."""
+    return sum(1 << int(n) for n in np.flatnonzero(selecao))
+
+BIT_DEZENA = tuple(1 << n for n in range(NUM_DEZENAS_TOTAL))
+MASCARA_PARES = _mascara_de(TABELA_DEZENAS['par'])
+MASCARA_IMPARES = _mascara_de(~TABELA_DEZENAS['par'])
+MASCARA_PRIMOS = _mascara_de(TABELA_DEZENAS['primo'])
+MASCARA_MOLDURA = _mascara_de(TABELA_DEZENAS['moldura'])
+MASCARA_MIOLO = _mascara_de(~TABELA_DEZENAS['moldura'])
+MASCARAS_LINHA = tuple(_mascara_de(TABELA_DEZENAS['linha'] == i) for i in range(10))
+MASCARAS_COLUNA = tuple(_mascara_de(TABELA_DEZENAS['coluna'] == j) for j in range(10))
+MASCARAS_FAIXA = tuple(_mascara_de(TABELA_DEZENAS['faixa'] == i) for i in range(10))
+MASCARAS_QUADRANTE = tuple(_mascara_de(TABELA_DEZENAS['quadrante'] == q) for q in range(4))
+MASCARAS_DIAGONAL = tuple(_mascara_de(TABELA_DEZENAS['diagonal'] == d) for d in range(2))
+NUM_MOLDURA = int(TABELA_DEZENAS['moldura'].sum()) # 36
+NUM_MIOLO = NUM_DEZENAS_TOTAL - NUM_MOLDURA # 64
+NUM_PRIMOS = int(TABELA_DEZENAS['primo'].sum()) # 25
+
+def mascara_da_combinacao(combinacao):
+    """Máscara (int de 100 bits) de uma combinação de dezenas distintas."""
+    return sum(map(BIT_DEZENA.__getitem__, combinacao))
+
+def maior_sequencia_consecutiva(mascara):
+    """Tamanho da maior sequência de dezenas consecutivas na máscara (m & m >> 1 encurta cada sequência em 1)."""
+    tamanho = 0
+    while mascara:
+        mascara &= mascara >> 1
+        tamanho += 1
+    return tamanho
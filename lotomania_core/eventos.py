@@ -0,0 +1,46 @@
+"""Erros estruturados e eventos de progresso do núcleo, para a interface ou a API decidirem como mostrá-los."""
+
+__all__ = ['ErroLotomania', 'ErroHistorico', 'ErroRede', 'EventoProgresso']
+
+
+class ErroLotomania(Exception):
+    """
+    Erro do núcleo com um 'codigo' estável (para a interface ou a API reagirem sem comparar textos),
+    uma mensagem pronta para o usuário e 'detalhes' (ex.: o caminho do arquivo ou o erro original).
+    """
+    def __init__(self, codigo, mensagem, **detalhes):
+        super().__init__(mensagem)
+        self.codigo = codigo
+        self.mensagem = mensagem
+        self.detalhes = detalhes
+
+    def como_dict(self):
+        return {'codigo': self.codigo, 'mensagem': self.mensagem, 'detalhes': {k: str(v) for k, v in self.detalhes.items()}}
+
+class ErroHistorico(ErroLotomania):
+    """Arquivo de histórico ilegível, corrompido ou que não pôde ser gravado."""
+
+class ErroRede(ErroLotomania):
+    """API de resultados indisponível ou com resposta inesperada."""
+
+
+class EventoProgresso:
+    """Passo 'atual' de 'total' de uma etapa de operação longa (ex.: 'download'), com detalhes como o concurso."""
+    __slots__ = ('etapa', 'atual', 'total', 'detalhes')
+
+    def __init__(self, etapa, atual, total, **detalhes):
+        self.etapa = etapa
+        self.atual = atual
+        self.total = total
+        self.detalhes = detalhes
+
+    @property
+    def fracao(self):
+        return min(self.atual / self.total, 1.0) if self.total else 1.0
+
+    def como_dict(self):
+        return {'etapa': self.etapa, 'atual': self.atual, 'total': self.total, 'fracao': self.fracao, **self.detalhes}
+
+    def __repr__(self):
+        detalhes = "".join(f", {k}={v!r}" for k, v in self.detalhes.items())
+        return f"EventoProgresso({self.etapa!r}, {self.atual}, {self.total}{detalhes})"
@@ -0,0 +1,392 @@
+"""Geradores de jogos e pipeline de geração combinada (amostragem, filtros, critérios e pontuação)."""
+import itertools
+import logging
+import math
+import random
+import time
+from statistics import NormalDist
+
+import numpy as np
+
+from .constantes import NUM_DEZENAS_POR_APOSTA, NUM_DEZENAS_TOTAL
+from .telemetria import TELEMETRIA, perfilado
+from .dezenas import TABELA_DEZENAS
+from .analise import CRITERIOS_VOLANTE, _LIMITES_VOLANTE
+
+__all__ = [
+    'gerar_aleatorio_lotomania', 'gerar_baseado_em_frequencia_lotomania', 'gerar_por_transicao_lotomania',
+    'gerar_por_modelo_ia_lotomania', 'gerar_com_filtros_lotomania', 'gerar_balanceado_lotomania',
+    'PIPELINE_BLOCO_MIN', 'PIPELINE_BLOCO_MAX', 'PIPELINE_MAX_CANDIDATOS', 'AMOSTRAGENS',
+    'caracteristicas_em_bloco', 'EtapaPipeline', 'etapas_criterios', 'pontuador_dezenas', 'pesos_de_amostragem',
+    'PipelineGeracao', 'resumo_pipeline',
+]
+
+logger = logging.getLogger(__name__)
+
+# --- Funções de Geração para LOTOMANIA ---
+
+def gerar_aleatorio_lotomania(num_jogos):
+    # Lotomania sempre aposta 50 números
+    numeros_possiveis = list(range(NUM_DEZENAS_TOTAL))
+    jogos_gerados = []
+    for _ in range(num_jogos):
+        jogos_gerados.append(sorted(random.sample(numeros_possiveis, NUM_DEZENAS_POR_APOSTA)))
+    return jogos_gerados
+
+def gerar_baseado_em_frequencia_lotomania(frequencias_counter, num_jogos):
+    # Lotomania sempre aposta 50 números
+    
+    # Seleciona mais números que o necessário para ter uma base para sortear, priorizando os mais frequentes
+    # Por exemplo, os 60 números mais frequentes para sortear 50
+    num_frequentes_para_selecao = min(NUM_DEZENAS_TOTAL, NUM_DEZENAS_POR_APOSTA + 10) 
+    lista_frequentes_base = [num for num, count in frequencias_counter.most_common(num_frequentes_para_selecao)]
+
+    jogos_gerados = []
+    for _ in range(num_jogos):
+        if len(lista_frequentes_base) >= NUM_DEZENAS_POR_APOSTA:
+            jogos_gerados.append(sorted(random.sample(lista_frequentes_base, NUM_DEZENAS_POR_APOSTA)))
+        else:
+            # Caso raro onde não há números suficientes na lista de frequentes (ex: histórico muito pequeno)
+            numeros_faltantes = NUM_DEZENAS_POR_APOSTA - len(lista_frequentes_base)
+            complemento_aleatorio = random.sample(
+                [n for n in range(NUM_DEZENAS_TOTAL) if n not in lista_frequentes_base],
+                numeros_faltantes
+            )
+            jogos_gerados.append(sorted(lista_frequentes_base + complemento_aleatorio))
+
+    return jogos_gerados
+
+def _amostrar_ponderado_sem_reposicao(pesos, quantidade, num_jogos):
+    """
+    Sorteia num_jogos combinações de 'quantidade' dezenas sem reposição, com P proporcional a 'pesos' (100,).
+    Usa chaves Exp(1)/peso (Efraimidis-Spirakis); a semente vem de 'random' para respeitar random.seed.
+    """
+    pesos = np.asarray(pesos, dtype=np.float64)
+    rng = np.random.default_rng(random.getrandbits(64))
+    chaves = rng.standard_exponential((num_jogos, NUM_DEZENAS_TOTAL)) / pesos
+    escolhidos = np.argpartition(chaves, quantidade - 1, axis=1)[:, :quantidade]
+    return [sorted(int(n) for n in jogo) for jogo in escolhidos]
+
+def gerar_por_transicao_lotomania(modelo_transicao, num_jogos, intensidade=1.0):
+    """
+    Gera jogos de 50 dezenas com probabilidade proporcional à pontuação do modelo de transição
+    para o próximo sorteio. intensidade > 1 acentua as diferenças entre as dezenas; 0 equivale ao aleatório.
+    """
+    pontuacao = modelo_transicao.pontuar().astype(np.float64)
+    return _amostrar_ponderado_sem_reposicao(pontuacao ** intensidade, NUM_DEZENAS_POR_APOSTA, num_jogos)
+
+def gerar_por_modelo_ia_lotomania(modelo, num_jogos, intensidade=1.0):
+    """Gera jogos de 50 dezenas com probabilidade proporcional à previsão do modelo logístico para o próximo sorteio."""
+    pontuacao = modelo.pontuar().astype(np.float64)
+    return _amostrar_ponderado_sem_reposicao(pontuacao ** intensidade, NUM_DEZENAS_POR_APOSTA, num_jogos)
+
+def gerar_com_filtros_lotomania(filtros_inclusao, filtros_exclusao, num_jogos):
+    # Lotomania sempre aposta 50 números
+    jogos_gerados = []
+    numeros_possiveis = set(range(NUM_DEZENAS_TOTAL))
+
+    for _ in range(num_jogos):
+        combinacao = set()
+        
+        # Adiciona números de inclusão
+        for num_incluir in filtros_inclusao:
+            if 0 <= num_incluir < NUM_DEZENAS_TOTAL and num_incluir not in combinacao:
+                combinacao.add(num_incluir)
+
+        # Remove números de exclusão e os já incluídos das opções restantes
+        opcoes_restantes = list(numeros_possiveis - set(filtros_exclusao) - combinacao)
+
+        # Se já tiver mais números do que o permitido devido aos filtros de inclusão (erro do usuário)
+        if len(combinacao) > NUM_DEZENAS_POR_APOSTA:
+            # Já tratado na GUI, mas para garantir a robustez
+            combinacao = set(random.sample(list(combinacao), NUM_DEZENAS_POR_APOSTA))
+            opcoes_restantes = [] # Não precisa de mais opções
+
+        # Preenche o restante da combinação com números aleatórios das opções restantes
+        while len(combinacao) < NUM_DEZENAS_POR_APOSTA:
+            if not opcoes_restantes:
+                # Este caso deve ser capturado pela GUI antes da chamada, mas é um fallback
+                raise ValueError("Não há números suficientes para gerar a combinação com os filtros fornecidos.")
+            
+            num_escolhido = random.choice(opcoes_restantes)
+            combinacao.add(num_escolhido)
+            opcoes_restantes.remove(num_escolhido) # Remove para evitar duplicatas na mesma combinação
+            
+        jogos_gerados.append(sorted(list(combinacao)))
+        
+    return jogos_gerados
+
+
+@perfilado
+def gerar_balanceado_lotomania(criterios, num_jogos, progress_callback=None, stop_event=None, tentativas_por_jogo=20000, aviso_callback=None):
+    # Lotomania sempre aposta 50 números; os critérios são conferidos em blocos de candidatos (PipelineGeracao)
+    # aviso_callback(mensagem) recebe o aviso de jogos sem combinação balanceada (padrão: o log do módulo, como warning)
+    # progress_callback(aceitos, num_jogos, candidatos, max_candidatos) é chamado a cada bloco
+    pipeline = PipelineGeracao(validadores=etapas_criterios(criterios))
+    jogos_gerados, relatorio = pipeline.gerar(num_jogos, max_candidatos=tentativas_por_jogo * num_jogos,
+                                              progress_callback=progress_callback, stop_event=stop_event)
+    if relatorio['cancelado']:
+        return [] # Aborta a geração se o evento de parada for ativado
+
+    TELEMETRIA.incrementar('balanceado_tentativas', relatorio['candidatos'])
+    TELEMETRIA.incrementar('balanceado_aceitos', len(jogos_gerados))
+    faltam = num_jogos - len(jogos_gerados)
+    if faltam:
+        TELEMETRIA.incrementar('balanceado_fallback_aleatorio', faltam)
+        aviso = (f"Não foi possível encontrar combinações balanceadas para {faltam} de {num_jogos} jogo(s) em {relatorio['candidatos']} tentativas. "
+                 f"Gerando jogos aleatórios de {NUM_DEZENAS_POR_APOSTA} números para estes. Considere suavizar os critérios.\n\n{resumo_pipeline(relatorio)}")
+        (aviso_callback or logger.warning)(aviso)
+        jogos_gerados.extend(gerar_aleatorio_lotomania(faltam))
+
+    return jogos_gerados
+
+# --- Pipeline de Geração Combinada ---
+# amostrador -> filtros -> validadores -> pontuadores -> deduplicação, sobre blocos de candidatos.
+# Cada bloco é uma matriz de incidência (B, 100); as contagens usadas pelos critérios (soma, pares,
+# moldura, primos, linhas, colunas, quadrantes e diagonais) saem de um único produto com a tabela de
+# características. A geração para assim que tem os jogos pedidos, e o tamanho do próximo bloco segue a
+# taxa de aceitação observada. Dezenas incluídas e excluídas entram no próprio amostrador (chave de
+# sorteio -1 ou infinita), então não custam rejeições.
+PIPELINE_BLOCO_MIN = 256
+PIPELINE_BLOCO_MAX = 16_384
+PIPELINE_MAX_CANDIDATOS = 2_000_000 # Candidatos por geração antes de desistir
+AMOSTRAGENS = ("uniforme", "frequencia", "transicao", "ia")
+
+# Colunas de _MATRIZ_CARACTERISTICAS: dezena, par, moldura, primo e um indicador por grupo do volante
+_MATRIZ_CARACTERISTICAS = np.column_stack(
+    [TABELA_DEZENAS['dezena'], TABELA_DEZENAS['par'], TABELA_DEZENAS['moldura'], TABELA_DEZENAS['primo']] +
+    [[(mascara >> n) & 1 for n in range(NUM_DEZENAS_TOTAL)] for _, _, mascaras, _ in CRITERIOS_VOLANTE for mascara in mascaras]
+).astype(np.float32) # float32 vai pelo BLAS e é exato para inteiros até 2**24
+_COLUNA_SOMA, _COLUNA_PARES, _COLUNA_MOLDURA, _COLUNA_PRIMOS = range(4)
+_COLUNAS_VOLANTE = {prefixo: range(inicio, inicio + len(mascaras)) for (prefixo, _, mascaras, _), inicio in
+                    zip(CRITERIOS_VOLANTE, itertools.accumulate((len(m) for _, _, m, _ in CRITERIOS_VOLANTE), initial=4))}
+
+def caracteristicas_em_bloco(incidencia):
+    """Contagens (B, colunas de _MATRIZ_CARACTERISTICAS) das linhas de 'incidencia' (B, 100) bool."""
+    return incidencia.astype(np.float32) @ _MATRIZ_CARACTERISTICAS
+
+class EtapaPipeline:
+    """
+    Etapa do pipeline. Nos filtros e validadores, funcao(incidencia, caracteristicas) -> (B,) bool com os
+    candidatos aceitos; nos pontuadores, -> (B,) float, e os candidatos abaixo de 'minimo' são rejeitados.
+    """
+    def __init__(self, nome, funcao, minimo=None):
+        self.nome = nome
+        self.funcao = funcao
+        self.minimo = minimo
+
+    def __repr__(self):
+        return f"EtapaPipeline({self.nome!r})"
+
+def _etapa_intervalo(nome, coluna, minimo, maximo, complemento=None):
+    """Contagem da coluna entre minimo e maximo; com complemento=(min, max), também NUM_DEZENAS_POR_APOSTA - contagem."""
+    def funcao(incidencia, caracteristicas):
+        contagem = caracteristicas[:, coluna]
+        aceitos = (contagem >= minimo) & (contagem <= maximo)
+        if complemento is not None:
+            resto = NUM_DEZENAS_POR_APOSTA - contagem
+            aceitos &= (resto >= complemento[0]) & (resto <= complemento[1])
+        return aceitos
+    return EtapaPipeline(nome, funcao)
+
+def _etapa_consecutivos(limite):
+    def funcao(incidencia, caracteristicas):
+        # Cada "e" com a matriz deslocada encurta as sequências em 1; sobra algo se alguma passa do limite
+        sobra = incidencia
+        for _ in range(limite):
+            sobra = sobra[:, 1:] & sobra[:, :-1]
+        return ~sobra.any(axis=1)
+    return EtapaPipeline("consecutivos", funcao)
+
+def _etapa_volante(prefixo, minimo, maximo):
+    colunas = list(_COLUNAS_VOLANTE[prefixo])
+    def funcao(incidencia, caracteristicas):
+        contagens = caracteristicas[:, colunas]
+        return ((contagens >= minimo) & (contagens <= maximo)).all(axis=1)
+    return EtapaPipeline(f"por {prefixo}", funcao)
+
+def etapas_criterios(criterios):
+    """Validadores dos critérios do modo balanceado, um por critério, para relatar as rejeições de cada um."""
+    etapas = [
+        _etapa_intervalo("soma", _COLUNA_SOMA, criterios['soma_min'], criterios['soma_max']),
+        _etapa_intervalo("pares/ímpares", _COLUNA_PARES, criterios['pares_min'], criterios['pares_max'],
+                         (criterios['impares_min'], criterios['impares_max'])),
+        _etapa_intervalo("moldura/miolo", _COLUNA_MOLDURA, criterios['moldura_min'], criterios['moldura_max'],
+                         (criterios['miolo_min'], criterios['miolo_max'])),
+    ]
+    if criterios.get('max_consecutivos') is not None:
+        etapas.append(_etapa_consecutivos(criterios['max_consecutivos']))
+    etapas.append(_etapa_intervalo("primos", _COLUNA_PRIMOS, criterios['primos_min'], criterios['primos_max']))
+    for chave_min, chave_max, _, tamanho in _LIMITES_VOLANTE:
+        minimo, maximo = criterios.get(chave_min), criterios.get(chave_max)
+        if minimo is not None or maximo is not None:
+            etapas.append(_etapa_volante(chave_min[:-4], 0 if minimo is None else minimo, tamanho if maximo is None else maximo))
+    return etapas
+
+def pontuador_dezenas(nome, valores, percentil_minimo=None):
+    """
+    Pontua cada candidato pela soma dos valores (100,) das suas dezenas. Com percentil_minimo, rejeita os
+    que ficam abaixo desse percentil entre jogos aleatórios (aproximação normal: a soma de 50 dezenas
+    tiradas sem reposição de 100 tem média 50 * média e variância 50 * var * 50 / 99).
+    """
+    valores = np.asarray(valores, dtype=np.float64)
+    minimo = None
+    if percentil_minimo:
+        media = NUM_DEZENAS_POR_APOSTA * valores.mean()
+        desvio = math.sqrt(NUM_DEZENAS_POR_APOSTA * valores.var() * (NUM_DEZENAS_TOTAL - NUM_DEZENAS_POR_APOSTA) / (NUM_DEZENAS_TOTAL - 1))
+        minimo = media + desvio * NormalDist().inv_cdf(percentil_minimo / 100)
+    return EtapaPipeline(nome, lambda incidencia, caracteristicas: incidencia.astype(np.float64) @ valores, minimo)
+
+def pesos_de_amostragem(amostragem, frequencias=None, modelo_transicao=None, modelo_ia=None, intensidade=1.0):
+    """
+    Pesos (100,) do amostrador. "frequencia" usa exp(intensidade * z) do escore padronizado de cada dezena
+    (as frequências brutas são quase iguais e pesariam quase nada); "transicao" e "ia" usam a pontuação do
+    modelo ** intensidade, como gerar_por_transicao_lotomania. "uniforme" retorna None.
+    """
+    if amostragem == "uniforme":
+        return None
+    if amostragem == "frequencia":
+        contagens = np.array([frequencias[n] for n in range(NUM_DEZENAS_TOTAL)], dtype=np.float64)
+        desvio = contagens.std()
+        return np.exp(intensidade * (contagens - contagens.mean()) / desvio) if desvio else None
+    if amostragem == "transicao":
+        return modelo_transicao.pontuar().astype(np.float64) ** intensidade
+    if amostragem == "ia":
+        return modelo_ia.pontuar().astype(np.float64) ** intensidade
+    raise ValueError(f"Amostragem desconhecida: {amostragem}. Use uma de {AMOSTRAGENS}.")
+
+class PipelineGeracao:
+    """
+    Geração composta: um amostrador ponderado (pesos (100,) ou uniforme) com dezenas incluídas e excluídas,
+    seguido de filtros, validadores e pontuadores (EtapaPipeline) e, com 'indice', da rejeição de repetições
+    e quase repetições (IndiceJogos). As etapas são aplicadas em ordem ao bloco inteiro de candidatos, e
+    o relatório conta, por etapa, os candidatos que chegaram a ela e os que ela rejeitou.
+    """
+    def __init__(self, pesos=None, incluir=(), excluir=(), filtros=(), validadores=(), pontuadores=(), indice=None, semente=None):
+        self.incluir = sorted(set(incluir))
+        self.excluir = sorted(set(excluir))
+        if any(not 0 <= n < NUM_DEZENAS_TOTAL for n in self.incluir + self.excluir):
+            raise ValueError("As dezenas incluídas e excluídas devem estar entre 00 e 99.")
+        if set(self.incluir) & set(self.excluir):
+            raise ValueError(f"As dezenas {sorted(set(self.incluir) & set(self.excluir))} estão marcadas para incluir e excluir.")
+        if len(self.incluir) > NUM_DEZENAS_POR_APOSTA:
+            raise ValueError(f"{len(self.incluir)} dezenas incluídas; a aposta tem {NUM_DEZENAS_POR_APOSTA}.")
+        if NUM_DEZENAS_TOTAL - len(self.excluir) < NUM_DEZENAS_POR_APOSTA:
+            raise ValueError(f"Com {len(self.excluir)} dezenas excluídas não sobram {NUM_DEZENAS_POR_APOSTA} para o jogo.")
+        # Chaves de Efraimidis-Spirakis Exp(1) / peso: as 50 menores formam o jogo. Sem pesos, uma
+        # chave uniforme dá a mesma distribuição e custa metade para sortear
+        self.ponderado = pesos is not None
+        self._inverso_pesos = 1.0 / np.maximum(np.asarray(pesos, dtype=np.float64), 1e-12) if self.ponderado else np.ones(NUM_DEZENAS_TOTAL)
+        self._inverso_pesos[self.excluir] = np.inf
+        self.etapas = ([('filtro', etapa) for etapa in filtros] + [('validador', etapa) for etapa in validadores] +
+                       [('pontuador', etapa) for etapa in pontuadores])
+        self.indice = indice
+        self.rng = np.random.default_rng(random.getrandbits(64) if semente is None else semente)
+
+    def amostrar(self, tamanho):
+        """Bloco (tamanho, 100) bool de jogos sorteados com as dezenas incluídas e sem as excluídas."""
+        forma = (tamanho, NUM_DEZENAS_TOTAL)
+        chaves = self.rng.standard_exponential(forma) if self.ponderado else self.rng.random(forma)
+        chaves *= self._inverso_pesos
+        chaves[:, self.incluir] = -1.0
+        # A 50ª menor chave de cada linha é o corte (empates entre chaves contínuas não acontecem na prática)
+        corte = np.partition(chaves, NUM_DEZENAS_POR_APOSTA - 1, axis=1)[:, NUM_DEZENAS_POR_APOSTA - 1:NUM_DEZENAS_POR_APOSTA]
+        return chaves <= corte
+
+    def _aplicar_etapas(self, incidencia, contagens):
+        """(vivos (B,) bool, [pontuações (B,) por pontuador]) de um bloco; acumula entrada e rejeitados em 'contagens'."""
+        caracteristicas = caracteristicas_em_bloco(incidencia)
+        vivos = np.ones(len(incidencia), dtype=bool)
+        pontuacoes = []
+        for contagem, (tipo, etapa) in zip(contagens, self.etapas):
+            contagem['entrada'] += int(np.count_nonzero(vivos))
+            resultado = etapa.funcao(incidencia, caracteristicas)
+            if tipo == 'pontuador':
+                pontuacoes.append(resultado)
+                if etapa.minimo is None:
+                    continue
+                resultado = resultado >= etapa.minimo
+            antes = int(np.count_nonzero(vivos))
+            vivos &= resultado
+            contagem['rejeitados'] += antes - int(np.count_nonzero(vivos))
+        return vivos, pontuacoes
+
+    def medir(self, amostras):
+        """Taxa de aceitação das etapas vetorizadas em 'amostras' candidatos, sem montar jogos: (taxa, [{'etapa', 'tipo', 'entrada', 'rejeitados'}])."""
+        contagens = [{'etapa': etapa.nome, 'tipo': tipo, 'entrada': 0, 'rejeitados': 0} for tipo, etapa in self.etapas]
+        aceitos = 0
+        for inicio in range(0, amostras, PIPELINE_BLOCO_MAX):
+            vivos, _ = self._aplicar_etapas(self.amostrar(min(PIPELINE_BLOCO_MAX, amostras - inicio)), contagens)
+            aceitos += int(np.count_nonzero(vivos))
+        return aceitos / max(amostras, 1), contagens
+
+    def gerar(self, num_jogos, max_candidatos=PIPELINE_MAX_CANDIDATOS, progress_callback=None, stop_event=None, taxa_aceitacao=None):
+        """
+        Retorna (jogos, relatorio). Para ao aceitar num_jogos jogos, ao passar de max_candidatos ou com stop_event.
+        relatorio: 'candidatos', 'aceitos', 'aprovados' (candidatos que passaram por filtros, validadores e
+        pontuadores, inclusive os que sobraram no último bloco), 'blocos', 'tempo', 'esgotado', 'cancelado', 'pontuacoes' (uma
+        tupla por jogo aceito, na ordem dos pontuadores) e 'etapas': [{'etapa', 'tipo', 'entrada', 'rejeitados'}].
+        progress_callback(aceitos, num_jogos, candidatos, max_candidatos) é chamado a cada bloco. taxa_aceitacao
+        (ex.: a de uma predefinição) dimensiona o primeiro bloco; depois vale a taxa observada.
+        """
+        inicio = time.perf_counter()
+        etapas = [{'etapa': etapa.nome, 'tipo': tipo, 'entrada': 0, 'rejeitados': 0} for tipo, etapa in self.etapas]
+        if self.indice is not None:
+            etapas.append({'etapa': "repetições", 'tipo': 'deduplicacao', 'entrada': 0, 'rejeitados': 0})
+        relatorio = {'candidatos': 0, 'aceitos': 0, 'blocos': 0, 'esgotado': False, 'cancelado': False, 'pontuacoes': [], 'etapas': etapas}
+        jogos = []
+        aprovados = 0 # Candidatos que passaram por todas as etapas vetorizadas (estimam a taxa de aceitação)
+        while len(jogos) < num_jogos:
+            if stop_event is not None and stop_event.is_set():
+                relatorio['cancelado'] = True
+                break
+            restantes = max_candidatos - relatorio['candidatos']
+            if restantes <= 0:
+                relatorio['esgotado'] = True
+                break
+            faltam = num_jogos - len(jogos)
+            if relatorio['candidatos'] == 0 and taxa_aceitacao:
+                taxa = taxa_aceitacao
+            else:
+                taxa = max(aprovados, 1) / max(relatorio['candidatos'], 1)
+            tamanho = int(min(max(1.5 * faltam / taxa, PIPELINE_BLOCO_MIN), PIPELINE_BLOCO_MAX, restantes))
+
+            incidencia = self.amostrar(tamanho)
+            vivos, pontuacoes = self._aplicar_etapas(incidencia, etapas)
+            relatorio['candidatos'] += tamanho
+            relatorio['blocos'] += 1
+            sobreviventes = np.flatnonzero(vivos)
+            aprovados += len(sobreviventes)
+
+            for linha in sobreviventes.tolist():
+                if len(jogos) == num_jogos:
+                    break
+                jogo = np.flatnonzero(incidencia[linha]).tolist()
+                if self.indice is not None:
+                    etapas[-1]['entrada'] += 1
+                    if self.indice.adicionar_se_novo(jogo) is None:
+                        etapas[-1]['rejeitados'] += 1
+                        continue
+                jogos.append(jogo)
+                relatorio['pontuacoes'].append(tuple(float(p[linha]) for p in pontuacoes))
+            if progress_callback:
+                progress_callback(len(jogos), num_jogos, relatorio['candidatos'], max_candidatos)
+
+        relatorio['aceitos'] = len(jogos)
+        relatorio['aprovados'] = aprovados
+        relatorio['tempo'] = time.perf_counter() - inicio
+        TELEMETRIA.incrementar('pipeline_candidatos', relatorio['candidatos'])
+        TELEMETRIA.incrementar('pipeline_aceitos', len(jogos))
+        return jogos, relatorio
+
+def resumo_pipeline(relatorio):
+    """Texto com a taxa de rejeição de cada etapa e a aceitação geral de PipelineGeracao.gerar."""
+    candidatos = relatorio['candidatos']
+    linhas = [f"{relatorio['aceitos']} jogo(s) aceito(s) de {candidatos} candidato(s) em {relatorio['blocos']} bloco(s), "
+              f"{relatorio['tempo']:.3f} s (aceitação {relatorio['aceitos'] / max(candidatos, 1):.2%})."]
+    for etapa in relatorio['etapas']:
+        taxa = etapa['rejeitados'] / etapa['entrada'] if etapa['entrada'] else 0.0
+        linhas.append(f"  {etapa['tipo']:<12} {etapa['etapa']:<16} {etapa['entrada']:>9} entraram, {etapa['rejeitados']:>9} rejeitados ({taxa:.1%})")
+    if relatorio['esgotado']:
+        linhas.append("Limite de candidatos atingido: afrouxe os critérios ou a pontuação mínima.")
+    return "\n".join(linhas)
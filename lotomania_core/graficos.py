@@ -0,0 +1,123 @@
+"""Gráficos de frequência e atraso com Matplotlib (backend Agg, sem interface gráfica)."""
+import math
+
+import numpy as np
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+
+from .constantes import NUM_DEZENAS_TOTAL
+from .telemetria import TELEMETRIA
+from .historico import AnaliseAtrasos, historico_para_array
+from .analise import _P_DEZENA
+
+__all__ = [
+    'GRAFICO_VISOES', 'GRAFICO_JANELA_PADRAO', 'dados_grafico_lotomania', 'GraficoFrequencias',
+    'exportar_grafico_lotomania',
+]
+
+# --- Funções de Plotagem ---
+# O gráfico é uma única Figure (sem pyplot, que guarda toda figura criada num registro global) montada
+# uma vez com as 100 barras; trocar de visão ou de dados só muda as alturas. Em tela, as barras e a
+# linha de referência (e o título e o rótulo do eixo Y) são artistas 'animated' redesenhados por blitting
+# sobre o fundo guardado (eixos, grade e ticks); o desenho completo só é refeito quando a escala do eixo Y
+# precisa mudar, o que só acontece se os dados não cabem nela ou passam a ocupar menos da metade.
+GRAFICO_VISOES = ("total", "janela", "atraso")
+GRAFICO_JANELA_PADRAO = 100 # Sorteios recentes da visão "janela"
+
+def dados_grafico_lotomania(visao, historico_dezenas_list, janela=GRAFICO_JANELA_PADRAO, analise_atrasos=None):
+    """
+    Valores (100,) da visão pedida, com o valor esperado num sorteio justo, o título e o rótulo do eixo Y:
+      "total":  frequência em todo o histórico;
+      "janela": frequência nos últimos 'janela' sorteios;
+      "atraso": atraso atual (de 'analise_atrasos', que deve estar sincronizada com o histórico, se informada).
+    """
+    dezenas = historico_para_array(historico_dezenas_list)
+    if visao == "total":
+        valores = np.bincount(dezenas.ravel(), minlength=NUM_DEZENAS_TOTAL)
+        return valores, dezenas.shape[0] * _P_DEZENA, f"Frequência em {dezenas.shape[0]} sorteios", "Frequência"
+    if visao == "janela":
+        recentes = dezenas[-janela:]
+        valores = np.bincount(recentes.ravel(), minlength=NUM_DEZENAS_TOTAL)
+        return valores, recentes.shape[0] * _P_DEZENA, f"Frequência nos últimos {recentes.shape[0]} sorteios", "Frequência"
+    if visao == "atraso":
+        if analise_atrasos is None:
+            analise_atrasos = AnaliseAtrasos.do_historico(dezenas)
+        # Atraso esperado de uma dezena com P(sair) = 0,2 por sorteio: (1 - p) / p = 4
+        return analise_atrasos.atraso_atual(), (1 - _P_DEZENA) / _P_DEZENA, "Atraso atual", "Sorteios sem sair"
+    raise ValueError(f"Visão do gráfico desconhecida: {visao}. Use uma de {GRAFICO_VISOES}.")
+
+def _limite_eixo_y(maximo):
+    """Limite superior "redondo" do eixo Y, com folga de 10% acima do maior valor."""
+    alvo = max(float(maximo), 1.0) * 1.1
+    passo = 10 ** math.floor(math.log10(alvo)) / 2
+    return math.ceil(alvo / passo) * passo
+
+class GraficoFrequencias:
+    """
+    Gráfico de barras das 100 dezenas, reaproveitado entre visões e atualizações.
+    Sem canvas de interface usa o Agg e serve para exportar PNG/SVG; para exibir em Tk, passe
+    self.figura a um FigureCanvasTkAgg (o fundo do blitting é recapturado a cada desenho completo).
+    """
+    def __init__(self, tamanho=(12, 6)):
+        self.figura = Figure(figsize=tamanho)
+        FigureCanvasAgg(self.figura)
+        self.eixo = self.figura.add_subplot()
+        self.figura.suptitle('Lotomania (00 a 99)', fontsize=16)
+        self.barras = self.eixo.bar(range(NUM_DEZENAS_TOTAL), np.zeros(NUM_DEZENAS_TOTAL), color='lightcoral', animated=True)
+        self.referencia = self.eixo.axhline(0, color='steelblue', linestyle='--', linewidth=1, animated=True, label='Esperado (sorteio justo)')
+        numeros = range(0, NUM_DEZENAS_TOTAL, 5) # Ticks a cada 5 números para não sobrecarregar
+        self.eixo.set_xticks(numeros)
+        self.eixo.set_xticklabels([f"{i:02d}" for i in numeros], rotation=45, ha="right")
+        self.eixo.set_xlabel('Número')
+        self.eixo.set_xlim(-1, NUM_DEZENAS_TOTAL)
+        self.eixo.grid(axis='y', linestyle='--', alpha=0.7)
+        self.eixo.legend(handles=[self.referencia], loc='upper right')
+        self.eixo.set_title('Frequência')
+        self.eixo.set_ylabel('Frequência')
+        self.figura.tight_layout(rect=[0, 0.03, 1, 0.96]) # Evita corte de títulos/rótulos
+        self._textos = (self.eixo.title, self.eixo.yaxis.label) # Mudam com a visão sem pedir desenho completo
+        for texto in self._textos:
+            texto.set_animated(True)
+        self._fundo = None
+        self.figura.canvas.mpl_connect('draw_event', self._ao_desenhar)
+
+    def _desenhar_animados(self):
+        for artista in (*self.barras, self.referencia, *self._textos):
+            self.eixo.draw_artist(artista)
+
+    def _ao_desenhar(self, evento):
+        canvas = self.figura.canvas
+        if hasattr(canvas, 'copy_from_bbox'):
+            self._fundo = canvas.copy_from_bbox(self.figura.bbox)
+            self._desenhar_animados()
+
+    def atualizar(self, valores, referencia, titulo, rotulo_y):
+        """Troca as alturas das barras e os textos; só redesenha tudo se a escala do eixo Y precisa mudar."""
+        for barra, valor in zip(self.barras, valores):
+            barra.set_height(valor)
+        self.referencia.set_ydata([referencia, referencia])
+        self.eixo.set_title(titulo)
+        self.eixo.set_ylabel(rotulo_y)
+        maximo = max(np.max(valores), referencia)
+        limite_atual = self.eixo.get_ylim()[1]
+        canvas = self.figura.canvas
+        if self._fundo is None or maximo * 1.05 > limite_atual or maximo * 2 < limite_atual:
+            self.eixo.set_ylim(0, _limite_eixo_y(maximo))
+            canvas.draw() # Dispara draw_event: novo fundo e artistas animados por cima
+            TELEMETRIA.incrementar('grafico_desenho_completo')
+        else:
+            canvas.restore_region(self._fundo)
+            self._desenhar_animados()
+            canvas.blit(self.figura.bbox)
+            TELEMETRIA.incrementar('grafico_blit')
+
+    def salvar(self, caminho, formato=None):
+        """Grava a figura atual (formato pela extensão: .png, .svg, ...), sem depender de Tk."""
+        self.figura.savefig(caminho, format=formato)
+        return caminho
+
+def exportar_grafico_lotomania(caminho, historico_dezenas_list, visao="total", janela=GRAFICO_JANELA_PADRAO, analise_atrasos=None):
+    """Renderiza uma visão do gráfico direto em arquivo PNG/SVG (sem interface gráfica)."""
+    grafico = GraficoFrequencias()
+    grafico.atualizar(*dados_grafico_lotomania(visao, historico_dezenas_list, janela, analise_atrasos))
+    return grafico.salvar(caminho)
@@ -0,0 +1,418 @@
+"""Leitura, gravação e simulação do histórico, formatos compactos (NumPy) e análises de frequência e atraso."""
+import json
+import logging
+import os
+from collections import Counter
+
+import numpy as np
+
+from .constantes import HISTORICO_FILE, NUM_DEZENAS_SORTEADAS, NUM_DEZENAS_TOTAL
+from .eventos import ErroHistorico
+from .telemetria import TELEMETRIA, perfilado
+from .dezenas import TABELA_DEZENAS
+
+__all__ = [
+    'salvar_historico', 'carregar_historico_map', 'simular_historico_lotomania', 'FORMATO_DEZENAS',
+    'FORMATO_INCIDENCIA', 'FORMATO_MASCARA', 'FORMATOS_HISTORICO', 'SIMULACAO_BLOCO', 'historico_para_array',
+    'dezenas_para_incidencia', 'incidencia_para_dezenas', 'dezenas_para_mascara', 'converter_formato_historico',
+    'iterar_sorteios_simulados', 'simular_sorteios_array', 'simular_historico_para_arquivo',
+    'analisar_frequencia_lotomania', 'AnaliseAtrasos', 'calcular_estatisticas_historicas_lotomania',
+]
+
+logger = logging.getLogger(__name__)
+
+# --- Funções de Dados e Análise para LOTOMANIA ---
+
+def salvar_historico(historico_data_map, caminho=None):
+    """Salva o histórico de sorteios em um arquivo JSON.
+    historico_data_map: Dicionário no formato {concurso_num: [dezenas_sorteadas]}
+    caminho: Arquivo de destino (padrão: HISTORICO_FILE)
+    Levanta ErroHistorico ('historico_nao_salvo') se o arquivo não puder ser gravado.
+    """
+    caminho = caminho or HISTORICO_FILE
+    try:
+        with open(caminho, 'w', encoding='utf-8') as f:
+            json.dump(historico_data_map, f, indent=4)
+        logger.info(f"Histórico salvo em {caminho}")
+    except Exception as e:
+        logger.error(f"Erro ao salvar histórico: {e}")
+        raise ErroHistorico('historico_nao_salvo', f"Não foi possível salvar o histórico em {caminho}. Erro: {e}", caminho=caminho, erro=e) from e
+
+def carregar_historico_map(caminho=None):
+    """Carrega o histórico de sorteios de um arquivo JSON.
+    caminho: Arquivo de origem (padrão: HISTORICO_FILE)
+    Retorna um dicionário no formato {concurso_num: [dezenas_sorteadas]} ({} se o arquivo não existe).
+    Levanta ErroHistorico: 'historico_corrompido' (o arquivo é removido, para um novo download) ou 'historico_ilegivel'.
+    """
+    caminho = caminho or HISTORICO_FILE
+    if os.path.exists(caminho):
+        try:
+            with open(caminho, 'r', encoding='utf-8') as f, TELEMETRIA.cronometro('parse_json_historico'):
+                historico_json = json.load(f)
+                # Converte as chaves de string para int ao carregar
+                historico_map = {int(k): v for k, v in historico_json.items()}
+            logger.info(f"Histórico de {len(historico_map)} concursos carregado de {caminho}")
+            return historico_map
+        except json.JSONDecodeError as e:
+            logger.error(f"Erro ao decodificar JSON do histórico: {e}. O arquivo pode estar corrompido.")
+            if os.path.exists(caminho):
+                os.remove(caminho) # Remover arquivo corrompido para evitar loop
+            raise ErroHistorico('historico_corrompido', "O arquivo de histórico local está corrompido ou vazio. Será feito um novo download ou simulação.",
+                                caminho=caminho, erro=e) from e
+        except Exception as e:
+            logger.error(f"Erro ao carregar histórico: {e}")
+            raise ErroHistorico('historico_ilegivel', f"Não foi possível carregar o histórico de {caminho}. Erro: {e}", caminho=caminho, erro=e) from e
+    return {} # Retorna dicionário vazio se o arquivo não existe
+
+def simular_historico_lotomania(num_sorteios=10000, semente=None, vies=None): # Simula 10 mil sorteios para Lotomania
+    """
+    Retorna uma lista de listas ordenadas de 20 dezenas, no mesmo formato de self.historico.
+    Para grandes volumes prefira simular_sorteios_array ou simular_historico_para_arquivo.
+    """
+    return simular_sorteios_array(num_sorteios, semente=semente, vies=vies).tolist()
+
+# --- Formatos Compactos do Histórico (NumPy) ---
+# "dezenas":    array (N, 20) uint8 com as dezenas ordenadas de cada sorteio
+# "incidencia": matriz (N, 100) bool; incidencia[i, n] indica se n saiu no sorteio i
+# "mascara":    array (N, 2) uint64; o bit (n % 64) da palavra (n // 64) indica se n saiu
+FORMATO_DEZENAS = "dezenas"
+FORMATO_INCIDENCIA = "incidencia"
+FORMATO_MASCARA = "mascara"
+FORMATOS_HISTORICO = (FORMATO_DEZENAS, FORMATO_INCIDENCIA, FORMATO_MASCARA)
+_LARGURA_FORMATO = {FORMATO_DEZENAS: NUM_DEZENAS_SORTEADAS, FORMATO_INCIDENCIA: NUM_DEZENAS_TOTAL, FORMATO_MASCARA: 2}
+_DTYPE_FORMATO = {FORMATO_DEZENAS: np.uint8, FORMATO_INCIDENCIA: bool, FORMATO_MASCARA: np.uint64}
+SIMULACAO_BLOCO = 16_384 # Sorteios por bloco na simulação vetorizada (cabe no cache L2/L3)
+
+def historico_para_array(historico_dezenas_list):
+    """Converte a lista de sorteios (listas de 20 dezenas) para o formato "dezenas"."""
+    if len(historico_dezenas_list) == 0:
+        return np.empty((0, NUM_DEZENAS_SORTEADAS), dtype=np.uint8)
+    dezenas = np.asarray(historico_dezenas_list, dtype=np.uint8)
+    if dezenas.ndim != 2 or dezenas.shape[1] != NUM_DEZENAS_SORTEADAS:
+        raise ValueError(f"Cada sorteio deve ter {NUM_DEZENAS_SORTEADAS} dezenas.")
+    return dezenas
+
+def dezenas_para_incidencia(dezenas):
+    """Formato "dezenas" (N, k) -> matriz de incidência (N, 100) bool."""
+    dezenas = np.asarray(dezenas)
+    incidencia = np.zeros((dezenas.shape[0], NUM_DEZENAS_TOTAL), dtype=bool)
+    incidencia[np.arange(dezenas.shape[0])[:, None], dezenas] = True
+    return incidencia
+
+def incidencia_para_dezenas(incidencia):
+    """Matriz de incidência (N, 100) -> formato "dezenas" (N, k) ordenado."""
+    incidencia = np.asarray(incidencia, dtype=bool)
+    por_linha = incidencia.sum(axis=1)
+    if incidencia.shape[0] and (por_linha != por_linha[0]).any():
+        raise ValueError("Todas as linhas da incidência devem ter a mesma quantidade de dezenas.")
+    k = int(por_linha[0]) if incidencia.shape[0] else NUM_DEZENAS_SORTEADAS
+    return np.nonzero(incidencia)[1].reshape(-1, k).astype(np.uint8)
+
+def dezenas_para_mascara(dezenas):
+    """Formato "dezenas" (N, k) -> máscaras de bits (N, 2) uint64."""
+    dezenas = np.asarray(dezenas)
+    bits = np.zeros((dezenas.shape[0], 128), dtype=bool)
+    bits[np.arange(dezenas.shape[0])[:, None], dezenas] = True
+    return np.packbits(bits, axis=1, bitorder='little').view('<u8')
+
+def converter_formato_historico(dezenas, formato):
+    """Converte um array no formato "dezenas" para qualquer formato de FORMATOS_HISTORICO."""
+    if formato == FORMATO_DEZENAS:
+        return np.asarray(dezenas, dtype=np.uint8)
+    if formato == FORMATO_INCIDENCIA:
+        return dezenas_para_incidencia(dezenas)
+    if formato == FORMATO_MASCARA:
+        return dezenas_para_mascara(dezenas)
+    raise ValueError(f"Formato desconhecido: {formato}. Use um de {FORMATOS_HISTORICO}.")
+
+def _pesos_de_vies(vies):
+    """
+    vies: None (sorteio uniforme), dicionário {dezena: peso} (as demais ficam com peso 1)
+    ou sequência com os 100 pesos. Pesos maiores tornam a dezena mais provável.
+    """
+    if vies is None:
+        return None
+    pesos = np.ones(NUM_DEZENAS_TOTAL, dtype=np.float64)
+    if isinstance(vies, dict):
+        for dezena, peso in vies.items():
+            pesos[int(dezena)] = peso
+    else:
+        pesos = np.asarray(vies, dtype=np.float64)
+        if pesos.shape != (NUM_DEZENAS_TOTAL,):
+            raise ValueError(f"O vetor de pesos deve ter {NUM_DEZENAS_TOTAL} posições.")
+    if not (pesos > 0).all():
+        raise ValueError("Todos os pesos devem ser positivos.")
+    return pesos.astype(np.float32)
+
+def _rede_ordenacao(n):
+    """
+    Comparadores (i, j) da rede de ordenação ímpar-par de Batcher para n entradas.
+    A rede é gerada para a potência de 2 seguinte e podada: fios >= n funcionam como +infinito,
+    então todo comparador que toca um deles é inócuo e pode ser descartado.
+    """
+    tamanho = 1
+    while tamanho < n:
+        tamanho *= 2
+    comparadores = []
+    p = 1
+    while p < tamanho:
+        k = p
+        while k >= 1:
+            for j in range(k % p, tamanho - k, 2 * k):
+                for i in range(min(k, tamanho - j - k)):
+                    if (i + j) // (2 * p) == (i + j + k) // (2 * p) and i + j + k < n:
+                        comparadores.append((i + j, i + j + k))
+            k //= 2
+        p *= 2
+    return comparadores
+
+_REDE_ORDENACAO_SORTEIO = _rede_ordenacao(NUM_DEZENAS_SORTEADAS) # 103 comparadores para 20 dezenas
+
+def _sortear_bloco(rng, n, pesos=None):
+    """
+    Sorteia n concursos de uma vez e retorna um array (n, 20) uint8 ordenado.
+    O trabalho é feito na transposta (dezena x sorteio) para que cada passo opere sobre
+    linhas contíguas, e a ordenação usa a rede de comparadores em vez de np.sort por linha.
+    """
+    if pesos is None:
+        # Fisher-Yates parcial vetorizado: só as 20 primeiras posições de cada sorteio são embaralhadas.
+        # O passo i troca a posição i com uma posição uniforme em [i, 100), obtida de 32 bits aleatórios
+        # por multiplicação e deslocamento (viés < 100 / 2**32, muito mais barato que rng.integers limitado).
+        colunas = np.repeat(np.arange(NUM_DEZENAS_TOTAL, dtype=np.uint8)[:, None], n, axis=1)
+        plano = colunas.ravel()
+        passos = np.arange(NUM_DEZENAS_SORTEADAS, dtype=np.uint64)[:, None]
+        destinos = rng.integers(0, 2**32, (NUM_DEZENAS_SORTEADAS, n), dtype=np.uint32) * (np.uint64(NUM_DEZENAS_TOTAL) - passos)
+        destinos >>= np.uint64(32)
+        destinos += passos
+        destinos = destinos.view(np.int64)
+        destinos *= n
+        destinos += np.arange(n, dtype=np.int64)
+        for i in range(NUM_DEZENAS_SORTEADAS):
+            atual = colunas[i].copy()
+            colunas[i] = plano[destinos[i]]
+            plano[destinos[i]] = atual
+        sorteios = colunas[:NUM_DEZENAS_SORTEADAS]
+    else:
+        # Amostragem ponderada sem reposição (Efraimidis-Spirakis): as 20 menores chaves Exp(1)/peso
+        chaves = rng.standard_exponential((n, NUM_DEZENAS_TOTAL), dtype=np.float32) / pesos
+        escolhidos = np.argpartition(chaves, NUM_DEZENAS_SORTEADAS - 1, axis=1)[:, :NUM_DEZENAS_SORTEADAS]
+        sorteios = np.ascontiguousarray(escolhidos.T.astype(np.uint8))
+
+    for a, b in _REDE_ORDENACAO_SORTEIO:
+        menor = np.minimum(sorteios[a], sorteios[b])
+        np.maximum(sorteios[a], sorteios[b], out=sorteios[b])
+        sorteios[a] = menor
+    return sorteios.T
+
+def iterar_sorteios_simulados(num_sorteios, semente=None, vies=None, bloco=SIMULACAO_BLOCO):
+    """Gera os sorteios simulados em blocos (n, 20) uint8, sem materializar o histórico inteiro."""
+    rng = np.random.default_rng(semente)
+    pesos = _pesos_de_vies(vies)
+    restantes = num_sorteios
+    while restantes > 0:
+        n = min(bloco, restantes)
+        yield _sortear_bloco(rng, n, pesos)
+        restantes -= n
+
+def simular_sorteios_array(num_sorteios, semente=None, vies=None, formato=FORMATO_DEZENAS, bloco=SIMULACAO_BLOCO):
+    """
+    Simula num_sorteios concursos e retorna o histórico no formato pedido (ver FORMATOS_HISTORICO).
+    A mesma semente produz sempre o mesmo histórico.
+    """
+    if formato not in FORMATOS_HISTORICO:
+        raise ValueError(f"Formato desconhecido: {formato}. Use um de {FORMATOS_HISTORICO}.")
+    saida = np.empty((num_sorteios, _LARGURA_FORMATO[formato]), dtype=_DTYPE_FORMATO[formato])
+    inicio = 0
+    for sorteios in iterar_sorteios_simulados(num_sorteios, semente, vies, bloco):
+        saida[inicio:inicio + len(sorteios)] = converter_formato_historico(sorteios, formato)
+        inicio += len(sorteios)
+    return saida
+
+def simular_historico_para_arquivo(caminho, num_sorteios, formato=FORMATO_DEZENAS, semente=None, vies=None, bloco=SIMULACAO_BLOCO):
+    """
+    Simula num_sorteios concursos gravando bloco a bloco em um arquivo .npy (memória constante).
+    O resultado pode ser aberto com np.load(caminho, mmap_mode='r').
+    """
+    if formato not in FORMATOS_HISTORICO:
+        raise ValueError(f"Formato desconhecido: {formato}. Use um de {FORMATOS_HISTORICO}.")
+    destino = np.lib.format.open_memmap(caminho, mode='w+', dtype=_DTYPE_FORMATO[formato], shape=(num_sorteios, _LARGURA_FORMATO[formato]))
+    inicio = 0
+    for sorteios in iterar_sorteios_simulados(num_sorteios, semente, vies, bloco):
+        destino[inicio:inicio + len(sorteios)] = converter_formato_historico(sorteios, formato)
+        inicio += len(sorteios)
+        destino.flush()
+    del destino
+    logger.info(f"{num_sorteios} sorteios simulados gravados em {caminho} (formato {formato})")
+    return caminho
+
+
+@perfilado
+def analisar_frequencia_lotomania(historico_dezenas_list):
+    """
+    Analisa a frequência e o atraso dos números sorteados.
+    historico_dezenas_list: Uma lista de listas de dezenas (ex: [[0,1,...],[50,60,...]]).
+    """
+    dezenas = historico_para_array(historico_dezenas_list)
+    num_sorteios = dezenas.shape[0]
+
+    # Garante que todos os números de 0 a 99 estejam nas frequências, mesmo que com 0
+    contagens = np.bincount(dezenas.ravel(), minlength=NUM_DEZENAS_TOTAL)
+    frequencias = Counter({num: int(contagens[num]) for num in range(NUM_DEZENAS_TOTAL)})
+
+    # Atraso = sorteios desde a última aparição (o histórico inteiro se o número nunca saiu)
+    atrasos = np.zeros(NUM_DEZENAS_TOTAL, dtype=np.int64)
+    if num_sorteios:
+        incidencia = dezenas_para_incidencia(dezenas)
+        atrasos = np.where(incidencia.any(axis=0), np.argmax(incidencia[::-1], axis=0), num_sorteios)
+    atrasos_corretos = {num: int(atrasos[num]) for num in range(NUM_DEZENAS_TOTAL)}
+
+    return frequencias, atrasos_corretos
+
+class AnaliseAtrasos:
+    """
+    Distribuição completa dos atrasos (intervalos entre aparições) de cada dezena.
+
+    Um intervalo é a quantidade de sorteios seguidos sem a dezena entre duas aparições, na mesma
+    escala do "atraso" de analisar_frequencia_lotomania. Para cada dezena são mantidos o histograma
+    dos intervalos completos, a soma, o máximo e a última aparição; média, mediana, percentis e a
+    curva de sobrevivência empírica S(k) = P(intervalo > k) saem do histograma.
+
+    O ajuste é vetorizado sobre as posições de aparição e 'atualizar' processa só os sorteios
+    novos; 'sincronizar' decide sozinho entre atualização incremental e novo ajuste.
+    """
+    def __init__(self):
+        self.num_sorteios = 0
+        self.ultima_aparicao = np.full(NUM_DEZENAS_TOTAL, -1, dtype=np.int64)
+        self.histograma = np.zeros((NUM_DEZENAS_TOTAL, 1), dtype=np.int64) # [dezena, intervalo]
+        self.soma = np.zeros(NUM_DEZENAS_TOTAL, dtype=np.int64)
+        self.maximo = np.zeros(NUM_DEZENAS_TOTAL, dtype=np.int64)
+        self._dezenas = np.empty((0, NUM_DEZENAS_SORTEADAS), dtype=np.uint8)
+
+    @classmethod
+    def do_historico(cls, historico_dezenas_list):
+        analise = cls()
+        analise.atualizar(historico_dezenas_list)
+        return analise
+
+    def atualizar(self, novos_sorteios):
+        """Incorpora sorteios posteriores aos já analisados (lista de listas ou formato "dezenas")."""
+        novos = historico_para_array(novos_sorteios)
+        if novos.shape[0] == 0:
+            return self
+        deslocamento = self.num_sorteios
+        incidencia = dezenas_para_incidencia(novos)
+        # Ordenação estável pela dezena (radix sort em uint8): aparições agrupadas por dezena e em ordem de sorteio
+        ordem = np.argsort(novos.ravel(), kind='stable')
+        dezena = novos.ravel()[ordem].astype(np.int64)
+        posicoes = ordem // novos.shape[1] + deslocamento
+
+        # A última aparição conhecida de cada dezena entra antes do seu grupo, como início do primeiro intervalo novo
+        ja_vistas = np.flatnonzero(self.ultima_aparicao >= 0)
+        inicio_grupo = np.searchsorted(dezena, ja_vistas)
+        dezena = np.insert(dezena, inicio_grupo, ja_vistas)
+        posicoes = np.insert(posicoes, inicio_grupo, self.ultima_aparicao[ja_vistas])
+
+        mesma_dezena = dezena[1:] == dezena[:-1]
+        intervalos = (posicoes[1:] - posicoes[:-1] - 1)[mesma_dezena]
+        dezena_intervalo = dezena[1:][mesma_dezena]
+
+        if intervalos.size:
+            largura = max(self.histograma.shape[1], int(intervalos.max()) + 1)
+            if largura > self.histograma.shape[1]:
+                self.histograma = np.pad(self.histograma, ((0, 0), (0, largura - self.histograma.shape[1])))
+            self.histograma += np.bincount(dezena_intervalo * largura + intervalos, minlength=NUM_DEZENAS_TOTAL * largura).reshape(NUM_DEZENAS_TOTAL, largura)
+            self.soma += np.bincount(dezena_intervalo, weights=intervalos, minlength=NUM_DEZENAS_TOTAL).astype(np.int64)
+            ocupado = self.histograma > 0
+            self.maximo = np.where(ocupado.any(axis=1), largura - 1 - np.argmax(ocupado[:, ::-1], axis=1), 0)
+
+        saiu = incidencia.any(axis=0)
+        ultima_nova = deslocamento + novos.shape[0] - 1 - np.argmax(incidencia[::-1], axis=0)
+        self.ultima_aparicao = np.where(saiu, ultima_nova, self.ultima_aparicao)
+        self.num_sorteios += novos.shape[0]
+        self._dezenas = np.concatenate([self._dezenas, novos])
+        return self
+
+    def sincronizar(self, historico_dezenas_list):
+        """
+        Ajusta a análise ao histórico informado: se ele apenas estende o que já foi analisado,
+        processa só os sorteios novos; caso contrário (ex.: lacunas reparadas no meio), refaz tudo.
+        """
+        dezenas = historico_para_array(historico_dezenas_list)
+        n = self.num_sorteios
+        if n <= dezenas.shape[0] and np.array_equal(dezenas[:n], self._dezenas):
+            return self.atualizar(dezenas[n:])
+        self.__init__()
+        return self.atualizar(dezenas)
+
+    def atraso_atual(self):
+        """Vetor (100,) com o atraso corrente de cada dezena (intervalo ainda em aberto)."""
+        return np.where(self.ultima_aparicao >= 0, self.num_sorteios - 1 - self.ultima_aparicao, self.num_sorteios)
+
+    def contagem(self):
+        return self.histograma.sum(axis=1)
+
+    def media(self):
+        contagem = self.contagem()
+        return np.divide(self.soma, contagem, out=np.zeros(NUM_DEZENAS_TOTAL), where=contagem > 0)
+
+    def percentil(self, p):
+        """Vetor (100,) com o menor intervalo k tal que P(intervalo <= k) >= p (0 < p <= 1)."""
+        acumulado = np.cumsum(self.histograma, axis=1)
+        alvo = np.ceil(p * acumulado[:, -1])[:, None]
+        return np.argmax(acumulado >= np.maximum(alvo, 1), axis=1)
+
+    def mediana(self):
+        return self.percentil(0.5)
+
+    def curva_sobrevivencia(self, dezena=None):
+        """S(k) = P(intervalo > k) para k = 0..máximo; matriz (100, K) ou vetor de uma dezena."""
+        contagem = np.maximum(self.contagem(), 1)[:, None]
+        sobrevivencia = 1.0 - np.cumsum(self.histograma, axis=1) / contagem
+        return sobrevivencia if dezena is None else sobrevivencia[dezena]
+
+    def atrasadas_alem_do_percentil(self, p=0.95):
+        """
+        Dezenas cujo atraso atual supera o percentil p dos seus próprios intervalos históricos.
+        Retorna [(dezena, atraso_atual, limiar)] ordenada do mais atípico para o menos.
+        """
+        atual = self.atraso_atual()
+        limiar = self.percentil(p)
+        com_dados = self.contagem() > 0
+        dezenas = np.flatnonzero(com_dados & (atual > limiar))
+        ordem = np.argsort(-(atual[dezenas] - limiar[dezenas]), kind='stable')
+        return [(int(d), int(atual[d]), int(limiar[d])) for d in dezenas[ordem]]
+
+@perfilado
+def calcular_estatisticas_historicas_lotomania(historico_dezenas_list):
+    """
+    Calcula as estatísticas médias e desvios padrão para os critérios de balanceamento
+    com base no histórico de sorteios reais.
+    """
+    if not historico_dezenas_list:
+        return {}
+
+    # Uma consulta à tabela de características por sorteio, vetorizada sobre o histórico
+    dezenas = historico_para_array(historico_dezenas_list)
+    caracteristicas = TABELA_DEZENAS[dezenas]
+    somas = dezenas.sum(axis=1, dtype=np.int64)
+    pares_counts = caracteristicas['par'].sum(axis=1)
+    impares_counts = NUM_DEZENAS_SORTEADAS - pares_counts
+    moldura_counts = caracteristicas['moldura'].sum(axis=1)
+    miolo_counts = NUM_DEZENAS_SORTEADAS - moldura_counts
+    primos_counts = caracteristicas['primo'].sum(axis=1)
+
+    estatisticas = {
+        'soma_media': np.mean(somas),
+        'soma_std': np.std(somas),
+        'pares_media': np.mean(pares_counts),
+        'pares_std': np.std(pares_counts),
+        'impares_media': np.mean(impares_counts),
+        'impares_std': np.std(impares_counts),
+        'moldura_media': np.mean(moldura_counts),
+        'moldura_std': np.std(moldura_counts),
+        'miolo_media': np.mean(miolo_counts),
+        'miolo_std': np.std(miolo_counts),
+        'primos_media': np.mean(primos_counts),
+        'primos_std': np.std(primos_counts),
+    }
+    return estatisticas
@@ -0,0 +1,305 @@
+"""Importação de históricos de planilhas da Caixa, CSV e JSON."""
+import csv
+import json
+import os
+import re
+import time
+import unicodedata
+import xml.etree.ElementTree as ET
+import zipfile
+from html.parser import HTMLParser
+
+from .constantes import NUM_DEZENAS_SORTEADAS, NUM_DEZENAS_TOTAL
+from .telemetria import TELEMETRIA, perfilado
+
+__all__ = [
+    'IMPORTACAO_FORMATOS', 'IMPORTACAO_BLOCO_LEITURA', 'validar_sorteio', 'detectar_formato_importacao',
+    'iterar_sorteios_arquivo', 'importar_historico', 'resumo_importacao',
+]
+
+# --- Importação de Históricos Externos ---
+# Planilhas de resultados da Caixa (.xlsx, ou o antigo .htm/.xls que na verdade é HTML), CSV e JSON
+# (o mapa {concurso: dezenas} deste programa, listas de respostas da API ou JSON Lines) são lidos em
+# fluxo: o .xlsx é um zip de XML percorrido com iterparse, o HTML alimenta um HTMLParser aos pedaços e
+# os arrays JSON são decodificados um elemento por vez. Cada linha vira (origem, concurso, dezenas) e é
+# validada antes de ser mesclada ao histórico; concursos que já existem com outras dezenas são conflitos.
+IMPORTACAO_FORMATOS = ("xlsx", "html", "csv", "json")
+IMPORTACAO_BLOCO_LEITURA = 1 << 16 # Caracteres lidos por vez de HTML e JSON
+_NOMES_COLUNA_CONCURSO = ("concurso", "numeroconcurso", "nconcurso", "conc")
+_PADRAO_COLUNA_DEZENA = re.compile(r"^(?:bola|dezena|dez|d)(\d{1,2})$")
+
+def _normalizar_nome_coluna(texto):
+    sem_acento = unicodedata.normalize('NFKD', str(texto)).encode('ascii', 'ignore').decode('ascii')
+    return re.sub(r"[^a-z0-9]", "", sem_acento.lower())
+
+def _inteiro_de_celula(valor):
+    """'05', 5, '5.0' -> 5; qualquer outra coisa -> ValueError."""
+    texto = str(valor).strip()
+    if re.fullmatch(r"\d+(?:\.0+)?", texto):
+        return int(float(texto)) if '.' in texto else int(texto)
+    raise ValueError(f"'{texto}' não é um número inteiro")
+
+def validar_sorteio(concurso, dezenas):
+    """Retorna (concurso, dezenas ordenadas) ou levanta ValueError com o motivo: 20 dezenas distintas de 00 a 99."""
+    concurso = _inteiro_de_celula(concurso)
+    if concurso < 1:
+        raise ValueError("número de concurso inválido")
+    dezenas = [_inteiro_de_celula(d) for d in dezenas]
+    if len(dezenas) != NUM_DEZENAS_SORTEADAS:
+        raise ValueError(f"{len(dezenas)} dezenas em vez de {NUM_DEZENAS_SORTEADAS}")
+    if len(set(dezenas)) != NUM_DEZENAS_SORTEADAS:
+        raise ValueError("dezenas repetidas")
+    if min(dezenas) < 0 or max(dezenas) >= NUM_DEZENAS_TOTAL:
+        raise ValueError("dezena fora de 00 a 99")
+    return concurso, sorted(dezenas)
+
+def detectar_formato_importacao(caminho):
+    """Formato (IMPORTACAO_FORMATOS) pelo conteúdo e pela extensão do arquivo."""
+    with open(caminho, 'rb') as f:
+        inicio = f.read(512)
+    if inicio.startswith(b"PK"):
+        return "xlsx"
+    texto = inicio.lstrip(b"\xef\xbb\xbf \t\r\n").lower()
+    if texto.startswith((b"<", b"<!doctype")):
+        return "html"
+    if texto.startswith((b"{", b"[")):
+        return "json"
+    return "csv"
+
+def _linhas_xlsx(caminho):
+    """Linhas (listas de células em texto) da primeira planilha de um .xlsx, sem carregar o XML inteiro."""
+    with zipfile.ZipFile(caminho) as arquivo:
+        nomes = arquivo.namelist()
+        compartilhadas = []
+        if 'xl/sharedStrings.xml' in nomes:
+            with arquivo.open('xl/sharedStrings.xml') as f:
+                for _, elemento in ET.iterparse(f):
+                    if elemento.tag.endswith('}si'):
+                        compartilhadas.append("".join(t.text or "" for t in elemento.iter() if t.tag.endswith('}t')))
+                        elemento.clear()
+        planilhas = sorted(n for n in nomes if re.fullmatch(r"xl/worksheets/sheet\d+\.xml", n))
+        if not planilhas:
+            raise ValueError("O arquivo .xlsx não tem planilhas.")
+        planilha = 'xl/worksheets/sheet1.xml' if 'xl/worksheets/sheet1.xml' in planilhas else planilhas[0]
+        with arquivo.open(planilha) as f:
+            celulas = {}
+            for _, elemento in ET.iterparse(f):
+                tag = elemento.tag.rsplit('}', 1)[-1]
+                if tag == 'c':
+                    referencia = re.match(r"[A-Z]+", elemento.get('r', ''))
+                    coluna = 0
+                    for letra in referencia.group() if referencia else "":
+                        coluna = coluna * 26 + ord(letra) - ord('A') + 1
+                    coluna = coluna - 1 if referencia else len(celulas)
+                    tipo = elemento.get('t')
+                    if tipo == 'inlineStr':
+                        valor = "".join(t.text or "" for t in elemento.iter() if t.tag.endswith('}t'))
+                    else:
+                        v = next((filho.text for filho in elemento if filho.tag.endswith('}v')), None) or ""
+                        valor = compartilhadas[int(v)] if tipo == 's' and v else v
+                    celulas[coluna] = valor
+                elif tag == 'row':
+                    yield [celulas.get(i, "") for i in range(max(celulas) + 1)] if celulas else []
+                    celulas = {}
+                    elemento.clear()
+
+class _LeitorTabelaHTML(HTMLParser):
+    """Junta o texto das células <td>/<th> de cada <tr>; as linhas completas ficam em 'linhas' até serem consumidas."""
+    def __init__(self):
+        super().__init__()
+        self.linhas = []
+        self._linha = None
+        self._celula = None
+
+    def handle_starttag(self, tag, attrs):
+        if tag == 'tr':
+            self._linha = []
+        elif tag in ('td', 'th') and self._linha is not None:
+            self._celula = []
+
+    def handle_endtag(self, tag):
+        if tag in ('td', 'th') and self._celula is not None:
+            self._linha.append(" ".join("".join(self._celula).split()))
+            self._celula = None
+        elif tag == 'tr' and self._linha is not None:
+            self.linhas.append(self._linha)
+            self._linha = None
+
+    def handle_data(self, data):
+        if self._celula is not None:
+            self._celula.append(data)
+
+def _linhas_html(caminho):
+    leitor = _LeitorTabelaHTML()
+    with open(caminho, 'r', encoding='utf-8', errors='replace') as f:
+        for pedaco in iter(lambda: f.read(IMPORTACAO_BLOCO_LEITURA), ""):
+            leitor.feed(pedaco)
+            yield from leitor.linhas
+            leitor.linhas = []
+    leitor.close()
+    yield from leitor.linhas
+
+def _linhas_csv(caminho):
+    with open(caminho, 'r', encoding='utf-8-sig', errors='replace', newline='') as f:
+        amostra = f.read(4096)
+        f.seek(0)
+        try:
+            dialeto = csv.Sniffer().sniff(amostra, delimiters=";,\t|")
+        except csv.Error:
+            dialeto = csv.excel
+        yield from csv.reader(f, dialeto)
+
+def _registros_tabela(linhas):
+    """
+    (linha, concurso, dezenas) das linhas de uma tabela. Com cabeçalho, usa as colunas "Concurso" e
+    "Bola1".."Bola20" (ou "Dezena1"..); sem, o primeiro inteiro da linha é o concurso e os 20 seguintes
+    são as dezenas, soltas ou juntas numa célula (datas e valores em reais ficam de fora). Linhas que não começam
+    por um número (títulos, cidades dos ganhadores) são ignoradas.
+    """
+    coluna_concurso, colunas_dezenas = None, None
+    for numero_linha, celulas in enumerate(linhas, start=1):
+        celulas = [str(c).strip() for c in celulas]
+        nomes = [_normalizar_nome_coluna(c) for c in celulas]
+        if any(nome in _NOMES_COLUNA_CONCURSO for nome in nomes):
+            dezenas = sorted((int(m.group(1)), i) for i, nome in enumerate(nomes) if (m := _PADRAO_COLUNA_DEZENA.match(nome)))
+            coluna_concurso = next(i for i, nome in enumerate(nomes) if nome in _NOMES_COLUNA_CONCURSO)
+            colunas_dezenas = [i for _, i in dezenas] if len(dezenas) == NUM_DEZENAS_SORTEADAS else None
+            continue
+        primeira = next((c for c in celulas if c), "")
+        if not re.fullmatch(r"\d+(?:\.0+)?", primeira):
+            continue
+        if colunas_dezenas is not None and max(coluna_concurso, *colunas_dezenas) < len(celulas):
+            yield numero_linha, celulas[coluna_concurso], [celulas[i] for i in colunas_dezenas]
+        else:
+            # Uma célula pode trazer todas as dezenas juntas ("01 05 12 ...", "01-05-12-...")
+            inteiros = [n for c in celulas if re.fullmatch(r"\d+(?:\.0+)?|\d+(?:[ ,;\-]+\d+)+", c)
+                        for n in re.findall(r"\d+(?:\.0+)?", c)]
+            yield numero_linha, inteiros[0], inteiros[1:1 + NUM_DEZENAS_SORTEADAS]
+
+def _objetos_json(caminho):
+    """
+    Registros de um array JSON ou de JSON Lines, decodificados um por vez. Um objeto sem a chave
+    "concurso" é um mapa {concurso: dezenas} (o formato do histórico deste programa) e rende um registro por par.
+    """
+    decodificador = json.JSONDecoder()
+    posicao = 0
+    with open(caminho, 'r', encoding='utf-8-sig') as f:
+        buffer = f.read(IMPORTACAO_BLOCO_LEITURA).lstrip()
+        if buffer.startswith('['):
+            buffer = buffer[1:]
+        fim_do_arquivo = False
+        while True:
+            buffer = buffer.lstrip(" \t\r\n,")
+            if buffer.startswith(']') or (fim_do_arquivo and not buffer):
+                return
+            try:
+                objeto, consumidos = decodificador.raw_decode(buffer)
+            except json.JSONDecodeError:
+                if fim_do_arquivo:
+                    raise
+                pedaco = f.read(IMPORTACAO_BLOCO_LEITURA)
+                fim_do_arquivo = not pedaco
+                buffer += pedaco
+                continue
+            buffer = buffer[consumidos:]
+            if isinstance(objeto, dict) and 'concurso' not in objeto:
+                for concurso, dezenas in objeto.items():
+                    posicao += 1
+                    yield posicao, {'concurso': concurso, 'dezenas': dezenas}
+            else:
+                posicao += 1
+                yield posicao, objeto
+
+def _registros_json(caminho):
+    for posicao, objeto in _objetos_json(caminho):
+        if not isinstance(objeto, dict):
+            yield posicao, None, objeto
+            continue
+        dezenas = objeto.get('dezenas', objeto.get('listaDezenas'))
+        if isinstance(dezenas, str):
+            dezenas = re.findall(r"\d+", dezenas)
+        yield posicao, objeto.get('concurso', objeto.get('numero')), dezenas if dezenas is not None else []
+
+def iterar_sorteios_arquivo(caminho, formato=None):
+    """
+    Lê um arquivo de resultados em fluxo e produz (origem, concurso, dezenas, erro) por linha de dados:
+    erro é None e concurso/dezenas vêm validados, ou erro traz o motivo da rejeição.
+    """
+    formato = formato or detectar_formato_importacao(caminho)
+    if formato == "json":
+        registros = _registros_json(caminho)
+    elif formato in IMPORTACAO_FORMATOS:
+        registros = _registros_tabela({"xlsx": _linhas_xlsx, "html": _linhas_html, "csv": _linhas_csv}[formato](caminho))
+    else:
+        raise ValueError(f"Formato desconhecido: {formato}. Use um de {IMPORTACAO_FORMATOS}.")
+    nome = os.path.basename(caminho)
+    for posicao, concurso, dezenas in registros:
+        origem = f"{nome}:{posicao}"
+        try:
+            concurso, dezenas = validar_sorteio(concurso, dezenas or [])
+        except (ValueError, TypeError) as e:
+            yield origem, concurso, None, str(e)
+            continue
+        yield origem, concurso, dezenas, None
+
+@perfilado
+def importar_historico(caminhos, historico_map, substituir_conflitos=False):
+    """
+    Mescla os sorteios dos arquivos em historico_map (alterado no lugar). Concursos novos entram; os que
+    já existem com as mesmas dezenas são contados como iguais; com dezenas diferentes são conflitos e
+    só substituem o atual com substituir_conflitos (entre dois arquivos, vale o primeiro lido). Cada
+    arquivo só é mesclado depois de lido por inteiro: um arquivo que falha no meio (ex.: JSON truncado)
+    não entra em nada e aparece em 'invalidos' como ilegível. Retorna {'lidos', 'novos', 'iguais',
+    'conflitos': [(concurso, atual, importado, origem)], 'substituidos', 'invalidos': [(origem, motivo)], 'tempo'}.
+    """
+    relatorio = {'lidos': 0, 'novos': [], 'iguais': 0, 'conflitos': [], 'substituidos': [], 'invalidos': []}
+    importados = {} # concurso -> origem, para conflitos dentro da própria importação
+    inicio = time.perf_counter()
+    for caminho in caminhos:
+        parcial = {'lidos': 0, 'novos': [], 'iguais': 0, 'conflitos': [], 'substituidos': [], 'invalidos': []}
+        lidos_arquivo = {} # concurso -> dezenas deste arquivo, mesclados só no fim
+        origens = {}
+        try:
+            for origem, concurso, dezenas, erro in iterar_sorteios_arquivo(caminho):
+                parcial['lidos'] += 1
+                if erro:
+                    parcial['invalidos'].append((origem, erro))
+                    continue
+                atual = lidos_arquivo.get(concurso, historico_map.get(concurso))
+                if atual is None:
+                    lidos_arquivo[concurso] = dezenas
+                    parcial['novos'].append(concurso)
+                elif sorted(atual) == dezenas:
+                    parcial['iguais'] += 1
+                else:
+                    parcial['conflitos'].append((concurso, sorted(atual), dezenas, origem))
+                    if substituir_conflitos and concurso not in importados and concurso not in origens:
+                        lidos_arquivo[concurso] = dezenas
+                        parcial['substituidos'].append(concurso)
+                origens.setdefault(concurso, origem)
+        except (OSError, ValueError, zipfile.BadZipFile, ET.ParseError) as e:
+            relatorio['invalidos'].append((os.path.basename(caminho),
+                                           f"arquivo ilegível ({parcial['lidos']} linha(s) lida(s) e descartada(s)): {e}"))
+            continue
+        historico_map.update(lidos_arquivo)
+        for chave, valor in parcial.items():
+            relatorio[chave] += valor
+        for concurso, origem in origens.items():
+            importados.setdefault(concurso, origem)
+    relatorio['tempo'] = time.perf_counter() - inicio
+    TELEMETRIA.incrementar('concursos_importados', len(relatorio['novos']))
+    return relatorio
+
+def resumo_importacao(relatorio, limite=10):
+    """Texto do relatório de importar_historico, com até 'limite' conflitos e linhas inválidas."""
+    linhas = [f"{relatorio['lidos']} linha(s) lida(s) em {relatorio['tempo']:.2f} s: {len(relatorio['novos'])} concurso(s) novo(s), "
+              f"{relatorio['iguais']} já presente(s), {len(relatorio['conflitos'])} conflito(s), {len(relatorio['invalidos'])} inválida(s)."]
+    if relatorio['substituidos']:
+        linhas.append(f"{len(relatorio['substituidos'])} concurso(s) em conflito substituído(s) pelos valores importados.")
+    for concurso, atual, importado, origem in relatorio['conflitos'][:limite]:
+        so_atual = ', '.join(f'{d:02d}' for d in sorted(set(atual) - set(importado)))
+        so_importado = ', '.join(f'{d:02d}' for d in sorted(set(importado) - set(atual)))
+        linhas.append(f"Conflito no concurso {concurso} ({origem}): atual tem {so_atual}; arquivo tem {so_importado}")
+    for origem, motivo in relatorio['invalidos'][:limite]:
+        linhas.append(f"Inválida {origem}: {motivo}")
+    return "\n".join(linhas)
@@ -0,0 +1,375 @@
+"""Índices de bits: consultas ao histórico por listas de ocorrência e repetições de jogos."""
+import hashlib
+
+import numpy as np
+
+from .constantes import (
+    CONSULTA_LIMITE_PADRAO, INDICE_MAX_BLOCOS, INDICE_MAX_RODADAS, INDICE_SEMELHANCA_PADRAO,
+    NUM_DEZENAS_POR_APOSTA, NUM_DEZENAS_SORTEADAS, NUM_DEZENAS_TOTAL
+)
+from .telemetria import TELEMETRIA
+from .dezenas import BIT_DEZENA, mascara_da_combinacao
+from .historico import historico_para_array
+from .analise import impressao_digital_historico
+from .comparacao import _popcount
+
+__all__ = ['IndiceConcursos', 'resumo_consulta', 'IndiceJogos', 'gerar_sem_repeticoes', 'deduplicar_jogos']
+
+# --- Consultas ao Histórico (Listas de Ocorrência) ---
+# Cada dezena tem uma lista de ocorrência: um bitset com um bit por sorteio, na ordem dos concursos.
+# "Concursos em que a, b e c saíram" é o AND das três listas, "em que alguma saiu" é o OR, e os
+# acertos de um jogo em cada sorteio são a soma das listas das suas dezenas. Com ~2.800 concursos
+# cada lista tem 44 palavras de 64 bits, e uma consulta leva microssegundos, sem varrer os sorteios.
+
+class IndiceConcursos:
+    """
+    Listas de ocorrência (100, palavras) uint64 do histórico, estendidas sorteio a sorteio.
+
+    As consultas devolvem bitsets (palavras,) uint64, que podem ser combinados com &, | e ~ (consultar
+    já faz isso); concursos_de, contar e ultimo traduzem um bitset em números de concurso.
+    """
+    def __init__(self):
+        self.num_sorteios = 0
+        self.concursos = np.zeros(64, dtype=np.int64) # Capacidade dobra conforme necessário
+        self._listas = np.zeros((NUM_DEZENAS_TOTAL, 1), dtype=np.uint64)
+        self._hash = hashlib.sha256() # Mesma impressão digital de impressao_digital_historico, acumulada
+
+    @classmethod
+    def do_historico_map(cls, historico_map):
+        concursos = sorted(historico_map)
+        return cls().sincronizar([historico_map[c] for c in concursos], concursos)
+
+    @property
+    def _palavras(self):
+        return (self.num_sorteios + 63) // 64
+
+    def impressao_digital(self):
+        return self._hash.hexdigest()
+
+    def adicionar(self, dezenas, concursos=None):
+        """Acrescenta sorteios (formato "dezenas") posteriores aos já indexados; sem concursos, numera em sequência."""
+        dezenas = historico_para_array(dezenas)
+        n, m = self.num_sorteios, dezenas.shape[0]
+        ultimo = int(self.concursos[n - 1]) if n else 0
+        concursos = np.arange(ultimo + 1, ultimo + 1 + m) if concursos is None else np.asarray(concursos, dtype=np.int64)
+        if concursos.shape != (m,) or (m and (concursos[0] <= ultimo or (np.diff(concursos) <= 0).any())):
+            raise ValueError("Os concursos acrescentados devem ser crescentes e posteriores aos já indexados.")
+        if m == 0:
+            return self
+        palavras = (n + m + 63) // 64
+        if palavras > self._listas.shape[1]:
+            listas = np.zeros((NUM_DEZENAS_TOTAL, max(palavras, 2 * self._listas.shape[1])), dtype=np.uint64)
+            listas[:, :self._listas.shape[1]] = self._listas
+            self._listas = listas
+        if n + m > len(self.concursos):
+            self.concursos = np.concatenate([self.concursos, np.zeros(max(n + m, 2 * len(self.concursos)) - len(self.concursos), dtype=np.int64)])
+        posicoes = np.arange(n, n + m)
+        bits = np.left_shift(np.uint64(1), (posicoes % 64).astype(np.uint64))
+        np.bitwise_or.at(self._listas, (dezenas.ravel(), np.repeat(posicoes // 64, NUM_DEZENAS_SORTEADAS)),
+                         np.repeat(bits, NUM_DEZENAS_SORTEADAS))
+        self.concursos[n:n + m] = concursos
+        self.num_sorteios = n + m
+        self._hash.update(np.ascontiguousarray(dezenas).tobytes())
+        return self
+
+    def sincronizar(self, historico_dezenas_list, concursos=None):
+        """
+        Ajusta o índice ao histórico informado: se ele estende o já indexado (mesmos concursos e mesma
+        impressão digital do prefixo), acrescenta só os sorteios novos; caso contrário, refaz tudo.
+        """
+        dezenas = historico_para_array(historico_dezenas_list)
+        concursos = np.arange(1, dezenas.shape[0] + 1) if concursos is None else np.asarray(concursos, dtype=np.int64)
+        n = self.num_sorteios
+        if (n > dezenas.shape[0] or not np.array_equal(concursos[:n], self.concursos[:n])
+                or impressao_digital_historico(dezenas[:n]) != self.impressao_digital()):
+            self.__init__()
+            n = 0
+        return self.adicionar(dezenas[n:], concursos[n:])
+
+    # --- Bitsets ---
+    def _dezenas(self, dezenas):
+        dezenas = sorted({int(d) for d in dezenas})
+        if dezenas and (dezenas[0] < 0 or dezenas[-1] >= NUM_DEZENAS_TOTAL):
+            raise ValueError("As dezenas devem estar entre 00 e 99.")
+        return dezenas
+
+    def todos(self):
+        """Bitset com todos os sorteios indexados."""
+        bitset = np.full(self._palavras, np.uint64(0xFFFF_FFFF_FFFF_FFFF))
+        if self.num_sorteios % 64:
+            bitset[-1] = np.uint64((1 << (self.num_sorteios % 64)) - 1)
+        return bitset
+
+    def com_todas(self, dezenas):
+        """Sorteios em que todas as dezenas saíram (todos os sorteios, se nenhuma for dada)."""
+        dezenas = self._dezenas(dezenas)
+        if not dezenas:
+            return self.todos()
+        return np.bitwise_and.reduce(self._listas[dezenas, :self._palavras], axis=0)
+
+    def com_alguma(self, dezenas):
+        """Sorteios em que pelo menos uma das dezenas saiu."""
+        dezenas = self._dezenas(dezenas)
+        if not dezenas:
+            return np.zeros(self._palavras, dtype=np.uint64)
+        return np.bitwise_or.reduce(self._listas[dezenas, :self._palavras], axis=0)
+
+    def sem_nenhuma(self, dezenas):
+        return self.todos() & ~self.com_alguma(dezenas)
+
+    def acertos(self, jogo):
+        """Vetor (num_sorteios,) uint8 com os acertos do jogo em cada sorteio: soma das listas das suas dezenas."""
+        listas = self._listas[self._dezenas(jogo), :self._palavras]
+        bits = np.unpackbits(listas.view(np.uint8), axis=1, bitorder='little')
+        return bits.sum(axis=0, dtype=np.uint8)[:self.num_sorteios]
+
+    def _de_vetor(self, selecionados):
+        """Vetor bool (num_sorteios,) -> bitset."""
+        bits = np.zeros(self._palavras * 64, dtype=bool)
+        bits[:self.num_sorteios] = selecionados
+        return np.packbits(bits, bitorder='little').view('<u8').astype(np.uint64)
+
+    def com_acertos(self, jogo, minimo, maximo=None):
+        """Sorteios em que o jogo teria de 'minimo' a 'maximo' acertos."""
+        acertos = self.acertos(jogo)
+        selecionados = acertos >= minimo
+        if maximo is not None:
+            selecionados &= acertos <= maximo
+        return self._de_vetor(selecionados)
+
+    def no_intervalo(self, de=None, ate=None):
+        """Sorteios dos concursos de 'de' a 'ate' (inclusive)."""
+        concursos = self.concursos[:self.num_sorteios]
+        inicio = 0 if de is None else int(np.searchsorted(concursos, de, side='left'))
+        fim = self.num_sorteios if ate is None else int(np.searchsorted(concursos, ate, side='right'))
+        selecionados = np.zeros(self.num_sorteios, dtype=bool)
+        selecionados[inicio:fim] = True
+        return self._de_vetor(selecionados)
+
+    def consultar(self, todas=(), alguma=(), nenhuma=(), jogo=None, minimo_acertos=0, maximo_acertos=None, de=None, ate=None):
+        """Interseção das condições dadas; as omitidas não restringem nada."""
+        bitset = self.com_todas(todas)
+        if alguma:
+            bitset &= self.com_alguma(alguma)
+        if nenhuma:
+            bitset &= ~self.com_alguma(nenhuma)
+        if jogo is not None and (minimo_acertos or maximo_acertos is not None):
+            bitset &= self.com_acertos(jogo, minimo_acertos, maximo_acertos)
+        if de is not None or ate is not None:
+            bitset &= self.no_intervalo(de, ate)
+        return bitset
+
+    # --- Resultados ---
+    def _posicoes(self, bitset):
+        return np.flatnonzero(np.unpackbits(np.asarray(bitset, dtype='<u8').view(np.uint8), bitorder='little')[:self.num_sorteios])
+
+    def concursos_de(self, bitset):
+        """Números dos concursos do bitset, em ordem crescente."""
+        return self.concursos[self._posicoes(bitset)]
+
+    def contar(self, bitset):
+        return int(_popcount(np.asarray(bitset, dtype=np.uint64)).sum())
+
+    def ultimo(self, bitset):
+        """Concurso mais recente do bitset (None se vazio), achado pela última palavra não nula."""
+        palavras = np.flatnonzero(bitset)
+        if not len(palavras):
+            return None
+        palavra = int(palavras[-1])
+        return int(self.concursos[palavra * 64 + int(bitset[palavra]).bit_length() - 1])
+
+    def ultima_vez(self, dezenas):
+        """Último concurso em que todas as dezenas saíram juntas (ex.: um par), ou None."""
+        return self.ultimo(self.com_todas(dezenas))
+
+    def resultado(self, bitset, jogo=None, limite=CONSULTA_LIMITE_PADRAO):
+        """
+        {'total', 'num_sorteios', 'ultimo', 'atraso', 'concursos'} do bitset, com os 'limite' concursos mais
+        recentes primeiro ('atraso': concursos indexados depois do último). Com 'jogo', também 'acertos' de cada um.
+        """
+        posicoes = self._posicoes(bitset)[::-1][:limite]
+        resultado = {
+            'total': self.contar(bitset),
+            'num_sorteios': self.num_sorteios,
+            'ultimo': int(self.concursos[posicoes[0]]) if len(posicoes) else None,
+            'atraso': self.num_sorteios - 1 - int(posicoes[0]) if len(posicoes) else None,
+            'concursos': self.concursos[posicoes].tolist(),
+        }
+        if jogo is not None:
+            resultado['acertos'] = self.acertos(jogo)[posicoes].tolist()
+        return resultado
+
+def resumo_consulta(resultado, descricao=""):
+    """Texto de IndiceConcursos.resultado para a interface."""
+    linhas = [descricao] if descricao else []
+    total, num_sorteios = resultado['total'], resultado['num_sorteios']
+    linhas.append(f"{total} de {num_sorteios} concurso(s) ({total / max(num_sorteios, 1):.2%}).")
+    if resultado['ultimo'] is None:
+        linhas.append("Nenhum concurso atende à consulta.")
+        return "\n".join(linhas)
+    linhas.append(f"Última vez: concurso {resultado['ultimo']} (há {resultado['atraso']} concurso(s)).")
+    mostrados = resultado['concursos']
+    linhas.append(f"\n{len(mostrados)} mais recente(s):" if len(mostrados) < total else "\nConcursos:")
+    if 'acertos' in resultado:
+        linhas.extend(f"  Concurso {c}: {a} acertos" for c, a in zip(mostrados, resultado['acertos']))
+    else:
+        linhas.extend("  " + ", ".join(str(c) for c in mostrados[i:i + 10]) for i in range(0, len(mostrados), 10))
+    return "\n".join(linhas)
+
+# --- Índice de Jogos (Repetições e Quase Repetições) ---
+
+def _mascara_int_para_array(mascara):
+    return np.array([mascara & 0xFFFF_FFFF_FFFF_FFFF, mascara >> 64], dtype=np.uint64)
+
+class IndiceJogos:
+    """
+    Índice de jogos por máscara de bits para achar repetições exatas e quase repetições.
+
+    As repetições exatas ficam num dicionário máscara -> id. Dois jogos de 'tamanho' dezenas com pelo
+    menos 'limiar' dezenas em comum diferem em no máximo d = 2 * (tamanho - limiar) dezenas; dividindo
+    as 100 dezenas em d + 1 blocos, eles coincidem exatamente em pelo menos um bloco (casa dos pombos).
+    Cada jogo entra então em d + 1 baldes (bloco, dezenas do jogo no bloco), e só os jogos que dividem
+    algum balde com a consulta têm a sobreposição conferida por popcount. Com limiares baixos os blocos
+    ficam curtos e quase todo jogo vira candidato; aí, e em consultas abaixo do limiar, as máscaras de
+    todos os jogos do mesmo tamanho são varridas com NumPy. Jogos de tamanhos diferentes só se comparam
+    por repetição exata.
+    """
+    def __init__(self, limiar=INDICE_SEMELHANCA_PADRAO, tamanho=NUM_DEZENAS_POR_APOSTA):
+        if limiar is not None and not 1 <= limiar <= tamanho:
+            raise ValueError(f"O limiar de semelhança deve estar entre 1 e {tamanho} dezenas.")
+        self.limiar = limiar
+        self.tamanho = tamanho
+        self.rotulos = []
+        self._ids_exatos = {}
+        self._mascaras_int = []
+        self._mascaras = np.zeros((64, 2), dtype=np.uint64) # Capacidade dobra conforme necessário
+        self._tamanhos = np.zeros(64, dtype=np.uint8)
+        self._baldes = {}
+        self._blocos = ()
+        if limiar is not None and 2 * (tamanho - limiar) + 1 <= INDICE_MAX_BLOCOS:
+            fronteiras = np.linspace(0, NUM_DEZENAS_TOTAL, 2 * (tamanho - limiar) + 2).round().astype(int)
+            self._blocos = tuple(sum(BIT_DEZENA[inicio:fim]) for inicio, fim in zip(fronteiras[:-1], fronteiras[1:]))
+
+    def __len__(self):
+        return len(self.rotulos)
+
+    def __contains__(self, jogo):
+        return mascara_da_combinacao(jogo) in self._ids_exatos
+
+    def _chaves(self, mascara):
+        return [(mascara & bloco) | (i << NUM_DEZENAS_TOTAL) for i, bloco in enumerate(self._blocos)]
+
+    def _inserir(self, mascara, tamanho, rotulo):
+        id_jogo = len(self.rotulos)
+        if id_jogo == len(self._tamanhos):
+            self._mascaras = np.concatenate([self._mascaras, np.zeros_like(self._mascaras)])
+            self._tamanhos = np.concatenate([self._tamanhos, np.zeros_like(self._tamanhos)])
+        self._mascaras[id_jogo] = _mascara_int_para_array(mascara)
+        self._tamanhos[id_jogo] = tamanho
+        self._mascaras_int.append(mascara)
+        self._ids_exatos[mascara] = id_jogo
+        self.rotulos.append(rotulo)
+        if tamanho == self.tamanho:
+            for chave in self._chaves(mascara):
+                self._baldes.setdefault(chave, []).append(id_jogo)
+        return id_jogo
+
+    def _varrer(self, mascara, tamanho, minimo):
+        """Ids e sobreposições de todos os jogos do mesmo tamanho com pelo menos 'minimo' dezenas em comum."""
+        n = len(self.rotulos)
+        consulta = _mascara_int_para_array(mascara)
+        em_comum = _popcount(self._mascaras[:n, 0] & consulta[0]) + _popcount(self._mascaras[:n, 1] & consulta[1])
+        ids = np.flatnonzero((em_comum >= minimo) & (self._tamanhos[:n] == tamanho))
+        return zip(ids.tolist(), em_comum[ids].tolist())
+
+    def _candidatos(self, mascara, minimo):
+        """Sobreposições dos candidatos dos baldes (só vale para jogos de 'tamanho' dezenas e minimo >= limiar)."""
+        vistos = set()
+        for chave in self._chaves(mascara):
+            for id_jogo in self._baldes.get(chave, ()):
+                if id_jogo not in vistos:
+                    vistos.add(id_jogo)
+                    em_comum = (mascara & self._mascaras_int[id_jogo]).bit_count()
+                    if em_comum >= minimo:
+                        yield id_jogo, em_comum
+
+    def _procurar(self, mascara, tamanho, minimo):
+        if self._blocos and tamanho == self.tamanho and minimo >= self.limiar:
+            return self._candidatos(mascara, minimo)
+        return self._varrer(mascara, tamanho, minimo)
+
+    def semelhantes(self, jogo, minimo=None):
+        """[(id, em_comum)] dos jogos do mesmo tamanho com pelo menos 'minimo' (padrão: limiar) dezenas em comum, da maior sobreposição para a menor."""
+        minimo = self.limiar if minimo is None else minimo
+        if minimo is None:
+            raise ValueError("Informe 'minimo' para consultar um índice sem limiar de semelhança.")
+        achados = self._procurar(mascara_da_combinacao(jogo), len(jogo), minimo)
+        return sorted(achados, key=lambda achado: (-achado[1], achado[0]))
+
+    def procurar_repeticao(self, jogo):
+        """(id, em_comum) do primeiro jogo indexado que o jogo repete ou quase repete (limiar), ou None."""
+        mascara = mascara_da_combinacao(jogo)
+        id_jogo = self._ids_exatos.get(mascara)
+        if id_jogo is not None:
+            return id_jogo, len(jogo)
+        if self.limiar is None:
+            return None
+        return next(iter(self._procurar(mascara, len(jogo), self.limiar)), None)
+
+    def adicionar(self, jogo, rotulo=None):
+        """Indexa o jogo (dezenas distintas, de qualquer tamanho) e retorna o seu id; uma repetição exata retorna o id já existente."""
+        mascara = mascara_da_combinacao(jogo)
+        id_jogo = self._ids_exatos.get(mascara)
+        return self._inserir(mascara, len(jogo), rotulo) if id_jogo is None else id_jogo
+
+    def adicionar_se_novo(self, jogo, rotulo=None):
+        """Indexa o jogo só se ele não repete nem quase repete nenhum jogo do índice. Retorna o id ou None."""
+        if self.procurar_repeticao(jogo) is not None:
+            TELEMETRIA.incrementar('indice_rejeitados')
+            return None
+        return self._inserir(mascara_da_combinacao(jogo), len(jogo), rotulo)
+
+    def adicionar_apostas(self, registro_apostas):
+        """Indexa as apostas de um RegistroApostas (rótulo "aposta #id") direto das suas máscaras."""
+        for id_aposta, (baixo, alto) in zip(registro_apostas.ids.tolist(), registro_apostas.mascaras.tolist()):
+            mascara = baixo | alto << 64
+            if mascara not in self._ids_exatos:
+                self._inserir(mascara, mascara.bit_count(), f"aposta #{id_aposta}")
+
+def gerar_sem_repeticoes(gerar_lote, num_jogos, indice, max_rodadas=INDICE_MAX_RODADAS, rotulo=None):
+    """
+    Pede lotes a gerar_lote(n) até juntar num_jogos jogos que não repetem nem quase repetem nenhum jogo do
+    índice (nem um ao outro: cada jogo aceito entra no índice). Para depois de max_rodadas lotes ou de um lote
+    vazio (geração cancelada). Retorna (jogos, rejeitados); pode haver menos jogos que o pedido.
+    """
+    jogos = []
+    rejeitados = 0
+    for _ in range(max_rodadas):
+        faltam = num_jogos - len(jogos)
+        if faltam <= 0:
+            break
+        lote = gerar_lote(faltam)
+        if not lote:
+            break
+        for jogo in lote:
+            if indice.adicionar_se_novo(jogo, rotulo) is None:
+                rejeitados += 1
+            else:
+                jogos.append(jogo)
+    return jogos, rejeitados
+
+def deduplicar_jogos(jogos, limiar=INDICE_SEMELHANCA_PADRAO):
+    """
+    Mantém a primeira ocorrência de cada jogo e remove as repetições e quase repetições (limiar; None só
+    remove as exatas). Retorna (unicos, removidos), com removidos = [(posição, posição_mantida, em_comum)].
+    """
+    indice = IndiceJogos(limiar)
+    unicos, removidos = [], []
+    for posicao, jogo in enumerate(jogos):
+        repeticao = indice.procurar_repeticao(jogo)
+        if repeticao is None:
+            indice.adicionar(jogo, posicao)
+            unicos.append(jogo)
+        else:
+            removidos.append((posicao, indice.rotulos[repeticao[0]], repeticao[1]))
+    return unicos, removidos
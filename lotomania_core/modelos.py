@@ -0,0 +1,441 @@
+"""Modelo de transição e modelo logístico (IA) das dezenas, ambos atualizados de forma incremental."""
+import json
+import logging
+import math
+import os
+import time
+
+import numpy as np
+
+from .constantes import MODELO_IA_FILE, NUM_DEZENAS_POR_APOSTA, NUM_DEZENAS_SORTEADAS, NUM_DEZENAS_TOTAL
+from .telemetria import TELEMETRIA
+from .historico import SIMULACAO_BLOCO, dezenas_para_incidencia, historico_para_array
+from .analise import _P_DEZENA, impressao_digital_historico
+
+__all__ = [
+    'TRANSICAO_K', 'TRANSICAO_LIMITES_ATRASO', 'ModeloTransicao', 'MODELO_IA_VERSAO', 'MODELO_IA_JANELAS',
+    'MODELO_IA_CARACTERISTICAS', 'MODELO_IA_AQUECIMENTO', 'MODELO_IA_BLOCO', 'ModeloLogisticoLotomania',
+    'avaliar_modelo_walk_forward',
+]
+
+logger = logging.getLogger(__name__)
+
+# --- Modelo de Transição ---
+TRANSICAO_K = 3 # Sorteios recentes que formam o padrão de aparição
+TRANSICAO_LIMITES_ATRASO = (5, 8, 12, 18) # Faixas de atraso para dezenas ausentes nos últimos K sorteios
+_DEZENAS_INDICE = np.arange(NUM_DEZENAS_TOTAL)
+
+class ModeloTransicao:
+    """
+    Estima P(dezena sai no próximo sorteio | estado da dezena nos últimos k sorteios).
+
+    O estado é o padrão de aparições nos k sorteios anteriores (bit i = saiu há i + 1 sorteios) ou,
+    quando a dezena não saiu em nenhum deles, a faixa do seu atraso (limites_atraso). Para cada estado
+    são contados, de forma vetorizada sobre a matriz de incidência, quantas vezes a dezena estava nele e
+    quantas vezes saiu no sorteio seguinte. As tabelas de consulta são:
+      'tabela_geral'  (S,)     probabilidade por estado, com todas as dezenas juntas;
+      'tabela'        (100, S) probabilidade por dezena e estado, encolhida na direção da geral.
+    Ambas são suavizadas na direção de 20/100 para estados pouco observados. 'pontuar()' devolve o vetor
+    de 100 probabilidades para o próximo sorteio já pronto (uma indexação), e 'atualizar' processa
+    apenas sorteios novos, como AnaliseAtrasos.
+    """
+    def __init__(self, k=TRANSICAO_K, limites_atraso=TRANSICAO_LIMITES_ATRASO, prior_geral=20.0, prior_dezena=50.0):
+        limites = tuple(int(l) for l in limites_atraso)
+        if k < 1 or k > 8:
+            raise ValueError("k deve estar entre 1 e 8.")
+        if any(l <= k for l in limites) or list(limites) != sorted(set(limites)):
+            raise ValueError(f"Os limites de atraso devem ser crescentes e maiores que k={k}.")
+        self.k = k
+        self.limites_atraso = limites
+        self.prior_geral = prior_geral
+        self.prior_dezena = prior_dezena
+        self.num_estados = (2 ** k - 1) + len(limites) + 1
+        self.num_sorteios = 0
+        self.observacoes = np.zeros((NUM_DEZENAS_TOTAL, self.num_estados), dtype=np.int64)
+        self.aparicoes = np.zeros((NUM_DEZENAS_TOTAL, self.num_estados), dtype=np.int64)
+        self.ultima_aparicao = np.full(NUM_DEZENAS_TOTAL, -1, dtype=np.int64)
+        self._recentes = np.zeros((0, NUM_DEZENAS_TOTAL), dtype=bool) # Últimos k sorteios (incidência)
+        self._impressao = impressao_digital_historico([])
+        self._recalcular_tabelas()
+
+    @classmethod
+    def do_historico(cls, historico_dezenas_list, **parametros):
+        return cls(**parametros).atualizar(historico_dezenas_list)
+
+    def nome_estado(self, estado):
+        """Descrição legível de um estado (ex.: "padrão 101" ou "atraso 8-11")."""
+        padroes = 2 ** self.k - 1
+        if estado < padroes:
+            return "padrão " + format(estado + 1, f"0{self.k}b")[::-1] # Mais recente à esquerda
+        faixa = estado - padroes
+        inicio = ([self.k] + list(self.limites_atraso))[faixa]
+        fim = self.limites_atraso[faixa] - 1 if faixa < len(self.limites_atraso) else None
+        return f"atraso {inicio}-{fim}" if fim is not None else f"atraso {inicio}+"
+
+    def _estados(self, padrao, atraso):
+        padroes = 2 ** self.k - 1
+        faixa = np.searchsorted(np.asarray(self.limites_atraso), atraso, side='right')
+        return np.where(padrao > 0, padrao.astype(np.int64) - 1, padroes + faixa)
+
+    def _processar_bloco(self, incidencia):
+        n = incidencia.shape[0]
+        base = self.num_sorteios
+        contexto = np.concatenate([self._recentes, incidencia])
+        r = self._recentes.shape[0]
+
+        # Padrão antes de cada sorteio do bloco: bit i = a dezena saiu i + 1 sorteios antes
+        padrao = np.zeros((n, NUM_DEZENAS_TOTAL), dtype=np.uint8)
+        for i in range(self.k):
+            inicio = r - 1 - i
+            if inicio >= 0:
+                padrao |= contexto[inicio:inicio + n].astype(np.uint8) << i
+            elif n + inicio > 0:
+                padrao[-inicio:] |= contexto[:n + inicio].astype(np.uint8) << i
+
+        # Última aparição antes de cada sorteio (-1 = nunca saiu) e atraso correspondente
+        indices = base + np.arange(n, dtype=np.int64)[:, None]
+        ultima = np.maximum.accumulate(np.where(incidencia, indices, -1), axis=0)
+        np.maximum(ultima, self.ultima_aparicao, out=ultima)
+        anterior = np.vstack([self.ultima_aparicao[None, :], ultima[:-1]])
+        atraso = indices - 1 - anterior
+
+        # Só conta sorteios com k anteriores conhecidos (o padrão fica completo)
+        validos = np.arange(n) + base >= self.k
+        estados = self._estados(padrao[validos], atraso[validos])
+        celulas = (_DEZENAS_INDICE * self.num_estados + estados).ravel()
+        tamanho = NUM_DEZENAS_TOTAL * self.num_estados
+        self.observacoes += np.bincount(celulas, minlength=tamanho).reshape(NUM_DEZENAS_TOTAL, self.num_estados)
+        self.aparicoes += np.bincount(celulas, weights=incidencia[validos].ravel(), minlength=tamanho).astype(np.int64).reshape(NUM_DEZENAS_TOTAL, self.num_estados)
+
+        self._recentes = contexto[-self.k:]
+        self.ultima_aparicao = ultima[-1]
+        self.num_sorteios += n
+
+    def _recalcular_tabelas(self):
+        a_priori = _P_DEZENA
+        geral = (self.aparicoes.sum(axis=0) + self.prior_geral * a_priori) / (self.observacoes.sum(axis=0) + self.prior_geral)
+        tabela = (self.aparicoes + self.prior_dezena * geral) / (self.observacoes + self.prior_dezena)
+        self.tabela_geral = geral.astype(np.float32)
+        self.tabela = tabela.astype(np.float32)
+        self.estado_atual = self.estados_do_proximo_sorteio()
+        self._pontuacao = self.tabela[_DEZENAS_INDICE, self.estado_atual]
+        self._pontuacao.flags.writeable = False
+
+    def estados_do_proximo_sorteio(self):
+        """Vetor (100,) com o estado de cada dezena imediatamente antes do próximo sorteio."""
+        padrao = np.zeros(NUM_DEZENAS_TOTAL, dtype=np.uint8)
+        for i in range(min(self.k, self._recentes.shape[0])):
+            padrao |= self._recentes[-1 - i].astype(np.uint8) << i
+        atraso = self.num_sorteios - 1 - self.ultima_aparicao
+        return self._estados(padrao, atraso)
+
+    def atualizar(self, novos_sorteios):
+        """Incorpora sorteios posteriores aos já ajustados (lista de listas ou formato "dezenas")."""
+        novos = historico_para_array(novos_sorteios)
+        if novos.shape[0] == 0:
+            return self
+        with TELEMETRIA.cronometro('modelo_transicao', sorteios=novos.shape[0]):
+            for inicio in range(0, novos.shape[0], SIMULACAO_BLOCO):
+                self._processar_bloco(dezenas_para_incidencia(novos[inicio:inicio + SIMULACAO_BLOCO]))
+            self._impressao = None # Sorteios recebidos diretamente: sincronizar não tem como conferir o prefixo
+            self._recalcular_tabelas()
+        return self
+
+    def sincronizar(self, historico_dezenas_list):
+        """
+        Ajusta o modelo ao histórico informado: se ele estende o já ajustado (mesma impressão digital
+        do prefixo), processa só os sorteios novos; caso contrário, reajusta do zero.
+        """
+        dezenas = historico_para_array(historico_dezenas_list)
+        n = self.num_sorteios
+        if n > dezenas.shape[0] or self._impressao != impressao_digital_historico(dezenas[:n]):
+            self.__init__(self.k, self.limites_atraso, self.prior_geral, self.prior_dezena)
+            n = 0
+        self.atualizar(dezenas[n:])
+        self._impressao = impressao_digital_historico(dezenas)
+        return self
+
+    def pontuar(self, estados=None):
+        """
+        Probabilidade estimada de cada dezena sair no próximo sorteio (vetor (100,) float32).
+        Sem argumentos devolve o vetor pré-calculado para o estado atual; 'estados' (100,) consulta outro estado.
+        """
+        if estados is None:
+            return self._pontuacao
+        return self.tabela[_DEZENAS_INDICE, estados]
+
+    def resumo_estados(self):
+        """[(nome_estado, observações, probabilidade geral)] para exibição."""
+        observacoes = self.observacoes.sum(axis=0)
+        return [(self.nome_estado(s), int(observacoes[s]), float(self.tabela_geral[s])) for s in range(self.num_estados)]
+
+# --- Modelo Logístico (IA) ---
+MODELO_IA_VERSAO = 1
+MODELO_IA_JANELAS = (3, 10, 25, 100) # Janelas da frequência recente, em sorteios
+MODELO_IA_CARACTERISTICAS = ('constante', 'saiu_no_ultimo') + tuple(f"freq_{j}" for j in MODELO_IA_JANELAS) + ('log_atraso', 'freq_total')
+MODELO_IA_AQUECIMENTO = max(MODELO_IA_JANELAS) # Sorteios iniciais sem janelas completas não entram no treino
+MODELO_IA_BLOCO = 2048 # Sorteios por passo de treino (100 exemplos por sorteio)
+
+class _ExtratorCaracteristicas:
+    """
+    Características de cada dezena imediatamente antes de cada sorteio, calculadas só com sorteios
+    anteriores: saiu no último, frequência nas janelas recentes, log do atraso e frequência acumulada.
+    Guarda apenas os últimos max(MODELO_IA_JANELAS) sorteios, a última aparição e os totais, então
+    processa o histórico em blocos e continua de onde parou.
+    """
+    def __init__(self):
+        self.num_sorteios = 0
+        self.recentes = np.zeros((0, NUM_DEZENAS_TOTAL), dtype=bool)
+        self.ultima_aparicao = np.full(NUM_DEZENAS_TOTAL, -1, dtype=np.int64)
+        self.totais = np.zeros(NUM_DEZENAS_TOTAL, dtype=np.int64)
+
+    def posicionar(self, dezenas):
+        """Coloca o extrator no estado de quem já processou 'dezenas', sem calcular características."""
+        self.__init__()
+        incidencia = dezenas_para_incidencia(dezenas[-MODELO_IA_AQUECIMENTO:])
+        self.recentes = incidencia
+        self.totais = np.bincount(np.asarray(dezenas).ravel(), minlength=NUM_DEZENAS_TOTAL).astype(np.int64)
+        n = len(dezenas)
+        saiu = incidencia.any(axis=0)
+        ultima_recente = n - 1 - np.argmax(incidencia[::-1], axis=0)
+        self.ultima_aparicao = np.where(saiu, ultima_recente, -1)
+        if not saiu.all() and n > incidencia.shape[0]:
+            # Dezenas ausentes da janela recente: a última aparição vem do restante do histórico
+            antigas = dezenas_para_incidencia(dezenas[:n - incidencia.shape[0]])
+            ausentes = ~saiu & antigas.any(axis=0)
+            self.ultima_aparicao[ausentes] = (antigas.shape[0] - 1 - np.argmax(antigas[::-1], axis=0))[ausentes]
+        self.num_sorteios = n
+        return self
+
+    @staticmethod
+    def _montar(acumulado, indices, anterior, totais_antes, t):
+        """Matriz (m, 100, F) a partir das somas acumuladas do contexto e do estado antes de cada sorteio."""
+        colunas = [np.ones((len(indices), NUM_DEZENAS_TOTAL), dtype=np.float32)]
+        colunas.append((acumulado[indices] - acumulado[np.maximum(indices - 1, 0)]).astype(np.float32))
+        for janela in MODELO_IA_JANELAS:
+            colunas.append((acumulado[indices] - acumulado[np.maximum(indices - janela, 0)]) / np.float32(janela) - np.float32(_P_DEZENA))
+        atraso = t[:, None] - 1 - anterior
+        colunas.append((np.log1p(atraso) - math.log1p(1 / _P_DEZENA - 1)).astype(np.float32))
+        taxa = totais_antes / np.maximum(t, 1)[:, None]
+        colunas.append((np.where(t[:, None] > 0, taxa, _P_DEZENA) - _P_DEZENA).astype(np.float32))
+        return np.stack(colunas, axis=2)
+
+    def processar(self, incidencia):
+        """Características (n, 100, F) antes de cada um dos n sorteios de 'incidencia' (posteriores aos já vistos)."""
+        n = incidencia.shape[0]
+        base = self.num_sorteios
+        r = self.recentes.shape[0]
+        contexto = np.concatenate([self.recentes, incidencia])
+        acumulado = np.zeros((contexto.shape[0] + 1, NUM_DEZENAS_TOTAL), dtype=np.int32)
+        np.cumsum(contexto, axis=0, out=acumulado[1:])
+        indices = r + np.arange(n)
+
+        t = base + np.arange(n, dtype=np.int64)
+        ultima = np.maximum.accumulate(np.where(incidencia, t[:, None], -1), axis=0)
+        np.maximum(ultima, self.ultima_aparicao, out=ultima)
+        anterior = np.vstack([self.ultima_aparicao[None, :], ultima[:-1]])
+        totais_antes = self.totais + np.cumsum(incidencia, axis=0) - incidencia
+
+        caracteristicas = self._montar(acumulado, indices, anterior, totais_antes, t)
+        self.recentes = contexto[-MODELO_IA_AQUECIMENTO:]
+        self.ultima_aparicao = ultima[-1]
+        self.totais = totais_antes[-1] + incidencia[-1]
+        self.num_sorteios += n
+        return caracteristicas
+
+    def atuais(self):
+        """Características (100, F) antes do próximo sorteio."""
+        acumulado = np.zeros((self.recentes.shape[0] + 1, NUM_DEZENAS_TOTAL), dtype=np.int32)
+        np.cumsum(self.recentes, axis=0, out=acumulado[1:])
+        t = np.array([self.num_sorteios], dtype=np.int64)
+        return self._montar(acumulado, np.array([self.recentes.shape[0]]), self.ultima_aparicao[None, :], self.totais[None, :], t)[0]
+
+def _sigmoide(x):
+    return 1.0 / (1.0 + np.exp(-x))
+
+class ModeloLogisticoLotomania:
+    """
+    Regressão logística por dezena: P(dezena sai no próximo sorteio | características de _ExtratorCaracteristicas).
+
+    O treino é incremental (aproximação de Laplace): os pesos atuais e a matriz de precisão acumulada
+    funcionam como priori gaussiana para os sorteios novos, e cada bloco é ajustado por Newton. Assim
+    'atualizar' com os concursos recém-baixados custa proporcional a eles, não ao histórico inteiro.
+    O modelo é salvo em JSON com a versão, as características e a impressão digital do histórico treinado.
+    """
+    def __init__(self, regularizacao=1.0):
+        self.regularizacao = regularizacao
+        self.extrator = _ExtratorCaracteristicas()
+        self.pesos = np.zeros(len(MODELO_IA_CARACTERISTICAS))
+        self.pesos[0] = math.log(_P_DEZENA / (1 - _P_DEZENA)) # Começa no sorteio justo: P = 0,2 para todas
+        self.precisao = regularizacao * np.eye(len(MODELO_IA_CARACTERISTICAS))
+        self.exemplos = 0
+        self.impressao = impressao_digital_historico([])
+        self._pontuacao = self._calcular_pontuacao()
+
+    @property
+    def num_sorteios(self):
+        return self.extrator.num_sorteios
+
+    def _calcular_pontuacao(self):
+        pontuacao = _sigmoide(self.extrator.atuais().astype(np.float64) @ self.pesos).astype(np.float32)
+        pontuacao.flags.writeable = False
+        return pontuacao
+
+    def _treinar(self, caracteristicas, alvo, iteracoes=25):
+        """Passos de Newton sobre um bloco (X (m, F), y (m,)) com a priori N(pesos, precisao^-1)."""
+        if len(alvo) == 0:
+            return
+        x = caracteristicas.astype(np.float64)
+        y = alvo.astype(np.float64)
+        pesos_anteriores, precisao_anterior = self.pesos, self.precisao
+        pesos = pesos_anteriores.copy()
+        for _ in range(iteracoes):
+            p = _sigmoide(x @ pesos)
+            gradiente = x.T @ (p - y) + precisao_anterior @ (pesos - pesos_anteriores)
+            hessiana = (x * (p * (1 - p))[:, None]).T @ x + precisao_anterior
+            passo = np.linalg.solve(hessiana, gradiente)
+            pesos -= passo
+            if np.abs(passo).max() < 1e-8:
+                break
+        p = _sigmoide(x @ pesos)
+        self.precisao = (x * (p * (1 - p))[:, None]).T @ x + precisao_anterior
+        self.pesos = pesos
+        self.exemplos += len(y)
+
+    def _treinar_bloco(self, caracteristicas, incidencia, primeiro_sorteio):
+        """Treina com um bloco já extraído, ignorando os sorteios do aquecimento."""
+        validos = primeiro_sorteio + np.arange(incidencia.shape[0]) >= MODELO_IA_AQUECIMENTO
+        self._treinar(caracteristicas[validos].reshape(-1, caracteristicas.shape[2]), incidencia[validos].ravel())
+
+    def atualizar(self, novos_sorteios):
+        """Treina com sorteios posteriores aos já vistos. Atualizar direto invalida a impressão digital."""
+        novos = historico_para_array(novos_sorteios)
+        if novos.shape[0] == 0:
+            return self
+        with TELEMETRIA.cronometro('modelo_ia_treino', sorteios=novos.shape[0]):
+            for inicio in range(0, novos.shape[0], MODELO_IA_BLOCO):
+                incidencia = dezenas_para_incidencia(novos[inicio:inicio + MODELO_IA_BLOCO])
+                primeiro = self.extrator.num_sorteios
+                self._treinar_bloco(self.extrator.processar(incidencia), incidencia, primeiro)
+            self.impressao = None
+            self._pontuacao = self._calcular_pontuacao()
+        return self
+
+    def sincronizar(self, historico_dezenas_list):
+        """Treina só os sorteios novos se o histórico estende o já treinado; senão, treina do zero."""
+        dezenas = historico_para_array(historico_dezenas_list)
+        n = self.num_sorteios
+        if n > dezenas.shape[0] or self.impressao != impressao_digital_historico(dezenas[:n]):
+            self.__init__(self.regularizacao)
+            n = 0
+        self.atualizar(dezenas[n:])
+        self.impressao = impressao_digital_historico(dezenas)
+        return self
+
+    def pontuar(self):
+        """Probabilidade estimada de cada dezena sair no próximo sorteio (vetor (100,) float32)."""
+        return self._pontuacao
+
+    def coeficientes(self):
+        return dict(zip(MODELO_IA_CARACTERISTICAS, (float(p) for p in self.pesos)))
+
+    def salvar(self, caminho=MODELO_IA_FILE):
+        dados = {
+            'versao': MODELO_IA_VERSAO,
+            'tipo': 'regressao_logistica',
+            'caracteristicas': list(MODELO_IA_CARACTERISTICAS),
+            'regularizacao': self.regularizacao,
+            'impressao': self.impressao,
+            'num_sorteios': self.num_sorteios,
+            'exemplos': self.exemplos,
+            'pesos': self.pesos.tolist(),
+            'precisao': self.precisao.tolist(),
+            'salvo_em': time.strftime("%Y-%m-%dT%H:%M:%S"),
+        }
+        temporario = f"{caminho}.tmp"
+        try:
+            with open(temporario, 'w', encoding='utf-8') as f:
+                json.dump(dados, f, indent=4)
+            os.replace(temporario, caminho)
+        except OSError as e:
+            logger.warning(f"Erro ao salvar o modelo {caminho}: {e}")
+
+    @classmethod
+    def carregar_ou_treinar(cls, historico_dezenas_list, caminho=MODELO_IA_FILE, regularizacao=1.0):
+        """
+        Carrega o modelo salvo se ele foi treinado com este histórico (ou com um prefixo dele, e então
+        treina só os concursos novos); caso contrário, ou se a versão/características mudaram, treina do zero.
+        Salva o arquivo sempre que o modelo muda.
+        """
+        dezenas = historico_para_array(historico_dezenas_list)
+        modelo = None
+        if os.path.exists(caminho):
+            try:
+                with open(caminho, 'r', encoding='utf-8') as f:
+                    dados = json.load(f)
+                n = int(dados['num_sorteios'])
+                compativel = (dados.get('versao') == MODELO_IA_VERSAO
+                              and tuple(dados.get('caracteristicas', ())) == MODELO_IA_CARACTERISTICAS
+                              and dados.get('regularizacao') == regularizacao)
+                if compativel and n <= dezenas.shape[0] and dados['impressao'] == impressao_digital_historico(dezenas[:n]):
+                    modelo = cls(regularizacao)
+                    modelo.pesos = np.asarray(dados['pesos'], dtype=np.float64)
+                    modelo.precisao = np.asarray(dados['precisao'], dtype=np.float64)
+                    modelo.exemplos = int(dados['exemplos'])
+                    modelo.extrator.posicionar(dezenas[:n])
+                    modelo.impressao = dados['impressao']
+                    modelo._pontuacao = modelo._calcular_pontuacao()
+                    TELEMETRIA.incrementar('modelo_ia_carregado')
+            except (ValueError, KeyError, TypeError, OSError) as e:
+                logger.warning(f"Erro ao ler o modelo {caminho}: {e}. Ele será treinado de novo.")
+                modelo = None
+        if modelo is None:
+            modelo = cls(regularizacao)
+        if modelo.num_sorteios != dezenas.shape[0] or modelo.impressao is None:
+            modelo.sincronizar(dezenas)
+            modelo.salvar(caminho)
+        return modelo
+
+def avaliar_modelo_walk_forward(historico_dezenas_list, inicio=None, passo=10, regularizacao=1.0):
+    """
+    Avaliação walk-forward: treina com os sorteios antes de 'inicio' e, a cada 'passo' sorteios, prevê o
+    trecho seguinte só com o que já foi visto, pontua e então o incorpora ao treino.
+    Compara log-loss e Brier com o sorteio justo (P = 0,2 para todas) e conta quantas das 20 dezenas
+    sorteadas caem nas 50 de maior probabilidade (10 em média ao acaso).
+    """
+    dezenas = historico_para_array(historico_dezenas_list)
+    total = dezenas.shape[0]
+    if inicio is None:
+        inicio = max(MODELO_IA_AQUECIMENTO + 1, total // 2)
+    inicio = min(max(inicio, 0), total)
+    modelo = ModeloLogisticoLotomania(regularizacao).atualizar(dezenas[:inicio])
+
+    log_loss = brier = 0.0
+    acertos_top = []
+    for pos in range(inicio, total, passo):
+        incidencia = dezenas_para_incidencia(dezenas[pos:pos + passo])
+        caracteristicas = modelo.extrator.processar(incidencia)
+        p = np.clip(_sigmoide(caracteristicas.astype(np.float64) @ modelo.pesos), 1e-12, 1 - 1e-12)
+        y = incidencia
+        log_loss -= float(np.where(y, np.log(p), np.log1p(-p)).sum())
+        brier += float(((p - y) ** 2).sum())
+        top = np.argpartition(-p, NUM_DEZENAS_POR_APOSTA - 1, axis=1)[:, :NUM_DEZENAS_POR_APOSTA]
+        acertos_top.extend(np.take_along_axis(y, top, axis=1).sum(axis=1).tolist())
+        modelo._treinar_bloco(caracteristicas, incidencia, pos)
+
+    avaliados = total - inicio
+    exemplos = max(avaliados * NUM_DEZENAS_TOTAL, 1)
+    q = _P_DEZENA
+    log_loss_base = -(q * math.log(q) + (1 - q) * math.log(1 - q))
+    return {
+        'sorteios_treino_inicial': int(inicio),
+        'sorteios_avaliados': int(avaliados),
+        'passo': passo,
+        'log_loss': log_loss / exemplos,
+        'log_loss_base': log_loss_base,
+        'brier': brier / exemplos,
+        'brier_base': q * (1 - q),
+        'acertos_top50_media': float(np.mean(acertos_top)) if acertos_top else 0.0,
+        'acertos_top50_esperado': NUM_DEZENAS_SORTEADAS * NUM_DEZENAS_POR_APOSTA / NUM_DEZENAS_TOTAL,
+        'coeficientes_finais': modelo.coeficientes(),
+    }
@@ -0,0 +1,284 @@
+"""Histórico em memória compartilhada entre processos e simulação Monte Carlo paralela de estratégias."""
+import os
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from .constantes import FAIXAS_PREMIADAS, NUM_DEZENAS_SORTEADAS, NUM_DEZENAS_TOTAL
+from .telemetria import TELEMETRIA, perfilado
+from .historico import (
+    SIMULACAO_BLOCO, analisar_frequencia_lotomania, dezenas_para_incidencia, dezenas_para_mascara,
+    historico_para_array, iterar_sorteios_simulados
+)
+from .modelos import ModeloLogisticoLotomania, ModeloTransicao
+from .geracao import (
+    gerar_aleatorio_lotomania, gerar_baseado_em_frequencia_lotomania, gerar_por_modelo_ia_lotomania,
+    gerar_por_transicao_lotomania
+)
+from .comparacao import acertos_por_mascara, jogos_para_mascara
+from .carteira import _acertos_de_dois_jogos, _momentos_carteira, _validar_carteira
+
+__all__ = [
+    'PARALELO_BLOCO_MIN', 'HandleHistorico', 'anexar_historico', 'HistoricoCompartilhado', 'frequencias_paralelas',
+    'coocorrencia_paralela', 'backtest_paralelo', 'SIMULACAO_TAREFA', 'ESTRATEGIAS', 'jogos_da_estrategia',
+    'simular_estrategia_paralela', 'resumo_simulacao',
+]
+
+# --- Histórico Compartilhado entre Processos ---
+# O histórico é publicado uma única vez (memória compartilhada ou arquivo .npy mapeado) e os
+# processos trabalhadores recebem apenas um HandleHistorico de poucos bytes. Cada trabalhador
+# mapeia os mesmos bytes sem copiar, então a memória não cresce com o número de processos.
+PARALELO_BLOCO_MIN = 20_000 # Sorteios mínimos por tarefa enviada a um trabalhador
+
+class HandleHistorico:
+    """Referência serializável a um histórico publicado por HistoricoCompartilhado."""
+    def __init__(self, num_sorteios, nome_dezenas=None, nome_incidencia=None, arquivo_dezenas=None):
+        self.num_sorteios = num_sorteios
+        self.nome_dezenas = nome_dezenas
+        self.nome_incidencia = nome_incidencia
+        self.arquivo_dezenas = arquivo_dezenas
+
+    def chave(self):
+        return (self.nome_dezenas, self.nome_incidencia, self.arquivo_dezenas, self.num_sorteios)
+
+    def __repr__(self):
+        origem = self.arquivo_dezenas or self.nome_dezenas
+        return f"HandleHistorico({self.num_sorteios} sorteios em {origem})"
+
+_historicos_anexados = {} # Por processo: handle.chave() -> (segmentos, dezenas, incidencia)
+
+def anexar_historico(handle):
+    """
+    Retorna (dezenas, incidencia) do histórico do handle, como visões sem cópia.
+    incidencia é None quando o histórico veio de um arquivo (é derivada por bloco, sob demanda).
+    O mapeamento é feito uma vez por processo e reaproveitado nas tarefas seguintes.
+    """
+    chave = handle.chave()
+    if chave not in _historicos_anexados:
+        segmentos = []
+        if handle.arquivo_dezenas:
+            dezenas = np.load(handle.arquivo_dezenas, mmap_mode='r')
+            incidencia = None
+        else:
+            shm_dezenas = shared_memory.SharedMemory(name=handle.nome_dezenas)
+            shm_incidencia = shared_memory.SharedMemory(name=handle.nome_incidencia)
+            segmentos = [shm_dezenas, shm_incidencia]
+            dezenas = np.ndarray((handle.num_sorteios, NUM_DEZENAS_SORTEADAS), dtype=np.uint8, buffer=shm_dezenas.buf)
+            incidencia = np.ndarray((handle.num_sorteios, NUM_DEZENAS_TOTAL), dtype=bool, buffer=shm_incidencia.buf)
+        _historicos_anexados[chave] = (segmentos, dezenas, incidencia)
+    _, dezenas, incidencia = _historicos_anexados[chave]
+    return dezenas, incidencia
+
+def _bloco_incidencia(handle, inicio, fim):
+    dezenas, incidencia = anexar_historico(handle)
+    if incidencia is not None:
+        return incidencia[inicio:fim]
+    return dezenas_para_incidencia(dezenas[inicio:fim])
+
+def _tarefa_frequencia(handle, inicio, fim):
+    dezenas, _ = anexar_historico(handle)
+    return np.bincount(np.asarray(dezenas[inicio:fim]).ravel(), minlength=NUM_DEZENAS_TOTAL)
+
+def _tarefa_coocorrencia(handle, inicio, fim):
+    # float32 usa BLAS e é exato para contagens abaixo de 2**24 por bloco
+    bloco = _bloco_incidencia(handle, inicio, fim).astype(np.float32)
+    return (bloco.T @ bloco).astype(np.int64)
+
+def _tarefa_backtest(handle, inicio, fim, jogos_incidencia):
+    bloco = _bloco_incidencia(handle, inicio, fim).astype(np.float32)
+    acertos = (bloco @ jogos_incidencia.T).astype(np.int64) # (sorteios, jogos)
+    histograma = np.zeros((jogos_incidencia.shape[0], NUM_DEZENAS_SORTEADAS + 1), dtype=np.int64)
+    for j in range(jogos_incidencia.shape[0]):
+        histograma[j] = np.bincount(acertos[:, j], minlength=NUM_DEZENAS_SORTEADAS + 1)
+    return histograma
+
+class HistoricoCompartilhado:
+    """
+    Publica o histórico (formato "dezenas" e matriz de incidência) em memória compartilhada.
+    Use como gerenciador de contexto; ao sair, os segmentos são liberados.
+
+        with HistoricoCompartilhado(self.historico) as compartilhado:
+            cooc = coocorrencia_paralela(compartilhado)
+    """
+    def __init__(self, historico=None, dezenas=None, arquivo_dezenas=None):
+        self._segmentos = []
+        if arquivo_dezenas is not None:
+            # Arquivo .npy no formato "dezenas" (ex.: simular_historico_para_arquivo) já é compartilhável
+            num_sorteios = np.load(arquivo_dezenas, mmap_mode='r').shape[0]
+            self.handle = HandleHistorico(num_sorteios, arquivo_dezenas=os.path.abspath(arquivo_dezenas))
+            return
+        if dezenas is None:
+            dezenas = historico_para_array(historico)
+        dezenas = np.asarray(dezenas, dtype=np.uint8)
+        num_sorteios = dezenas.shape[0]
+        shm_dezenas = shared_memory.SharedMemory(create=True, size=max(1, dezenas.nbytes))
+        shm_incidencia = shared_memory.SharedMemory(create=True, size=max(1, num_sorteios * NUM_DEZENAS_TOTAL))
+        self._segmentos = [shm_dezenas, shm_incidencia]
+        np.ndarray(dezenas.shape, dtype=np.uint8, buffer=shm_dezenas.buf)[:] = dezenas
+        incidencia = np.ndarray((num_sorteios, NUM_DEZENAS_TOTAL), dtype=bool, buffer=shm_incidencia.buf)
+        for inicio in range(0, num_sorteios, SIMULACAO_BLOCO):
+            incidencia[inicio:inicio + SIMULACAO_BLOCO] = dezenas_para_incidencia(dezenas[inicio:inicio + SIMULACAO_BLOCO])
+        self.handle = HandleHistorico(num_sorteios, shm_dezenas.name, shm_incidencia.name)
+
+    @property
+    def num_sorteios(self):
+        return self.handle.num_sorteios
+
+    def fechar(self):
+        _historicos_anexados.pop(self.handle.chave(), None)
+        for segmento in self._segmentos:
+            segmento.close()
+            segmento.unlink()
+        self._segmentos = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.fechar()
+
+def _dividir_em_tarefas(num_sorteios, workers):
+    tamanho = max(PARALELO_BLOCO_MIN, -(-num_sorteios // (workers * 4)))
+    return [(inicio, min(inicio + tamanho, num_sorteios)) for inicio in range(0, num_sorteios, tamanho)]
+
+def _mapear_em_processos(tarefa, lista_argumentos, workers, executor=None):
+    """Executa tarefa(*argumentos) para cada item, em processos quando há mais de um worker e de uma tarefa."""
+    if workers == 1 or len(lista_argumentos) <= 1:
+        return [tarefa(*argumentos) for argumentos in lista_argumentos]
+    executor_local = executor is None
+    executor = executor or ProcessPoolExecutor(max_workers=workers)
+    try:
+        futuros = [executor.submit(tarefa, *argumentos) for argumentos in lista_argumentos]
+        return [futuro.result() for futuro in futuros]
+    finally:
+        if executor_local:
+            executor.shutdown()
+
+def _executar_paralelo(compartilhado, tarefa, argumentos_extras=(), workers=None, executor=None):
+    """Distribui 'tarefa' pelos blocos do histórico e devolve a soma dos resultados parciais."""
+    workers = workers or os.cpu_count() or 1
+    intervalos = _dividir_em_tarefas(compartilhado.num_sorteios, workers)
+    parciais = _mapear_em_processos(tarefa, [(compartilhado.handle, i, f, *argumentos_extras) for i, f in intervalos], workers, executor)
+    return sum(parciais[1:], parciais[0]) if parciais else None
+
+def frequencias_paralelas(compartilhado, workers=None, executor=None):
+    """Frequência de cada dezena (Counter, como em analisar_frequencia_lotomania) usando todos os núcleos."""
+    contagens = _executar_paralelo(compartilhado, _tarefa_frequencia, workers=workers, executor=executor)
+    if contagens is None:
+        contagens = np.zeros(NUM_DEZENAS_TOTAL, dtype=np.int64)
+    return Counter({num: int(contagens[num]) for num in range(NUM_DEZENAS_TOTAL)})
+
+def coocorrencia_paralela(compartilhado, workers=None, executor=None):
+    """Matriz (100, 100) com quantas vezes cada par de dezenas saiu junto (diagonal = frequência)."""
+    matriz = _executar_paralelo(compartilhado, _tarefa_coocorrencia, workers=workers, executor=executor)
+    return matriz if matriz is not None else np.zeros((NUM_DEZENAS_TOTAL, NUM_DEZENAS_TOTAL), dtype=np.int64)
+
+def backtest_paralelo(compartilhado, jogos, workers=None, executor=None):
+    """
+    Confronta cada jogo com todos os sorteios do histórico.
+    Retorna um array (num_jogos, 21): [j, k] = em quantos sorteios o jogo j teve k acertos.
+    """
+    jogos_incidencia = dezenas_para_incidencia(np.asarray(jogos)).astype(np.float32)
+    histograma = _executar_paralelo(compartilhado, _tarefa_backtest, (jogos_incidencia,), workers=workers, executor=executor)
+    return histograma if histograma is not None else np.zeros((len(jogos), NUM_DEZENAS_SORTEADAS + 1), dtype=np.int64)
+
+# --- Simulação Monte Carlo Paralela de Estratégias ---
+# Os sorteios simulados são divididos em tarefas de tamanho fixo, cada uma com a sua semente derivada
+# (SeedSequence.spawn): o resultado depende só da semente e do número de sorteios, não de quantos
+# processos executaram as tarefas. Cada tarefa devolve o histograma (jogos, 21) de acertos, calculado
+# pelo popcount das máscaras, e os histogramas são somados. Num sorteio justo, qualquer jogo de 50
+# dezenas acerta segundo a hipergeométrica; o desvio de cada faixa é medido em erros padrão exatos da
+# carteira (os jogos de um mesmo sorteio não são independentes).
+SIMULACAO_TAREFA = 250_000 # Sorteios por tarefa enviada a um processo
+ESTRATEGIAS = ("aleatorio", "frequencia", "transicao", "ia")
+
+def jogos_da_estrategia(estrategia, historico_dezenas_list, num_jogos):
+    """Gera num_jogos jogos com uma das ESTRATEGIAS de geração, treinada no histórico dado."""
+    if estrategia == "aleatorio":
+        return gerar_aleatorio_lotomania(num_jogos)
+    if estrategia == "frequencia":
+        return gerar_baseado_em_frequencia_lotomania(analisar_frequencia_lotomania(historico_dezenas_list)[0], num_jogos)
+    if estrategia == "transicao":
+        return gerar_por_transicao_lotomania(ModeloTransicao.do_historico(historico_dezenas_list), num_jogos)
+    if estrategia == "ia":
+        return gerar_por_modelo_ia_lotomania(ModeloLogisticoLotomania.carregar_ou_treinar(historico_dezenas_list), num_jogos)
+    raise ValueError(f"Estratégia desconhecida: {estrategia}. Use uma de {ESTRATEGIAS}.")
+
+def _tarefa_simulacao(mascaras_jogos, num_sorteios, semente, vies=None, bloco=SIMULACAO_BLOCO):
+    largura = NUM_DEZENAS_SORTEADAS + 1
+    deslocamento = np.arange(len(mascaras_jogos))[:, None] * largura # Um histograma por jogo num só bincount
+    histograma = np.zeros(len(mascaras_jogos) * largura, dtype=np.int64)
+    for sorteios in iterar_sorteios_simulados(num_sorteios, semente, vies, bloco):
+        acertos = acertos_por_mascara(mascaras_jogos, dezenas_para_mascara(sorteios))
+        histograma += np.bincount((acertos + deslocamento).ravel(), minlength=len(histograma))
+    return histograma.reshape(len(mascaras_jogos), largura)
+
+@perfilado
+def simular_estrategia_paralela(jogos, num_sorteios, semente=None, workers=None, executor=None, vies=None):
+    """
+    Confronta os jogos com num_sorteios sorteios simulados, repartidos entre processos. Retorna o
+    histograma (jogos, 21) de acertos, a distribuição observada e a teórica (hipergeométrica) por número
+    de acertos, o erro padrão e o desvio (z) de cada faixa e a vazão (sorteios e acertos por segundo).
+    vies simula sorteios viciados (ver simular_historico_lotomania), e aí a teoria deixa de valer.
+    """
+    jogos = _validar_carteira(jogos)
+    if num_sorteios < 1:
+        raise ValueError("Simule pelo menos um sorteio.")
+    mascaras = jogos_para_mascara(jogos)
+    workers = workers or os.cpu_count() or 1
+    tamanhos = [min(SIMULACAO_TAREFA, num_sorteios - inicio) for inicio in range(0, num_sorteios, SIMULACAO_TAREFA)]
+    sementes = np.random.SeedSequence(semente).spawn(len(tamanhos))
+
+    inicio = time.perf_counter()
+    parciais = _mapear_em_processos(_tarefa_simulacao, [(mascaras, n, s, vies) for n, s in zip(tamanhos, sementes)], workers, executor)
+    duracao = time.perf_counter() - inicio
+    histograma = sum(parciais[1:], parciais[0])
+    TELEMETRIA.incrementar('simulacao_sorteios', num_sorteios)
+    TELEMETRIA.registrar_tempo('simulacao_paralela', duracao, workers=workers)
+
+    total = histograma.sum()
+    observada = histograma.sum(axis=0) / total
+    pares = _acertos_de_dois_jogos()
+    teorica = pares[0].sum(axis=1)
+    # Erro padrão da fração de bilhetes com a acertos: variância exata, por sorteio, da contagem da carteira
+    sobreposicoes = acertos_por_mascara(mascaras, mascaras)
+    variancias = np.array([_momentos_carteira(sobreposicoes, np.eye(NUM_DEZENAS_SORTEADAS + 1)[a])[1] for a in range(NUM_DEZENAS_SORTEADAS + 1)])
+    erro_padrao = np.sqrt(variancias / num_sorteios) / len(jogos)
+    z = np.divide(observada - teorica, erro_padrao, out=np.zeros_like(observada), where=erro_padrao > 0)
+    confiavel = teorica * total >= 10 # Com poucas ocorrências esperadas a aproximação normal do z não vale
+    return {
+        'num_jogos': len(jogos),
+        'num_sorteios': num_sorteios,
+        'histograma': histograma,
+        'observada': observada,
+        'teorica': teorica,
+        'erro_padrao': erro_padrao,
+        'z': z,
+        'max_z': float(np.abs(z[confiavel]).max()) if confiavel.any() else 0.0,
+        'workers': workers,
+        'tarefas': len(tamanhos),
+        'tempo': duracao,
+        'sorteios_por_segundo': num_sorteios / duracao if duracao > 0 else None,
+        'acertos_por_segundo': num_sorteios * len(jogos) / duracao if duracao > 0 else None,
+    }
+
+def resumo_simulacao(resultado):
+    """Tabela em texto das faixas premiadas (observada x teórica) e da vazão de uma simulação."""
+    linhas = [
+        f"{resultado['num_jogos']} jogo(s) x {resultado['num_sorteios']:,} sorteios simulados em {resultado['tempo']:.2f} s "
+        f"com {resultado['workers']} processo(s) e {resultado['tarefas']} tarefa(s)",
+        f"Vazão: {resultado['sorteios_por_segundo']:,.0f} sorteios/s, {resultado['acertos_por_segundo']:,.0f} jogos conferidos/s",
+        "",
+        "Acertos |  Observada (1 em X) |   Teórica (1 em X) |      z",
+    ]
+    for faixa in sorted(FAIXAS_PREMIADAS, reverse=True):
+        observada, teorica = resultado['observada'][faixa], resultado['teorica'][faixa]
+        texto_observada = f"{1 / observada:>18,.0f}" if observada > 0 else f"{'não ocorreu':>18}"
+        linhas.append(f"{faixa:^7d} | {texto_observada} | {1 / teorica:>18,.0f} | {resultado['z'][faixa]:>+6.2f}")
+    linhas.append("")
+    linhas.append(f"Maior desvio (faixas com 10+ ocorrências esperadas): {resultado['max_z']:.2f} erros padrão"
+                  + (" (compatível com a teoria)" if resultado['max_z'] < 4 else " (ATENÇÃO: longe da teoria)"))
+    return "\n".join(linhas)
@@ -0,0 +1,217 @@
+"""Configurações do usuário, predefinições de critérios e sugestões do histórico."""
+import json
+import logging
+import math
+import os
+import threading
+
+from .constantes import CONFIG_FILE, NUM_DEZENAS_POR_APOSTA, NUM_DEZENAS_SORTEADAS, NUM_DEZENAS_TOTAL
+from .dezenas import NUM_MIOLO, NUM_MOLDURA, NUM_PRIMOS
+from .analise import CRITERIOS_VOLANTE, _ESCALA_STD_APOSTA, sugerir_criterios_volante
+from .geracao import PipelineGeracao, etapas_criterios
+
+__all__ = [
+    'CONFIG_VERSAO', 'PREDEFINICAO_AMOSTRAS', 'CRITERIOS_BALANCEADOS_PADRAO', 'sugerir_criterios_balanceados',
+    'verificar_criterios', 'avaliar_criterios', 'avaliacao_do_relatorio', 'resumo_avaliacao_criterios',
+    'ConfiguracaoUsuario',
+]
+
+logger = logging.getLogger(__name__)
+
+# --- Configurações do Usuário e Predefinições de Critérios ---
+# Um arquivo JSON pequeno guarda as últimas escolhas da geração balanceada, as predefinições de
+# critérios com nome (cada uma com a viabilidade e a taxa de aceitação medidas ao salvar) e as
+# sugestões do histórico, marcadas com a impressão digital dos sorteios de onde saíram.
+CONFIG_VERSAO = 1
+PREDEFINICAO_AMOSTRAS = 200_000 # Candidatos sorteados para medir a taxa de aceitação de uma predefinição
+
+# Valores iniciais da janela de geração balanceada; os limites do volante com None ficam desativados
+CRITERIOS_BALANCEADOS_PADRAO = {
+    'soma_min': 2000, 'soma_max': 3000,
+    'pares_min': 20, 'pares_max': 30,
+    'impares_min': 20, 'impares_max': 30,
+    'moldura_min': 12, 'moldura_max': 22,
+    'miolo_min': 28, 'miolo_max': 38,
+    'max_consecutivos': 3,
+    'primos_min': 10, 'primos_max': 18,
+    **{f"{prefixo}_{limite}": None for prefixo, *_ in CRITERIOS_VOLANTE for limite in ('min', 'max')},
+}
+
+def sugerir_criterios_balanceados(estatisticas, analise_volante=None, desvios_soma=2.0, desvios=1.0):
+    """
+    Critérios para uma aposta de 50 dezenas a partir de calcular_estatisticas_historicas_lotomania (sorteios
+    de 20): como em sugerir_criterios_volante, a média é escalada por 50/20 e o desvio pela razão
+    hipergeométrica, e o intervalo é média ± desvios * std (soma: desvios_soma).
+    """
+    escala = NUM_DEZENAS_POR_APOSTA / NUM_DEZENAS_SORTEADAS
+    limites = {'soma': (4950, desvios_soma), 'pares': (50, desvios), 'impares': (50, desvios),
+               'moldura': (NUM_MOLDURA, desvios), 'miolo': (NUM_MIOLO, desvios), 'primos': (NUM_PRIMOS, desvios)}
+    criterios = dict(CRITERIOS_BALANCEADOS_PADRAO)
+    for nome, (teto, k) in limites.items():
+        media = estatisticas[f'{nome}_media'] * escala
+        margem = k * estatisticas[f'{nome}_std'] * _ESCALA_STD_APOSTA
+        criterios[f'{nome}_min'] = max(0, int(media - margem))
+        criterios[f'{nome}_max'] = min(teto, int(math.ceil(media + margem)))
+    criterios['max_consecutivos'] = 3
+    criterios.update(sugerir_criterios_volante(analise_volante or {}))
+    return criterios
+
+def verificar_criterios(criterios):
+    """
+    Motivos pelos quais nenhum jogo de 50 dezenas atende aos critérios (lista vazia se nenhum limite
+    é impossível por si só). São condições necessárias: combinações de limites ainda podem não ter
+    jogos, o que a taxa de aceitação medida revela.
+    """
+    motivos = []
+    for nome in ('soma', 'pares', 'impares', 'moldura', 'miolo', 'primos'):
+        if criterios[f'{nome}_min'] > criterios[f'{nome}_max']:
+            motivos.append(f"{nome}: mínimo {criterios[f'{nome}_min']} maior que o máximo {criterios[f'{nome}_max']}")
+    soma_menor = sum(range(NUM_DEZENAS_POR_APOSTA))
+    soma_maior = sum(range(NUM_DEZENAS_TOTAL - NUM_DEZENAS_POR_APOSTA, NUM_DEZENAS_TOTAL))
+    if criterios['soma_max'] < soma_menor or criterios['soma_min'] > soma_maior:
+        motivos.append(f"soma: um jogo de {NUM_DEZENAS_POR_APOSTA} dezenas soma de {soma_menor} a {soma_maior}")
+    for nome, complemento, total in (('pares', 'impares', 50), ('moldura', 'miolo', NUM_MOLDURA)):
+        menor = max(criterios[f'{nome}_min'], NUM_DEZENAS_POR_APOSTA - criterios[f'{complemento}_max'], 0)
+        maior = min(criterios[f'{nome}_max'], NUM_DEZENAS_POR_APOSTA - criterios[f'{complemento}_min'], total)
+        if menor > maior:
+            motivos.append(f"{nome}/{complemento}: nenhuma divisão das {NUM_DEZENAS_POR_APOSTA} dezenas atende aos dois intervalos")
+    if criterios['primos_min'] > NUM_PRIMOS:
+        motivos.append(f"primos: só há {NUM_PRIMOS} primos entre 00 e 99")
+    limite = criterios.get('max_consecutivos')
+    # Sequências de no máximo 'limite' dezenas separadas por uma lacuna cobrem no máximo 100 - 100 // (limite + 1) dezenas
+    if limite is not None and NUM_DEZENAS_TOTAL - NUM_DEZENAS_TOTAL // (limite + 1) < NUM_DEZENAS_POR_APOSTA:
+        motivos.append(f"consecutivos: com no máximo {limite} seguidas não cabem {NUM_DEZENAS_POR_APOSTA} dezenas")
+    for prefixo, _, mascaras, tamanho in CRITERIOS_VOLANTE:
+        minimo, maximo = criterios.get(f'{prefixo}_min'), criterios.get(f'{prefixo}_max')
+        minimo = 0 if minimo is None else minimo
+        maximo = tamanho if maximo is None else maximo
+        particao = sum(m.bit_count() for m in mascaras) == NUM_DEZENAS_TOTAL # Linhas, colunas e quadrantes cobrem o volante
+        if minimo > maximo:
+            motivos.append(f"por {prefixo}: mínimo {minimo} maior que o máximo {maximo}")
+        elif particao and not len(mascaras) * minimo <= NUM_DEZENAS_POR_APOSTA <= len(mascaras) * maximo:
+            motivos.append(f"por {prefixo}: {len(mascaras)} grupos com {minimo} a {maximo} dezenas não somam {NUM_DEZENAS_POR_APOSTA}")
+    return motivos
+
+def avaliar_criterios(criterios, amostras=PREDEFINICAO_AMOSTRAS, semente=0):
+    """
+    Viabilidade e taxa de aceitação dos critérios entre jogos uniformes: {'viavel' (None se nenhum dos
+    'amostras' candidatos passou, embora nenhum limite seja impossível), 'motivos', 'taxa_aceitacao',
+    'amostras', 'etapas': [{'etapa', 'taxa_rejeicao'}]}.
+    """
+    motivos = verificar_criterios(criterios)
+    if motivos:
+        return {'viavel': False, 'motivos': motivos, 'taxa_aceitacao': 0.0, 'amostras': 0, 'etapas': []}
+    taxa, contagens = PipelineGeracao(validadores=etapas_criterios(criterios), semente=semente).medir(amostras)
+    etapas = [{'etapa': c['etapa'], 'taxa_rejeicao': c['rejeitados'] / c['entrada'] if c['entrada'] else 0.0} for c in contagens]
+    return {'viavel': True if taxa > 0 else None, 'motivos': [], 'taxa_aceitacao': taxa, 'amostras': amostras, 'etapas': etapas}
+
+def avaliacao_do_relatorio(relatorio):
+    """
+    Avaliação no formato de avaliar_criterios com a aceitação observada numa geração (PipelineGeracao.gerar).
+    A taxa usa os aprovados pelas etapas vetorizadas, não os aceitos, que param em num_jogos.
+    """
+    candidatos = relatorio['candidatos']
+    etapas = [{'etapa': e['etapa'], 'taxa_rejeicao': e['rejeitados'] / e['entrada'] if e['entrada'] else 0.0} for e in relatorio['etapas']]
+    return {'viavel': True if relatorio['aprovados'] else None, 'motivos': [], 'taxa_aceitacao': relatorio['aprovados'] / max(candidatos, 1),
+            'amostras': candidatos, 'etapas': etapas}
+
+def resumo_avaliacao_criterios(avaliacao):
+    """Uma linha com a viabilidade e a aceitação de avaliar_criterios."""
+    if avaliacao['viavel'] is False:
+        return "Inviável: " + "; ".join(avaliacao['motivos'])
+    if avaliacao['viavel'] is None:
+        return f"Nenhum de {avaliacao['amostras']} candidatos aceito: aceitação abaixo de {1 / avaliacao['amostras']:.1e}"
+    taxa = avaliacao['taxa_aceitacao']
+    mais_restritiva = max(avaliacao['etapas'], key=lambda e: e['taxa_rejeicao'], default=None)
+    texto = f"Viável: aceitação {taxa:.2%} (~{math.ceil(1 / taxa)} candidatos por jogo)"
+    if mais_restritiva and mais_restritiva['taxa_rejeicao'] > 0:
+        texto += f"; mais restritivo: {mais_restritiva['etapa']} ({mais_restritiva['taxa_rejeicao']:.0%} rejeitados)"
+    return texto
+
+class ConfiguracaoUsuario:
+    """
+    Últimas configurações, predefinições de critérios e sugestões do histórico, em memória e em CONFIG_FILE.
+    Cada alteração regrava o arquivo inteiro (ele tem poucos KB) por um temporário e os.replace.
+    """
+    def __init__(self, caminho=CONFIG_FILE):
+        self.caminho = caminho
+        self._lock = threading.Lock()
+        self._dados = {'versao': CONFIG_VERSAO, 'ultimas': {}, 'predefinicoes': {}, 'sugestoes': None}
+        if caminho and os.path.exists(caminho):
+            try:
+                with open(caminho, 'r', encoding='utf-8') as f:
+                    dados = json.load(f)
+                if dados.get('versao') == CONFIG_VERSAO:
+                    self._dados.update(dados)
+            except (ValueError, OSError) as e:
+                logger.warning(f"Erro ao ler as configurações {caminho}: {e}. Usando os valores padrão.")
+
+    def _salvar(self):
+        if not self.caminho:
+            return
+        temporario = f"{self.caminho}.tmp"
+        try:
+            with open(temporario, 'w', encoding='utf-8') as f:
+                json.dump(self._dados, f, ensure_ascii=False, indent=1)
+            os.replace(temporario, self.caminho)
+        except OSError as e:
+            logger.warning(f"Erro ao salvar as configurações {self.caminho}: {e}")
+
+    def ultimas(self):
+        """Últimas escolhas salvas com guardar_ultimas ({} se nenhuma)."""
+        return dict(self._dados['ultimas'])
+
+    def guardar_ultimas(self, **valores):
+        with self._lock:
+            self._dados['ultimas'].update(valores)
+            self._salvar()
+
+    def nomes_predefinicoes(self):
+        return sorted(self._dados['predefinicoes'])
+
+    def predefinicao(self, nome):
+        """{'criterios', 'avaliacao'} da predefinição, ou None."""
+        return self._dados['predefinicoes'].get(nome)
+
+    def salvar_predefinicao(self, nome, criterios, avaliacao=None):
+        """Guarda os critérios com a sua avaliação (avaliar_criterios, calculada aqui se não vier pronta)."""
+        criterios = {**CRITERIOS_BALANCEADOS_PADRAO, **criterios}
+        if avaliacao is None:
+            avaliacao = avaliar_criterios(criterios)
+        with self._lock:
+            self._dados['predefinicoes'][nome] = {'criterios': criterios, 'avaliacao': avaliacao}
+            self._salvar()
+        return avaliacao
+
+    def remover_predefinicao(self, nome):
+        with self._lock:
+            if self._dados['predefinicoes'].pop(nome, None) is not None:
+                self._salvar()
+
+    def taxa_aceitacao(self, criterios):
+        """Taxa de aceitação já medida para estes critérios (predefinição, sugestões ou última geração), ou None."""
+        criterios = {**CRITERIOS_BALANCEADOS_PADRAO, **criterios}
+        registros = list(self._dados['predefinicoes'].values()) + [self._dados['sugestoes'], self._dados['ultimas']]
+        for registro in registros:
+            if registro and registro.get('avaliacao') and {**CRITERIOS_BALANCEADOS_PADRAO, **registro.get('criterios', {})} == criterios:
+                return registro['avaliacao']['taxa_aceitacao'] or None
+        return None
+
+    def sugestoes(self, impressao=None):
+        """{'impressao', 'num_sorteios', 'criterios', 'avaliacao'} guardadas; com 'impressao', só se forem desse histórico."""
+        sugestoes = self._dados['sugestoes']
+        if sugestoes is None or (impressao is not None and sugestoes['impressao'] != impressao):
+            return None
+        return sugestoes
+
+    def atualizar_sugestoes(self, impressao, num_sorteios, estatisticas, analise_volante):
+        """Recalcula e guarda as sugestões e a sua avaliação, a menos que já sejam deste histórico."""
+        atuais = self.sugestoes(impressao)
+        if atuais is not None:
+            return atuais
+        criterios = sugerir_criterios_balanceados(estatisticas, analise_volante)
+        sugestoes = {'impressao': impressao, 'num_sorteios': num_sorteios, 'criterios': criterios, 'avaliacao': avaliar_criterios(criterios)}
+        with self._lock:
+            self._dados['sugestoes'] = sugestoes
+            self._salvar()
+        return sugestoes
@@ -0,0 +1,474 @@
+"""Acesso à API de resultados (com cache em disco), reparo de lacunas e atualização do histórico."""
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import numpy as np
+import requests
+
+from .constantes import (
+    API_BASE_URL, API_CACHE_DIR, API_CACHE_MAX_BYTES, API_LATEST_TTL, FALHAS_DOWNLOAD_FILE, HTTP_TENTATIVAS,
+    HTTP_TIMEOUT, NUM_DEZENAS_SORTEADAS, REPARO_WORKERS
+)
+from .eventos import ErroRede, EventoProgresso
+from .telemetria import TELEMETRIA
+
+__all__ = [
+    'requisitar_api', 'buscar_json_api', 'extrair_dezenas_api', 'CacheAPILotomania', 'detectar_lacunas_historico',
+    'RegistroFalhasDownload', 'reparar_lacunas_historico', 'atualizar_historico',
+]
+
+logger = logging.getLogger(__name__)
+
+# --- Acesso à API de Resultados (com Cache em Disco) ---
+
+def requisitar_api(url, nome_metrica='download_concurso', tentativas=HTTP_TENTATIVAS, cabecalhos=None, **rotulos):
+    """
+    GET com novas tentativas para a API de resultados. Retorna o objeto Response.
+    Propaga a última requests.exceptions.RequestException se todas as tentativas falharem.
+    """
+    for tentativa in range(tentativas):
+        try:
+            with TELEMETRIA.cronometro(nome_metrica, **rotulos):
+                response = requests.get(url, timeout=HTTP_TIMEOUT, headers=cabecalhos)
+                response.raise_for_status()
+            return response
+        except requests.exceptions.RequestException:
+            TELEMETRIA.incrementar('http_erros')
+            if tentativa == tentativas - 1:
+                raise
+            TELEMETRIA.incrementar('http_retentativas')
+            time.sleep(0.5 * (2 ** tentativa)) # Espera exponencial entre tentativas
+
+def buscar_json_api(url, nome_metrica='download_concurso', tentativas=HTTP_TENTATIVAS, **rotulos):
+    """
+    GET com novas tentativas para a API de resultados. Retorna o JSON decodificado.
+    Propaga a última requests.exceptions.RequestException (ou json.JSONDecodeError) se todas falharem.
+    """
+    response = requisitar_api(url, nome_metrica, tentativas, **rotulos)
+    with TELEMETRIA.cronometro('parse_json'):
+        return response.json()
+
+def extrair_dezenas_api(data):
+    """Retorna as 20 dezenas ordenadas de uma resposta da API, ou None se a resposta estiver incompleta."""
+    if not isinstance(data, dict) or 'dezenas' not in data or len(data['dezenas']) != NUM_DEZENAS_SORTEADAS:
+        return None
+    # As dezenas da API podem vir como strings, converte para int e ordena
+    return sorted([int(d) for d in data['dezenas']])
+
+class CacheAPILotomania:
+    """
+    Cache em disco das respostas da API, um arquivo por concurso (concursos passados nunca mudam).
+    Cada entrada guarda o payload bruto, seu SHA-256 e metadados (data, premiações, acumulou).
+    Entradas cujo hash não confere são descartadas e baixadas de novo. O tamanho total é limitado
+    a max_bytes removendo as entradas acessadas há mais tempo.
+    """
+    VERSAO = 1
+    CHAVE_LATEST = "latest"
+
+    def __init__(self, diretorio=API_CACHE_DIR, max_bytes=API_CACHE_MAX_BYTES):
+        self.diretorio = diretorio
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._tamanhos = None # {chave: bytes}, carregado sob demanda
+
+    def _caminho(self, chave):
+        return os.path.join(self.diretorio, f"{chave}.json")
+
+    def _indice(self):
+        if self._tamanhos is None:
+            self._tamanhos = {}
+            if os.path.isdir(self.diretorio):
+                for nome in os.listdir(self.diretorio):
+                    chave, ext = os.path.splitext(nome)
+                    if ext == ".json":
+                        self._tamanhos[chave] = os.path.getsize(os.path.join(self.diretorio, nome))
+        return self._tamanhos
+
+    def _ler_entrada(self, chave):
+        caminho = self._caminho(chave)
+        try:
+            with open(caminho, 'r', encoding='utf-8') as f:
+                entrada = json.load(f)
+            payload = entrada['payload']
+            if hashlib.sha256(payload.encode('utf-8')).hexdigest() != entrada['sha256']:
+                raise ValueError("hash divergente")
+        except FileNotFoundError:
+            return None
+        except (ValueError, KeyError, TypeError, AttributeError) as e: # JSONDecodeError é um ValueError
+            logger.warning(f"Entrada de cache inválida para {chave} ({e}). Será baixada novamente.")
+            TELEMETRIA.incrementar('cache_corrompido')
+            self.remover(chave)
+            return None
+        os.utime(caminho) # Marca o acesso para a política de remoção (LRU)
+        return entrada
+
+    def _gravar_entrada(self, chave, texto, cabecalhos=None, metadados=None):
+        os.makedirs(self.diretorio, exist_ok=True)
+        cabecalhos = cabecalhos or {}
+        entrada = {
+            'versao': self.VERSAO,
+            'chave': str(chave),
+            'obtido_em': time.strftime("%Y-%m-%dT%H:%M:%S"),
+            'etag': cabecalhos.get('ETag'),
+            'last_modified': cabecalhos.get('Last-Modified'),
+            'sha256': hashlib.sha256(texto.encode('utf-8')).hexdigest(),
+            'metadados': metadados or {},
+            'payload': texto,
+        }
+        caminho = self._caminho(chave)
+        tmp = f"{caminho}.{threading.get_ident()}.tmp"
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump(entrada, f, ensure_ascii=False)
+        os.replace(tmp, caminho)
+        with self._lock:
+            self._indice()[str(chave)] = os.path.getsize(caminho)
+        self._aplicar_limite()
+
+    @staticmethod
+    def _idade(entrada):
+        """Segundos desde que a entrada foi obtida da API ('obtido_em'; o mtime só marca o último acesso)."""
+        try:
+            return time.time() - time.mktime(time.strptime(entrada['obtido_em'], "%Y-%m-%dT%H:%M:%S"))
+        except (KeyError, TypeError, ValueError):
+            return float('inf') # Sem data legível: tratada como expirada
+
+    @staticmethod
+    def _metadados_do_payload(data):
+        return {campo: data.get(campo) for campo in ('concurso', 'data', 'acumulou', 'premiacoes', 'proximoConcurso', 'dataProximoConcurso') if campo in data}
+
+    def obter(self, concurso):
+        """Payload decodificado do concurso em cache, ou None se ausente/inválido."""
+        entrada = self._ler_entrada(int(concurso))
+        if entrada is None:
+            TELEMETRIA.incrementar('cache_falhas')
+            return None
+        TELEMETRIA.incrementar('cache_acertos')
+        return json.loads(entrada['payload'])
+
+    def metadados(self, concurso):
+        """Metadados (data, premiações, acumulou...) do concurso em cache, ou None."""
+        entrada = self._ler_entrada(int(concurso))
+        return entrada['metadados'] if entrada else None
+
+    def guardar(self, concurso, texto, cabecalhos=None):
+        """Guarda o payload bruto de um concurso. Respostas sem as 20 dezenas não são guardadas."""
+        data = json.loads(texto)
+        if extrair_dezenas_api(data) is None:
+            return False
+        self._gravar_entrada(int(concurso), texto, cabecalhos, self._metadados_do_payload(data))
+        return True
+
+    def remover(self, chave):
+        with self._lock:
+            self._indice().pop(str(chave), None)
+        try:
+            os.remove(self._caminho(chave))
+        except FileNotFoundError:
+            pass
+
+    def concursos(self):
+        """Números dos concursos presentes no cache, em ordem."""
+        with self._lock:
+            return sorted(int(c) for c in self._indice() if c.isdigit())
+
+    def tamanho_total(self):
+        with self._lock:
+            return sum(self._indice().values())
+
+    def _aplicar_limite(self):
+        with self._lock:
+            indice = self._indice()
+            total = sum(indice.values())
+            if total <= self.max_bytes:
+                return
+            por_acesso = sorted(indice, key=lambda c: os.path.getmtime(self._caminho(c)) if os.path.exists(self._caminho(c)) else 0)
+            removidas = []
+            for chave in por_acesso:
+                if total <= self.max_bytes:
+                    break
+                total -= indice.pop(chave)
+                removidas.append(chave)
+        for chave in removidas:
+            try:
+                os.remove(self._caminho(chave))
+            except FileNotFoundError:
+                pass
+        TELEMETRIA.incrementar('cache_removidas', len(removidas))
+
+    def baixar_concurso(self, concurso):
+        """Baixa o concurso da API (sem consultar o cache), guarda se válido e retorna o JSON."""
+        response = requisitar_api(f"{API_BASE_URL}/{concurso}", concurso=concurso)
+        with TELEMETRIA.cronometro('parse_json'):
+            data = response.json()
+        if extrair_dezenas_api(data) is not None:
+            self._gravar_entrada(int(concurso), response.text, response.headers, self._metadados_do_payload(data))
+        return data
+
+    def buscar_concurso(self, concurso):
+        """Concurso do cache; se ausente ou corrompido, baixa da API."""
+        data = self.obter(concurso)
+        return data if data is not None else self.baixar_concurso(concurso)
+
+    def buscar_latest(self, ttl=API_LATEST_TTL):
+        """
+        Resultado mais recente. Dentro do TTL usa a cópia local sem rede; depois faz um GET
+        condicional (If-None-Match / If-Modified-Since) e reaproveita a cópia em caso de 304.
+        """
+        entrada = self._ler_entrada(self.CHAVE_LATEST)
+        cabecalhos = {}
+        if entrada:
+            if self._idade(entrada) < ttl:
+                TELEMETRIA.incrementar('cache_acertos')
+                return json.loads(entrada['payload'])
+            if entrada.get('etag'):
+                cabecalhos['If-None-Match'] = entrada['etag']
+            if entrada.get('last_modified'):
+                cabecalhos['If-Modified-Since'] = entrada['last_modified']
+
+        response = requisitar_api(f"{API_BASE_URL}/latest", 'download_latest', cabecalhos=cabecalhos or None)
+        if response.status_code == 304 and entrada:
+            TELEMETRIA.incrementar('http_nao_modificado')
+            # Renova o TTL: regrava a mesma resposta com um novo 'obtido_em'
+            self._gravar_entrada(self.CHAVE_LATEST, entrada['payload'],
+                                 {'ETag': entrada.get('etag'), 'Last-Modified': entrada.get('last_modified')}, entrada.get('metadados'))
+            return json.loads(entrada['payload'])
+
+        with TELEMETRIA.cronometro('parse_json'):
+            data = response.json()
+        metadados = self._metadados_do_payload(data)
+        self._gravar_entrada(self.CHAVE_LATEST, response.text, response.headers, metadados)
+        if 'concurso' in data and extrair_dezenas_api(data) is not None:
+            self._gravar_entrada(int(data['concurso']), response.text, response.headers, metadados)
+        return data
+
+    def reconstruir_historico(self):
+        """Monta {concurso: dezenas} só com o que está no cache (reconstrução offline)."""
+        historico_map = {}
+        for concurso in self.concursos():
+            dezenas = extrair_dezenas_api(self.obter(concurso))
+            if dezenas:
+                historico_map[concurso] = dezenas
+        return historico_map
+
+# --- Detecção e Reparo de Lacunas do Histórico ---
+
+def detectar_lacunas_historico(historico_map, ultimo_concurso=None):
+    """
+    Retorna, em ordem, os concursos de 1 até ultimo_concurso (padrão: o maior do histórico)
+    ausentes do histórico. Uma única passada O(N) sobre um vetor de presença indexado pelo concurso.
+    """
+    if ultimo_concurso is None:
+        ultimo_concurso = max(historico_map.keys(), default=0)
+    if ultimo_concurso <= 0:
+        return []
+    presentes = np.zeros(ultimo_concurso + 1, dtype=bool)
+    concursos = np.fromiter((c for c in historico_map if 0 < c <= ultimo_concurso), dtype=np.int64)
+    presentes[concursos] = True
+    presentes[0] = True # Não existe concurso 0
+    return np.flatnonzero(~presentes).tolist()
+
+class RegistroFalhasDownload:
+    """Registro persistente (JSON) dos concursos cujo download falhou: tentativas, último erro e data."""
+    def __init__(self, caminho=FALHAS_DOWNLOAD_FILE):
+        self.caminho = caminho
+        self._lock = threading.Lock()
+        self.falhas = {}
+        if os.path.exists(caminho):
+            try:
+                with open(caminho, 'r', encoding='utf-8') as f:
+                    self.falhas = {int(k): v for k, v in json.load(f).items()}
+            except (ValueError, OSError) as e:
+                logger.warning(f"Erro ao ler o registro de falhas {caminho}: {e}. Começando um registro novo.")
+
+    def registrar_falha(self, concurso, erro):
+        with self._lock:
+            registro = self.falhas.setdefault(int(concurso), {'tentativas': 0})
+            registro['tentativas'] += 1
+            registro['ultimo_erro'] = str(erro)[:300]
+            registro['ultima_tentativa'] = time.strftime("%Y-%m-%dT%H:%M:%S")
+
+    def registrar_sucesso(self, concurso):
+        with self._lock:
+            self.falhas.pop(int(concurso), None)
+
+    def salvar(self):
+        with self._lock:
+            dados = {str(k): v for k, v in sorted(self.falhas.items())}
+        try:
+            if not dados and not os.path.exists(self.caminho):
+                return
+            with open(self.caminho, 'w', encoding='utf-8') as f:
+                json.dump(dados, f, indent=4, ensure_ascii=False)
+        except OSError as e:
+            logger.warning(f"Erro ao salvar o registro de falhas {self.caminho}: {e}")
+
+def reparar_lacunas_historico(lacunas, cache_api, registro_falhas=None, max_workers=REPARO_WORKERS, progresso=None):
+    """
+    Busca apenas os concursos em 'lacunas', em paralelo (cada requisição já tem novas tentativas),
+    usando o cache da API quando possível. Retorna ({concurso: dezenas} recuperados, {concurso: erro}).
+    progresso(EventoProgresso('reparo', ...)) é chamado a cada concurso concluído.
+    """
+    recuperados, falhas = {}, {}
+
+    def buscar(concurso):
+        return extrair_dezenas_api(cache_api.buscar_concurso(concurso))
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futuros = {executor.submit(buscar, concurso): concurso for concurso in lacunas}
+        for concluidos, futuro in enumerate(as_completed(futuros), 1):
+            concurso = futuros[futuro]
+            if progresso:
+                progresso(EventoProgresso('reparo', concluidos, len(futuros), concurso=concurso))
+            try:
+                dezenas = futuro.result()
+                if dezenas is None:
+                    raise ValueError("dados incompletos ou inesperados")
+            except (requests.exceptions.RequestException, ValueError) as e: # JSONDecodeError é um ValueError
+                falhas[concurso] = e
+                if registro_falhas:
+                    registro_falhas.registrar_falha(concurso, e)
+                continue
+            recuperados[concurso] = dezenas
+            if registro_falhas:
+                registro_falhas.registrar_sucesso(concurso)
+
+    TELEMETRIA.incrementar('lacunas_reparadas', len(recuperados))
+    TELEMETRIA.incrementar('lacunas_com_falha', len(falhas))
+    logger.info(f"Reparo de lacunas: {len(recuperados)} recuperadas, {len(falhas)} ainda com falha.")
+    return recuperados, falhas
+
+# --- Atualização do Histórico ---
+
+def _ultimo_concurso_online(cache_api):
+    try:
+        return cache_api.buscar_latest()['concurso']
+    except requests.exceptions.RequestException as e:
+        logger.warning(f"Erro de conexão ao tentar buscar o último concurso online: {e}")
+        raise ErroRede('api_indisponivel', "Não foi possível buscar o último concurso online. Verifique sua conexão ou a disponibilidade da API.",
+                       erro=e) from e
+    except (ValueError, KeyError, TypeError) as e: # JSONDecodeError é um ValueError
+        logger.warning(f"Erro ao decodificar JSON do último concurso online: {e}")
+        raise ErroRede('resposta_invalida', "Formato de dados inesperado ao buscar o último concurso online.", erro=e) from e
+
+def atualizar_historico(historico_map, cache_api, registro_falhas, completo=False, progresso=None, stop_event=None):
+    """
+    Baixa os concursos posteriores ao último de historico_map (todos, com completo=True; os que já estão
+    no cache da API são lidos do disco) e repara as lacunas. Não altera historico_map nem grava o histórico.
+
+    Retorna {'historico_map', 'ultimo_online', 'baixados', 'recuperados', 'falhas', 'alterado', 'cancelado',
+    'offline', 'erro'}: 'alterado' indica que há concursos novos ou corrigidos a salvar. Se stop_event for
+    acionado, devolve o histórico local intacto ('cancelado' True, 'alterado' False); o download completo
+    nunca devolve menos concursos que o histórico local. progresso(EventoProgresso) recebe
+    um evento 'download' por concurso e 'reparo' por lacuna. Se o último concurso online não puder ser obtido,
+    levanta ErroRede ('api_indisponivel' ou 'resposta_invalida'); com completo=True, em vez disso, reconstrói
+    offline: historico_map completado com o cache da API, 'offline' True, 'erro' com o ErroRede (como_dict)
+    e os concursos vindos do cache em 'recuperados'.
+    """
+    historico_local = historico_map
+    historico_map = {} if completo else dict(historico_map)
+    inicio = max(historico_map) + 1 if historico_map else 1
+    if completo or inicio == 1:
+        logger.info("Forçando download completo ou nenhum histórico local. Baixando desde o concurso 1.")
+    else:
+        logger.info(f"Último concurso local: {inicio - 1}. Buscando a partir do concurso: {inicio}")
+
+    try:
+        ultimo_online = _ultimo_concurso_online(cache_api)
+    except ErroRede as e:
+        if not completo:
+            raise
+        # Reconstrução offline: o histórico local completado com o que estiver no cache da API
+        do_cache = cache_api.reconstruir_historico()
+        recuperados = sorted(c for c, dezenas in do_cache.items() if historico_local.get(c) != dezenas)
+        logger.warning(f"Sem acesso à API: {len(recuperados)} concurso(s) recuperado(s) do cache local.")
+        return {
+            'historico_map': {**historico_local, **do_cache},
+            'ultimo_online': None,
+            'baixados': [],
+            'recuperados': recuperados,
+            'falhas': {},
+            'alterado': bool(recuperados),
+            'cancelado': False,
+            'offline': True,
+            'erro': e.como_dict(),
+        }
+    logger.info(f"Concurso mais recente online: {ultimo_online}")
+
+    baixados, cancelado = [], False
+    total = max(ultimo_online - inicio + 1, 0)
+    for passo, concurso_num in enumerate(range(inicio, ultimo_online + 1), 1):
+        if stop_event is not None and stop_event.is_set():
+            cancelado = True
+            break
+        data = cache_api.obter(concurso_num) # Concursos passados não mudam: o cache dispensa a rede
+        if data is None:
+            try:
+                data = cache_api.baixar_concurso(concurso_num)
+            except requests.exceptions.RequestException as e:
+                logger.warning(f"Erro ao buscar concurso {concurso_num}: {e}. Tentando próximo.")
+                registro_falhas.registrar_falha(concurso_num, e)
+            except json.JSONDecodeError as e:
+                logger.warning(f"Erro ao decodificar JSON do concurso {concurso_num}: {e}. Pulando.")
+                registro_falhas.registrar_falha(concurso_num, e)
+            time.sleep(0.01) # Pequeno atraso para ser educado com a API e evitar bloqueios
+        if data is not None:
+            dezenas = extrair_dezenas_api(data)
+            if dezenas:
+                historico_map[concurso_num] = dezenas
+                baixados.append(concurso_num)
+                registro_falhas.registrar_sucesso(concurso_num)
+                TELEMETRIA.incrementar('concursos_baixados')
+            else:
+                logger.warning(f"Dados incompletos ou inesperados para o concurso {concurso_num}. Pulando.")
+                registro_falhas.registrar_falha(concurso_num, "dados incompletos ou inesperados")
+        if progresso:
+            progresso(EventoProgresso('download', passo, total, concurso=concurso_num))
+
+    if cancelado:
+        # Um mapa parcial (sobretudo no download completo, que parte do zero) não pode substituir o local
+        registro_falhas.salvar()
+        logger.info(f"Atualização cancelada após {len(baixados)} concurso(s); histórico local mantido.")
+        return {
+            'historico_map': dict(historico_local),
+            'ultimo_online': ultimo_online,
+            'baixados': baixados,
+            'recuperados': [],
+            'falhas': {},
+            'alterado': False,
+            'cancelado': True,
+            'offline': False,
+            'erro': None,
+        }
+
+    # Concursos que falharam agora ou em execuções anteriores viram lacunas: busca só esses
+    recuperados, falhas = {}, {}
+    lacunas = detectar_lacunas_historico(historico_map, ultimo_online)
+    if lacunas:
+        logger.info(f"{len(lacunas)} concurso(s) ausente(s) no histórico. Reparando...")
+        recuperados, falhas = reparar_lacunas_historico(lacunas, cache_api, registro_falhas, progresso=progresso)
+        historico_map.update(recuperados)
+    registro_falhas.salvar()
+
+    if completo:
+        # O download completo nunca encolhe o histórico: o que não pôde ser baixado fica com a versão local
+        mantidos = historico_local.keys() - historico_map.keys()
+        if mantidos:
+            logger.warning(f"{len(mantidos)} concurso(s) não baixado(s) no download completo; mantida a versão local.")
+            historico_map = {**historico_local, **historico_map}
+
+    return {
+        'historico_map': historico_map,
+        'ultimo_online': ultimo_online,
+        'baixados': baixados,
+        'recuperados': sorted(recuperados),
+        'falhas': falhas,
+        'alterado': historico_map != historico_local,
+        'cancelado': False,
+        'offline': False,
+        'erro': None,
+    }
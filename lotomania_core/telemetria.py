@@ -0,0 +1,260 @@
+"""Telemetria dos caminhos críticos e perfilamento opcional (@perfilado)."""
+import cProfile
+import functools
+import json
+import logging
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from logging.handlers import RotatingFileHandler
+
+from .constantes import TELEMETRIA_LOG_FILE, TELEMETRIA_PROMETHEUS_FILE
+
+__all__ = [
+    'Telemetria', 'TELEMETRIA', 'PERFIL_MODOS', 'PERFIL_DIR_PADRAO', 'PERFIL_INTERVALO_AMOSTRAGEM',
+    'configurar_perfil', 'configuracao_perfil', 'perfilado',
+]
+
+logger = logging.getLogger(__name__)
+
+# --- Instrumentação (Telemetria) ---
+class Telemetria:
+    """
+    Temporizadores e contadores nomeados para os caminhos críticos.
+    Desligada por padrão: com 'ativa' False, cada chamada retorna logo no primeiro teste,
+    sem alocar nada nem adquirir lock. Ative com LOTOMANIA_TELEMETRIA=1 ou pela aba Ferramentas.
+    """
+    def __init__(self, ativa=False):
+        self.ativa = ativa
+        self._lock = threading.Lock()
+        self._logger = None
+        self.contadores = Counter()
+        self.temporizadores = {} # nome -> {'contagem', 'total', 'max', 'ultimo'}
+
+    def incrementar(self, nome, valor=1):
+        if not self.ativa:
+            return
+        with self._lock:
+            self.contadores[nome] += valor
+
+    def registrar_tempo(self, nome, segundos, **rotulos):
+        if not self.ativa:
+            return
+        with self._lock:
+            t = self.temporizadores.get(nome)
+            if t is None:
+                t = self.temporizadores[nome] = {'contagem': 0, 'total': 0.0, 'max': 0.0, 'ultimo': 0.0}
+            t['contagem'] += 1
+            t['total'] += segundos
+            t['max'] = max(t['max'], segundos)
+            t['ultimo'] = segundos
+        if self._logger:
+            extras = " ".join(f"{k}={v}" for k, v in rotulos.items())
+            self._logger.info(f"{nome} {segundos * 1000:.2f}ms {extras}".rstrip())
+
+    @contextmanager
+    def cronometro(self, nome, **rotulos):
+        """Mede o bloco 'with' e registra o tempo em 'nome'."""
+        if not self.ativa:
+            yield
+            return
+        inicio = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.registrar_tempo(nome, time.perf_counter() - inicio, **rotulos)
+
+    def configurar_log(self, caminho=TELEMETRIA_LOG_FILE, max_bytes=1_000_000, backups=3):
+        """Grava cada medição em um log rotativo (max_bytes por arquivo, 'backups' arquivos antigos)."""
+        logger = logging.getLogger("lotomania.telemetria")
+        logger.setLevel(logging.INFO)
+        logger.propagate = False
+        for handler in list(logger.handlers):
+            logger.removeHandler(handler)
+            handler.close()
+        handler = RotatingFileHandler(caminho, maxBytes=max_bytes, backupCount=backups, encoding='utf-8')
+        handler.setFormatter(logging.Formatter("%(asctime)s %(message)s"))
+        logger.addHandler(handler)
+        self._logger = logger
+
+    def zerar(self):
+        with self._lock:
+            self.contadores.clear()
+            self.temporizadores.clear()
+
+    def resumo(self):
+        """Retorna uma cópia dos contadores e temporizadores atuais."""
+        with self._lock:
+            return {
+                'contadores': dict(self.contadores),
+                'temporizadores': {nome: dict(t) for nome, t in self.temporizadores.items()},
+            }
+
+    def formatar_texto(self):
+        """Resumo legível para o painel de diagnóstico."""
+        dados = self.resumo()
+        linhas = ["--- Temporizadores ---", f"{'Nome':<32}{'Qtd':>7}{'Média(ms)':>12}{'Máx(ms)':>12}"]
+        for nome, t in sorted(dados['temporizadores'].items()):
+            media = t['total'] / t['contagem'] if t['contagem'] else 0.0
+            linhas.append(f"{nome:<32}{t['contagem']:>7}{media * 1000:>12.2f}{t['max'] * 1000:>12.2f}")
+        linhas.append("")
+        linhas.append("--- Contadores ---")
+        for nome, valor in sorted(dados['contadores'].items()):
+            linhas.append(f"{nome:<32}{valor:>12}")
+        return "\n".join(linhas)
+
+    def exportar_prometheus(self, caminho=TELEMETRIA_PROMETHEUS_FILE):
+        """Grava as métricas no formato de texto do Prometheus (node_exporter textfile)."""
+        dados = self.resumo()
+        linhas = []
+        for nome, valor in sorted(dados['contadores'].items()):
+            metrica = f"lotomania_{nome}_total"
+            linhas.append(f"# TYPE {metrica} counter")
+            linhas.append(f"{metrica} {valor}")
+        for nome, t in sorted(dados['temporizadores'].items()):
+            metrica = f"lotomania_{nome}_segundos"
+            linhas.append(f"# TYPE {metrica} summary")
+            linhas.append(f"{metrica}_count {t['contagem']}")
+            linhas.append(f"{metrica}_sum {t['total']:.6f}")
+            linhas.append(f"# TYPE {metrica}_max gauge")
+            linhas.append(f"{metrica}_max {t['max']:.6f}")
+        # Escrita atômica para que o coletor nunca leia um arquivo pela metade
+        tmp = caminho + ".tmp"
+        with open(tmp, 'w', encoding='utf-8') as f:
+            f.write("\n".join(linhas) + "\n")
+        os.replace(tmp, caminho)
+        return caminho
+
+TELEMETRIA = Telemetria(ativa=os.environ.get("LOTOMANIA_TELEMETRIA", "") not in ("", "0"))
+
+# --- Perfilamento (Opcional) ---
+# Modos: "cprofile" grava arquivos .pstats (abrir com pstats/snakeviz);
+# "amostragem" grava pilhas colapsadas .folded (entrada do flamegraph.pl/speedscope).
+# Ative com LOTOMANIA_PERFIL=cprofile|amostragem ou com a opção --perfil na linha de comando.
+PERFIL_MODOS = ("cprofile", "amostragem")
+PERFIL_DIR_PADRAO = "perfis"
+PERFIL_INTERVALO_AMOSTRAGEM = 0.005 # Segundos entre amostras de pilha
+
+_perfil_config = {
+    'modo': os.environ.get("LOTOMANIA_PERFIL") or None,
+    'diretorio': os.environ.get("LOTOMANIA_PERFIL_DIR", PERFIL_DIR_PADRAO),
+}
+_perfil_estado = threading.local() # Evita perfis aninhados na mesma thread
+_perfil_contador = Counter()
+
+def configurar_perfil(modo, diretorio=PERFIL_DIR_PADRAO):
+    """Liga (modo em PERFIL_MODOS) ou desliga (modo None) o perfilamento das funções marcadas com @perfilado."""
+    if modo is not None and modo not in PERFIL_MODOS:
+        raise ValueError(f"Modo de perfil inválido: {modo}. Use um de {PERFIL_MODOS}.")
+    _perfil_config['modo'] = modo
+    _perfil_config['diretorio'] = diretorio
+
+def configuracao_perfil():
+    """Cópia de {'modo', 'diretorio'} do perfilamento atual (inicialmente, de LOTOMANIA_PERFIL e LOTOMANIA_PERFIL_DIR)."""
+    return dict(_perfil_config)
+
+def _resumir_parametro(valor):
+    """Representação curta de um argumento para os metadados do perfil."""
+    if isinstance(valor, (int, float, bool, str)) or valor is None:
+        return valor
+    if isinstance(valor, dict):
+        if len(valor) <= 20 and all(isinstance(v, (int, float, bool, str, type(None))) for v in valor.values()):
+            return {str(k): v for k, v in valor.items()}
+        return f"dict[len={len(valor)}]"
+    if isinstance(valor, (list, tuple, set)):
+        return f"{type(valor).__name__}[len={len(valor)}]"
+    return type(valor).__name__
+
+class _AmostradorPilha:
+    """Amostra periodicamente a pilha de uma thread e acumula pilhas colapsadas."""
+    def __init__(self, thread_id, intervalo=PERFIL_INTERVALO_AMOSTRAGEM):
+        self.thread_id = thread_id
+        self.intervalo = intervalo
+        self.pilhas = Counter()
+        self._parar = threading.Event()
+        self._thread = threading.Thread(target=self._executar, daemon=True)
+
+    def _executar(self):
+        while not self._parar.wait(self.intervalo):
+            frame = sys._current_frames().get(self.thread_id)
+            nomes = []
+            while frame is not None:
+                codigo = frame.f_code
+                nomes.append(f"{codigo.co_name} ({os.path.basename(codigo.co_filename)}:{codigo.co_firstlineno})")
+                frame = frame.f_back
+            if nomes:
+                self.pilhas[";".join(reversed(nomes))] += 1
+
+    def iniciar(self):
+        self._thread.start()
+
+    def parar(self):
+        self._parar.set()
+        self._thread.join()
+
+def _gravar_perfil(nome, modo, coletor, metadados):
+    diretorio = _perfil_config['diretorio']
+    os.makedirs(diretorio, exist_ok=True)
+    _perfil_contador[nome] += 1
+    base = os.path.join(diretorio, f"{nome}_{time.strftime('%Y%m%d-%H%M%S')}_{os.getpid()}_{_perfil_contador[nome]}")
+    if modo == "cprofile":
+        caminho = base + ".pstats"
+        coletor.dump_stats(caminho)
+    else:
+        caminho = base + ".folded"
+        with open(caminho, 'w', encoding='utf-8') as f:
+            for pilha, contagem in coletor.pilhas.most_common():
+                f.write(f"{pilha} {contagem}\n")
+    metadados['arquivo'] = os.path.basename(caminho)
+    with open(base + ".meta.json", 'w', encoding='utf-8') as f:
+        json.dump(metadados, f, indent=4, ensure_ascii=False)
+    logger.info(f"Perfil de {nome} salvo em {caminho}")
+    return caminho
+
+def perfilado(func):
+    """
+    Decorador: quando o perfilamento está ligado, perfila cada chamada de 'func' e grava
+    um arquivo por execução, com os parâmetros da chamada em um .meta.json ao lado.
+    Desligado, custa apenas uma verificação de dicionário por chamada.
+    """
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        modo = _perfil_config['modo']
+        if modo is None or getattr(_perfil_estado, 'ativo', False):
+            return func(*args, **kwargs)
+
+        _perfil_estado.ativo = True
+        if modo == "cprofile":
+            coletor = cProfile.Profile()
+            coletor.enable()
+        else:
+            coletor = _AmostradorPilha(threading.get_ident())
+            coletor.iniciar()
+        inicio = time.perf_counter()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            duracao = time.perf_counter() - inicio
+            if modo == "cprofile":
+                coletor.disable()
+            else:
+                coletor.parar()
+            _perfil_estado.ativo = False
+            metadados = {
+                'funcao': func.__qualname__,
+                'modo': modo,
+                'inicio': time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime(time.time() - duracao)),
+                'duracao_segundos': duracao,
+                'argumentos': [_resumir_parametro(a) for a in args],
+                'argumentos_nomeados': {k: _resumir_parametro(v) for k, v in kwargs.items()},
+                'python': sys.version.split()[0],
+                'pid': os.getpid(),
+            }
+            try:
+                _gravar_perfil(func.__name__, modo, coletor, metadados)
+            except OSError as e:
+                logger.warning(f"Erro ao gravar perfil de {func.__name__}: {e}")
+    return wrapper
@@ -1,392 +1,41 @@
+"""
+Interface gráfica (Tk) da LotomaniaIA. Dados, análises, modelos e geração ficam no pacote lotomania_core,
+que não depende de tkinter; aqui ficam só as janelas, as mensagens e a linha de comando.
+"""
 import random
 from collections import Counter
 import tkinter as tk
-from tkinter import messagebox, scrolledtext, filedialog, ttk
-import matplotlib.pyplot as plt
+from tkinter import messagebox, scrolledtext, filedialog, ttk, simpledialog
 from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
 import math
-import requests
-import json
 import time
-import os
 import numpy as np
 import threading
-
-# --- Configurações de Arquivo e Jogo (LOTOMANIA) ---
-HISTORICO_FILE = "historico_lotomania.json"
-NUM_DEZENAS_TOTAL = 100 # De 00 a 99
-NUM_DEZENAS_POR_APOSTA = 50 # Você escolhe 50 números
-NUM_DEZENAS_SORTEADAS = 20 # 20 números são sorteados no concurso
-
-# --- Funções Auxiliares ---
-def _is_prime(n):
-    if n < 2:
-        return False
-    # 0 e 1 não são primos. Numeros primos de 00 a 99:
-    # 2, 3, 5, 7, 11, 13, 17, 19, 23, 29, 31, 37, 41, 43, 47, 53, 59, 61, 67, 71, 73, 79, 83, 89, 97
-    # Total de 25 primos entre 0 e 99.
-    for i in range(2, int(math.sqrt(n)) + 1):
-        if n % i == 0:
-            return False
-    return True
-
-# --- Funções de Dados e Análise para LOTOMANIA ---
-
-def salvar_historico(historico_data_map):
-    """Salva o histórico de sorteios em um arquivo JSON.
-    historico_data_map: Dicionário no formato {concurso_num: [dezenas_sorteadas]}
-    """
-    try:
-        with open(HISTORICO_FILE, 'w', encoding='utf-8') as f:
-            json.dump(historico_data_map, f, indent=4)
-        print(f"Histórico salvo em {HISTORICO_FILE}")
-    except Exception as e:
-        print(f"Erro ao salvar histórico: {e}")
-        messagebox.showerror("Erro de Salvamento", f"Não foi possível salvar o histórico em {HISTORICO_FILE}. Erro: {e}")
-
-def carregar_historico_map():
-    """Carrega o histórico de sorteios de um arquivo JSON.
-    Retorna um dicionário no formato {concurso_num: [dezenas_sorteadas]}.
-    """
-    if os.path.exists(HISTORICO_FILE):
-        try:
-            with open(HISTORICO_FILE, 'r', encoding='utf-8') as f:
-                historico_json = json.load(f)
-                # Converte as chaves de string para int ao carregar
-                historico_map = {int(k): v for k, v in historico_json.items()}
-            print(f"Histórico de {len(historico_map)} concursos carregado de {HISTORICO_FILE}")
-            return historico_map
-        except json.JSONDecodeError as e:
-            print(f"Erro ao decodificar JSON do histórico: {e}. O arquivo pode estar corrompido.")
-            messagebox.showwarning("Erro de Leitura", "O arquivo de histórico local está corrompido ou vazio. Será feito um novo download ou simulação.")
-            if os.path.exists(HISTORICO_FILE):
-                os.remove(HISTORICO_FILE) # Remover arquivo corrompido para evitar loop
-            return {} # Retorna dicionário vazio para indicar que não há histórico válido
-        except Exception as e:
-            print(f"Erro ao carregar histórico: {e}")
-            messagebox.showerror("Erro de Carregamento", f"Não foi possível carregar o histórico de {HISTORICO_FILE}. Erro: {e}")
-            return {}
-    return {} # Retorna dicionário vazio se o arquivo não existe
-
-def simular_historico_lotomania(num_sorteios=10000): # Simula 10 mil sorteios para Lotomania
-    historico_dezenas_list = []
-    # Números de 0 a 99
-    numeros_possiveis = list(range(NUM_DEZENAS_TOTAL))
-    for i in range(num_sorteios):
-        # Lotomania sorteia 20 dezenas
-        sorteio = sorted(random.sample(numeros_possiveis, NUM_DEZENAS_SORTEADAS))
-        historico_dezenas_list.append(sorteio)
-    return historico_dezenas_list
-
-
-def analisar_frequencia_lotomania(historico_dezenas_list):
-    """
-    Analisa a frequência e o atraso dos números sorteados.
-    historico_dezenas_list: Uma lista de listas de dezenas (ex: [[0,1,...],[50,60,...]]).
-    """
-    frequencias = Counter()
-    atrasos_corretos = {num: 0 for num in range(NUM_DEZENAS_TOTAL)}
-    
-    for sorteio in historico_dezenas_list:
-        for numero in sorteio:
-            frequencias[numero] += 1
-            
-    # Garante que todos os números de 0 a 99 estejam nas frequências, mesmo que com 0
-    for i in range(NUM_DEZENAS_TOTAL):
-        if i not in frequencias:
-            frequencias[i] = 0
-            
-    if historico_dezenas_list:
-        for num_loteria in range(NUM_DEZENAS_TOTAL):
-            count_atraso = 0
-            # Percorre o histórico do mais recente para o mais antigo para calcular o atraso
-            for sorteio in reversed(historico_dezenas_list):
-                if num_loteria in sorteio:
-                    break
-                count_atraso += 1
-            atrasos_corretos[num_loteria] = count_atraso
-
-    return frequencias, atrasos_corretos
-
-def calcular_estatisticas_historicas_lotomania(historico_dezenas_list):
-    """
-    Calcula as estatísticas médias e desvios padrão para os critérios de balanceamento
-    com base no histórico de sorteios reais.
-    """
-    somas = []
-    pares_counts = []
-    impares_counts = []
-    moldura_counts = []
-    miolo_counts = []
-    primos_counts = []
-
-    moldura_nums = {
-        0, 1, 2, 3, 4, 5, 6, 7, 8, 9,   # Linha 0
-        10, 19, 20, 29, 30, 39, 40, 49, 50, 59, # Meio: colunas 0 e 9
-        60, 69, 70, 79, 80, 89, 90, 91, 92, 93, # Meio: colunas 0 e 9
-        94, 95, 96, 97, 98, 99 # Linha 9
-    }
-    
-    for sorteio in historico_dezenas_list:
-        somas.append(sum(sorteio))
-        pares_counts.append(sum(1 for n in sorteio if n % 2 == 0))
-        impares_counts.append(NUM_DEZENAS_SORTEADAS - sum(1 for n in sorteio if n % 2 == 0))
-        
-        cont_moldura = sum(1 for n in sorteio if n in moldura_nums)
-        moldura_counts.append(cont_moldura)
-        miolo_counts.append(NUM_DEZENAS_SORTEADAS - cont_moldura)
-
-        primos_counts.append(sum(1 for n in sorteio if _is_prime(n)))
-    
-    if not historico_dezenas_list:
-        return {}
-
-    estatisticas = {
-        'soma_media': np.mean(somas),
-        'soma_std': np.std(somas),
-        'pares_media': np.mean(pares_counts),
-        'pares_std': np.std(pares_counts),
-        'impares_media': np.mean(impares_counts),
-        'impares_std': np.std(impares_counts),
-        'moldura_media': np.mean(moldura_counts),
-        'moldura_std': np.std(moldura_counts),
-        'miolo_media': np.mean(miolo_counts),
-        'miolo_std': np.std(miolo_counts),
-        'primos_media': np.mean(primos_counts),
-        'primos_std': np.std(primos_counts),
-    }
-    return estatisticas
-
-# --- Funções de Geração para LOTOMANIA ---
-
-def gerar_aleatorio_lotomania(num_jogos):
-    # Lotomania sempre aposta 50 números
-    numeros_possiveis = list(range(NUM_DEZENAS_TOTAL))
-    jogos_gerados = []
-    for _ in range(num_jogos):
-        jogos_gerados.append(sorted(random.sample(numeros_possiveis, NUM_DEZENAS_POR_APOSTA)))
-    return jogos_gerados
-
-def gerar_baseado_em_frequencia_lotomania(frequencias_counter, num_jogos):
-    # Lotomania sempre aposta 50 números
-    
-    # Seleciona mais números que o necessário para ter uma base para sortear, priorizando os mais frequentes
-    # Por exemplo, os 60 números mais frequentes para sortear 50
-    num_frequentes_para_selecao = min(NUM_DEZENAS_TOTAL, NUM_DEZENAS_POR_APOSTA + 10) 
-    lista_frequentes_base = [num for num, count in frequencias_counter.most_common(num_frequentes_para_selecao)]
-
-    jogos_gerados = []
-    for _ in range(num_jogos):
-        if len(lista_frequentes_base) >= NUM_DEZENAS_POR_APOSTA:
-            jogos_gerados.append(sorted(random.sample(lista_frequentes_base, NUM_DEZENAS_POR_APOSTA)))
-        else:
-            # Caso raro onde não há números suficientes na lista de frequentes (ex: histórico muito pequeno)
-            numeros_faltantes = NUM_DEZENAS_POR_APOSTA - len(lista_frequentes_base)
-            complemento_aleatorio = random.sample(
-                [n for n in range(NUM_DEZENAS_TOTAL) if n not in lista_frequentes_base],
-                numeros_faltantes
-            )
-            jogos_gerados.append(sorted(lista_frequentes_base + complemento_aleatorio))
-
-    return jogos_gerados
-
-def gerar_com_filtros_lotomania(filtros_inclusao, filtros_exclusao, num_jogos):
-    # Lotomania sempre aposta 50 números
-    jogos_gerados = []
-    numeros_possiveis = set(range(NUM_DEZENAS_TOTAL))
-
-    for _ in range(num_jogos):
-        combinacao = set()
-        
-        # Adiciona números de inclusão
-        for num_incluir in filtros_inclusao:
-            if 0 <= num_incluir < NUM_DEZENAS_TOTAL and num_incluir not in combinacao:
-                combinacao.add(num_incluir)
-
-        # Remove números de exclusão e os já incluídos das opções restantes
-        opcoes_restantes = list(numeros_possiveis - set(filtros_exclusao) - combinacao)
-
-        # Se já tiver mais números do que o permitido devido aos filtros de inclusão (erro do usuário)
-        if len(combinacao) > NUM_DEZENAS_POR_APOSTA:
-            # Já tratado na GUI, mas para garantir a robustez
-            combinacao = set(random.sample(list(combinacao), NUM_DEZENAS_POR_APOSTA))
-            opcoes_restantes = [] # Não precisa de mais opções
-
-        # Preenche o restante da combinação com números aleatórios das opções restantes
-        while len(combinacao) < NUM_DEZENAS_POR_APOSTA:
-            if not opcoes_restantes:
-                # Este caso deve ser capturado pela GUI antes da chamada, mas é um fallback
-                raise ValueError("Não há números suficientes para gerar a combinação com os filtros fornecidos.")
-            
-            num_escolhido = random.choice(opcoes_restantes)
-            combinacao.add(num_escolhido)
-            opcoes_restantes.remove(num_escolhido) # Remove para evitar duplicatas na mesma combinação
-            
-        jogos_gerados.append(sorted(list(combinacao)))
-        
-    return jogos_gerados
-
-
-def _checar_criterios_balanceados_lotomania(combinacao, criterios):
-    # Critério de Soma
-    soma_atual = sum(combinacao)
-    if not (criterios['soma_min'] <= soma_atual <= criterios['soma_max']):
-        return False
-
-    # Critério de Pares/Ímpares
-    pares = sum(1 for n in combinacao if n % 2 == 0)
-    impares = NUM_DEZENAS_POR_APOSTA - pares
-    if not (criterios['pares_min'] <= pares <= criterios['pares_max'] and
-            criterios['impares_min'] <= impares <= criterios['impares_max']):
-        return False
-    
-    # Critério de Moldura/Miolo (apenas 34 números na moldura de 0 a 99)
-    moldura_nums = {
-        0, 1, 2, 3, 4, 5, 6, 7, 8, 9,   # Linha 0
-        10, 19, 20, 29, 30, 39, 40, 49, 50, 59, # Meio: colunas 0 e 9
-        60, 69, 70, 79, 80, 89, 90, 91, 92, 93, # Meio: colunas 0 e 9
-        94, 95, 96, 97, 98, 99 # Linha 9
-    }
-    cont_moldura = sum(1 for n in combinacao if n in moldura_nums)
-    cont_miolo = NUM_DEZENAS_POR_APOSTA - cont_moldura
-    
-    if not (criterios['moldura_min'] <= cont_moldura <= criterios['moldura_max'] and
-            criterios['miolo_min'] <= cont_miolo <= criterios['miolo_max']):
-        return False
-
-    # Critério de Números Consecutivos
-    if criterios['max_consecutivos'] is not None:
-        sequencia_max_atual = 0
-        sequencia_atual = 0
-        combinacao_ordenada = sorted(combinacao)
-        for i in range(len(combinacao_ordenada)):
-            if i > 0 and combinacao_ordenada[i] == combinacao_ordenada[i-1] + 1:
-                sequencia_atual += 1
-            else:
-                sequencia_atual = 1
-            sequencia_max_atual = max(sequencia_max_atual, sequencia_atual)
-        if sequencia_max_atual > criterios['max_consecutivos']:
-            return False
-            
-    # Critério de Números Primos
-    cont_primos = sum(1 for n in combinacao if _is_prime(n))
-    if not (criterios['primos_min'] <= cont_primos <= criterios['primos_max']):
-        return False
-            
-    return True
-
-def gerar_balanceado_lotomania(criterios, num_jogos, progress_callback=None, stop_event=None, tentativas_por_jogo=20000):
-    # Lotomania sempre aposta 50 números
-    numeros_possiveis = list(range(NUM_DEZENAS_TOTAL))
-    jogos_gerados = []
-    warnings_issued = 0
-
-    for i in range(num_jogos):
-        if stop_event and stop_event.is_set():
-            return [] # Aborta a geração se o evento de parada for ativado
-
-        combinacao_encontrada = False
-        for tentativa in range(tentativas_por_jogo):
-            combinacao = sorted(random.sample(numeros_possiveis, NUM_DEZENAS_POR_APOSTA))
-            if _checar_criterios_balanceados_lotomania(combinacao, criterios):
-                jogos_gerados.append(combinacao)
-                combinacao_encontrada = True
-                break
-            
-            if progress_callback and (tentativa % 500 == 0): # Atualiza a cada 500 tentativas
-                progress_callback(i, num_jogos, tentativa, tentativas_por_jogo)
-        
-        if not combinacao_encontrada:
-            if warnings_issued < 5: # Limita o número de avisos para não sobrecarregar
-                messagebox.showwarning("Aviso de Geração Balanceada", f"Não foi possível encontrar uma combinação balanceada para o jogo {i+1} dentro de {tentativas_por_jogo} tentativas. Gerando um jogo aleatório de {NUM_DEZENAS_POR_APOSTA} números para este. Considere suavizar os critérios.")
-                warnings_issued += 1
-            jogos_gerados.append(gerar_aleatorio_lotomania(1)[0]) # Gera um jogo aleatório
-
-    return jogos_gerados
-
-# --- Funções de Plotagem ---
-def plotar_frequencias_lotomania(frequencias):
-    top = tk.Toplevel()
-    top.title("Análise Gráfica de Frequência - Lotomania")
-    top.geometry("1000x600")
-    top.transient(top.master) # Mantém a janela no topo da principal
-    top.grab_set() # Bloqueia interação com a janela principal
-
-    fig, ax = plt.subplots(figsize=(12, 6))
-    fig.suptitle('Frequência de Números - Lotomania (00 a 99)', fontsize=16)
-    
-    todos_numeros = {num: frequencias.get(num, 0) for num in range(NUM_DEZENAS_TOTAL)}
-    numeros = sorted(todos_numeros.keys())
-    counts = [todos_numeros[n] for n in numeros]
-
-    ax.bar(numeros, counts, color='lightcoral')
-    ax.set_xlabel('Número')
-    ax.set_ylabel('Frequência')
-    ax.set_xticks([i for i in numeros if i % 5 == 0]) # Exibir ticks a cada 5 números para não sobrecarregar
-    ax.set_xticklabels([f"{i:02d}" for i in numeros if i % 5 == 0], rotation=45, ha="right") # Formata para 00, 05, etc.
-    ax.set_ylim(bottom=0)
-    ax.grid(axis='y', linestyle='--', alpha=0.7)
-
-    plt.tight_layout(rect=[0, 0.03, 1, 0.96]) # Ajusta layout para evitar corte de títulos/rótulos
-
-    canvas = FigureCanvasTkAgg(fig, master=top)
-    canvas_widget = canvas.get_tk_widget()
-    canvas_widget.pack(side=tk.TOP, fill=tk.BOTH, expand=1)
-    canvas.draw()
-
-# --- Funções de Probabilidade ---
-
-def combinacoes(n, k):
-    if k < 0 or k > n:
-        return 0
-    if k == 0 or k == n:
-        return 1
-    if k > n // 2:
-        k = n - k
-    
-    res = 1
-    for i in range(k):
-        res = res * (n - i) // (i + 1)
-    return res
-
-def calcular_probabilidade_lotomania(acertos_desejados):
-    """
-    Calcula a probabilidade de acertar um número específico de dezenas na Lotomania.
-    - NUM_DEZENAS_TOTAL = 100 (de 00 a 99)
-    - NUM_DEZENAS_POR_APOSTA = 50 (você aposta 50 dezenas)
-    - NUM_DEZENAS_SORTEADAS = 20 (sorteadas)
-    
-    A fórmula é: C(50, acertos) * C(50, 20 - acertos) / C(100, 20)
-    Onde:
-    - C(N, K) é o número de combinações de N elementos tomados K a K.
-    - C(50, acertos): combinações de 50 dezenas que você escolheu que acertaram
-    - C(50, 20 - acertos): combinações das 50 dezenas que você NÃO escolheu que foram sorteadas (20 - acertos)
-    - C(100, 20): Total de combinações possíveis de 20 dezenas em 100.
-    """
-    
-    # 50 dezenas apostadas (acertadas)
-    # 50 dezenas não apostadas
-    
-    prob = {}
-    acertos_possiveis = [0, 15, 16, 17, 18, 19, 20] # Lotomania premia 0, 15, 16, 17, 18, 19, 20
-    
-    # Total de combinações possíveis de 20 dezenas em 100
-    total_combinacoes = combinacoes(NUM_DEZENAS_TOTAL, NUM_DEZENAS_SORTEADAS)
-    
-    for acerto in acertos_possiveis:
-        # Número de formas de escolher 'acerto' dezenas entre as 50 que você apostou
-        combinacoes_acertadas_da_aposta = combinacoes(NUM_DEZENAS_POR_APOSTA, acerto)
-        
-        # Número de formas de escolher (20 - acerto) dezenas entre as 50 que você NÃO apostou
-        combinacoes_nao_acertadas_da_aposta = combinacoes(NUM_DEZENAS_TOTAL - NUM_DEZENAS_POR_APOSTA, NUM_DEZENAS_SORTEADAS - acerto)
-        
-        # O resultado é a multiplicação desses dois dividido pelo total de combinações
-        probabilidade_num = (combinacoes_acertadas_da_aposta * combinacoes_nao_acertadas_da_aposta) / total_combinacoes
-        
-        prob[acerto] = probabilidade_num
-        
-    return prob
-
+import sys
+import argparse
+import logging
+
+from lotomania_core import (
+    APOSTA_MAX_CONCURSOS, AnaliseAtrasos, CRITERIOS_BALANCEADOS_PADRAO, CRITERIOS_VOLANTE, CacheAPILotomania,
+    CacheAnalises, ConfiguracaoUsuario, ESTRATEGIAS, ErroHistorico, ErroLotomania, ErroRede, FAIXAS_PREMIADAS,
+    GRAFICO_JANELA_PADRAO, GRAFICO_VISOES, GraficoFrequencias, INDICE_SEMELHANCA_PADRAO, IndiceConcursos,
+    IndiceJogos, ModeloLogisticoLotomania, ModeloTransicao, NIVEL_SIGNIFICANCIA, NUM_DEZENAS_POR_APOSTA,
+    NUM_DEZENAS_SORTEADAS, NUM_DEZENAS_TOTAL, NUM_MIOLO, NUM_MOLDURA, NUM_PRIMOS, PERFIL_MODOS, PipelineGeracao,
+    RegistroApostas, RegistroFalhasDownload, TELEMETRIA, TELEMETRIA_PROMETHEUS_FILE, analisar_frequencia_lotomania,
+    analise_volante_em_cache, atualizar_historico, avaliacao_do_relatorio, avaliar_carteira_lotomania,
+    avaliar_criterios, avaliar_modelo_walk_forward, calcular_estatisticas_historicas_lotomania,
+    calcular_probabilidade_lotomania, carregar_historico_map, configuracao_perfil, configurar_perfil,
+    contar_acertos_lotomania, dados_grafico_lotomania, deduplicar_jogos, etapas_criterios,
+    exportar_grafico_lotomania, extrair_jogos_de_texto, gerar_aleatorio_lotomania,
+    gerar_baseado_em_frequencia_lotomania, gerar_com_filtros_lotomania, gerar_desdobramento_lotomania,
+    gerar_por_modelo_ia_lotomania, gerar_por_transicao_lotomania, gerar_sem_repeticoes, importar_historico,
+    impressao_digital_historico, jogos_da_estrategia, perfilado, pesos_de_amostragem, pontuador_dezenas,
+    resumo_avaliacao_criterios, resumo_consulta, resumo_desdobramento, resumo_importacao, resumo_pipeline,
+    resumo_simulacao, salvar_historico, simular_estrategia_paralela, simular_historico_lotomania,
+    sugerir_criterios_balanceados, testes_aleatoriedade_em_cache, verificar_criterios
+)
+
+logger = logging.getLogger(__name__)
 
 # --- Classe da Aplicação GUI para LOTOMANIA ---
 class LotomaniaIA(tk.Tk):
@@ -400,8 +49,22 @@ class LotomaniaIA(tk.Tk):
         self.historico_map = {} # Dicionário {concurso_num: [dezenas_sorteadas]} para gerenciamento de persistência
         self.frequencias = Counter()
         self.atrasos = {}
+        self.analise_atrasos = AnaliseAtrasos() # Distribuição dos atrasos, atualizada incrementalmente
+        self.indice_concursos = IndiceConcursos() # Listas de ocorrência das dezenas para as consultas ao histórico
+        self.modelo_transicao = ModeloTransicao() # P(sair no próximo | padrão recente ou atraso), atualizado incrementalmente
+        self.modelo_ia = ModeloLogisticoLotomania() # Regressão logística sobre características de atraso e frequência
         self.estatisticas_historicas = {} # Para sugestões de balanceamento
-        self.num_jogos_gerar = tk.IntVar(value=1)
+        self.analise_volante = {} # Linhas, colunas, quadrantes e diagonais dos sorteios recentes (sugestões do volante)
+        self.cache_api = CacheAPILotomania() # Respostas da API em disco, por concurso
+        self.cache_analises = CacheAnalises() # Testes de aleatoriedade e outras análises caras, por impressão do histórico
+        self.configuracao = ConfiguracaoUsuario() # Últimas escolhas, predefinições e sugestões da geração balanceada
+        self.registro_falhas = RegistroFalhasDownload() # Concursos a tentar de novo
+        self.registro_apostas = RegistroApostas() # Apostas conferidas automaticamente a cada atualização
+        self.painel_grafico = None # Janela do gráfico, criada na primeira abertura e reaproveitada
+        ultimas = self.configuracao.ultimas()
+        self.num_jogos_gerar = tk.IntVar(value=ultimas.get('num_jogos', 1))
+        self.evitar_repeticoes_var = tk.BooleanVar(value=ultimas.get('evitar_repeticoes', True))
+        self.limiar_repeticao_var = tk.IntVar(value=ultimas.get('limiar_repeticao', INDICE_SEMELHANCA_PADRAO))
 
         self.style = ttk.Style(self) # Estilo para os widgets ttk
         self.current_theme = "Padrão" # Tema padrão
@@ -414,6 +77,9 @@ class LotomaniaIA(tk.Tk):
         self.stop_event = None
         self.progress_window = None
 
+        if TELEMETRIA.ativa:
+            TELEMETRIA.configurar_log()
+
     def apply_theme(self, theme_name):
         self.current_theme = theme_name
         
@@ -495,100 +161,140 @@ class LotomaniaIA(tk.Tk):
 
         self.atualizar_dados_online(force_full_download=False)
 
+    @perfilado
     def atualizar_dados_online(self, force_full_download=False):
         """
-        Atualiza o histórico de sorteios da Lotomania, baixando apenas os novos concursos.
-        Se force_full_download for True, baixa todo o histórico novamente.
+        Atualiza o histórico de sorteios da Lotomania, baixando apenas os novos concursos (atualizar_historico).
+        Se force_full_download for True, reconstrói todo o histórico: concursos já presentes no
+        cache da API (self.cache_api) são lidos do disco e só os ausentes são baixados; sem acesso à API,
+        o histórico local é completado com o cache e gravado.
         """
         self.status_data_label.config(text="Status dos Dados: Atualizando dados...", fg="blue")
         self.update_idletasks()
 
-        self.historico_map = carregar_historico_map()
-        
-        last_local_concurso = 0
-        if self.historico_map:
-            last_local_concurso = max(self.historico_map.keys())
-
-        concurso_to_start_download = 1
-        if not force_full_download and last_local_concurso > 0:
-            concurso_to_start_download = last_local_concurso + 1
-            print(f"Último concurso local: {last_local_concurso}. Buscando a partir do concurso: {concurso_to_start_download}")
-        else:
-            print("Forçando download completo ou nenhum histórico local. Baixando desde o concurso 1.")
-            self.historico_map = {} # Zera o mapa para um download completo
-
+        self.historico_map = self._carregar_historico_local()
         try:
-            # Busca o último concurso online
-            response_latest = requests.get(f"https://loteriascaixa-api.herokuapp.com/api/lotomania/latest")
-            response_latest.raise_for_status()
-            latest_data = response_latest.json()
-            latest_online_concurso = latest_data['concurso']
-            print(f"Concurso mais recente online: {latest_online_concurso}")
-
-            if latest_online_concurso >= concurso_to_start_download:
-                print(f"Baixando sorteios de {concurso_to_start_download} até {latest_online_concurso}")
-                
-                # Baixa os novos sorteios e adiciona/atualiza no dicionário
-                for concurso_num in range(concurso_to_start_download, latest_online_concurso + 1):
-                    try:
-                        url = f"https://loteriascaixa-api.herokuapp.com/api/lotomania/{concurso_num}"
-                        response = requests.get(url)
-                        response.raise_for_status()
-                        data = response.json()
-                        
-                        if 'dezenas' in data and len(data['dezenas']) == NUM_DEZENAS_SORTEADAS:
-                            # As dezenas da API podem vir como strings, converte para int e ordena
-                            dezenas = sorted([int(d) for d in data['dezenas']])
-                            self.historico_map[concurso_num] = dezenas
-                        else:
-                            print(f"Aviso: Dados incompletos ou inesperados para o concurso {concurso_num}. Pulando.")
-                    except requests.exceptions.RequestException as e:
-                        print(f"Erro ao buscar concurso {concurso_num}: {e}. Tentando próximo.")
-                    except json.JSONDecodeError as e:
-                        print(f"Erro ao decodificar JSON do concurso {concurso_num}: {e}. Pulando.")
-                    time.sleep(0.01) # Pequeno atraso para ser educado com a API e evitar bloqueios
-
-                salvar_historico(self.historico_map)
-
-                self.historico = [self.historico_map[c] for c in sorted(self.historico_map.keys())]
-
-                messagebox.showinfo("Atualização Concluída", f"Histórico atualizado! Total de {len(self.historico)} sorteios.")
+            resultado = atualizar_historico(self.historico_map, self.cache_api, self.registro_falhas, completo=force_full_download,
+                                            progresso=self._mostrar_progresso_download)
+            self.historico_map = resultado['historico_map']
+            if resultado['offline']: # Download completo sem acesso à API: reconstruído a partir do cache
+                erro = resultado['erro']
+                messagebox.showerror("Erro de Conexão" if erro['codigo'] == 'api_indisponivel' else "Erro de Dados", erro['mensagem'])
+            if resultado['alterado']:
+                self._salvar_historico_local()
+                if resultado['offline']:
+                    mensagem = (f"Histórico reconstruído a partir do cache local: {len(resultado['recuperados'])} concurso(s) recuperado(s), "
+                                f"total de {len(self.historico_map)} sorteios.")
+                else:
+                    mensagem = f"Histórico atualizado! Total de {len(self.historico_map)} sorteios."
+                if resultado['falhas']:
+                    mensagem += f"\n{len(resultado['falhas'])} concurso(s) não puderam ser baixados e serão tentados novamente na próxima atualização."
+                messagebox.showinfo("Atualização Concluída", mensagem)
+            elif resultado['offline']:
+                if self.historico_map:
+                    messagebox.showwarning("Dados", "Não foi possível atualizar os dados online. Usando o histórico local existente.")
             else:
                 messagebox.showinfo("Atualização Concluída", "Seu histórico já está atualizado!")
-                self.historico = [self.historico_map[c] for c in sorted(self.historico_map.keys())]
-
-        except requests.exceptions.RequestException as e:
-            print(f"Erro de conexão ao tentar buscar o último concurso online: {e}")
-            messagebox.showerror("Erro de Conexão", "Não foi possível buscar o último concurso online. Verifique sua conexão ou a disponibilidade da API.")
-            if not self.historico_map:
-                self.historico = simular_historico_lotomania(10000)
-                messagebox.showwarning("Dados", "Não foi possível carregar ou baixar dados reais. Usando histórico simulado.")
-            else:
+        except ErroRede as e:
+            messagebox.showerror("Erro de Conexão" if e.codigo == 'api_indisponivel' else "Erro de Dados", e.mensagem)
+            if self.historico_map:
                 messagebox.showwarning("Dados", "Não foi possível atualizar os dados online. Usando o histórico local existente.")
-                self.historico = [self.historico_map[c] for c in sorted(self.historico_map.keys())]
 
+        if self.historico_map:
+            self.historico = [self.historico_map[c] for c in sorted(self.historico_map.keys())]
+        else:
+            self.historico = simular_historico_lotomania(10000)
+            messagebox.showwarning("Dados", "Não foi possível carregar ou baixar dados reais. Usando histórico simulado.")
 
-        except json.JSONDecodeError as e:
-            print(f"Erro ao decodificar JSON do último concurso online: {e}")
-            messagebox.showerror("Erro de Dados", "Formato de dados inesperado ao buscar o último concurso online.")
-            if not self.historico_map:
-                self.historico = simular_historico_lotomania(10000)
-                messagebox.showwarning("Dados", "Não foi possível carregar ou baixar dados reais. Usando histórico simulado.")
-            else:
-                messagebox.showwarning("Dados", "Erro ao processar dados online. Usando o histórico local existente.")
-                self.historico = [self.historico_map[c] for c in sorted(self.historico_map.keys())]
-        
+        self._recalcular_analises()
+
+    def _carregar_historico_local(self):
+        try:
+            return carregar_historico_map()
+        except ErroHistorico as e:
+            messagebox.showwarning("Erro de Leitura", e.mensagem)
+            return {}
+
+    def _salvar_historico_local(self):
+        try:
+            salvar_historico(self.historico_map)
+        except ErroHistorico as e:
+            messagebox.showerror("Erro de Salvamento", e.mensagem)
+
+    def _mostrar_progresso_download(self, evento):
+        if evento.etapa == 'download':
+            texto = f"Status dos Dados: Concurso {evento.detalhes['concurso']} ({evento.atual}/{evento.total})..."
+        else:
+            texto = f"Status dos Dados: Reparando lacunas ({evento.atual}/{evento.total})..."
+        self.status_data_label.config(text=texto, fg="blue")
+        self.update_idletasks()
+
+    def _recalcular_analises(self):
+        """Refaz as análises sobre self.historico; os modelos com sincronizar só processam os concursos novos."""
         if self.historico:
-            self.frequencias, self.atrasos = analisar_frequencia_lotomania(self.historico)
+            with TELEMETRIA.cronometro('analise_frequencia', sorteios=len(self.historico)):
+                self.frequencias, self.atrasos = analisar_frequencia_lotomania(self.historico)
+            with TELEMETRIA.cronometro('analise_atrasos', sorteios=len(self.historico)):
+                self.analise_atrasos.sincronizar(self.historico)
+            self.modelo_transicao.sincronizar(self.historico)
+            # Histórico simulado (sem mapa) é numerado de 1 em diante
+            self.indice_concursos.sincronizar(self.historico, sorted(self.historico_map) if self.historico_map else None)
+            if self.historico_map:
+                self.modelo_ia = ModeloLogisticoLotomania.carregar_ou_treinar(self.historico) # Lê do disco se nada mudou
+            else: # Histórico simulado: modelo só em memória, sem sobrescrever o salvo do histórico real
+                self.modelo_ia = ModeloLogisticoLotomania().sincronizar(self.historico)
             sample_size = min(500, len(self.historico))
-            self.estatisticas_historicas = calcular_estatisticas_historicas_lotomania(self.historico[-sample_size:])
+            with TELEMETRIA.cronometro('estatisticas_historicas', sorteios=sample_size):
+                self.estatisticas_historicas = calcular_estatisticas_historicas_lotomania(self.historico[-sample_size:])
+                self.analise_volante = analise_volante_em_cache(self.historico[-sample_size:], self.cache_analises)
+            if self.historico_map: # Sugestões de um histórico simulado não substituem as do histórico real
+                self.configuracao.atualizar_sugestoes(impressao_digital_historico(self.historico[-sample_size:]), sample_size,
+                                                      self.estatisticas_historicas, self.analise_volante)
         else:
             self.frequencias = Counter()
             self.atrasos = {num: 0 for num in range(NUM_DEZENAS_TOTAL)}
+            self.analise_atrasos = AnaliseAtrasos()
+            self.indice_concursos = IndiceConcursos()
+            self.modelo_transicao = ModeloTransicao()
+            self.modelo_ia = ModeloLogisticoLotomania()
             self.estatisticas_historicas = {}
+            self.analise_volante = {}
 
+        self.conferir_apostas_registradas()
+        if self.painel_grafico is not None and self.painel_grafico.winfo_exists() and self.painel_grafico.winfo_viewable():
+            self.painel_grafico.atualizar() # Só as alturas mudam, sobre a mesma figura
         self.update_status_label()
 
+    def importar_historico_de_arquivo(self):
+        """Mescla ao histórico local sorteios de planilhas da Caixa (.xlsx, .htm antigos), CSV ou JSON."""
+        caminhos = filedialog.askopenfilenames(
+            title="Importar histórico de sorteios",
+            filetypes=[("Planilhas e dados", "*.xlsx *.htm *.html *.xls *.csv *.txt *.json *.jsonl"), ("Todos os arquivos", "*.*")])
+        if not caminhos:
+            return
+        self.status_data_label.config(text="Status dos Dados: Importando arquivos...", fg="blue")
+        self.update_idletasks()
+
+        mesclado = dict(self.historico_map) # Prévia: só vira o histórico depois da decisão sobre os conflitos
+        relatorio = importar_historico(caminhos, mesclado)
+        # Só os conflitos com o histórico local são perguntados; entre arquivos, vale o primeiro lido
+        contra_local = [conflito for conflito in relatorio['conflitos'] if conflito[0] in self.historico_map]
+        if contra_local and messagebox.askyesno(
+                "Conflitos na Importação",
+                f"{len({conflito[0] for conflito in contra_local})} concurso(s) do histórico local têm dezenas diferentes nos arquivos.\n\n"
+                f"{resumo_importacao({**relatorio, 'conflitos': contra_local, 'invalidos': []}, limite=5)}\n\nSubstituir pelos valores importados?"):
+            mesclado = dict(self.historico_map)
+            relatorio = importar_historico(caminhos, mesclado, substituir_conflitos=True)
+        self.historico_map = mesclado
+
+        if relatorio['novos'] or relatorio['substituidos']:
+            self._salvar_historico_local()
+            self.historico = [self.historico_map[c] for c in sorted(self.historico_map.keys())]
+            self._recalcular_analises()
+        else:
+            self.update_status_label()
+        messagebox.showinfo("Importação Concluída", resumo_importacao(relatorio))
+
 
     def create_widgets(self):
         main_frame = tk.Frame(self, padx=10, pady=10)
@@ -648,12 +354,21 @@ class LotomaniaIA(tk.Tk):
         self.num_jogos_spinner = tk.Spinbox(num_jogos_frame, from_=1, to=15, textvariable=self.num_jogos_gerar, width=5, font=("Arial", 10))
         self.num_jogos_spinner.pack(side=tk.LEFT, padx=5)
         tk.Label(num_jogos_frame, text="jogos").pack(side=tk.LEFT)
+        tk.Checkbutton(num_jogos_frame, text="Evitar repetições (", variable=self.evitar_repeticoes_var).pack(side=tk.LEFT, padx=(15, 0))
+        limiar_spin = tk.Spinbox(num_jogos_frame, from_=26, to=NUM_DEZENAS_POR_APOSTA, textvariable=self.limiar_repeticao_var, width=4)
+        limiar_spin.pack(side=tk.LEFT)
+        tk.Label(num_jogos_frame, text="ou mais dezenas em comum)").pack(side=tk.LEFT)
+        self.add_tooltip(limiar_spin, "Rejeita jogos com esta quantidade de dezenas em comum com outro jogo do lote ou com uma aposta registrada. 50 = só repetições exatas.")
 
         tk.Button(parent_frame, text="Gerar Aleatório", command=self.gerar_e_exibir_aleatorio, font=("Arial", 11), bg="#4CAF50", fg="white", padx=10, pady=5, relief="raised").grid(row=1, column=0, pady=8, padx=5, sticky="ew")
         tk.Button(parent_frame, text="Gerar Baseado em Frequência", command=self.gerar_e_exibir_frequencia, font=("Arial", 11), bg="#2196F3", fg="white", padx=10, pady=5, relief="raised").grid(row=1, column=1, pady=8, padx=5, sticky="ew")
         tk.Button(parent_frame, text="Gerar com Filtros Personalizados", command=self.abrir_config_filtros, font=("Arial", 11), bg="#FFC107", fg="#333", padx=10, pady=5, relief="raised").grid(row=2, column=0, pady=8, padx=5, sticky="ew")
         tk.Button(parent_frame, text="Gerar Combinação 'Balanceada'", command=self.abrir_config_balanceado, font=("Arial", 11), bg="#9C27B0", fg="white", padx=10, pady=5, relief="raised").grid(row=2, column=1, pady=8, padx=5, sticky="ew")
-        tk.Button(parent_frame, text="Atualizar Dados (Buscar Online)", command=lambda: self.atualizar_dados_online(force_full_download=False), font=("Arial", 11), bg="#607D8B", fg="white", padx=10, pady=5, relief="raised").grid(row=3, column=0, columnspan=2, pady=8, padx=5, sticky="ew")
+        tk.Button(parent_frame, text="Gerar por Modelo de Transição", command=self.gerar_e_exibir_transicao, font=("Arial", 11), bg="#3F51B5", fg="white", padx=10, pady=5, relief="raised").grid(row=3, column=0, pady=8, padx=5, sticky="ew")
+        tk.Button(parent_frame, text="Gerar por Modelo de IA", command=self.gerar_e_exibir_modelo_ia, font=("Arial", 11), bg="#00897B", fg="white", padx=10, pady=5, relief="raised").grid(row=3, column=1, pady=8, padx=5, sticky="ew")
+        tk.Button(parent_frame, text="Gerar Desdobramento (Fechamento)", command=self.abrir_config_desdobramento, font=("Arial", 11), bg="#795548", fg="white", padx=10, pady=5, relief="raised").grid(row=4, column=0, columnspan=2, pady=8, padx=5, sticky="ew")
+        tk.Button(parent_frame, text="Atualizar Dados (Buscar Online)", command=lambda: self.atualizar_dados_online(force_full_download=False), font=("Arial", 11), bg="#607D8B", fg="white", padx=10, pady=5, relief="raised").grid(row=5, column=0, pady=8, padx=5, sticky="ew")
+        tk.Button(parent_frame, text="Importar Histórico de Arquivo", command=self.importar_historico_de_arquivo, font=("Arial", 11), bg="#78909C", fg="white", padx=10, pady=5, relief="raised").grid(row=5, column=1, pady=8, padx=5, sticky="ew")
 
 
     def create_analises_tab(self, parent_frame):
@@ -675,6 +390,9 @@ class LotomaniaIA(tk.Tk):
         tk.Button(parent_frame, text="Salvar Jogos Gerados em Arquivo", command=self.salvar_jogos_gerados, font=("Arial", 11), bg="#009688", fg="white", padx=10, pady=5, relief="raised").grid(row=1, column=1, pady=8, padx=5, sticky="ew")
         tk.Button(parent_frame, text="Carregar Jogos de Arquivo", command=self.carregar_jogos_de_arquivo, font=("Arial", 11), bg="#673AB7", fg="white", padx=10, pady=5, relief="raised").grid(row=2, column=0, columnspan=2, pady=8, padx=5, sticky="ew")
         tk.Button(parent_frame, text="Preparar para Impressão", command=self.preparar_para_impressao, font=("Arial", 11), bg="#FF9800", fg="white", padx=10, pady=5, relief="raised").grid(row=3, column=0, columnspan=2, pady=8, padx=5, sticky="ew")
+        tk.Button(parent_frame, text="Registrar Jogos para Conferência", command=self.registrar_jogos_para_conferencia, font=("Arial", 11), bg="#795548", fg="white", padx=10, pady=5, relief="raised").grid(row=4, column=0, pady=8, padx=5, sticky="ew")
+        tk.Button(parent_frame, text="Relatório de Apostas", command=self.mostrar_relatorio_apostas, font=("Arial", 11), bg="#455A64", fg="white", padx=10, pady=5, relief="raised").grid(row=4, column=1, pady=8, padx=5, sticky="ew")
+        tk.Button(parent_frame, text="Remover Repetições de Arquivo", command=self.remover_repeticoes_de_arquivo, font=("Arial", 11), bg="#00796B", fg="white", padx=10, pady=5, relief="raised").grid(row=5, column=0, columnspan=2, pady=8, padx=5, sticky="ew")
 
 
     def create_ferramentas_tab(self, parent_frame):
@@ -686,7 +404,9 @@ class LotomaniaIA(tk.Tk):
         # Seção de Probabilidades
         prob_frame = tk.LabelFrame(parent_frame, text="Calculadora de Probabilidades", font=("Arial", 10, "bold"), fg="#555", padx=10, pady=5)
         prob_frame.grid(row=1, column=0, columnspan=2, pady=(5, 10), padx=10, sticky="ew")
-        tk.Button(prob_frame, text="Mostrar Probabilidades", command=self.mostrar_probabilidades, font=("Arial", 11), bg="#4A90E2", fg="white", padx=10, pady=5, relief="raised").pack(pady=5)
+        tk.Button(prob_frame, text="Mostrar Probabilidades", command=self.mostrar_probabilidades, font=("Arial", 11), bg="#4A90E2", fg="white", padx=10, pady=5, relief="raised").pack(side=tk.LEFT, expand=True, pady=5)
+        tk.Button(prob_frame, text="Avaliar Carteira (Jogos na Tela)", command=self.mostrar_avaliacao_carteira, font=("Arial", 11), bg="#4A90E2", fg="white", padx=10, pady=5, relief="raised").pack(side=tk.LEFT, expand=True, pady=5)
+        tk.Button(prob_frame, text="Simular Jogos na Tela", command=self.mostrar_simulacao_jogos, font=("Arial", 11), bg="#4A90E2", fg="white", padx=10, pady=5, relief="raised").pack(side=tk.LEFT, expand=True, pady=5)
 
         # Seção de Comparador
         comp_frame = tk.LabelFrame(parent_frame, text="Comparar Jogo com Concurso", font=("Arial", 10, "bold"), fg="#555", padx=10, pady=5)
@@ -699,14 +419,85 @@ class LotomaniaIA(tk.Tk):
         self.jogo_comparar_entry.grid(row=1, column=1, sticky="ew", padx=5, pady=2)
         tk.Button(comp_frame, text="Comparar", command=self.comparar_jogo_com_concurso, font=("Arial", 11), bg="#C2185B", fg="white", padx=10, pady=5, relief="raised").grid(row=2, column=0, columnspan=2, pady=5)
 
+        # Seção de Consultas ao Histórico
+        consulta_frame = tk.LabelFrame(parent_frame, text="Consultar Histórico", font=("Arial", 10, "bold"), fg="#555", padx=10, pady=5)
+        consulta_frame.grid(row=3, column=0, columnspan=2, pady=(5, 10), padx=10, sticky="ew")
+        consulta_frame.grid_columnconfigure(1, weight=1)
+        self.consulta_entries = {}
+        for linha, (chave, rotulo) in enumerate((('todas', "Saíram todas:"), ('nenhuma', "Não saiu nenhuma:"), ('jogo', "Jogo (acertos):"))):
+            tk.Label(consulta_frame, text=rotulo).grid(row=linha, column=0, sticky="w", padx=5, pady=2)
+            self.consulta_entries[chave] = tk.Entry(consulta_frame, width=30, font=("Arial", 10))
+            self.consulta_entries[chave].grid(row=linha, column=1, columnspan=3, sticky="ew", padx=5, pady=2)
+        self.add_tooltip(self.consulta_entries['todas'], "Dezenas separadas por vírgula; ex.: 07, 44 para saber quando o par saiu junto.")
+        self.add_tooltip(self.consulta_entries['jogo'], "Com um jogo, lista os concursos em que ele teria pelo menos o mínimo de acertos.")
+        tk.Label(consulta_frame, text="Mínimo de acertos:").grid(row=3, column=0, sticky="w", padx=5, pady=2)
+        self.consulta_minimo_var = tk.IntVar(value=FAIXAS_PREMIADAS[1])
+        tk.Spinbox(consulta_frame, from_=0, to=NUM_DEZENAS_SORTEADAS, textvariable=self.consulta_minimo_var, width=5).grid(row=3, column=1, sticky="w", padx=5, pady=2)
+        tk.Label(consulta_frame, text="Concursos de/até:").grid(row=3, column=2, sticky="e", padx=5, pady=2)
+        intervalo_frame = tk.Frame(consulta_frame)
+        intervalo_frame.grid(row=3, column=3, sticky="w", padx=5, pady=2)
+        self.consulta_de_entry = tk.Entry(intervalo_frame, width=7, font=("Arial", 10))
+        self.consulta_de_entry.pack(side=tk.LEFT)
+        self.consulta_ate_entry = tk.Entry(intervalo_frame, width=7, font=("Arial", 10))
+        self.consulta_ate_entry.pack(side=tk.LEFT, padx=(3, 0))
+        tk.Button(consulta_frame, text="Consultar", command=self.consultar_historico, font=("Arial", 11), bg="#C2185B", fg="white", padx=10, pady=5, relief="raised").grid(row=4, column=0, columnspan=4, pady=5)
+
         # Seção de Temas
         tema_frame = tk.LabelFrame(parent_frame, text="Escolher Tema", font=("Arial", 10, "bold"), fg="#555", padx=10, pady=5)
-        tema_frame.grid(row=3, column=0, columnspan=2, pady=(5, 10), padx=10, sticky="ew")
+        tema_frame.grid(row=4, column=0, columnspan=2, pady=(5, 10), padx=10, sticky="ew")
         self.tema_var = tk.StringVar(value=self.current_theme)
         ttk.Radiobutton(tema_frame, text="Padrão", variable=self.tema_var, value="Padrão", command=lambda: self.apply_theme("Padrão")).pack(anchor="w")
         ttk.Radiobutton(tema_frame, text="Azul Escuro", variable=self.tema_var, value="Azul Escuro", command=lambda: self.apply_theme("Azul Escuro")).pack(anchor="w")
         ttk.Radiobutton(tema_frame, text="Verde Claro", variable=self.tema_var, value="Verde Claro", command=lambda: self.apply_theme("Verde Claro")).pack(anchor="w")
 
+        # Seção de Diagnóstico (telemetria)
+        diag_frame = tk.LabelFrame(parent_frame, text="Diagnóstico de Desempenho", font=("Arial", 10, "bold"), fg="#555", padx=10, pady=5)
+        diag_frame.grid(row=5, column=0, columnspan=2, pady=(5, 10), padx=10, sticky="ew")
+        self.telemetria_var = tk.BooleanVar(value=TELEMETRIA.ativa)
+        tk.Checkbutton(diag_frame, text="Ativar telemetria (tempos e contadores)", variable=self.telemetria_var, command=self.alternar_telemetria).grid(row=0, column=0, columnspan=3, sticky="w")
+        tk.Button(diag_frame, text="Mostrar Diagnóstico", command=self.mostrar_diagnostico, font=("Arial", 10), bg="#455A64", fg="white", padx=8, pady=3, relief="raised").grid(row=1, column=0, pady=5, padx=3, sticky="ew")
+        tk.Button(diag_frame, text="Exportar Métricas", command=self.exportar_metricas, font=("Arial", 10), bg="#455A64", fg="white", padx=8, pady=3, relief="raised").grid(row=1, column=1, pady=5, padx=3, sticky="ew")
+        tk.Button(diag_frame, text="Zerar", command=TELEMETRIA.zerar, font=("Arial", 10), bg="#455A64", fg="white", padx=8, pady=3, relief="raised").grid(row=1, column=2, pady=5, padx=3, sticky="ew")
+
+
+    def alternar_telemetria(self):
+        TELEMETRIA.ativa = self.telemetria_var.get()
+        if TELEMETRIA.ativa and TELEMETRIA._logger is None:
+            TELEMETRIA.configurar_log()
+
+    def mostrar_diagnostico(self):
+        top = tk.Toplevel(self)
+        top.title("Diagnóstico de Desempenho - Lotomania")
+        top.geometry("620x450")
+        top.transient(self)
+
+        text_area = scrolledtext.ScrolledText(top, wrap=tk.NONE, width=70, height=22, font=("Courier New", 10))
+        text_area.pack(padx=10, pady=10, fill=tk.BOTH, expand=True)
+
+        def atualizar():
+            text_area.config(state=tk.NORMAL)
+            text_area.delete(1.0, tk.END)
+            if not TELEMETRIA.ativa:
+                text_area.insert(tk.END, "Telemetria desativada. Marque 'Ativar telemetria' para coletar dados.\n\n")
+            text_area.insert(tk.END, TELEMETRIA.formatar_texto())
+            text_area.config(state=tk.DISABLED)
+
+        atualizar()
+        tk.Button(top, text="Atualizar", command=atualizar, font=("Arial", 10), bg="#2196F3", fg="white", padx=10, pady=3, relief="raised").pack(pady=(0, 10))
+
+    def exportar_metricas(self):
+        file_path = filedialog.asksaveasfilename(
+            defaultextension=".prom",
+            initialfile=TELEMETRIA_PROMETHEUS_FILE,
+            filetypes=[("Métricas Prometheus", "*.prom"), ("Todos os Arquivos", "*.*")],
+            title="Exportar Métricas"
+        )
+        if file_path:
+            try:
+                TELEMETRIA.exportar_prometheus(file_path)
+                messagebox.showinfo("Exportado", f"Métricas exportadas em:\n{file_path}")
+            except Exception as e:
+                messagebox.showerror("Erro ao Exportar", f"Não foi possível exportar as métricas. Erro: {e}")
 
     def update_status_label(self):
         if self.historico:
@@ -762,6 +553,69 @@ class LotomaniaIA(tk.Tk):
                 messagebox.showinfo("Salvo", f"Jogos salvos com sucesso em:\n{file_path}")
             except Exception as e:
                 messagebox.showerror("Erro ao Salvar", f"Não foi possível salvar os jogos. Erro: {e}")
+                return
+            if extrair_jogos_de_texto(conteudo) and messagebox.askyesno("Conferência Automática", "Deseja registrar estes jogos para serem conferidos automaticamente quando os próximos concursos forem baixados?"):
+                self.registrar_jogos_para_conferencia()
+
+    def registrar_jogos_para_conferencia(self):
+        """Registra os jogos da área de resultados no registro de apostas, com concurso alvo e validade."""
+        jogos = extrair_jogos_de_texto(self.resultado_text_area.get(1.0, tk.END))
+        if not jogos:
+            messagebox.showwarning("Nada para Registrar", "Não há jogos gerados na tela para registrar.")
+            return
+        proximo = max(self.historico_map) + 1 if self.historico_map else 1
+        concurso_alvo = simpledialog.askinteger("Concurso Alvo", "Para qual concurso são estes jogos?", initialvalue=proximo, minvalue=1, parent=self)
+        if concurso_alvo is None:
+            return
+        validos = simpledialog.askinteger("Teimosinha", f"Por quantos concursos seguidos os jogos valem (1 a {APOSTA_MAX_CONCURSOS})?", initialvalue=1, minvalue=1, maxvalue=APOSTA_MAX_CONCURSOS, parent=self)
+        if validos is None:
+            return
+        ids = self.registro_apostas.registrar(jogos, concurso_alvo, validos)
+        conferidos = self.registro_apostas.sincronizar(self.historico_map) # Concursos alvo que já saíram são conferidos na hora
+        self.registro_apostas.salvar()
+        mensagem = f"{len(ids)} jogo(s) registrado(s) para o concurso {concurso_alvo}" + (f" e os {validos - 1} seguintes." if validos > 1 else ".")
+        if conferidos:
+            mensagem += f"\n{len(conferidos)} conferência(s) já feita(s) com concursos do histórico."
+        messagebox.showinfo("Apostas Registradas", mensagem)
+
+    def conferir_apostas_registradas(self):
+        """Confere as apostas pendentes com os concursos recém-chegados e avisa sobre as premiadas."""
+        conferidos = self.registro_apostas.sincronizar(self.historico_map)
+        if not conferidos:
+            return
+        self.registro_apostas.salvar()
+        premiadas = [(aposta, concurso, acertos) for aposta, concurso, acertos in conferidos if acertos in FAIXAS_PREMIADAS]
+        logger.info(f"{len(conferidos)} conferência(s) de apostas registradas, {len(premiadas)} premiada(s).")
+        if premiadas:
+            linhas = "\n".join(f"Aposta #{aposta} no concurso {concurso}: {acertos} acertos" for aposta, concurso, acertos in premiadas[:20])
+            messagebox.showinfo("Apostas Premiadas", f"{len(premiadas)} aposta(s) registrada(s) premiada(s) nos novos concursos:\n\n{linhas}")
+
+    def mostrar_relatorio_apostas(self):
+        relatorio = self.registro_apostas.relatorio(self.cache_api)
+        top = tk.Toplevel(self)
+        top.title("Relatório de Apostas Registradas")
+        top.geometry("480x500")
+        top.transient(self)
+
+        text_area = scrolledtext.ScrolledText(top, wrap=tk.WORD, width=56, height=26, font=("Courier New", 10))
+        text_area.pack(padx=10, pady=10)
+        text_area.insert(tk.END, "--- Apostas Registradas ---\n", "title")
+        text_area.insert(tk.END, f"Apostas: {self.registro_apostas.num_apostas}   Conferências: {relatorio['conferencias']}   Aguardando sorteio: {relatorio['pendentes']}\n\n")
+        text_area.insert(tk.END, "--- Faixas de Premiação ---\n", "title")
+        for faixa in sorted(relatorio['faixas'], reverse=True):
+            text_area.insert(tk.END, f"{faixa:>2} acertos: {relatorio['faixas'][faixa]}\n")
+        text_area.insert(tk.END, "\n--- Premiadas ---\n", "title")
+        if not relatorio['premiadas']:
+            text_area.insert(tk.END, "Nenhuma aposta premiada até agora.\n")
+        total = 0.0
+        for aposta, concurso, acertos, valor in relatorio['premiadas']:
+            texto_valor = f"R$ {valor:,.2f}" if isinstance(valor, (int, float)) else "valor desconhecido"
+            total += valor if isinstance(valor, (int, float)) else 0.0
+            text_area.insert(tk.END, f"Aposta #{aposta} | concurso {concurso} | {acertos} acertos | {texto_valor}\n")
+        if total:
+            text_area.insert(tk.END, f"\nTotal conhecido: R$ {total:,.2f}\n")
+        text_area.tag_config("title", font=("Courier New", 12, "bold"), foreground="blue")
+        text_area.config(state=tk.DISABLED)
 
     def carregar_jogos_de_arquivo(self):
         """Carrega jogos de um arquivo de texto e os exibe na área de resultados."""
@@ -775,18 +629,7 @@ class LotomaniaIA(tk.Tk):
                     conteudo = f.read()
                 
                 # Tenta formatar para exibir como jogos, se possível
-                jogos_carregados = []
-                for line in conteudo.split('\n'):
-                    if "Jogo" in line and ":" in line:
-                        try:
-                            # Extrai os números após o ': ' e remove espaços
-                            nums_str = line.split(': ')[1].strip()
-                            nums = sorted([int(n) for n in nums_str.split(',') if n.strip().isdigit()])
-                            if len(nums) == NUM_DEZENAS_POR_APOSTA:
-                                jogos_carregados.append(nums)
-                        except (ValueError, IndexError):
-                            # Se a linha não for um formato de jogo reconhecível, ignora
-                            pass
+                jogos_carregados = extrair_jogos_de_texto(conteudo)
                 
                 if jogos_carregados:
                     self.atualizar_resultado_text_area(jogos_carregados)
@@ -801,6 +644,31 @@ class LotomaniaIA(tk.Tk):
             except Exception as e:
                 messagebox.showerror("Erro ao Carregar", f"Não foi possível carregar os jogos. Erro: {e}")
 
+    def remover_repeticoes_de_arquivo(self):
+        """Carrega um arquivo de jogos e exibe só a primeira ocorrência de cada jogo, sem repetições nem quase repetições."""
+        file_path = filedialog.askopenfilename(
+            filetypes=[("Arquivos de Texto", "*.txt"), ("Todos os Arquivos", "*.*")],
+            title="Remover Repetições de Arquivo"
+        )
+        if not file_path:
+            return
+        try:
+            with open(file_path, 'r', encoding='utf-8') as f:
+                jogos = extrair_jogos_de_texto(f.read())
+        except (OSError, UnicodeDecodeError) as e:
+            messagebox.showerror("Erro ao Carregar", f"Não foi possível ler o arquivo. Erro: {e}")
+            return
+        if not jogos:
+            messagebox.showwarning("Nenhum Jogo", "Nenhum jogo no formato padrão foi encontrado no arquivo.")
+            return
+
+        limiar = self.limiar_repeticao_var.get() if self.evitar_repeticoes_var.get() else None
+        unicos, removidos = deduplicar_jogos(jogos, limiar)
+        self.atualizar_resultado_text_area(unicos)
+        linhas = "\n".join(f"Jogo {posicao + 1:02d} repete o jogo {mantido + 1:02d} ({em_comum} dezenas em comum)" for posicao, mantido, em_comum in removidos[:20])
+        messagebox.showinfo("Repetições Removidas", f"{len(jogos)} jogo(s) no arquivo: {len(removidos)} removido(s), {len(unicos)} exibido(s).\n\n{linhas}\n\n"
+                                                    "Use 'Salvar Jogos Gerados em Arquivo' para gravar a lista sem repetições.")
+
     def preparar_para_impressao(self):
         """Abre uma nova janela com os jogos formatados para impressão."""
         conteudo = self.resultado_text_area.get(1.0, tk.END).strip()
@@ -858,10 +726,34 @@ class LotomaniaIA(tk.Tk):
         copy_button.pack(pady=10)
 
 
+    def _indice_repeticoes(self):
+        """IndiceJogos com as apostas registradas e o limite da aba de geração; False se o limite for inválido."""
+        try:
+            indice = IndiceJogos(self.limiar_repeticao_var.get())
+        except (ValueError, tk.TclError):
+            messagebox.showerror("Erro de Entrada", f"O limite de dezenas em comum deve ser um número entre 1 e {NUM_DEZENAS_POR_APOSTA}.")
+            return False
+        indice.adicionar_apostas(self.registro_apostas)
+        return indice
+
+    def _gerar_sem_repeticoes(self, gerar_lote, num_jogos):
+        """Gera com gerar_lote(n) rejeitando, se ativado, jogos iguais ou quase iguais a outros do lote ou às apostas registradas."""
+        if not self.evitar_repeticoes_var.get():
+            return gerar_lote(num_jogos)
+        indice = self._indice_repeticoes()
+        if indice is False:
+            return []
+        jogos, rejeitados = gerar_sem_repeticoes(gerar_lote, num_jogos, indice)
+        if rejeitados:
+            logger.info(f"{rejeitados} jogo(s) rejeitado(s) por repetir ou quase repetir outro jogo.")
+        if rejeitados and len(jogos) < num_jogos:
+            messagebox.showwarning("Repetições", f"Só foi possível gerar {len(jogos)} de {num_jogos} jogos sem repetições ({rejeitados} rejeitados). Aumente o limite de dezenas em comum ou afrouxe os filtros.")
+        return jogos
+
     def gerar_e_exibir_aleatorio(self):
         start_time = time.time()
         num_jogos = self.num_jogos_gerar.get()
-        jogos = gerar_aleatorio_lotomania(num_jogos)
+        jogos = self._gerar_sem_repeticoes(gerar_aleatorio_lotomania, num_jogos)
         end_time = time.time()
         self.atualizar_resultado_text_area(jogos, end_time - start_time)
 
@@ -871,7 +763,27 @@ class LotomaniaIA(tk.Tk):
             return
         start_time = time.time()
         num_jogos = self.num_jogos_gerar.get()
-        jogos = gerar_baseado_em_frequencia_lotomania(self.frequencias, num_jogos)
+        jogos = self._gerar_sem_repeticoes(lambda n: gerar_baseado_em_frequencia_lotomania(self.frequencias, n), num_jogos)
+        end_time = time.time()
+        self.atualizar_resultado_text_area(jogos, end_time - start_time)
+
+    def gerar_e_exibir_transicao(self):
+        if not self.historico:
+            messagebox.showwarning("Dados Ausentes", "Nenhum histórico disponível para o modelo de transição. Por favor, atualize os dados online ou use outro método.")
+            return
+        start_time = time.time()
+        num_jogos = self.num_jogos_gerar.get()
+        jogos = self._gerar_sem_repeticoes(lambda n: gerar_por_transicao_lotomania(self.modelo_transicao, n), num_jogos)
+        end_time = time.time()
+        self.atualizar_resultado_text_area(jogos, end_time - start_time)
+
+    def gerar_e_exibir_modelo_ia(self):
+        if not self.historico:
+            messagebox.showwarning("Dados Ausentes", "Nenhum histórico disponível para o modelo de IA. Por favor, atualize os dados online ou use outro método.")
+            return
+        start_time = time.time()
+        num_jogos = self.num_jogos_gerar.get()
+        jogos = self._gerar_sem_repeticoes(lambda n: gerar_por_modelo_ia_lotomania(self.modelo_ia, n), num_jogos)
         end_time = time.time()
         self.atualizar_resultado_text_area(jogos, end_time - start_time)
 
@@ -880,7 +792,10 @@ class LotomaniaIA(tk.Tk):
         if not self.historico:
             messagebox.showwarning("Dados Ausentes", "Nenhum histórico disponível para plotar frequências. Por favor, atualize os dados online.")
             return
-        plotar_frequencias_lotomania(self.frequencias)
+        if self.painel_grafico is None or not self.painel_grafico.winfo_exists():
+            self.painel_grafico = PainelGraficoFrequencias(self)
+        else:
+            self.painel_grafico.mostrar()
 
     def mostrar_analises_detalhadas(self):
         if not self.historico:
@@ -889,29 +804,102 @@ class LotomaniaIA(tk.Tk):
             
         top = tk.Toplevel(self)
         top.title("Análises Detalhadas - Lotomania")
-        top.geometry("450x600")
+        top.geometry("560x600")
         top.transient(self)
         top.grab_set()
 
-        text_area = scrolledtext.ScrolledText(top, wrap=tk.WORD, width=50, height=30, font=("Courier New", 10))
+        text_area = scrolledtext.ScrolledText(top, wrap=tk.WORD, width=64, height=30, font=("Courier New", 10))
         text_area.pack(padx=10, pady=10)
+
+        # Calculado uma vez por versão do histórico; as próximas aberturas leem do cache
+        testes = testes_aleatoriedade_em_cache(self.historico, self.cache_analises)
+        p_dezenas = testes['uniformidade_dezenas']['p']
+        p_sequencias = testes['sequencias']['p']
+        marca = lambda p: "*" if p < NIVEL_SIGNIFICANCIA else " "
         
         text_area.insert(tk.END, "--- Números Quentes (Mais Frequentes) ---\n", "title")
         quentes_sorted = sorted(self.frequencias.items(), key=lambda item: item[1], reverse=True)
         for num, freq in quentes_sorted[:20]:
-            text_area.insert(tk.END, f"Número {num:02d}: {freq} vezes\n")
+            text_area.insert(tk.END, f"Número {num:02d}: {freq} vezes (p={p_dezenas[num]:.3f}){marca(p_dezenas[num])}\n")
         text_area.insert(tk.END, "\n")
 
         text_area.insert(tk.END, "--- Números Frios (Menos Frequentes) ---\n", "title")
         frios_sorted = sorted(self.frequencias.items(), key=lambda item: item[1])
         for num, freq in frios_sorted[:20]:
-            text_area.insert(tk.END, f"Número {num:02d}: {freq} vezes\n")
+            text_area.insert(tk.END, f"Número {num:02d}: {freq} vezes (p={p_dezenas[num]:.3f}){marca(p_dezenas[num])}\n")
         text_area.insert(tk.END, "\n")
 
         text_area.insert(tk.END, "--- Análise de Atrasos ---\n", "title")
+        media_intervalos = self.analise_atrasos.media()
+        p95_intervalos = self.analise_atrasos.percentil(0.95)
         atrasos_sorted = sorted(self.atrasos.items(), key=lambda item: item[1], reverse=True)
         for num, atraso in atrasos_sorted[:20]:
-            text_area.insert(tk.END, f"Número {num:02d}: Atraso de {atraso} sorteios\n")
+            text_area.insert(tk.END, f"Número {num:02d}: Atraso de {atraso} sorteios (média {media_intervalos[num]:.1f}, p95 {p95_intervalos[num]}, sequências p={p_sequencias[num]:.3f}){marca(p_sequencias[num])}\n")
+        text_area.insert(tk.END, "\n")
+
+        text_area.insert(tk.END, "--- Atrasados Além do Percentil 95 ---\n", "title")
+        atrasadas = self.analise_atrasos.atrasadas_alem_do_percentil(0.95)
+        if not atrasadas:
+            text_area.insert(tk.END, "Nenhum número com atraso acima do seu p95 histórico.\n")
+        maximo_intervalos = self.analise_atrasos.maximo
+        sobrevivencia = self.analise_atrasos.curva_sobrevivencia()
+        for num, atraso, limiar in atrasadas:
+            k = min(atraso, sobrevivencia.shape[1] - 1)
+            text_area.insert(tk.END, f"Número {num:02d}: {atraso} sorteios (p95 {limiar}, máx {maximo_intervalos[num]}, P(>atraso) {sobrevivencia[num, k]:.1%})\n")
+        text_area.insert(tk.END, "\n")
+
+        text_area.insert(tk.END, "--- Volante (Linhas, Colunas, Quadrantes, Diagonais) ---\n", "title")
+        volante = analise_volante_em_cache(self.historico, self.cache_analises)
+        nomes_grupos = {
+            'linhas': [f"{10 * i:02d}-{10 * i + 9:02d}" for i in range(10)],
+            'colunas': [f"final {j}" for j in range(10)],
+            'quadrantes': ["sup. esq.", "sup. dir.", "inf. esq.", "inf. dir."],
+            'diagonais': ["principal", "secundária"],
+        }
+        for _, recorte, _, tamanho in CRITERIOS_VOLANTE:
+            estatisticas = volante[recorte]
+            esperado = NUM_DEZENAS_SORTEADAS * tamanho / NUM_DEZENAS_TOTAL
+            text_area.insert(tk.END, f"{recorte.capitalize()} (esperado {esperado:.1f} por sorteio):\n")
+            for nome, media, std in zip(nomes_grupos[recorte], estatisticas['media'], estatisticas['std']):
+                text_area.insert(tk.END, f"  {nome:<10}: {media:.2f} ± {std:.2f}\n")
+        text_area.insert(tk.END, "\n")
+
+        text_area.insert(tk.END, "--- Modelo de Transição (próximo sorteio) ---\n", "title")
+        for nome, observacoes, probabilidade in self.modelo_transicao.resumo_estados():
+            text_area.insert(tk.END, f"{nome:<14}: P(sair) {probabilidade:.3f} em {observacoes} observações\n")
+        pontuacao = self.modelo_transicao.pontuar()
+        melhores = np.argsort(-pontuacao, kind='stable')[:10]
+        text_area.insert(tk.END, "Maiores pontuações: " + ", ".join(f"{n:02d} ({pontuacao[n]:.3f})" for n in melhores) + "\n\n")
+
+        text_area.insert(tk.END, "--- Modelo de IA (Regressão Logística) ---\n", "title")
+        avaliacao = self.cache_analises.obter_ou_calcular(impressao_digital_historico(self.historico), "walk_forward:10", lambda: avaliar_modelo_walk_forward(self.historico))
+        for nome, peso in self.modelo_ia.coeficientes().items():
+            text_area.insert(tk.END, f"{nome:<15}: {peso:+.4f}\n")
+        text_area.insert(tk.END, f"Walk-forward em {avaliacao['sorteios_avaliados']} sorteios (treino inicial {avaliacao['sorteios_treino_inicial']}):\n")
+        text_area.insert(tk.END, f"  Log-loss {avaliacao['log_loss']:.5f} (sorteio justo {avaliacao['log_loss_base']:.5f})\n")
+        text_area.insert(tk.END, f"  Brier {avaliacao['brier']:.5f} (sorteio justo {avaliacao['brier_base']:.5f})\n")
+        text_area.insert(tk.END, f"  Acertos nas 50 mais prováveis: {avaliacao['acertos_top50_media']:.2f} por sorteio (ao acaso {avaliacao['acertos_top50_esperado']:.0f})\n\n")
+
+        text_area.insert(tk.END, "--- Testes de Aleatoriedade ---\n", "title")
+        text_area.insert(tk.END, f"{testes['num_sorteios']} sorteios. p < {NIVEL_SIGNIFICANCIA} (*) indica desvio improvável em um sorteio justo.\n")
+        globais = [
+            ("Uniformidade das dezenas (qui-quadrado)", testes['uniformidade_dezenas']['global']['p']),
+            ("Uniformidade das faixas de dez (qui-quadrado)", testes['uniformidade_faixas']['global']['p']),
+            ("Independência dos pares (Monte Carlo)", testes['independencia_pares']['p']),
+            ("Soma das dezenas (KS)", testes['ks_soma']['p']),
+            ("Quantidade de pares (KS)", testes['ks_pares']['p']),
+        ]
+        for nome, p in globais:
+            text_area.insert(tk.END, f"{nome}: p={p:.4f}{marca(p)}\n")
+        for titulo, p_valores in (("uniformidade", p_dezenas), ("sequências", p_sequencias)):
+            significativos = sum(1 for p in p_valores if p < NIVEL_SIGNIFICANCIA)
+            text_area.insert(tk.END, f"Dezenas com p < {NIVEL_SIGNIFICANCIA} no teste de {titulo}: {significativos} (esperado ao acaso: {NIVEL_SIGNIFICANCIA * NUM_DEZENAS_TOTAL:.0f})\n")
+        faixas_p = testes['uniformidade_faixas']['p']
+        text_area.insert(tk.END, "Faixas: " + ", ".join(f"{10 * i:02d}-{10 * i + 9:02d} p={p:.2f}" for i, p in enumerate(faixas_p)) + "\n")
+        text_area.insert(tk.END, "Pares mais atípicos:\n")
+        for extremo in testes['independencia_pares']['extremos'][:5]:
+            a, b = extremo['par']
+            text_area.insert(tk.END, f"  {a:02d}-{b:02d}: {extremo['observado']} vezes juntos (esperado {testes['independencia_pares']['esperado_por_par']:.1f}, z={extremo['z']:+.2f})\n")
         text_area.insert(tk.END, "\n")
 
         text_area.tag_config("title", font=("Courier New", 12, "bold"), foreground="blue")
@@ -952,6 +940,88 @@ class LotomaniaIA(tk.Tk):
         text_area.tag_config("title", font=("Courier New", 12, "bold"), foreground="blue")
         text_area.config(state=tk.DISABLED)
 
+    def mostrar_avaliacao_carteira(self):
+        """Avalia os jogos da área de resultados como uma carteira: melhor faixa e bilhetes premiados por sorteio."""
+        jogos = extrair_jogos_de_texto(self.resultado_text_area.get(1.0, tk.END))
+        if not jogos:
+            messagebox.showwarning("Nada para Avaliar", "Gere ou carregue jogos na área de resultados para avaliar a carteira.")
+            return
+        self.config(cursor="watch")
+        self.update_idletasks()
+        try:
+            avaliacao = avaliar_carteira_lotomania(jogos)
+            avaliacao_historico = avaliar_carteira_lotomania(jogos, metodo="historico", historico_dezenas_list=self.historico) if self.historico else None
+        finally:
+            self.config(cursor="")
+
+        top = tk.Toplevel(self)
+        top.title("Avaliação da Carteira - Lotomania")
+        top.geometry("520x560")
+        top.transient(self)
+
+        text_area = scrolledtext.ScrolledText(top, wrap=tk.WORD, width=60, height=30, font=("Courier New", 10))
+        text_area.pack(padx=10, pady=10)
+        text_area.insert(tk.END, "--- Avaliação da Carteira ---\n", "title")
+        if avaliacao['metodo'] == "exato":
+            text_area.insert(tk.END, f"{avaliacao['num_jogos']} jogo(s), cálculo exato\n\n")
+        else:
+            text_area.insert(tk.END, f"{avaliacao['num_jogos']} jogo(s), {avaliacao['num_sorteios']:,} sorteios simulados ({avaliacao['sorteios_por_segundo']:,.0f}/s)\n\n")
+
+        text_area.insert(tk.END, "--- Melhor Faixa por Sorteio ---\n", "title")
+        for faixa, prob in avaliacao['melhor_faixa'].items():
+            texto = f"1 em {1 / prob:,.0f}" if prob > 0 else "não ocorreu na simulação"
+            text_area.insert(tk.END, f"{faixa:>2} acertos: {texto}\n")
+        algum = avaliacao['prob_algum_premio']
+        text_area.insert(tk.END, f"Algum prêmio: {algum:.4%}" + (f" (1 em {1 / algum:,.1f})\n\n" if algum > 0 else "\n\n"))
+
+        text_area.insert(tk.END, "--- Bilhetes Premiados por Sorteio ---\n", "title")
+        for quantidade, prob in enumerate(avaliacao['premiados']):
+            if prob >= 1e-6:
+                text_area.insert(tk.END, f"{quantidade:>3} premiado(s): {prob:.4%}\n")
+        premiado_um_jogo = sum(calcular_probabilidade_lotomania(0).values())
+        desvio_independentes = math.sqrt(avaliacao['num_jogos'] * premiado_um_jogo * (1 - premiado_um_jogo))
+        text_area.insert(tk.END, f"\nMédia: {avaliacao['media_premiados']:.4f} (exata: {avaliacao['media_premiados_exata']:.4f})\n")
+        text_area.insert(tk.END, f"Desvio padrão: {math.sqrt(avaliacao['variancia_premiados']):.4f} (exato: {math.sqrt(avaliacao['variancia_premiados_exata']):.4f})\n")
+        text_area.insert(tk.END, f"Desvio se os jogos fossem independentes: {desvio_independentes:.4f}\n\n")
+
+        if avaliacao_historico:
+            text_area.insert(tk.END, f"--- Nos {avaliacao_historico['num_sorteios']} Sorteios do Histórico ---\n", "title")
+            text_area.insert(tk.END, f"Algum prêmio: {avaliacao_historico['prob_algum_premio']:.4%}\n")
+            text_area.insert(tk.END, f"Média de premiados: {avaliacao_historico['media_premiados']:.4f}\n")
+            for faixa, prob in avaliacao_historico['melhor_faixa'].items():
+                if prob > 0:
+                    text_area.insert(tk.END, f"{faixa:>2} acertos como melhor faixa: {round(prob * avaliacao_historico['num_sorteios'])} vez(es)\n")
+
+        text_area.tag_config("title", font=("Courier New", 12, "bold"), foreground="blue")
+        text_area.config(state=tk.DISABLED)
+
+
+    def mostrar_simulacao_jogos(self):
+        """Simula sorteios em paralelo contra os jogos da área de resultados e compara as faixas com a teoria."""
+        jogos = extrair_jogos_de_texto(self.resultado_text_area.get(1.0, tk.END))
+        if not jogos:
+            messagebox.showwarning("Nada para Simular", "Gere ou carregue jogos na área de resultados para simular.")
+            return
+        num_sorteios = simpledialog.askinteger("Simulação Monte Carlo", "Quantos sorteios simular?", initialvalue=1_000_000, minvalue=1000, maxvalue=100_000_000, parent=self)
+        if num_sorteios is None:
+            return
+        self.config(cursor="watch")
+        self.update_idletasks()
+        try:
+            resultado = simular_estrategia_paralela(jogos, num_sorteios)
+        finally:
+            self.config(cursor="")
+
+        top = tk.Toplevel(self)
+        top.title("Simulação Monte Carlo - Lotomania")
+        top.geometry("640x420")
+        top.transient(self)
+        text_area = scrolledtext.ScrolledText(top, wrap=tk.NONE, width=76, height=20, font=("Courier New", 10))
+        text_area.pack(padx=10, pady=10)
+        text_area.insert(tk.END, "--- Faixas Simuladas x Teoria ---\n", "title")
+        text_area.insert(tk.END, resumo_simulacao(resultado) + "\n")
+        text_area.tag_config("title", font=("Courier New", 12, "bold"), foreground="blue")
+        text_area.config(state=tk.DISABLED)
 
     def comparar_jogo_com_concurso(self):
         concurso_num_str = self.concurso_entry.get()
@@ -985,12 +1055,59 @@ class LotomaniaIA(tk.Tk):
         concurso_sorteado = self.historico_map.get(concurso_num)
         
         if concurso_sorteado:
-            acertos = len(set(seu_jogo).intersection(set(concurso_sorteado)))
+            acertos = contar_acertos_lotomania(seu_jogo, concurso_sorteado)
             messagebox.showinfo("Resultado da Comparação", f"No concurso {concurso_num}, você acertaria {acertos} dezenas!")
         else:
             messagebox.showwarning("Concurso Não Encontrado", f"O concurso {concurso_num} não foi encontrado no histórico local. Tente atualizar os dados ou digite um concurso válido.")
 
 
+    def consultar_historico(self):
+        """Concursos em que todas as dezenas saíram, nenhuma saiu e/ou o jogo teria o mínimo de acertos."""
+        if not self.indice_concursos.num_sorteios:
+            messagebox.showwarning("Dados Ausentes", "Histórico de sorteios não carregado. Por favor, atualize os dados online primeiro.")
+            return
+        try:
+            campos = {chave: [int(p) for p in entry.get().replace(" ", "").split(',') if p] for chave, entry in self.consulta_entries.items()}
+            de = int(self.consulta_de_entry.get()) if self.consulta_de_entry.get().strip() else None
+            ate = int(self.consulta_ate_entry.get()) if self.consulta_ate_entry.get().strip() else None
+            minimo = self.consulta_minimo_var.get()
+        except (ValueError, tk.TclError):
+            messagebox.showerror("Erro", "Use dezenas e concursos numéricos, separados por vírgula (ex: 07, 44).")
+            return
+        jogo = campos['jogo'] or None
+        if not (campos['todas'] or campos['nenhuma'] or jogo or de is not None or ate is not None):
+            messagebox.showwarning("Consulta Vazia", "Informe dezenas, um jogo ou um intervalo de concursos.")
+            return
+
+        inicio = time.perf_counter()
+        try:
+            bitset = self.indice_concursos.consultar(campos['todas'], nenhuma=campos['nenhuma'], jogo=jogo, minimo_acertos=minimo, de=de, ate=ate)
+            resultado = self.indice_concursos.resultado(bitset, jogo=jogo)
+        except ValueError as e:
+            messagebox.showerror("Erro", str(e))
+            return
+        tempo = time.perf_counter() - inicio
+
+        condicoes = []
+        if campos['todas']:
+            condicoes.append("saíram todas: " + ", ".join(f"{n:02d}" for n in sorted(set(campos['todas']))))
+        if campos['nenhuma']:
+            condicoes.append("não saiu nenhuma: " + ", ".join(f"{n:02d}" for n in sorted(set(campos['nenhuma']))))
+        if jogo:
+            condicoes.append(f"jogo de {len(set(jogo))} dezenas com {minimo} ou mais acertos")
+        if de is not None or ate is not None:
+            condicoes.append(f"concursos {de if de is not None else 'início'} a {ate if ate is not None else 'fim'}")
+        texto = resumo_consulta(resultado, "Consulta: " + "; ".join(condicoes) + f" ({tempo * 1000:.2f} ms)\n")
+
+        top = tk.Toplevel(self)
+        top.title("Consulta ao Histórico - Lotomania")
+        top.geometry("560x420")
+        top.transient(self)
+        text_area = scrolledtext.ScrolledText(top, wrap=tk.WORD, width=64, height=20, font=("Courier New", 10))
+        text_area.pack(padx=10, pady=10, fill=tk.BOTH, expand=True)
+        text_area.insert(tk.END, texto)
+        text_area.config(state=tk.DISABLED)
+
     def abrir_config_filtros(self):
         top = tk.Toplevel(self)
         top.title("Configurar Filtros - Lotomania")
@@ -1067,29 +1184,110 @@ class LotomaniaIA(tk.Tk):
                 return
             
             start_time = time.time()
-            jogos_gerados = gerar_com_filtros_lotomania(incluir_nums, excluir_nums, num_jogos)
+            jogos_gerados = self._gerar_sem_repeticoes(lambda n: gerar_com_filtros_lotomania(incluir_nums, excluir_nums, n), num_jogos)
             end_time = time.time()
             self.atualizar_resultado_text_area(jogos_gerados, end_time - start_time)
             top.destroy()
 
         tk.Button(top, text="Gerar com Estes Filtros", command=aplicar_filtros, font=("Arial", 11, "bold"), bg="#4CAF50", fg="white", padx=10, pady=5, relief="raised").pack(pady=20)
 
+    def abrir_config_desdobramento(self):
+        top = tk.Toplevel(self)
+        top.title("Desdobramento com Garantia - Lotomania")
+        top.geometry("480x400")
+        top.transient(self)
+        top.grab_set()
+
+        tk.Label(top, text=f"Jogos de {NUM_DEZENAS_POR_APOSTA} dezenas tirados de um grupo escolhido, com garantia de acertos", font=("Arial", 9, "bold")).pack(pady=(10, 5))
+
+        tk.Label(top, text=f"Grupo de Dezenas ({NUM_DEZENAS_POR_APOSTA} a {NUM_DEZENAS_TOTAL}, separadas por vírgula; vazio = 00-99):", font=("Arial", 10, "bold")).pack(pady=(10, 0))
+        entry_grupo = tk.Entry(top, width=60)
+        entry_grupo.pack(pady=(0, 10), padx=10)
+
+        garantia_frame = tk.LabelFrame(top, text="Garantia", font=("Arial", 9, "bold"), padx=5, pady=5)
+        garantia_frame.pack(fill=tk.X, padx=10, pady=5)
+        k_var = tk.IntVar(value=6)
+        t_var = tk.IntVar(value=5)
+        tk.Label(garantia_frame, text="Se saírem pelo menos").pack(side=tk.LEFT)
+        k_spin = tk.Spinbox(garantia_frame, from_=1, to=NUM_DEZENAS_SORTEADAS, textvariable=k_var, width=4)
+        k_spin.pack(side=tk.LEFT, padx=2)
+        tk.Label(garantia_frame, text="dezenas do grupo, acertar").pack(side=tk.LEFT)
+        t_spin = tk.Spinbox(garantia_frame, from_=1, to=NUM_DEZENAS_SORTEADAS, textvariable=t_var, width=4)
+        t_spin.pack(side=tk.LEFT, padx=2)
+        self.add_tooltip(k_spin, "Quantas dezenas do grupo precisam estar entre as 20 sorteadas para a garantia valer.")
+        self.add_tooltip(t_spin, "Acertos garantidos em pelo menos um jogo (entre as dezenas do grupo).")
+
+        busca_frame = tk.Frame(top)
+        busca_frame.pack(fill=tk.X, padx=10, pady=5)
+        busca_var = tk.BooleanVar(value=True)
+        tempo_busca_var = tk.IntVar(value=5)
+        tk.Checkbutton(busca_frame, text="Reduzir com busca local por até", variable=busca_var).pack(side=tk.LEFT)
+        tk.Spinbox(busca_frame, from_=1, to=120, textvariable=tempo_busca_var, width=4).pack(side=tk.LEFT, padx=2)
+        tk.Label(busca_frame, text="segundos").pack(side=tk.LEFT)
+
+        def aplicar_desdobramento():
+            texto = entry_grupo.get().replace(" ", "")
+            try:
+                grupo = [int(p) for p in texto.split(',') if p] if texto else list(range(NUM_DEZENAS_TOTAL))
+                k, t = k_var.get(), t_var.get()
+                tempo_busca = tempo_busca_var.get()
+            except (ValueError, tk.TclError):
+                messagebox.showerror("Erro de Entrada", "Use apenas números separados por vírgula no grupo e valores inteiros nos campos.", parent=top)
+                return
+
+            top.config(cursor="watch")
+            top.update_idletasks()
+            try:
+                resultado = gerar_desdobramento_lotomania(grupo, k, t, busca_local=busca_var.get(), tempo_busca_local=tempo_busca)
+            except ValueError as e:
+                messagebox.showerror("Erro de Desdobramento", str(e), parent=top)
+                return
+            finally:
+                top.config(cursor="")
+
+            self.atualizar_resultado_text_area(resultado['jogos'], resultado['tempo_total'])
+            resumo = resumo_desdobramento(resultado)
+            self.resultado_text_area.config(state=tk.NORMAL)
+            self.resultado_text_area.insert(tk.END, f"\n{resumo}\n")
+            self.resultado_text_area.config(state=tk.DISABLED)
+            top.destroy()
+            verificacao = resultado.get('verificacao')
+            if verificacao and verificacao['falhas']:
+                # Estourou o tempo sem uma conferência limpa: os jogos não garantem o que foi pedido
+                messagebox.showwarning("Desdobramento Sem Garantia",
+                                       f"{resumo}\n\nA garantia pedida NÃO vale para estes jogos. Tente um grupo menor ou menos acertos garantidos.")
+            else:
+                messagebox.showinfo("Desdobramento Gerado", resumo)
+
+        tk.Button(top, text="Gerar Desdobramento", command=aplicar_desdobramento, font=("Arial", 11, "bold"), bg="#795548", fg="white", padx=10, pady=5, relief="raised").pack(pady=20)
+
     def abrir_config_balanceado(self):
         """
         Abre uma nova janela Toplevel para configurar os critérios da geração balanceada.
         """
         top = tk.Toplevel(self)
         top.title("Configurar Geração Balanceada - Lotomania")
-        top.geometry("600x750")
+        top.geometry("600x1040")
         top.transient(self)
         top.grab_set()
 
+        # A janela reabre com as últimas escolhas; sem elas, com os valores padrão
+        ultimas = self.configuracao.ultimas()
+        inicial = {**CRITERIOS_BALANCEADOS_PADRAO, **ultimas.get('criterios', {})}
+
         num_jogos_frame = tk.LabelFrame(top, text="Quantidade de Jogos a Gerar", font=("Arial", 9, "bold"), padx=5, pady=2)
         num_jogos_frame.pack(fill=tk.X, padx=10, pady=5)
         tk.Label(num_jogos_frame, text="Escolha:").pack(side=tk.LEFT, padx=(5, 0))
         tk.Spinbox(num_jogos_frame, from_=1, to=15, textvariable=self.num_jogos_gerar, width=5, font=("Arial", 9)).pack(side=tk.LEFT, padx=5)
         tk.Label(num_jogos_frame, text="jogos").pack(side=tk.LEFT)
 
+        predefinicoes_frame = tk.LabelFrame(top, text="Predefinições de Critérios", font=("Arial", 9, "bold"), padx=5, pady=2)
+        predefinicoes_frame.pack(fill=tk.X, padx=10, pady=5)
+        predefinicao_var = tk.StringVar(value=ultimas.get('predefinicao', ""))
+        predefinicao_combo = ttk.Combobox(predefinicoes_frame, textvariable=predefinicao_var, values=self.configuracao.nomes_predefinicoes(), state="readonly", width=22)
+        predefinicao_combo.pack(side=tk.LEFT, padx=2)
+        avaliacao_label = tk.Label(top, text="", font=("Arial", 8, "italic"), fg="#555", wraplength=560, justify=tk.LEFT)
+        avaliacao_label.pack(fill=tk.X, padx=12)
 
         criterios_frame = tk.LabelFrame(top, text="Defina os Critérios para o Jogo Balanceado", font=("Arial", 10, "bold"), padx=10, pady=10)
         criterios_frame.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
@@ -1100,8 +1298,8 @@ class LotomaniaIA(tk.Tk):
         tk.Label(criterios_frame, text="Soma das Dezenas:", font=("Arial", 9, "bold")).grid(row=row_idx, column=0, sticky="w", pady=2, padx=5)
         soma_frame = tk.Frame(criterios_frame)
         soma_frame.grid(row=row_idx, column=1, sticky="ew", pady=2, padx=5)
-        self.soma_min_var = tk.IntVar(value=2000)
-        self.soma_max_var = tk.IntVar(value=3000)
+        self.soma_min_var = tk.IntVar(value=inicial['soma_min'])
+        self.soma_max_var = tk.IntVar(value=inicial['soma_max'])
         soma_min_spin = tk.Spinbox(soma_frame, from_=0, to=4950, textvariable=self.soma_min_var, width=6)
         soma_min_spin.pack(side=tk.LEFT, padx=2)
         tk.Label(soma_frame, text="Max:").pack(side=tk.LEFT)
@@ -1114,8 +1312,8 @@ class LotomaniaIA(tk.Tk):
         tk.Label(criterios_frame, text="Números Pares:", font=("Arial", 9, "bold")).grid(row=row_idx, column=0, sticky="w", pady=2, padx=5)
         pares_frame = tk.Frame(criterios_frame)
         pares_frame.grid(row=row_idx, column=1, sticky="ew", pady=2, padx=5)
-        self.pares_min_var = tk.IntVar(value=20)
-        self.pares_max_var = tk.IntVar(value=30)
+        self.pares_min_var = tk.IntVar(value=inicial['pares_min'])
+        self.pares_max_var = tk.IntVar(value=inicial['pares_max'])
         pares_min_spin = tk.Spinbox(pares_frame, from_=0, to=50, textvariable=self.pares_min_var, width=6)
         pares_min_spin.pack(side=tk.LEFT, padx=2)
         tk.Label(pares_frame, text="Max:").pack(side=tk.LEFT)
@@ -1128,8 +1326,8 @@ class LotomaniaIA(tk.Tk):
         tk.Label(criterios_frame, text="Números Ímpares:", font=("Arial", 9, "bold")).grid(row=row_idx, column=0, sticky="w", pady=2, padx=5)
         impares_frame = tk.Frame(criterios_frame)
         impares_frame.grid(row=row_idx, column=1, sticky="ew", pady=2, padx=5)
-        self.impares_min_var = tk.IntVar(value=20)
-        self.impares_max_var = tk.IntVar(value=30)
+        self.impares_min_var = tk.IntVar(value=inicial['impares_min'])
+        self.impares_max_var = tk.IntVar(value=inicial['impares_max'])
         impares_min_spin = tk.Spinbox(impares_frame, from_=0, to=50, textvariable=self.impares_min_var, width=6)
         impares_min_spin.pack(side=tk.LEFT, padx=2)
         tk.Label(impares_frame, text="Max:").pack(side=tk.LEFT)
@@ -1142,33 +1340,33 @@ class LotomaniaIA(tk.Tk):
         tk.Label(criterios_frame, text="Números na Moldura:", font=("Arial", 9, "bold")).grid(row=row_idx, column=0, sticky="w", pady=2, padx=5)
         moldura_frame = tk.Frame(criterios_frame)
         moldura_frame.grid(row=row_idx, column=1, sticky="ew", pady=2, padx=5)
-        self.moldura_min_var = tk.IntVar(value=12)
-        self.moldura_max_var = tk.IntVar(value=22)
-        moldura_min_spin = tk.Spinbox(moldura_frame, from_=0, to=34, textvariable=self.moldura_min_var, width=6)
+        self.moldura_min_var = tk.IntVar(value=inicial['moldura_min'])
+        self.moldura_max_var = tk.IntVar(value=inicial['moldura_max'])
+        moldura_min_spin = tk.Spinbox(moldura_frame, from_=0, to=NUM_MOLDURA, textvariable=self.moldura_min_var, width=6)
         moldura_min_spin.pack(side=tk.LEFT, padx=2)
         tk.Label(moldura_frame, text="Max:").pack(side=tk.LEFT)
-        moldura_max_spin = tk.Spinbox(moldura_frame, from_=0, to=34, textvariable=self.moldura_max_var, width=6)
+        moldura_max_spin = tk.Spinbox(moldura_frame, from_=0, to=NUM_MOLDURA, textvariable=self.moldura_max_var, width=6)
         moldura_max_spin.pack(side=tk.LEFT, padx=2)
-        self.add_tooltip(moldura_min_spin, "Número mínimo de dezenas da moldura (0-34).")
-        self.add_tooltip(moldura_max_spin, "Número máximo de dezenas da moldura (0-34).")
+        self.add_tooltip(moldura_min_spin, f"Número mínimo de dezenas da moldura (0-{NUM_MOLDURA}).")
+        self.add_tooltip(moldura_max_spin, f"Número máximo de dezenas da moldura (0-{NUM_MOLDURA}).")
         row_idx += 1
 
         tk.Label(criterios_frame, text="Números no Miolo:", font=("Arial", 9, "bold")).grid(row=row_idx, column=0, sticky="w", pady=2, padx=5)
         miolo_frame = tk.Frame(criterios_frame)
         miolo_frame.grid(row=row_idx, column=1, sticky="ew", pady=2, padx=5)
-        self.miolo_min_var = tk.IntVar(value=28)
-        self.miolo_max_var = tk.IntVar(value=38)
-        miolo_min_spin = tk.Spinbox(miolo_frame, from_=0, to=66, textvariable=self.miolo_min_var, width=6)
+        self.miolo_min_var = tk.IntVar(value=inicial['miolo_min'])
+        self.miolo_max_var = tk.IntVar(value=inicial['miolo_max'])
+        miolo_min_spin = tk.Spinbox(miolo_frame, from_=0, to=NUM_MIOLO, textvariable=self.miolo_min_var, width=6)
         miolo_min_spin.pack(side=tk.LEFT, padx=2)
         tk.Label(miolo_frame, text="Max:").pack(side=tk.LEFT)
-        miolo_max_spin = tk.Spinbox(miolo_frame, from_=0, to=66, textvariable=self.miolo_max_var, width=6)
+        miolo_max_spin = tk.Spinbox(miolo_frame, from_=0, to=NUM_MIOLO, textvariable=self.miolo_max_var, width=6)
         miolo_max_spin.pack(side=tk.LEFT, padx=2)
-        self.add_tooltip(miolo_min_spin, "Número mínimo de dezenas do miolo (0-66).")
-        self.add_tooltip(miolo_max_spin, "Número máximo de dezenas do miolo (0-66).")
+        self.add_tooltip(miolo_min_spin, f"Número mínimo de dezenas do miolo (0-{NUM_MIOLO}).")
+        self.add_tooltip(miolo_max_spin, f"Número máximo de dezenas do miolo (0-{NUM_MIOLO}).")
         row_idx += 1
 
         tk.Label(criterios_frame, text="Máx. Consecutivos:", font=("Arial", 9, "bold")).grid(row=row_idx, column=0, sticky="w", pady=2, padx=5)
-        self.max_consecutivos_var = tk.IntVar(value=3)
+        self.max_consecutivos_var = tk.IntVar(value=inicial['max_consecutivos'])
         max_consecutivos_spin = tk.Spinbox(criterios_frame, from_=0, to=10, textvariable=self.max_consecutivos_var, width=6)
         max_consecutivos_spin.grid(row=row_idx, column=1, sticky="w", pady=2, padx=5)
         self.add_tooltip(max_consecutivos_spin, "Número máximo de dezenas consecutivas permitidas (ex: 01, 02, 03).")
@@ -1177,66 +1375,160 @@ class LotomaniaIA(tk.Tk):
         tk.Label(criterios_frame, text="Números Primos:", font=("Arial", 9, "bold")).grid(row=row_idx, column=0, sticky="w", pady=2, padx=5)
         primos_frame = tk.Frame(criterios_frame)
         primos_frame.grid(row=row_idx, column=1, sticky="ew", pady=2, padx=5)
-        self.primos_min_var = tk.IntVar(value=10)
-        self.primos_max_var = tk.IntVar(value=18)
-        primos_min_spin = tk.Spinbox(primos_frame, from_=0, to=25, textvariable=self.primos_min_var, width=6)
+        self.primos_min_var = tk.IntVar(value=inicial['primos_min'])
+        self.primos_max_var = tk.IntVar(value=inicial['primos_max'])
+        primos_min_spin = tk.Spinbox(primos_frame, from_=0, to=NUM_PRIMOS, textvariable=self.primos_min_var, width=6)
         primos_min_spin.pack(side=tk.LEFT, padx=2)
         tk.Label(primos_frame, text="Max:").pack(side=tk.LEFT)
-        primos_max_spin = tk.Spinbox(primos_frame, from_=0, to=25, textvariable=self.primos_max_var, width=6)
+        primos_max_spin = tk.Spinbox(primos_frame, from_=0, to=NUM_PRIMOS, textvariable=self.primos_max_var, width=6)
         primos_max_spin.pack(side=tk.LEFT, padx=2)
-        self.add_tooltip(primos_min_spin, "Número mínimo de dezenas primas (0-25).")
-        self.add_tooltip(primos_max_spin, "Número máximo de dezenas primas (0-25).")
+        self.add_tooltip(primos_min_spin, f"Número mínimo de dezenas primas (0-{NUM_PRIMOS}).")
+        self.add_tooltip(primos_max_spin, f"Número máximo de dezenas primas (0-{NUM_PRIMOS}).")
         row_idx += 1
+
+        # Limites do volante valem para cada grupo (ex.: toda linha); o intervalo completo desativa o critério
+        self.volante_vars = {}
+        rotulos_volante = {'linha': "Por Linha:", 'coluna': "Por Coluna:", 'quadrante': "Por Quadrante:", 'diagonal': "Por Diagonal:"}
+        for prefixo, _, _, tamanho in CRITERIOS_VOLANTE:
+            tk.Label(criterios_frame, text=rotulos_volante[prefixo], font=("Arial", 9, "bold")).grid(row=row_idx, column=0, sticky="w", pady=2, padx=5)
+            volante_frame = tk.Frame(criterios_frame)
+            volante_frame.grid(row=row_idx, column=1, sticky="ew", pady=2, padx=5)
+            minimo_var = tk.IntVar(value=inicial[f'{prefixo}_min'] or 0)
+            maximo_var = tk.IntVar(value=tamanho if inicial[f'{prefixo}_max'] is None else inicial[f'{prefixo}_max'])
+            minimo_spin = tk.Spinbox(volante_frame, from_=0, to=tamanho, textvariable=minimo_var, width=6)
+            minimo_spin.pack(side=tk.LEFT, padx=2)
+            tk.Label(volante_frame, text="Max:").pack(side=tk.LEFT)
+            maximo_spin = tk.Spinbox(volante_frame, from_=0, to=tamanho, textvariable=maximo_var, width=6)
+            maximo_spin.pack(side=tk.LEFT, padx=2)
+            self.add_tooltip(minimo_spin, f"Mínimo de dezenas em cada {prefixo} do volante (0-{tamanho}).")
+            self.add_tooltip(maximo_spin, f"Máximo de dezenas em cada {prefixo} do volante (0-{tamanho}).")
+            self.volante_vars[prefixo] = (minimo_var, maximo_var, tamanho)
+            row_idx += 1
         
-        def aplicar_sugestoes_historicas():
-            if not self.estatisticas_historicas:
-                messagebox.showwarning("Dados Ausentes", "Nenhuma estatística histórica disponível para sugestões. Por favor, atualize os dados online ou use dados simulados.")
+        campos_criterios = {
+            'soma_min': self.soma_min_var, 'soma_max': self.soma_max_var,
+            'pares_min': self.pares_min_var, 'pares_max': self.pares_max_var,
+            'impares_min': self.impares_min_var, 'impares_max': self.impares_max_var,
+            'moldura_min': self.moldura_min_var, 'moldura_max': self.moldura_max_var,
+            'miolo_min': self.miolo_min_var, 'miolo_max': self.miolo_max_var,
+            'max_consecutivos': self.max_consecutivos_var,
+            'primos_min': self.primos_min_var, 'primos_max': self.primos_max_var,
+        }
+
+        def preencher_criterios(criterios):
+            criterios = {**CRITERIOS_BALANCEADOS_PADRAO, **criterios}
+            for chave, var in campos_criterios.items():
+                var.set(criterios[chave])
+            for prefixo, (minimo_var, maximo_var, tamanho) in self.volante_vars.items():
+                minimo_var.set(criterios[f'{prefixo}_min'] or 0)
+                maximo_var.set(tamanho if criterios[f'{prefixo}_max'] is None else criterios[f'{prefixo}_max'])
+
+        def ler_criterios():
+            """Critérios da janela; os limites do volante só entram se restringem algo. ValueError se um mínimo passa do máximo."""
+            criterios = {chave: var.get() for chave, var in campos_criterios.items()}
+            for prefixo, (minimo_var, maximo_var, tamanho) in self.volante_vars.items():
+                minimo, maximo = minimo_var.get(), maximo_var.get()
+                if minimo > maximo:
+                    raise ValueError(f"Mínimo deve ser menor ou igual ao Máximo por {prefixo} do volante.")
+                if minimo > 0 or maximo < tamanho:
+                    criterios[f'{prefixo}_min'] = minimo
+                    criterios[f'{prefixo}_max'] = maximo
+            return criterios
+
+        def mostrar_avaliacao(avaliacao, origem):
+            avaliacao_label.config(text=f"{origem}: {resumo_avaliacao_criterios(avaliacao)}" if avaliacao else "")
+
+        def carregar_predefinicao(event=None):
+            predefinicao = self.configuracao.predefinicao(predefinicao_var.get())
+            if predefinicao is None:
                 return
+            preencher_criterios(predefinicao['criterios'])
+            mostrar_avaliacao(predefinicao['avaliacao'], f"Predefinição '{predefinicao_var.get()}'")
 
-            stats = self.estatisticas_historicas
-            
-            self.soma_min_var.set(max(0, int(stats['soma_media'] - 2 * stats['soma_std'])))
-            self.soma_max_var.set(min(4950, int(stats['soma_media'] + 2 * stats['soma_std'])))
-
-            self.pares_min_var.set(max(0, int(stats['pares_media'] - 1 * stats['pares_std'])))
-            self.pares_max_var.set(min(50, int(stats['pares_media'] + 1 * stats['pares_std'])))
-            
-            self.impares_min_var.set(max(0, int(stats['impares_media'] - 1 * stats['impares_std'])))
-            self.impares_max_var.set(min(50, int(stats['impares_media'] + 1 * stats['impares_std'])))
-
-            self.moldura_min_var.set(max(0, int(stats['moldura_media'] - 1 * stats['moldura_std'])))
-            self.moldura_max_var.set(min(34, int(stats['moldura_media'] + 1 * stats['moldura_std'])))
-
-            self.miolo_min_var.set(max(0, int(stats['miolo_media'] - 1 * stats['miolo_std'])))
-            self.miolo_max_var.set(min(66, int(stats['miolo_media'] + 1 * stats['miolo_std'])))
-
-            self.primos_min_var.set(max(0, int(stats['primos_media'] - 1 * stats['primos_std'])))
-            self.primos_max_var.set(min(25, int(stats['primos_media'] + 1 * stats['primos_std'])))
-
-            self.max_consecutivos_var.set(3) 
+        def salvar_predefinicao():
+            nome = simpledialog.askstring("Salvar Predefinição", "Nome da predefinição:", initialvalue=predefinicao_var.get(), parent=top)
+            if not nome:
+                return
+            try:
+                criterios = ler_criterios()
+            except (ValueError, tk.TclError) as e:
+                messagebox.showerror("Erro de Critério", str(e), parent=top)
+                return
+            top.config(cursor="watch")
+            top.update_idletasks()
+            try:
+                avaliacao = self.configuracao.salvar_predefinicao(nome.strip(), criterios) # Mede a aceitação uma vez, ao salvar
+            finally:
+                top.config(cursor="")
+            predefinicao_combo.config(values=self.configuracao.nomes_predefinicoes())
+            predefinicao_var.set(nome.strip())
+            mostrar_avaliacao(avaliacao, f"Predefinição '{nome.strip()}'")
+
+        def excluir_predefinicao():
+            nome = predefinicao_var.get()
+            if nome and messagebox.askyesno("Excluir Predefinição", f"Excluir a predefinição '{nome}'?", parent=top):
+                self.configuracao.remover_predefinicao(nome)
+                predefinicao_combo.config(values=self.configuracao.nomes_predefinicoes())
+                predefinicao_var.set("")
+                mostrar_avaliacao(None, "")
+
+        predefinicao_combo.bind("<<ComboboxSelected>>", carregar_predefinicao)
+        tk.Button(predefinicoes_frame, text="Salvar Como...", command=salvar_predefinicao).pack(side=tk.LEFT, padx=2)
+        tk.Button(predefinicoes_frame, text="Excluir", command=excluir_predefinicao).pack(side=tk.LEFT, padx=2)
+        if ultimas.get('avaliacao'):
+            mostrar_avaliacao(ultimas['avaliacao'], "Última geração")
 
-            messagebox.showinfo("Sugestões Aplicadas", "Critérios preenchidos com sugestões baseadas no histórico de sorteios.")
+        def aplicar_sugestoes_historicas():
+            # Guardadas no arquivo de configurações a cada atualização do histórico: não há nada a recalcular aqui
+            sugestoes = self.configuracao.sugestoes()
+            if sugestoes is None and self.estatisticas_historicas:
+                criterios = sugerir_criterios_balanceados(self.estatisticas_historicas, self.analise_volante)
+                sugestoes = {'criterios': criterios, 'avaliacao': avaliar_criterios(criterios), 'num_sorteios': len(self.historico[-500:])}
+            if sugestoes is None:
+                messagebox.showwarning("Dados Ausentes", "Nenhuma estatística histórica disponível para sugestões. Por favor, atualize os dados online ou use dados simulados.")
+                return
+            preencher_criterios(sugestoes['criterios'])
+            mostrar_avaliacao(sugestoes['avaliacao'], f"Sugestões de {sugestoes['num_sorteios']} sorteios")
+            messagebox.showinfo("Sugestões Aplicadas", "Critérios preenchidos com sugestões baseadas no histórico de sorteios.\n\n" + resumo_avaliacao_criterios(sugestoes['avaliacao']))
+
+        # Amostragem, dezenas fixas e pontuação mínima combinadas aos critérios no mesmo pipeline
+        combinar_frame = tk.LabelFrame(top, text="Combinar com Amostragem, Filtros e Pontuação", font=("Arial", 10, "bold"), padx=10, pady=5)
+        combinar_frame.pack(fill=tk.X, padx=10, pady=5)
+        rotulos_amostragem = {"Uniforme": "uniforme", "Frequência": "frequencia", "Modelo de Transição": "transicao", "Modelo de IA": "ia"}
+        amostragem_var = tk.StringVar(value=next((r for r, a in rotulos_amostragem.items() if a == ultimas.get('amostragem')), "Uniforme"))
+        intensidade_var = tk.DoubleVar(value=ultimas.get('intensidade', 1.0))
+        percentil_var = tk.IntVar(value=ultimas.get('percentil_ia', 0))
+        tk.Label(combinar_frame, text="Amostragem:").grid(row=0, column=0, sticky="w")
+        ttk.Combobox(combinar_frame, textvariable=amostragem_var, values=list(rotulos_amostragem), state="readonly", width=18).grid(row=0, column=1, sticky="w", padx=2)
+        tk.Label(combinar_frame, text="Intensidade:").grid(row=0, column=2, sticky="w", padx=(10, 0))
+        intensidade_spin = tk.Spinbox(combinar_frame, from_=0.0, to=5.0, increment=0.25, textvariable=intensidade_var, width=5)
+        intensidade_spin.grid(row=0, column=3, sticky="w", padx=2)
+        tk.Label(combinar_frame, text="Pontuação IA mín. (percentil):").grid(row=1, column=0, columnspan=2, sticky="w")
+        percentil_spin = tk.Spinbox(combinar_frame, from_=0, to=99, textvariable=percentil_var, width=5)
+        percentil_spin.grid(row=1, column=2, sticky="w", padx=2)
+        tk.Label(combinar_frame, text="Incluir:").grid(row=2, column=0, sticky="w")
+        entry_incluir = tk.Entry(combinar_frame, width=55)
+        entry_incluir.grid(row=2, column=1, columnspan=3, sticky="ew", padx=2, pady=2)
+        entry_incluir.insert(0, ultimas.get('incluir', ""))
+        tk.Label(combinar_frame, text="Excluir:").grid(row=3, column=0, sticky="w")
+        entry_excluir = tk.Entry(combinar_frame, width=55)
+        entry_excluir.grid(row=3, column=1, columnspan=3, sticky="ew", padx=2, pady=2)
+        entry_excluir.insert(0, ultimas.get('excluir', ""))
+        self.add_tooltip(intensidade_spin, "Quanto a amostragem favorece as dezenas bem pontuadas (0 = uniforme).")
+        self.add_tooltip(percentil_spin, "Rejeita jogos cuja pontuação pelo modelo de IA fica abaixo deste percentil entre jogos aleatórios (0 = desligado).")
+        self.add_tooltip(entry_incluir, "Dezenas (00-99, separadas por vírgula) presentes em todos os jogos.")
+        self.add_tooltip(entry_excluir, "Dezenas (00-99, separadas por vírgula) fora de todos os jogos.")
 
         tk.Button(top, text="Sugestões Baseadas no Histórico", command=aplicar_sugestoes_historicas, font=("Arial", 10), bg="#FFD700", fg="#333", padx=10, pady=5, relief="raised").pack(pady=(10, 5))
 
 
         def aplicar_balanceado():
             try:
-                criterios = {
-                    'soma_min': self.soma_min_var.get(),
-                    'soma_max': self.soma_max_var.get(),
-                    'pares_min': self.pares_min_var.get(),
-                    'pares_max': self.pares_max_var.get(),
-                    'impares_min': self.impares_min_var.get(),
-                    'impares_max': self.impares_max_var.get(),
-                    'moldura_min': self.moldura_min_var.get(),
-                    'moldura_max': self.moldura_max_var.get(),
-                    'miolo_min': self.miolo_min_var.get(),
-                    'miolo_max': self.miolo_max_var.get(),
-                    'max_consecutivos': self.max_consecutivos_var.get(),
-                    'primos_min': self.primos_min_var.get(),
-                    'primos_max': self.primos_max_var.get()
-                }
+                try:
+                    criterios = ler_criterios()
+                except ValueError as e:
+                    messagebox.showerror("Erro de Critério", str(e))
+                    return
 
                 if not (criterios['soma_min'] <= criterios['soma_max']):
                     messagebox.showerror("Erro de Critério", "Soma Mínima deve ser menor ou igual à Soma Máxima.")
@@ -1250,29 +1542,49 @@ class LotomaniaIA(tk.Tk):
                 if not (criterios['primos_min'] <= criterios['primos_max']):
                     messagebox.showerror("Erro de Critério", "Mínimo deve ser menor ou igual ao Máximo para Primos.")
                     return
-                
-                if (criterios['pares_min'] + criterios['impares_min'] > NUM_DEZENAS_POR_APOSTA or
-                    criterios['pares_max'] + criterios['impares_max'] < NUM_DEZENAS_POR_APOSTA):
-                    messagebox.showwarning("Aviso de Critério", f"A soma dos intervalos de Pares/Ímpares ({criterios['pares_min']}-{criterios['pares_max']} e {criterios['impares_min']}-{criterios['impares_max']}) pode não permitir uma combinação de {NUM_DEZENAS_POR_APOSTA} números. Verifique seus limites. Note que os totais para pares e ímpares devem somar {NUM_DEZENAS_POR_APOSTA}.")
-
-                if (criterios['moldura_min'] + criterios['miolo_min'] > NUM_DEZENAS_POR_APOSTA or
-                    criterios['moldura_max'] + criterios['miolo_max'] < NUM_DEZENAS_POR_APOSTA):
-                    messagebox.showwarning("Aviso de Critério", f"A soma dos intervalos de Moldura/Miolo ({criterios['moldura_min']}-{criterios['moldura_max']} e {criterios['miolo_min']}-{criterios['miolo_max']}) pode não permitir uma combinação de {NUM_DEZENAS_POR_APOSTA} números. Verifique seus limites. Note que os totais para moldura e miolo devem somar {NUM_DEZENAS_POR_APOSTA}.")
-                    
+                motivos = verificar_criterios(criterios)
+                if motivos: # Limites que nenhum jogo de 50 dezenas atende: não adianta sortear candidatos
+                    messagebox.showerror("Critérios Impossíveis", "Nenhum jogo atende aos critérios:\n" + "\n".join(motivos))
+                    return
+
                 num_jogos = self.num_jogos_gerar.get()
-                
+                amostragem = rotulos_amostragem[amostragem_var.get()]
+                percentil = percentil_var.get()
+                if (amostragem != "uniforme" or percentil) and not self.historico:
+                    messagebox.showwarning("Dados Ausentes", "A amostragem ponderada e a pontuação precisam do histórico. Por favor, atualize os dados online.")
+                    return
+                incluir = [int(p) for p in entry_incluir.get().replace(" ", "").split(',') if p]
+                excluir = [int(p) for p in entry_excluir.get().replace(" ", "").split(',') if p]
+                indice = self._indice_repeticoes() if self.evitar_repeticoes_var.get() else None
+                if indice is False:
+                    return
+                pesos = pesos_de_amostragem(amostragem, self.frequencias, self.modelo_transicao, self.modelo_ia, intensidade_var.get())
+                pontuadores = [pontuador_dezenas("modelo de IA", self.modelo_ia.pontuar(), percentil)] if percentil else []
+                pipeline = PipelineGeracao(pesos, incluir, excluir, validadores=etapas_criterios(criterios), pontuadores=pontuadores, indice=indice)
+
                 self.show_progress_window(num_jogos)
 
                 start_time = time.time()
-                jogos = gerar_balanceado_lotomania(criterios, num_jogos, 
-                                                progress_callback=self.update_progress_bar,
-                                                stop_event=self.stop_event)
+                stop_event = self.stop_event
+                jogos, relatorio = pipeline.gerar(num_jogos, progress_callback=self.update_progress_bar, stop_event=stop_event,
+                                                  taxa_aceitacao=self.configuracao.taxa_aceitacao(criterios))
                 end_time = time.time()
                 
                 self.hide_progress_window()
 
-                if not self.stop_event.is_set():
+                if not stop_event.is_set():
+                    self.configuracao.guardar_ultimas(
+                        criterios=criterios, predefinicao=predefinicao_var.get(), avaliacao=avaliacao_do_relatorio(relatorio),
+                        amostragem=amostragem, intensidade=intensidade_var.get(), percentil_ia=percentil,
+                        incluir=entry_incluir.get(), excluir=entry_excluir.get(), num_jogos=num_jogos,
+                        evitar_repeticoes=self.evitar_repeticoes_var.get(), limiar_repeticao=self.limiar_repeticao_var.get())
                     self.atualizar_resultado_text_area(jogos, end_time - start_time)
+                    resumo = resumo_pipeline(relatorio)
+                    self.resultado_text_area.config(state=tk.NORMAL)
+                    self.resultado_text_area.insert(tk.END, f"\n{resumo}\n")
+                    self.resultado_text_area.config(state=tk.DISABLED)
+                    if len(jogos) < num_jogos:
+                        messagebox.showwarning("Aviso de Geração Balanceada", f"Só {len(jogos)} de {num_jogos} jogo(s) atenderam a todas as etapas.\n\n{resumo}")
                     top.destroy()
                 else:
                     self.limpar_resultados()
@@ -1313,11 +1625,11 @@ class LotomaniaIA(tk.Tk):
         y = self.winfo_y() + (self.winfo_height() // 2) - (self.progress_window.winfo_height() // 2)
         self.progress_window.geometry(f"+{int(x)}+{int(y)}")
 
-    def update_progress_bar(self, current_game_idx, total_games, current_attempt, max_attempts_per_game):
+    def update_progress_bar(self, aceitos, total_games, candidatos, max_candidatos):
         if self.progress_window and self.progress_bar:
-            progress_value = (current_game_idx * 100) + (current_attempt / max_attempts_per_game) * 100
-            self.progress_bar["value"] = progress_value
-            self.progress_label.config(text=f"Gerando jogo {current_game_idx + 1}/{total_games}...")
+            # A barra avança com os jogos aceitos ou, se a aceitação for baixa, com os candidatos testados
+            self.progress_bar["value"] = max(aceitos / total_games, candidatos / max_candidatos) * total_games * 100
+            self.progress_label.config(text=f"Gerando jogo {min(aceitos + 1, total_games)}/{total_games}... ({candidatos} candidatos)")
             self.progress_window.update_idletasks()
 
     def hide_progress_window(self):
@@ -1371,6 +1683,103 @@ class ToolTip:
             self.tip_window.destroy()
         self.tip_window = None
 
+class PainelGraficoFrequencias(tk.Toplevel):
+    """Janela do gráfico criada uma vez: fechar apenas a esconde, e reabrir ou atualizar os dados reaproveita a figura."""
+    def __init__(self, app):
+        super().__init__(app)
+        self.app = app
+        self.title("Análise Gráfica de Frequência - Lotomania")
+        self.geometry("1000x640")
+        self.protocol("WM_DELETE_WINDOW", self.withdraw)
+
+        controles = tk.Frame(self)
+        controles.pack(side=tk.TOP, fill=tk.X, padx=10, pady=5)
+        self.visao_var = tk.StringVar(value="total")
+        for texto, visao in (("Todo o Histórico", "total"), ("Últimos Sorteios", "janela"), ("Atraso Atual", "atraso")):
+            tk.Radiobutton(controles, text=texto, variable=self.visao_var, value=visao, command=self.atualizar).pack(side=tk.LEFT, padx=5)
+        self.janela_var = tk.IntVar(value=GRAFICO_JANELA_PADRAO)
+        janela_spin = tk.Spinbox(controles, from_=10, to=5000, increment=10, textvariable=self.janela_var, width=6, command=self.atualizar)
+        janela_spin.pack(side=tk.LEFT, padx=5)
+        janela_spin.bind('<Return>', lambda evento: self.atualizar())
+        app.add_tooltip(janela_spin, "Quantidade de sorteios recentes da visão \"Últimos Sorteios\".")
+        tk.Button(controles, text="Exportar PNG/SVG", command=self.exportar).pack(side=tk.RIGHT, padx=5)
+
+        self.grafico = GraficoFrequencias()
+        self.canvas = FigureCanvasTkAgg(self.grafico.figura, master=self)
+        self.canvas.get_tk_widget().pack(side=tk.TOP, fill=tk.BOTH, expand=1)
+        self.atualizar()
+
+    def mostrar(self):
+        self.deiconify()
+        self.lift()
+        self.atualizar()
+
+    def _janela(self):
+        try:
+            return max(1, self.janela_var.get())
+        except tk.TclError: # Campo vazio ou inválido enquanto o usuário digita
+            return GRAFICO_JANELA_PADRAO
+
+    def atualizar(self):
+        if not self.app.historico:
+            return
+        self.grafico.atualizar(*dados_grafico_lotomania(self.visao_var.get(), self.app.historico, self._janela(), self.app.analise_atrasos))
+
+    def exportar(self):
+        caminho = filedialog.asksaveasfilename(parent=self, defaultextension=".png", filetypes=[("Imagem PNG", "*.png"), ("Imagem SVG", "*.svg")], title="Exportar Gráfico")
+        if not caminho:
+            return
+        try:
+            self.grafico.salvar(caminho)
+            messagebox.showinfo("Gráfico Exportado", f"Gráfico salvo em:\n{caminho}", parent=self)
+        except (OSError, ValueError) as e:
+            messagebox.showerror("Erro ao Exportar", f"Não foi possível salvar o gráfico: {e}", parent=self)
+
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="IA de Geração de Números Lotomania")
+    perfil = configuracao_perfil()
+    parser.add_argument("--perfil", choices=PERFIL_MODOS, default=perfil['modo'], help="Perfila atualizações e gerações (também via LOTOMANIA_PERFIL).")
+    parser.add_argument("--perfil-dir", default=perfil['diretorio'], help="Diretório dos arquivos de perfil.")
+    parser.add_argument("--grafico", metavar="ARQUIVO", help="Renderiza o gráfico do histórico local em PNG/SVG e sai, sem abrir a interface.")
+    parser.add_argument("--visao", choices=GRAFICO_VISOES, default="total", help="Visão do gráfico exportado com --grafico.")
+    parser.add_argument("--janela", type=int, default=GRAFICO_JANELA_PADRAO, help="Sorteios recentes da visão 'janela'.")
+    parser.add_argument("--simular", type=int, metavar="SORTEIOS", help="Simula SORTEIOS sorteios contra jogos de uma estratégia, compara com a teoria e sai.")
+    parser.add_argument("--estrategia", choices=ESTRATEGIAS, default="aleatorio", help="Estratégia que gera os jogos de --simular.")
+    parser.add_argument("--jogos", type=int, default=10, help="Jogos gerados para --simular.")
+    parser.add_argument("--workers", type=int, help="Processos da simulação (padrão: todos os núcleos).")
+    parser.add_argument("--semente", type=int, help="Semente da simulação (mesma semente, mesmo resultado com qualquer número de processos).")
+    parser.add_argument("--importar", nargs="+", metavar="ARQUIVO", help="Mescla ao histórico local os sorteios de planilhas da Caixa (.xlsx/.htm), CSV ou JSON e sai.")
+    parser.add_argument("--substituir-conflitos", action="store_true", help="Com --importar, troca pelas dezenas do arquivo os concursos locais divergentes.")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(message)s") # Mensagens de andamento e avisos do núcleo no console
+    configurar_perfil(args.perfil, args.perfil_dir)
+
+    try: # Modos sem interface: erros do núcleo (ex.: histórico ilegível) encerram com a mensagem
+        if args.importar:
+            historico_map = carregar_historico_map()
+            relatorio = importar_historico(args.importar, historico_map, args.substituir_conflitos)
+            if relatorio['novos'] or relatorio['substituidos']:
+                salvar_historico(historico_map)
+            print(resumo_importacao(relatorio))
+            sys.exit(0)
+
+        if args.simular:
+            historico_map = carregar_historico_map()
+            if args.estrategia != "aleatorio" and not historico_map:
+                sys.exit("Nenhum histórico local para treinar a estratégia. Abra o programa e atualize os dados primeiro.")
+            jogos = jogos_da_estrategia(args.estrategia, [historico_map[c] for c in sorted(historico_map)], args.jogos)
+            print(resumo_simulacao(simular_estrategia_paralela(jogos, args.simular, args.semente, args.workers)))
+            sys.exit(0)
+
+        if args.grafico:
+            historico_map = carregar_historico_map()
+            if not historico_map:
+                sys.exit("Nenhum histórico local para o gráfico. Abra o programa e atualize os dados primeiro.")
+            exportar_grafico_lotomania(args.grafico, [historico_map[c] for c in sorted(historico_map)], args.visao, args.janela)
+            print(f"Gráfico salvo em {args.grafico}")
+            sys.exit(0)
+    except ErroLotomania as e:
+        sys.exit(e.mensagem)
+
     app = LotomaniaIA()
     app.mainloop()
\ No newline at end of file
@@ -0,0 +1,544 @@
+"""
+Serviço HTTP/JSON local da LotomaniaIA (sem interface gráfica), feito sobre asyncio da biblioteca padrão.
+
+Uso:
+    python servidor_lotomania.py                          # http://127.0.0.1:8765
+    python servidor_lotomania.py --porta 9000 --janela-lote 0.005
+
+Rotas:
+    GET  /saude
+    GET  /gerar?modo=aleatorio&quantidade=5               modos: aleatorio, frequencia, transicao, ia, filtros, balanceado, combinado
+    GET  /gerar?modo=frequencia&quantidade=5&distintos=45 sem jogos com 45 ou mais dezenas em comum
+    POST /gerar        {"modo": "filtros", "quantidade": 3, "inclusao": [1, 2], "exclusao": [99]}
+    POST /gerar        {"modo": "balanceado", "quantidade": 2, "criterios": {"soma_min": 2100, ...}}
+    POST /gerar        {"modo": "combinado", "amostragem": "frequencia", "inclusao": [7], "criterios": {...}, "percentil_ia": 80}
+    POST /gerar        {"modo": "balanceado", "predefinicao": "estreito", "criterios": {"primos_max": 16}}
+    GET  /predefinicoes                                   predefinições salvas e sugestões do histórico, com a avaliação
+    GET  /consulta?todas=7,44                             concursos em que 07 e 44 saíram juntos (e a última vez)
+    POST /consulta     {"jogo": [...], "minimo": 16, "de": 2000, "nenhuma": [0], "limite": 50}
+    GET  /analise/frequencia
+    GET  /analise/atrasos
+    GET  /analise/volante                                 linhas, colunas, quadrantes e diagonais
+    GET  /probabilidade
+    POST /comparar     {"jogos": [[...]], "concurso": 2700}    sem "concurso": contra todo o histórico
+    POST /carteira     {"jogos": [[...]], "metodo": "monte_carlo", "sorteios": 200000, "premios": {"20": 1e6}}
+    POST /recarregar   relê o histórico e as predefinições do disco e refaz as análises
+
+O histórico e as análises ficam em memória. Pedidos de geração iguais que chegam dentro da janela
+de lote são atendidos por uma única chamada ao gerador, executada fora do laço de eventos. Os modos
+balanceado e combinado só devolvem jogos que atendem aos critérios: se o limite de candidatos acabar
+antes, a resposta é 206 com 'faltaram' e 'aviso', e a falta é dividida entre os pedidos do lote.
+"""
+import argparse
+import asyncio
+import functools
+import json
+import logging
+import sys
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from http import HTTPStatus
+from urllib.parse import parse_qs, urlsplit
+
+import numpy as np
+
+import lotomania_core as lot
+
+SERVIDOR_HOST = "127.0.0.1"
+SERVIDOR_PORTA = 8765
+SERVIDOR_JANELA_LOTE = 0.001 # Segundos que um pedido de geração espera por outros iguais (0 agrupa só os simultâneos)
+SERVIDOR_MAX_LOTE = 500 # Jogos por chamada ao gerador; um lote cheio é despachado na hora
+SERVIDOR_MAX_JOGOS = 1000 # Jogos por pedido
+SERVIDOR_MAX_CONSULTA = 100_000 # Concursos listados por consulta ao histórico
+SERVIDOR_MAX_CORPO = 1024 * 1024 # Bytes
+SERVIDOR_TIMEOUT_OCIOSO = 30 # Segundos até fechar uma conexão keep-alive parada
+SERVIDOR_WORKERS = 2
+SERVIDOR_CARTEIRA_SORTEIOS = 200_000 # Sorteios simulados por avaliação de carteira, se o pedido não disser
+SERVIDOR_CARTEIRA_MAX_SORTEIOS = 5_000_000
+
+# Valores padrão da janela de geração balanceada; a predefinição e os critérios enviados no pedido os substituem
+CRITERIOS_PADRAO = dict(lot.CRITERIOS_BALANCEADOS_PADRAO)
+
+
+class ErroHTTP(Exception):
+    def __init__(self, status, mensagem):
+        super().__init__(mensagem)
+        self.status = status
+
+
+class EstadoServidor:
+    """Histórico, análises e modelos carregados uma vez e trocados de uma só vez em 'recarregar'."""
+    def __init__(self, caminho_historico=None):
+        self.caminho_historico = caminho_historico
+        self.recarregar()
+
+    def recarregar(self):
+        try:
+            historico_map = lot.carregar_historico_map(self.caminho_historico)
+        except lot.ErroHistorico as e: # Arquivo corrompido ou ilegível: o serviço sobe sem histórico
+            print(f"{e.mensagem} Iniciando sem histórico.")
+            historico_map = {}
+        concursos = sorted(historico_map)
+        historico = [historico_map[c] for c in concursos]
+        frequencias, atrasos = lot.analisar_frequencia_lotomania(historico)
+        analise_atrasos = lot.AnaliseAtrasos.do_historico(historico)
+        dados = {
+            'historico_map': historico_map,
+            'concursos': np.asarray(concursos, dtype=np.int64),
+            'historico': historico,
+            'mascaras': lot.dezenas_para_mascara(lot.historico_para_array(historico)),
+            'frequencias': frequencias,
+            'modelo_transicao': lot.ModeloTransicao().sincronizar(historico),
+            'indice_concursos': lot.IndiceConcursos().sincronizar(historico, concursos),
+            'modelo_ia': lot.ModeloLogisticoLotomania.carregar_ou_treinar(historico) if historico else lot.ModeloLogisticoLotomania(),
+            'configuracao': lot.ConfiguracaoUsuario(), # Predefinições salvas pela interface gráfica
+            'carregado_em': time.strftime("%Y-%m-%dT%H:%M:%S"),
+        }
+        # Respostas que só mudam com o histórico são serializadas uma vez
+        dados['resposta_frequencia'] = _json_bytes({
+            'num_sorteios': len(historico),
+            'frequencias': {f"{n:02d}": frequencias[n] for n in range(lot.NUM_DEZENAS_TOTAL)},
+            'atrasos': {f"{n:02d}": atrasos[n] for n in range(lot.NUM_DEZENAS_TOTAL)},
+        })
+        dados['resposta_atrasos'] = _json_bytes({
+            'num_sorteios': len(historico),
+            'atraso_atual': analise_atrasos.atraso_atual().tolist(),
+            'media': analise_atrasos.media().round(4).tolist(),
+            'p95': analise_atrasos.percentil(0.95).tolist(),
+            'maximo': analise_atrasos.maximo.tolist(),
+            'atrasadas_alem_p95': [{'dezena': d, 'atraso': a, 'p95': l} for d, a, l in analise_atrasos.atrasadas_alem_do_percentil(0.95)],
+        })
+        analise_volante = lot.analisar_volante_lotomania(historico)
+        dados['resposta_volante'] = _json_bytes({
+            **analise_volante,
+            'criterios_sugeridos': lot.sugerir_criterios_volante(analise_volante),
+        })
+        self.dados = dados # Troca atômica: pedidos em andamento continuam com o instantâneo anterior
+        return len(historico)
+
+
+class LoteadorGeracao:
+    """
+    Agrupa pedidos de geração com a mesma chave (modo e parâmetros) que chegam dentro de 'janela'
+    segundos em uma única chamada gerador(total), rodada no executor, e reparte o resultado.
+    """
+    def __init__(self, executor, janela=SERVIDOR_JANELA_LOTE, max_lote=SERVIDOR_MAX_LOTE):
+        self.executor = executor
+        self.janela = janela
+        self.max_lote = max_lote
+        self._abertos = {} # chave -> {'gerador', 'pedidos': [(quantidade, futuro)], 'total'}
+
+    async def gerar(self, chave, gerador, quantidade):
+        loop = asyncio.get_running_loop()
+        futuro = loop.create_future()
+        lote = self._abertos.get(chave)
+        if lote is None:
+            lote = self._abertos[chave] = {'gerador': gerador, 'pedidos': [], 'total': 0}
+            loop.call_later(self.janela, self._despachar, chave, lote)
+        lote['pedidos'].append((quantidade, futuro))
+        lote['total'] += quantidade
+        if lote['total'] >= self.max_lote:
+            self._despachar(chave, lote)
+        return await futuro
+
+    def _despachar(self, chave, lote):
+        if self._abertos.get(chave) is not lote:
+            return # Já despachado por ter enchido
+        del self._abertos[chave]
+        lot.TELEMETRIA.incrementar('servidor_lotes')
+        lot.TELEMETRIA.incrementar('servidor_pedidos_em_lote', len(lote['pedidos']))
+        execucao = asyncio.get_running_loop().run_in_executor(self.executor, lote['gerador'], lote['total'])
+        execucao.add_done_callback(lambda resultado: self._repartir(resultado, lote['pedidos']))
+
+    @staticmethod
+    def _repartir(resultado, pedidos):
+        # Se o gerador devolver menos jogos que o total do lote (critérios apertados), a falta é dividida
+        # entre os pedidos: os jogos são distribuídos um a um, em rodízio, até cada pedido completar a sua quantidade
+        erro = resultado.exception()
+        if erro:
+            for _, futuro in pedidos:
+                if not futuro.done(): # Cliente desconectou
+                    futuro.set_exception(erro)
+            return
+        partes = [[] for _ in pedidos]
+        fila = deque(i for i, (quantidade, _) in enumerate(pedidos) if quantidade)
+        for jogo in resultado.result():
+            if not fila:
+                break
+            i = fila.popleft()
+            partes[i].append(jogo)
+            if len(partes[i]) < pedidos[i][0]:
+                fila.append(i)
+        for (_, futuro), parte in zip(pedidos, partes):
+            if not futuro.done():
+                futuro.set_result(parte)
+
+
+def _json_bytes(obj):
+    return json.dumps(obj, ensure_ascii=False).encode('utf-8')
+
+
+def _inteiro(parametros, nome, padrao=None, minimo=None, maximo=None):
+    valor = parametros.get(nome, padrao)
+    try:
+        valor = int(valor)
+    except (TypeError, ValueError):
+        raise ErroHTTP(HTTPStatus.BAD_REQUEST, f"'{nome}' deve ser um número inteiro.")
+    if (minimo is not None and valor < minimo) or (maximo is not None and valor > maximo):
+        raise ErroHTTP(HTTPStatus.BAD_REQUEST, f"'{nome}' deve estar entre {minimo} e {maximo}.")
+    return valor
+
+
+def _criterios(parametros, configuracao):
+    """
+    Critérios do pedido sobre os da 'predefinicao' (salva em lot.CONFIG_FILE) ou sobre CRITERIOS_PADRAO;
+    None se o pedido não trouxer nenhum dos dois. Critérios que nenhum jogo atende são recusados.
+    """
+    nome = parametros.get('predefinicao')
+    recebidos = parametros.get('criterios')
+    if recebidos is not None and (not isinstance(recebidos, dict) or set(recebidos) - set(CRITERIOS_PADRAO)):
+        raise ErroHTTP(HTTPStatus.BAD_REQUEST, f"'criterios' aceita apenas as chaves {sorted(CRITERIOS_PADRAO)}.")
+    if nome is None and recebidos is None:
+        return None
+    criterios = dict(CRITERIOS_PADRAO)
+    if nome is not None:
+        predefinicao = configuracao.predefinicao(nome)
+        if predefinicao is None:
+            raise ErroHTTP(HTTPStatus.BAD_REQUEST, f"Predefinição desconhecida: {nome}. Salvas: {configuracao.nomes_predefinicoes()}.")
+        criterios.update(predefinicao['criterios'])
+    criterios.update(recebidos or {})
+    motivos = lot.verificar_criterios(criterios)
+    if motivos:
+        raise ErroHTTP(HTTPStatus.BAD_REQUEST, "Nenhum jogo atende aos critérios: " + " ".join(motivos))
+    return criterios
+
+
+def _lista_dezenas(valor, nome):
+    """Aceita lista JSON ou texto "1,2,3" e valida dezenas distintas entre 00 e 99."""
+    if valor is None:
+        return []
+    if isinstance(valor, str):
+        valor = [v for v in valor.split(',') if v.strip()]
+    try:
+        dezenas = sorted({int(v) for v in valor})
+    except (TypeError, ValueError):
+        raise ErroHTTP(HTTPStatus.BAD_REQUEST, f"'{nome}' deve ser uma lista de dezenas.")
+    if any(d < 0 or d >= lot.NUM_DEZENAS_TOTAL for d in dezenas):
+        raise ErroHTTP(HTTPStatus.BAD_REQUEST, f"As dezenas de '{nome}' devem estar entre 00 e 99.")
+    return dezenas
+
+
+class ServidorLotomania:
+    def __init__(self, estado, janela_lote=SERVIDOR_JANELA_LOTE, workers=SERVIDOR_WORKERS):
+        self.estado = estado
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="lotomania-servidor")
+        self.loteador = LoteadorGeracao(self.executor, janela_lote)
+        self.rotas = {
+            ('GET', '/saude'): self.saude,
+            ('GET', '/gerar'): self.gerar,
+            ('POST', '/gerar'): self.gerar,
+            ('GET', '/analise/frequencia'): lambda parametros: self.estado.dados['resposta_frequencia'],
+            ('GET', '/analise/atrasos'): lambda parametros: self.estado.dados['resposta_atrasos'],
+            ('GET', '/analise/volante'): lambda parametros: self.estado.dados['resposta_volante'],
+            ('GET', '/probabilidade'): self.probabilidade,
+            ('POST', '/comparar'): self.comparar,
+            ('POST', '/carteira'): self.carteira,
+            ('GET', '/predefinicoes'): self.predefinicoes,
+            ('GET', '/consulta'): self.consulta,
+            ('POST', '/consulta'): self.consulta,
+            ('POST', '/recarregar'): self.recarregar,
+        }
+
+    # --- Rotas ---
+    async def saude(self, parametros):
+        dados = self.estado.dados
+        concursos = dados['concursos']
+        return {
+            'status': 'ok',
+            'num_sorteios': int(len(concursos)),
+            'ultimo_concurso': int(concursos[-1]) if len(concursos) else None,
+            'carregado_em': dados['carregado_em'],
+        }
+
+    async def gerar(self, parametros):
+        dados = self.estado.dados
+        modo = parametros.get('modo', 'aleatorio')
+        quantidade = _inteiro(parametros, 'quantidade', 1, 1, SERVIDOR_MAX_JOGOS)
+        if modo == 'aleatorio':
+            chave, gerador = (modo,), lot.gerar_aleatorio_lotomania
+        elif modo == 'frequencia':
+            frequencias = dados['frequencias']
+            chave, gerador = (modo, id(frequencias)), lambda n: lot.gerar_baseado_em_frequencia_lotomania(frequencias, n)
+        elif modo == 'transicao':
+            modelo = dados['modelo_transicao']
+            chave, gerador = (modo, id(modelo)), lambda n: lot.gerar_por_transicao_lotomania(modelo, n)
+        elif modo == 'ia':
+            modelo = dados['modelo_ia']
+            chave, gerador = (modo, id(modelo)), lambda n: lot.gerar_por_modelo_ia_lotomania(modelo, n)
+        elif modo == 'filtros':
+            inclusao = _lista_dezenas(parametros.get('inclusao'), 'inclusao')
+            exclusao = _lista_dezenas(parametros.get('exclusao'), 'exclusao')
+            if set(inclusao) & set(exclusao):
+                raise ErroHTTP(HTTPStatus.BAD_REQUEST, "Uma dezena não pode estar na inclusão e na exclusão.")
+            if len(inclusao) > lot.NUM_DEZENAS_POR_APOSTA or lot.NUM_DEZENAS_TOTAL - len(exclusao) < lot.NUM_DEZENAS_POR_APOSTA:
+                raise ErroHTTP(HTTPStatus.BAD_REQUEST, "Filtros impossíveis para um jogo de 50 dezenas.")
+            chave, gerador = (modo, tuple(inclusao), tuple(exclusao)), lambda n: lot.gerar_com_filtros_lotomania(inclusao, exclusao, n)
+        elif modo == 'balanceado':
+            criterios = _criterios(parametros, dados['configuracao']) or dict(CRITERIOS_PADRAO)
+            # O pipeline dos critérios, sem o fallback aleatório de gerar_balanceado_lotomania: só jogos que atendem
+            pipeline_balanceado = lot.PipelineGeracao(validadores=lot.etapas_criterios(criterios))
+            taxa = dados['configuracao'].taxa_aceitacao(criterios)
+            chave = (modo, tuple(sorted(criterios.items())))
+            gerador = lambda n: pipeline_balanceado.gerar(n, taxa_aceitacao=taxa)[0]
+        elif modo == 'combinado':
+            # Amostragem ponderada, dezenas fixas, critérios e pontuação mínima num só pipeline; sem fallback aleatório
+            amostragem = parametros.get('amostragem', 'uniforme')
+            if amostragem not in lot.AMOSTRAGENS:
+                raise ErroHTTP(HTTPStatus.BAD_REQUEST, f"'amostragem' deve ser uma de {list(lot.AMOSTRAGENS)}.")
+            try:
+                intensidade = float(parametros.get('intensidade', 1.0))
+            except (TypeError, ValueError):
+                raise ErroHTTP(HTTPStatus.BAD_REQUEST, "'intensidade' deve ser um número.")
+            percentil = _inteiro(parametros, 'percentil_ia', 0, 0, 99)
+            inclusao = _lista_dezenas(parametros.get('inclusao'), 'inclusao')
+            exclusao = _lista_dezenas(parametros.get('exclusao'), 'exclusao')
+            criterios = _criterios(parametros, dados['configuracao'])
+            pesos = lot.pesos_de_amostragem(amostragem, dados['frequencias'], dados['modelo_transicao'], dados['modelo_ia'], intensidade)
+            try:
+                pipeline = lot.PipelineGeracao(
+                    pesos, inclusao, exclusao,
+                    validadores=lot.etapas_criterios(criterios) if criterios else (),
+                    pontuadores=[lot.pontuador_dezenas("modelo de IA", dados['modelo_ia'].pontuar(), percentil)] if percentil else ())
+            except ValueError as e:
+                raise ErroHTTP(HTTPStatus.BAD_REQUEST, str(e))
+            chave = (modo, amostragem, intensidade, percentil, tuple(inclusao), tuple(exclusao),
+                     tuple(sorted(criterios.items())) if criterios else None, id(dados))
+            taxa = dados['configuracao'].taxa_aceitacao(criterios) if criterios else None
+            gerador = lambda n: pipeline.gerar(n, taxa_aceitacao=taxa)[0]
+        else:
+            raise ErroHTTP(HTTPStatus.BAD_REQUEST, f"Modo desconhecido: {modo}.")
+
+        # 'distintos': rejeita jogos do lote com essa quantidade ou mais de dezenas em comum
+        if parametros.get('distintos') is not None:
+            limiar = _inteiro(parametros, 'distintos', minimo=1, maximo=lot.NUM_DEZENAS_POR_APOSTA)
+            gerador_base = gerador
+            chave = chave + ('distintos', limiar)
+            gerador = lambda n: lot.gerar_sem_repeticoes(gerador_base, n, lot.IndiceJogos(limiar))[0]
+
+        inicio = time.perf_counter()
+        with lot.TELEMETRIA.cronometro('servidor_gerar', modo=modo):
+            jogos = await self.loteador.gerar(chave, gerador, quantidade)
+        resposta = {'modo': modo, 'jogos': jogos, 'tempo_ms': round((time.perf_counter() - inicio) * 1000, 3)}
+        faltaram = quantidade - len(jogos)
+        if faltaram:
+            # Nunca uma lista curta com cara de completa: 206 e o aviso de quantos jogos faltaram
+            lot.TELEMETRIA.incrementar('servidor_jogos_faltantes', faltaram)
+            resposta['faltaram'] = faltaram
+            resposta['aviso'] = (f"Só {len(jogos)} de {quantidade} jogo(s) atenderam às condições dentro do limite de candidatos. "
+                                 f"Afrouxe os critérios, a pontuação mínima ou 'distintos'.")
+            return HTTPStatus.PARTIAL_CONTENT, resposta
+        return resposta
+
+    async def predefinicoes(self, parametros):
+        configuracao = self.estado.dados['configuracao']
+        return {
+            'predefinicoes': {nome: configuracao.predefinicao(nome) for nome in configuracao.nomes_predefinicoes()},
+            'sugestoes': configuracao.sugestoes(),
+        }
+
+    async def probabilidade(self, parametros):
+        probabilidades = lot.calcular_probabilidade_lotomania(0)
+        return {
+            'probabilidades': {str(acertos): p for acertos, p in probabilidades.items()},
+            'um_em': {str(acertos): round(1 / p) for acertos, p in probabilidades.items() if p > 0},
+        }
+
+    async def comparar(self, parametros):
+        dados = self.estado.dados
+        jogos = parametros.get('jogos')
+        if jogos is None and 'jogo' in parametros:
+            jogos = [parametros['jogo']]
+        if not isinstance(jogos, list) or not jogos:
+            raise ErroHTTP(HTTPStatus.BAD_REQUEST, "Envie 'jogos' (lista de jogos) ou 'jogo'.")
+        if len(jogos) > SERVIDOR_MAX_JOGOS:
+            raise ErroHTTP(HTTPStatus.BAD_REQUEST, f"No máximo {SERVIDOR_MAX_JOGOS} jogos por pedido.")
+        jogos = [_lista_dezenas(jogo, 'jogos') for jogo in jogos]
+        mascaras_jogos = lot.jogos_para_mascara(jogos)
+
+        if parametros.get('concurso') is not None:
+            concurso = _inteiro(parametros, 'concurso')
+            sorteio = dados['historico_map'].get(concurso)
+            if sorteio is None:
+                raise ErroHTTP(HTTPStatus.NOT_FOUND, f"Concurso {concurso} não encontrado no histórico.")
+            acertos = lot.acertos_por_mascara(mascaras_jogos, lot.jogos_para_mascara([sorteio]))[:, 0]
+            return {'concurso': concurso, 'sorteio': sorteio, 'acertos': acertos.tolist()}
+
+        if not len(dados['concursos']):
+            raise ErroHTTP(HTTPStatus.SERVICE_UNAVAILABLE, "Nenhum histórico carregado.")
+        acertos = await asyncio.get_running_loop().run_in_executor(
+            self.executor, lot.acertos_por_mascara, mascaras_jogos, dados['mascaras'])
+        resultados = []
+        for linha in acertos:
+            contagem = np.bincount(linha, minlength=lot.NUM_DEZENAS_SORTEADAS + 1)
+            melhor = int(np.argmax(linha))
+            resultados.append({
+                'faixas': {str(f): int(contagem[f]) for f in lot.FAIXAS_PREMIADAS},
+                'maximo_acertos': int(linha[melhor]),
+                'concurso_maximo': int(dados['concursos'][melhor]),
+            })
+        return {'num_sorteios': int(len(dados['concursos'])), 'resultados': resultados}
+
+    async def consulta(self, parametros):
+        # Interseção de listas de ocorrência: microssegundos, respondida no próprio laço de eventos
+        indice = self.estado.dados['indice_concursos']
+        jogo = _lista_dezenas(parametros.get('jogo'), 'jogo') or None
+        minimo = _inteiro(parametros, 'minimo', lot.FAIXAS_PREMIADAS[1] if jogo else 0, 0, lot.NUM_DEZENAS_SORTEADAS)
+        maximo = _inteiro(parametros, 'maximo', minimo=0, maximo=lot.NUM_DEZENAS_SORTEADAS) if parametros.get('maximo') is not None else None
+        de = _inteiro(parametros, 'de') if parametros.get('de') is not None else None
+        ate = _inteiro(parametros, 'ate') if parametros.get('ate') is not None else None
+        limite = _inteiro(parametros, 'limite', lot.CONSULTA_LIMITE_PADRAO, 0, SERVIDOR_MAX_CONSULTA)
+        inicio = time.perf_counter()
+        with lot.TELEMETRIA.cronometro('servidor_consulta'):
+            bitset = indice.consultar(_lista_dezenas(parametros.get('todas'), 'todas'), _lista_dezenas(parametros.get('alguma'), 'alguma'),
+                                      _lista_dezenas(parametros.get('nenhuma'), 'nenhuma'), jogo, minimo, maximo, de, ate)
+            resultado = indice.resultado(bitset, jogo=jogo, limite=limite)
+        return {**resultado, 'tempo_ms': round((time.perf_counter() - inicio) * 1000, 3)}
+
+    async def carteira(self, parametros):
+        jogos = parametros.get('jogos')
+        if not isinstance(jogos, list) or not jogos:
+            raise ErroHTTP(HTTPStatus.BAD_REQUEST, "Envie 'jogos' (lista de jogos).")
+        if len(jogos) > SERVIDOR_MAX_JOGOS:
+            raise ErroHTTP(HTTPStatus.BAD_REQUEST, f"No máximo {SERVIDOR_MAX_JOGOS} jogos por pedido.")
+        jogos = [_lista_dezenas(jogo, 'jogos') for jogo in jogos]
+        metodo = parametros.get('metodo')
+        num_sorteios = _inteiro(parametros, 'sorteios', SERVIDOR_CARTEIRA_SORTEIOS, 1, SERVIDOR_CARTEIRA_MAX_SORTEIOS)
+        premios = parametros.get('premios')
+        try:
+            premios = {int(faixa): float(valor) for faixa, valor in premios.items()} if premios is not None else None
+        except (AttributeError, TypeError, ValueError):
+            raise ErroHTTP(HTTPStatus.BAD_REQUEST, "'premios' deve ser um objeto {faixa: valor}.")
+        avaliar = functools.partial(lot.avaliar_carteira_lotomania, jogos, metodo=metodo, num_sorteios=num_sorteios,
+                                    historico_dezenas_list=self.estado.dados['historico'], premios=premios)
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self.executor, avaliar)
+        except ValueError as e:
+            raise ErroHTTP(HTTPStatus.BAD_REQUEST, str(e))
+
+    async def recarregar(self, parametros):
+        num_sorteios = await asyncio.get_running_loop().run_in_executor(self.executor, self.estado.recarregar)
+        return {'status': 'ok', 'num_sorteios': num_sorteios}
+
+    # --- HTTP ---
+    async def _responder(self, metodo, alvo, corpo):
+        url = urlsplit(alvo)
+        rota = self.rotas.get((metodo, url.path.rstrip('/') or '/'))
+        if rota is None:
+            caminhos = {caminho for _, caminho in self.rotas}
+            if url.path in caminhos:
+                raise ErroHTTP(HTTPStatus.METHOD_NOT_ALLOWED, f"Método {metodo} não suportado em {url.path}.")
+            raise ErroHTTP(HTTPStatus.NOT_FOUND, f"Rota desconhecida: {url.path}.")
+        parametros = {nome: valores[-1] for nome, valores in parse_qs(url.query).items()}
+        if corpo:
+            try:
+                json_corpo = json.loads(corpo)
+            except ValueError:
+                raise ErroHTTP(HTTPStatus.BAD_REQUEST, "Corpo da requisição não é um JSON válido.")
+            if not isinstance(json_corpo, dict):
+                raise ErroHTTP(HTTPStatus.BAD_REQUEST, "O corpo JSON deve ser um objeto.")
+            parametros.update(json_corpo)
+        resultado = rota(parametros)
+        if asyncio.iscoroutine(resultado):
+            resultado = await resultado
+        status = HTTPStatus.OK
+        if isinstance(resultado, tuple): # (status, corpo) para respostas que não são 200
+            status, resultado = resultado
+        return status, resultado if isinstance(resultado, bytes) else _json_bytes(resultado)
+
+    async def atender(self, reader, writer):
+        try:
+            while True:
+                try:
+                    linha = await asyncio.wait_for(reader.readline(), SERVIDOR_TIMEOUT_OCIOSO)
+                except asyncio.TimeoutError:
+                    break
+                if not linha.strip():
+                    break
+                metodo, alvo, versao = linha.decode('latin-1').split()
+                cabecalhos = {}
+                while True:
+                    linha_cabecalho = await reader.readline()
+                    if linha_cabecalho in (b'\r\n', b'\n', b''):
+                        break
+                    nome, _, valor = linha_cabecalho.decode('latin-1').partition(':')
+                    cabecalhos[nome.strip().lower()] = valor.strip()
+                conexao = cabecalhos.get('connection', '').lower()
+                manter = conexao == 'keep-alive' or (versao == 'HTTP/1.1' and conexao != 'close')
+
+                lot.TELEMETRIA.incrementar('servidor_requisicoes')
+                tamanho = int(cabecalhos.get('content-length') or 0)
+                if tamanho > SERVIDOR_MAX_CORPO:
+                    status, resposta, manter = HTTPStatus.REQUEST_ENTITY_TOO_LARGE, _json_bytes({'erro': "Corpo grande demais."}), False
+                else:
+                    corpo = await reader.readexactly(tamanho) if tamanho else b''
+                    try:
+                        status, resposta = await self._responder(metodo.upper(), alvo, corpo)
+                    except ErroHTTP as e:
+                        status, resposta = e.status, _json_bytes({'erro': str(e)})
+                    except lot.ErroLotomania as e:
+                        status, resposta = HTTPStatus.SERVICE_UNAVAILABLE, _json_bytes({'erro': e.mensagem, 'codigo': e.codigo})
+                    except Exception as e:
+                        lot.TELEMETRIA.incrementar('servidor_erros')
+                        print(f"Erro ao atender {metodo} {alvo}: {e}")
+                        status, resposta = HTTPStatus.INTERNAL_SERVER_ERROR, _json_bytes({'erro': "Erro interno."})
+
+                writer.write(
+                    f"HTTP/1.1 {status.value} {status.phrase}\r\n"
+                    f"Content-Type: application/json; charset=utf-8\r\n"
+                    f"Content-Length: {len(resposta)}\r\n"
+                    f"Connection: {'keep-alive' if manter else 'close'}\r\n\r\n".encode('latin-1') + resposta)
+                await writer.drain()
+                if not manter:
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError, ValueError):
+            pass # Cliente desconectou ou enviou uma requisição malformada
+        finally:
+            writer.close()
+
+    async def iniciar(self, host=SERVIDOR_HOST, porta=SERVIDOR_PORTA):
+        return await asyncio.start_server(self.atender, host, porta)
+
+    def fechar(self):
+        self.executor.shutdown(wait=False)
+
+
+async def servir(host=SERVIDOR_HOST, porta=SERVIDOR_PORTA, caminho_historico=None, janela_lote=SERVIDOR_JANELA_LOTE):
+    estado = EstadoServidor(caminho_historico)
+    servidor = ServidorLotomania(estado, janela_lote)
+    try:
+        async with await servidor.iniciar(host, porta) as tcp:
+            print(f"Servidor LotomaniaIA em http://{host}:{porta} ({len(estado.dados['historico'])} sorteios em memória)")
+            await tcp.serve_forever()
+    finally:
+        servidor.fechar()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serviço HTTP/JSON local da LotomaniaIA.")
+    parser.add_argument("--host", default=SERVIDOR_HOST, help="Endereço de escuta (padrão: apenas local).")
+    parser.add_argument("--porta", type=int, default=SERVIDOR_PORTA)
+    parser.add_argument("--historico", default=None, help="Arquivo de histórico (padrão: historico_lotomania.json).")
+    parser.add_argument("--janela-lote", type=float, default=SERVIDOR_JANELA_LOTE, help="Segundos que um pedido de geração espera para ser agrupado.")
+    args = parser.parse_args(argv)
+    # Só os avisos e erros do núcleo (cache ilegível, falha de gravação), no stderr
+    logging.basicConfig(level=logging.WARNING, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+    try:
+        asyncio.run(servir(args.host, args.porta, args.historico, args.janela_lote))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())